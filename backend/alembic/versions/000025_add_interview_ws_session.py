@@ -0,0 +1,40 @@
+"""Add interview_ws_session table for shared WebSocket session state
+
+Revision ID: 000025
+Revises: 000024
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "000025"
+down_revision = "000024"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE interview_ws_session (
+            session_key VARCHAR(128) NOT NULL,
+            interview_id VARCHAR(36) NOT NULL,
+            prefix VARCHAR(64) NOT NULL DEFAULT '',
+            started_at DOUBLE PRECISION NOT NULL,
+            audio_marker_timings JSON NOT NULL DEFAULT '[]',
+            fragment_index INTEGER NOT NULL DEFAULT 0,
+            spool_path VARCHAR(1024) NOT NULL,
+            updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            PRIMARY KEY (session_key),
+            FOREIGN KEY (interview_id) REFERENCES interview(id) ON DELETE CASCADE
+        )
+    """)
+    op.execute(
+        "CREATE INDEX ix_interview_ws_session_updated_at ON interview_ws_session (updated_at)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_interview_ws_session_updated_at")
+    op.execute("DROP TABLE IF EXISTS interview_ws_session")
@@ -0,0 +1,25 @@
+"""Add rolling context summary to interview
+
+Revision ID: 000026
+Revises: 000025
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "000026"
+down_revision = "000025"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE interview ADD COLUMN context_summary TEXT")
+    op.execute("ALTER TABLE interview ADD COLUMN context_summary_index INTEGER")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE interview DROP COLUMN IF EXISTS context_summary_index")
+    op.execute("ALTER TABLE interview DROP COLUMN IF EXISTS context_summary")
@@ -0,0 +1,38 @@
+"""Add interview_prompt_template table for rendered system prompts
+
+Revision ID: 000027
+Revises: 000026
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "000027"
+down_revision = "000026"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE interview_prompt_template (
+            cache_key VARCHAR(64) NOT NULL,
+            candidate_id VARCHAR(36) NOT NULL,
+            vacancy_id INTEGER,
+            prompt TEXT NOT NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            PRIMARY KEY (cache_key),
+            FOREIGN KEY (candidate_id) REFERENCES candidate(id) ON DELETE CASCADE,
+            FOREIGN KEY (vacancy_id) REFERENCES vacancy(id) ON DELETE CASCADE
+        )
+    """)
+    op.execute(
+        "CREATE INDEX ix_interview_prompt_template_candidate_id ON interview_prompt_template (candidate_id)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_interview_prompt_template_candidate_id")
+    op.execute("DROP TABLE IF EXISTS interview_prompt_template")
@@ -0,0 +1,23 @@
+"""Add pre-generated greeting to interview
+
+Revision ID: 000028
+Revises: 000027
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "000028"
+down_revision = "000027"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE interview ADD COLUMN pending_greeting TEXT")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE interview DROP COLUMN IF EXISTS pending_greeting")
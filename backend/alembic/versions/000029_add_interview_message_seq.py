@@ -0,0 +1,35 @@
+"""Add per-interview message sequence
+
+Revision ID: 000029
+Revises: 000028
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "000029"
+down_revision = "000028"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "ALTER TABLE interview ADD COLUMN message_seq INTEGER NOT NULL DEFAULT 0"
+    )
+    op.execute("""
+        UPDATE interview i
+        SET message_seq = m.next_index
+        FROM (
+            SELECT interview_id, MAX(index) + 1 AS next_index
+            FROM interview_message
+            GROUP BY interview_id
+        ) m
+        WHERE m.interview_id = i.id
+        """)
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE interview DROP COLUMN IF EXISTS message_seq")
@@ -0,0 +1,47 @@
+"""Add compatibility_report table for persisted compatibility reports
+
+Revision ID: 000030
+Revises: 000029
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "000030"
+down_revision = "000029"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE compatibility_report (
+            id SERIAL NOT NULL,
+            candidate_id VARCHAR(36) NOT NULL,
+            vacancy_id INTEGER NOT NULL,
+            fingerprint VARCHAR(64) NOT NULL,
+            scoring_version INTEGER NOT NULL,
+            status VARCHAR(32) NOT NULL DEFAULT 'pending',
+            report JSON,
+            overall_score DOUBLE PRECISION,
+            error TEXT,
+            computed_at TIMESTAMP,
+            created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            PRIMARY KEY (id),
+            CONSTRAINT uq_compatibility_report_fingerprint
+                UNIQUE (candidate_id, vacancy_id, fingerprint),
+            FOREIGN KEY (candidate_id) REFERENCES candidate(id) ON DELETE CASCADE,
+            FOREIGN KEY (vacancy_id) REFERENCES vacancy(id) ON DELETE CASCADE
+        )
+    """)
+    op.execute(
+        "CREATE INDEX ix_compatibility_report_vacancy_id ON compatibility_report (vacancy_id)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_compatibility_report_vacancy_id")
+    op.execute("DROP TABLE IF EXISTS compatibility_report")
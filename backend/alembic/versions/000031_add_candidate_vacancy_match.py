@@ -0,0 +1,47 @@
+"""Add candidate_vacancy_match table with precomputed match scores
+
+Revision ID: 000031
+Revises: 000030
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "000031"
+down_revision = "000030"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE candidate_vacancy_match (
+            vacancy_id INTEGER NOT NULL,
+            candidate_id VARCHAR(36) NOT NULL,
+            embedding_similarity DOUBLE PRECISION NOT NULL,
+            skills_pct INTEGER NOT NULL,
+            overall_score DOUBLE PRECISION NOT NULL,
+            skills_fingerprint VARCHAR(64) NOT NULL,
+            computed_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            PRIMARY KEY (vacancy_id, candidate_id),
+            FOREIGN KEY (vacancy_id) REFERENCES vacancy(id) ON DELETE CASCADE,
+            FOREIGN KEY (candidate_id) REFERENCES candidate(id) ON DELETE CASCADE
+        )
+    """)
+    # Top-k in both directions is an index range scan
+    op.execute(
+        "CREATE INDEX ix_candidate_vacancy_match_vacancy_score "
+        "ON candidate_vacancy_match (vacancy_id, overall_score DESC)"
+    )
+    op.execute(
+        "CREATE INDEX ix_candidate_vacancy_match_candidate_score "
+        "ON candidate_vacancy_match (candidate_id, overall_score DESC)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_candidate_vacancy_match_candidate_score")
+    op.execute("DROP INDEX IF EXISTS ix_candidate_vacancy_match_vacancy_score")
+    op.execute("DROP TABLE IF EXISTS candidate_vacancy_match")
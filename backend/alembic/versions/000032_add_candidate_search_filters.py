@@ -0,0 +1,102 @@
+"""Add candidate search filter columns and indexes for filtered top-k
+
+Revision ID: 000032
+Revises: 000031
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+import json
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "000032"
+down_revision = "000031"
+branch_labels = None
+depends_on = None
+
+
+def _parse_list(value) -> list:
+    if not value:
+        return []
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except json.JSONDecodeError:
+            return [value]
+    return value if isinstance(value, list) else []
+
+
+def _normalize_skill(skill) -> str:
+    return " ".join(str(skill).lower().split())
+
+
+def _experience_years(experience) -> int:
+    total_years = 0
+    for item in _parse_list(experience):
+        if isinstance(item, dict) and "years" in item:
+            try:
+                total_years += int(item["years"])
+            except (ValueError, TypeError):
+                pass
+    return total_years
+
+
+def upgrade() -> None:
+    op.execute(
+        "ALTER TABLE candidate "
+        "ADD COLUMN experience_years INTEGER NOT NULL DEFAULT 0, "
+        "ADD COLUMN skill_tags VARCHAR[] NOT NULL DEFAULT '{}'"
+    )
+
+    # Backfill with the same parsing as app.services.candidates
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.text("SELECT id, skills, tech, experience FROM candidate")
+    ).fetchall()
+    for candidate_id, skills, tech, experience in rows:
+        tags = {
+            _normalize_skill(skill) for skill in _parse_list(skills) + _parse_list(tech)
+        }
+        bind.execute(
+            sa.text(
+                "UPDATE candidate SET skill_tags = :tags, "
+                "experience_years = :years WHERE id = :id"
+            ),
+            {
+                "id": candidate_id,
+                "tags": sorted(tag for tag in tags if tag),
+                "years": _experience_years(experience),
+            },
+        )
+
+    op.execute("CREATE INDEX ix_candidate_geo_lower ON candidate (lower(geo))")
+    op.execute(
+        "CREATE INDEX ix_candidate_employment_type ON candidate (employment_type)"
+    )
+    op.execute("CREATE INDEX ix_candidate_status ON candidate (status)")
+    op.execute(
+        "CREATE INDEX ix_candidate_experience_years ON candidate (experience_years)"
+    )
+    # Containment (@>) on skill tags
+    op.execute(
+        "CREATE INDEX ix_candidate_skill_tags ON candidate USING GIN (skill_tags)"
+    )
+    op.execute("CREATE INDEX ix_vacancy_location_lower ON vacancy (lower(location))")
+    op.execute("CREATE INDEX ix_vacancy_employment_type ON vacancy (employment_type)")
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_vacancy_employment_type")
+    op.execute("DROP INDEX IF EXISTS ix_vacancy_location_lower")
+    op.execute("DROP INDEX IF EXISTS ix_candidate_skill_tags")
+    op.execute("DROP INDEX IF EXISTS ix_candidate_experience_years")
+    op.execute("DROP INDEX IF EXISTS ix_candidate_status")
+    op.execute("DROP INDEX IF EXISTS ix_candidate_employment_type")
+    op.execute("DROP INDEX IF EXISTS ix_candidate_geo_lower")
+    op.execute(
+        "ALTER TABLE candidate DROP COLUMN IF EXISTS skill_tags, "
+        "DROP COLUMN IF EXISTS experience_years"
+    )
@@ -0,0 +1,61 @@
+"""Add per-chunk embedding tables for candidates and vacancies
+
+Revision ID: 000033
+Revises: 000032
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+from sqlalchemy import text
+
+# revision identifiers, used by Alembic.
+revision = "000033"
+down_revision = "000032"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Same column type as the document embeddings (see 000024)
+    connection = op.get_bind()
+    result = connection.execute(
+        text("SELECT 1 FROM pg_extension WHERE extname = 'vector'")
+    ).fetchone()
+    embedding_type = "vector(1024)" if result else "TEXT"
+
+    op.execute(f"""
+        CREATE TABLE candidate_embedding_chunks (
+            id SERIAL PRIMARY KEY,
+            candidate_id VARCHAR(36) NOT NULL,
+            chunk_index INTEGER NOT NULL,
+            embedding {embedding_type} NOT NULL,
+            text_content TEXT NOT NULL,
+            FOREIGN KEY (candidate_id) REFERENCES candidate(id) ON DELETE CASCADE
+        )
+    """)
+    op.execute(f"""
+        CREATE TABLE vacancy_embedding_chunks (
+            id SERIAL PRIMARY KEY,
+            vacancy_id INTEGER NOT NULL,
+            chunk_index INTEGER NOT NULL,
+            embedding {embedding_type} NOT NULL,
+            text_content TEXT NOT NULL,
+            FOREIGN KEY (vacancy_id) REFERENCES vacancy(id) ON DELETE CASCADE
+        )
+    """)
+    op.execute(
+        "CREATE INDEX ix_candidate_embedding_chunks_candidate_id "
+        "ON candidate_embedding_chunks (candidate_id)"
+    )
+    op.execute(
+        "CREATE INDEX ix_vacancy_embedding_chunks_vacancy_id "
+        "ON vacancy_embedding_chunks (vacancy_id)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_vacancy_embedding_chunks_vacancy_id")
+    op.execute("DROP INDEX IF EXISTS ix_candidate_embedding_chunks_candidate_id")
+    op.execute("DROP TABLE IF EXISTS vacancy_embedding_chunks")
+    op.execute("DROP TABLE IF EXISTS candidate_embedding_chunks")
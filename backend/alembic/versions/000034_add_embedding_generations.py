@@ -0,0 +1,104 @@
+"""Add embedding generations for switching embedding models
+
+Revision ID: 000034
+Revises: 000033
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+from sqlalchemy import text
+
+# revision identifiers, used by Alembic.
+revision = "000034"
+down_revision = "000033"
+branch_labels = None
+depends_on = None
+
+# Existing embeddings were produced by GigaChat's "Embeddings" model
+INITIAL_GENERATION = "Embeddings"
+
+EMBEDDING_TABLES = [
+    ("candidate_embeddings", "candidate_id"),
+    ("vacancy_embeddings", "vacancy_id"),
+    ("candidate_embedding_chunks", "candidate_id"),
+    ("vacancy_embedding_chunks", "vacancy_id"),
+]
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE TABLE embedding_generation (
+            name VARCHAR(64) PRIMARY KEY,
+            model VARCHAR(64) NOT NULL,
+            dimension INTEGER NOT NULL,
+            status VARCHAR(16) NOT NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            activated_at TIMESTAMP
+        )
+    """)
+    # At most one generation is searched
+    op.execute(
+        "CREATE UNIQUE INDEX ix_embedding_generation_active "
+        "ON embedding_generation (status) WHERE status = 'active'"
+    )
+    op.execute(
+        "INSERT INTO embedding_generation (name, model, dimension, status, activated_at) "
+        f"VALUES ('{INITIAL_GENERATION}', 'Embeddings', 1024, 'active', NOW())"
+    )
+
+    connection = op.get_bind()
+    use_vector = connection.execute(
+        text("SELECT 1 FROM pg_extension WHERE extname = 'vector'")
+    ).fetchone()
+
+    for table, owner in EMBEDDING_TABLES:
+        op.execute(
+            f"ALTER TABLE {table} ADD COLUMN generation VARCHAR(64) NOT NULL "
+            f"DEFAULT '{INITIAL_GENERATION}' "
+            "REFERENCES embedding_generation(name) ON DELETE CASCADE"
+        )
+        op.execute(f"ALTER TABLE {table} ALTER COLUMN generation DROP DEFAULT")
+        if use_vector:
+            # The dimension now depends on the generation's model
+            op.execute(f"ALTER TABLE {table} ALTER COLUMN embedding TYPE vector")
+
+    for table, owner in EMBEDDING_TABLES[:2]:
+        op.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {table}_{owner}_key")
+        op.execute(
+            f"ALTER TABLE {table} ADD CONSTRAINT {table}_{owner}_generation_key "
+            f"UNIQUE ({owner}, generation)"
+        )
+    for table, owner in EMBEDDING_TABLES[2:]:
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_{owner}")
+        op.execute(f"CREATE INDEX ix_{table}_{owner} ON {table} ({owner}, generation)")
+
+
+def downgrade() -> None:
+    connection = op.get_bind()
+    use_vector = connection.execute(
+        text("SELECT 1 FROM pg_extension WHERE extname = 'vector'")
+    ).fetchone()
+
+    for table, owner in EMBEDDING_TABLES:
+        # Only the active generation fits the single-model schema
+        op.execute(
+            f"DELETE FROM {table} WHERE generation <> "
+            "(SELECT name FROM embedding_generation WHERE status = 'active')"
+        )
+    for table, owner in EMBEDDING_TABLES[2:]:
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_{owner}")
+        op.execute(f"CREATE INDEX ix_{table}_{owner} ON {table} ({owner})")
+    for table, owner in EMBEDDING_TABLES[:2]:
+        op.execute(
+            f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {table}_{owner}_generation_key"
+        )
+        op.execute(
+            f"ALTER TABLE {table} ADD CONSTRAINT {table}_{owner}_key UNIQUE ({owner})"
+        )
+    for table, owner in EMBEDDING_TABLES:
+        op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS generation")
+        if use_vector:
+            op.execute(f"ALTER TABLE {table} ALTER COLUMN embedding TYPE vector(1024)")
+
+    op.execute("DROP TABLE IF EXISTS embedding_generation")
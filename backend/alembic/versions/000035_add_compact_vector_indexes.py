@@ -0,0 +1,60 @@
+"""Add halfvec and binary-quantized HNSW indexes for the initial generation
+
+Revision ID: 000035
+Revises: 000034
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+import hashlib
+
+from alembic import op
+from sqlalchemy import text
+
+# revision identifiers, used by Alembic.
+revision = "000035"
+down_revision = "000034"
+branch_labels = None
+depends_on = None
+
+GENERATION = "Embeddings"
+DIMENSION = 1024
+TABLES = ["candidate_embeddings", "vacancy_embeddings"]
+
+
+def _index_name(table: str, quantization: str) -> str:
+    # Same naming as app.services.vector_quantization.index_name
+    digest = hashlib.sha1(GENERATION.encode("utf-8")).hexdigest()[:8]
+    return f"ix_{table}_{quantization}_{digest}"
+
+
+def upgrade() -> None:
+    version = (
+        op.get_bind()
+        .execute(text("SELECT extversion FROM pg_extension WHERE extname = 'vector'"))
+        .scalar()
+    )
+    # halfvec and bit vectors need pgvector 0.7; without them searches fall
+    # back to exact ordering after the first failed compact search
+    if not version or tuple(int(p) for p in version.split(".")[:2]) < (0, 7):
+        return
+
+    for table in TABLES:
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS {_index_name(table, 'halfvec')} "
+            f"ON {table} USING hnsw "
+            f"((embedding::halfvec({DIMENSION})) halfvec_cosine_ops) "
+            f"WHERE generation = '{GENERATION}'"
+        )
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS {_index_name(table, 'bit')} "
+            f"ON {table} USING hnsw "
+            f"((binary_quantize(embedding)::bit({DIMENSION})) bit_hamming_ops) "
+            f"WHERE generation = '{GENERATION}'"
+        )
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.execute(f"DROP INDEX IF EXISTS {_index_name(table, 'bit')}")
+        op.execute(f"DROP INDEX IF EXISTS {_index_name(table, 'halfvec')}")
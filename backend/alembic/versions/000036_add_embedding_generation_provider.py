@@ -0,0 +1,27 @@
+"""Add the embedding provider of each embedding generation
+
+Revision ID: 000036
+Revises: 000035
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "000036"
+down_revision = "000035"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing generations were embedded by GigaChat
+    op.execute(
+        "ALTER TABLE embedding_generation "
+        "ADD COLUMN provider VARCHAR(16) NOT NULL DEFAULT 'gigachat'"
+    )
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE embedding_generation DROP COLUMN provider")
@@ -0,0 +1,63 @@
+"""Add Russian full-text search over candidates, vacancies and transcripts
+
+Revision ID: 000037
+Revises: 000036
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "000037"
+down_revision = "000036"
+branch_labels = None
+depends_on = None
+
+# Generated columns keep the documents in sync on every insert and update;
+# the weights rank matches in names and titles above matches in long texts.
+# experience is JSON text; the parser skips the punctuation.
+SEARCH_VECTORS = {
+    "candidate": """
+        setweight(to_tsvector('russian', coalesce(name, '')), 'A')
+        || setweight(to_tsvector('russian', coalesce(position, '')), 'A')
+        || setweight(to_tsvector('russian', coalesce(experience, '')), 'B')
+    """,
+    "vacancy": """
+        setweight(to_tsvector('russian', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('russian', coalesce(description, '')), 'B')
+        || setweight(to_tsvector('russian', coalesce(requirements, '')), 'B')
+    """,
+    "interview_message": "to_tsvector('russian', coalesce(text, ''))",
+}
+
+
+def upgrade() -> None:
+    for table, expression in SEARCH_VECTORS.items():
+        op.execute(
+            f"ALTER TABLE {table} ADD COLUMN search_vector tsvector "
+            f"GENERATED ALWAYS AS ({expression}) STORED"
+        )
+        op.execute(
+            f"CREATE INDEX ix_{table}_search_vector ON {table} "
+            "USING gin (search_vector)"
+        )
+
+    # Fuzzy matching of misspelled names and partial emails
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        "CREATE INDEX ix_candidate_name_trgm ON candidate "
+        "USING gin (name gin_trgm_ops)"
+    )
+    op.execute(
+        "CREATE INDEX ix_candidate_email_trgm ON candidate "
+        "USING gin (email gin_trgm_ops)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_candidate_email_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_candidate_name_trgm")
+    for table in SEARCH_VECTORS:
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_search_vector")
+        op.execute(f"ALTER TABLE {table} DROP COLUMN search_vector")
@@ -0,0 +1,64 @@
+"""Add candidate name keys and flagged duplicate candidates
+
+Revision ID: 000038
+Revises: 000037
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+import re
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "000038"
+down_revision = "000037"
+branch_labels = None
+depends_on = None
+
+
+def _normalize_name(name) -> str:
+    words = re.findall(r"\w+", str(name or "").casefold().replace("ё", "е"))
+    return " ".join(sorted(words))
+
+
+def upgrade() -> None:
+    op.execute(
+        "ALTER TABLE candidate ADD COLUMN name_key VARCHAR(255) NOT NULL DEFAULT ''"
+    )
+
+    # Backfill with the same normalization as app.services.candidate_dedup
+    bind = op.get_bind()
+    rows = bind.execute(sa.text("SELECT id, name FROM candidate")).fetchall()
+    for candidate_id, name in rows:
+        bind.execute(
+            sa.text("UPDATE candidate SET name_key = :key WHERE id = :id"),
+            {"id": candidate_id, "key": _normalize_name(name)},
+        )
+
+    op.execute("CREATE INDEX ix_candidate_name_key ON candidate (name_key)")
+    op.execute("CREATE INDEX ix_candidate_email_lower ON candidate (lower(email))")
+    op.execute("""
+        CREATE TABLE candidate_duplicate (
+            candidate_id VARCHAR(36) NOT NULL
+                REFERENCES candidate(id) ON DELETE CASCADE,
+            duplicate_of_id VARCHAR(36) NOT NULL
+                REFERENCES candidate(id) ON DELETE CASCADE,
+            reason VARCHAR(16) NOT NULL,
+            similarity DOUBLE PRECISION,
+            created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            PRIMARY KEY (candidate_id, duplicate_of_id)
+        )
+    """)
+    op.execute(
+        "CREATE INDEX ix_candidate_duplicate_duplicate_of_id "
+        "ON candidate_duplicate (duplicate_of_id)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS candidate_duplicate")
+    op.execute("DROP INDEX IF EXISTS ix_candidate_email_lower")
+    op.execute("DROP INDEX IF EXISTS ix_candidate_name_key")
+    op.execute("ALTER TABLE candidate DROP COLUMN IF EXISTS name_key")
@@ -0,0 +1,39 @@
+"""Prune superseded interview prompts and index them per candidate and vacancy
+
+Revision ID: 000039
+Revises: 000038
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "000039"
+down_revision = "000038"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Only the newest prompt of a (candidate, vacancy) pair is ever served again
+    op.execute("""
+        DELETE FROM interview_prompt_template old
+        USING interview_prompt_template newer
+        WHERE old.candidate_id = newer.candidate_id
+          AND old.vacancy_id IS NOT DISTINCT FROM newer.vacancy_id
+          AND (old.created_at, old.cache_key) < (newer.created_at, newer.cache_key)
+    """)
+    op.execute("DROP INDEX IF EXISTS ix_interview_prompt_template_candidate_id")
+    op.execute(
+        "CREATE INDEX ix_interview_prompt_template_candidate_vacancy "
+        "ON interview_prompt_template (candidate_id, vacancy_id)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_interview_prompt_template_candidate_vacancy")
+    op.execute(
+        "CREATE INDEX ix_interview_prompt_template_candidate_id "
+        "ON interview_prompt_template (candidate_id)"
+    )
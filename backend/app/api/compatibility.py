@@ -2,17 +2,30 @@
 API endpoints for candidate-vacancy compatibility analysis.
 """
 
+import json
 import logging
-from typing import List, Dict, Any
+from typing import AsyncIterator, List, Dict, Any, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.db.session import get_session
 from app.models.candidate import Candidate
+from app.models.compatibility_report import CompatibilityReportRecord
 from app.models.vacancy import Vacancy
+from app.schemas.common import CandidateStatus, CompatibilityBatchRequest
+from app.services.compatibility_batch import compatibility_batch_service
+from app.services.compatibility_reports import (
+    ReportStatus,
+    compatibility_report_service,
+)
 from app.services.compatibility_service import compatibility_service
 from app.services.embedding_service import embedding_service
-from sqlalchemy import select
+from app.services.entity_cache import entity_cache
+from app.services.exceptions import NotFoundError
+from app.services.match_matrix import OPEN_VACANCY_STATUS, match_matrix_service
+from app.services.search_filters import CandidateFilters, VacancyFilters
 
 logger = logging.getLogger(__name__)
 
@@ -24,54 +37,148 @@ async def get_compatibility_report(
     candidate_id: str, vacancy_id: int, session: AsyncSession = Depends(get_session)
 ) -> Dict[str, Any]:
     """
-    Generate detailed compatibility report between a candidate and vacancy.
+    Get the detailed compatibility report between a candidate and vacancy.
+
+    Stored reports are returned immediately. Otherwise a compute job is started
+    and 202 with the job status is returned; poll until the report is ready.
     """
     try:
-        report = await compatibility_service.analyze_compatibility(
+        record = await compatibility_report_service.request_report(
             session, candidate_id, vacancy_id
         )
-
-        if not report:
-            raise HTTPException(
-                status_code=404,
-                detail="Candidate or vacancy not found, or unable to generate report",
-            )
-
-        return {
-            "executive_summary": report.executive_summary,
-            "candidate_profile": report.candidate_profile,
-            "detailed_analysis": report.detailed_analysis,
-            "potential_concerns": report.potential_concerns,
-            "hiring_recommendation": report.hiring_recommendation,
-            "next_steps": report.next_steps,
-        }
-
+    except NotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         logger.error(f"Error generating compatibility report: {e}")
         raise HTTPException(status_code=500, detail="Internal server error")
 
+    if record.status != ReportStatus.DONE:
+        return JSONResponse(status_code=202, content=_report_job_status(record))
+    return record.report
+
+
+@router.post(
+    "/candidate/{candidate_id}/vacancy/{vacancy_id}/report/compute",
+    status_code=202,
+)
+async def compute_compatibility_report(
+    candidate_id: str, vacancy_id: int, session: AsyncSession = Depends(get_session)
+) -> Dict[str, Any]:
+    """
+    Start computing the report for the current candidate and vacancy versions.
+
+    Does nothing if the report is already stored or being computed; a failed
+    job is retried.
+    """
+    try:
+        record = await compatibility_report_service.request_report(
+            session, candidate_id, vacancy_id, retry_failed=True
+        )
+    except NotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return _report_job_status(record)
+
+
+@router.get("/candidate/{candidate_id}/vacancy/{vacancy_id}/report/status")
+async def get_compatibility_report_status(
+    candidate_id: str, vacancy_id: int, session: AsyncSession = Depends(get_session)
+) -> Dict[str, Any]:
+    """
+    Get the status of the report for the current candidate and vacancy versions.
+    """
+    try:
+        record = await compatibility_report_service.get_report(
+            session, candidate_id, vacancy_id
+        )
+    except NotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    if record is None:
+        raise HTTPException(status_code=404, detail="Report has not been requested")
+    return _report_job_status(record)
+
+
+def _report_job_status(record: CompatibilityReportRecord) -> Dict[str, Any]:
+    return {
+        "status": record.status,
+        "scoring_version": record.scoring_version,
+        "overall_score": record.overall_score,
+        "computed_at": (record.computed_at.isoformat() if record.computed_at else None),
+        "error": record.error,
+    }
+
+
+@router.post("/batch")
+async def score_compatibility_batch(
+    payload: CompatibilityBatchRequest, session: AsyncSession = Depends(get_session)
+) -> StreamingResponse:
+    """
+    Score many (candidate, vacancy) pairs at once.
+
+    Streams one JSON object per line (NDJSON) as each pair is scored, in
+    completion order: the pair's ids and status "done" with similarity_score,
+    skills_pct and overall_score, or status "failed" with an error.
+    """
+    if len(payload.pairs) > settings.compatibility_batch_max_pairs:
+        raise HTTPException(
+            status_code=422,
+            detail=f"At most {settings.compatibility_batch_max_pairs} pairs per batch",
+        )
+    # Everything is loaded, and the session's connection released, before
+    # streaming starts; scoring needs no session
+    pairs = await compatibility_batch_service.load(
+        session, [(pair.candidate_id, pair.vacancy_id) for pair in payload.pairs]
+    )
+    return StreamingResponse(
+        _ndjson(compatibility_batch_service.score(pairs)),
+        media_type="application/x-ndjson",
+    )
+
+
+async def _ndjson(results: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    async for result in results:
+        yield json.dumps(result, ensure_ascii=False) + "\n"
+
 
 @router.get("/candidate/{candidate_id}/top-vacancies")
 async def get_top_vacancies_for_candidate(
     candidate_id: str,
     limit: int = Query(default=10, ge=1, le=50),
+    location: Optional[str] = None,
+    employment_type: Optional[str] = None,
     session: AsyncSession = Depends(get_session),
 ) -> List[Dict[str, Any]]:
     """
-    Find top matching vacancies for a candidate based on embedding similarity.
+    Find top matching open vacancies for a candidate.
+
+    Served from the precomputed match table; falls back to ranking by
+    embedding similarity while the candidate's matches are not computed yet.
+    Filters are applied before ranking, so up to `limit` matching vacancies
+    are returned; none if the computed matches all fail the filters.
     """
+    filters = VacancyFilters(location=location, employment_type=employment_type)
     try:
         # Check if candidate exists
-        candidate_query = select(Candidate).where(Candidate.id == candidate_id)
-        result = await session.execute(candidate_query)
-        candidate = result.scalar_one_or_none()
+        candidate = await entity_cache.get(session, Candidate, candidate_id)
 
         if not candidate:
             raise HTTPException(status_code=404, detail="Candidate not found")
 
+        matches = await match_matrix_service.top_vacancies(
+            session, candidate_id, limit, filters
+        )
+        if matches:
+            return [
+                _vacancy_item(vacancy, match.embedding_similarity, match.overall_score)
+                for match, vacancy in matches
+            ]
+        if await match_matrix_service.has_candidate_matches(session, candidate_id):
+            # Computed, just nothing passes the filters
+            return []
+        match_matrix_service.enqueue_candidate(candidate_id)
+
         # Find similar vacancies
         similar_vacancies = await embedding_service.find_similar_vacancies(
-            session, candidate_id, limit
+            session, candidate_id, limit, filters
         )
 
         # Format response
@@ -84,41 +191,11 @@ async def get_top_vacancies_for_candidate(
                 report = await compatibility_service.analyze_compatibility(
                     session, candidate_id, vacancy.id
                 )
-                overall_score = None
-                if (
-                    report
-                    and report.executive_summary
-                    and "overall_match_score" in report.executive_summary
-                ):
-                    # overall_match_score like "72%" -> float 72.0
-                    score_str = report.executive_summary["overall_match_score"]
-                    overall_score = float(str(score_str).replace("%", "").strip())
+                overall_score = report.overall_score if report else None
             except Exception:
                 overall_score = None
 
-            response.append(
-                {
-                    "vacancy_id": vacancy.id,
-                    "title": vacancy.title,
-                    "company": vacancy.company,
-                    "location": vacancy.location,
-                    "domain": vacancy.domain,
-                    "employment_type": vacancy.employment_type,
-                    "experience_level": vacancy.experience_level,
-                    "similarity_score": round(
-                        similarity * 100, 2
-                    ),  # Calibrated similarity percentage
-                    "overall_score": round(
-                        (
-                            overall_score
-                            if overall_score is not None
-                            else similarity * 100
-                        ),
-                        2,
-                    ),
-                    "match_level": _get_match_level_from_score(similarity),
-                }
-            )
+            response.append(_vacancy_item(vacancy, similarity, overall_score))
 
         return response
 
@@ -133,23 +210,55 @@ async def get_top_vacancies_for_candidate(
 async def get_top_candidates_for_vacancy(
     vacancy_id: int,
     limit: int = Query(default=10, ge=1, le=50),
+    location: Optional[str] = None,
+    employment_type: Optional[str] = None,
+    status: Optional[CandidateStatus] = None,
+    min_experience_years: Optional[int] = Query(default=None, ge=0),
+    skills: List[str] = Query(default=[]),
     session: AsyncSession = Depends(get_session),
 ) -> List[Dict[str, Any]]:
     """
-    Find top matching candidates for a vacancy based on embedding similarity.
+    Find top matching candidates for a vacancy.
+
+    Open vacancies are served from the precomputed match table; other
+    vacancies, and open ones not computed yet, are ranked by embedding
+    similarity. Filters are applied before ranking, so up to `limit` matching
+    candidates are returned, or none if the computed matches all fail the
+    filters; `skills` may be repeated and all must match.
     """
+    filters = CandidateFilters(
+        location=location,
+        employment_type=employment_type,
+        status=status,
+        min_experience_years=min_experience_years,
+        skills=skills,
+    )
     try:
         # Check if vacancy exists
-        vacancy_query = select(Vacancy).where(Vacancy.id == vacancy_id)
-        result = await session.execute(vacancy_query)
-        vacancy = result.scalar_one_or_none()
+        vacancy = await entity_cache.get(session, Vacancy, vacancy_id)
 
         if not vacancy:
             raise HTTPException(status_code=404, detail="Vacancy not found")
 
+        if vacancy.status == OPEN_VACANCY_STATUS:
+            matches = await match_matrix_service.top_candidates(
+                session, vacancy_id, limit, filters
+            )
+            if matches:
+                return [
+                    _candidate_item(
+                        candidate, match.embedding_similarity, match.overall_score
+                    )
+                    for match, candidate in matches
+                ]
+            if await match_matrix_service.has_vacancy_matches(session, vacancy_id):
+                # Computed, just nothing passes the filters
+                return []
+            match_matrix_service.enqueue_vacancy(vacancy_id)
+
         # Find similar candidates
         similar_candidates = await embedding_service.find_similar_candidates(
-            session, vacancy_id, limit
+            session, vacancy_id, limit, filters
         )
 
         # Format response
@@ -162,39 +271,11 @@ async def get_top_candidates_for_vacancy(
                 report = await compatibility_service.analyze_compatibility(
                     session, candidate.id, vacancy_id
                 )
-                overall_score = None
-                if (
-                    report
-                    and report.executive_summary
-                    and "overall_match_score" in report.executive_summary
-                ):
-                    score_str = report.executive_summary["overall_match_score"]
-                    overall_score = float(str(score_str).replace("%", "").strip())
+                overall_score = report.overall_score if report else None
             except Exception:
                 overall_score = None
 
-            response.append(
-                {
-                    "candidate_id": candidate.id,
-                    "name": candidate.name,
-                    "position": candidate.position,
-                    "email": candidate.email,
-                    "geo": candidate.geo,
-                    "employment_type": candidate.employment_type,
-                    "similarity_score": round(
-                        similarity * 100, 2
-                    ),  # Calibrated similarity percentage
-                    "overall_score": round(
-                        (
-                            overall_score
-                            if overall_score is not None
-                            else similarity * 100
-                        ),
-                        2,
-                    ),
-                    "match_level": _get_match_level_from_score(similarity),
-                }
-            )
+            response.append(_candidate_item(candidate, similarity, overall_score))
 
         return response
 
@@ -205,6 +286,47 @@ async def get_top_candidates_for_vacancy(
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+def _vacancy_item(
+    vacancy: Vacancy, similarity: float, overall_score: float | None
+) -> Dict[str, Any]:
+    return {
+        "vacancy_id": vacancy.id,
+        "title": vacancy.title,
+        "company": vacancy.company,
+        "location": vacancy.location,
+        "domain": vacancy.domain,
+        "employment_type": vacancy.employment_type,
+        "experience_level": vacancy.experience_level,
+        "similarity_score": round(
+            similarity * 100, 2
+        ),  # Calibrated similarity percentage
+        "overall_score": round(
+            overall_score if overall_score is not None else similarity * 100, 2
+        ),
+        "match_level": _get_match_level_from_score(similarity),
+    }
+
+
+def _candidate_item(
+    candidate: Candidate, similarity: float, overall_score: float | None
+) -> Dict[str, Any]:
+    return {
+        "candidate_id": candidate.id,
+        "name": candidate.name,
+        "position": candidate.position,
+        "email": candidate.email,
+        "geo": candidate.geo,
+        "employment_type": candidate.employment_type,
+        "similarity_score": round(
+            similarity * 100, 2
+        ),  # Calibrated similarity percentage
+        "overall_score": round(
+            overall_score if overall_score is not None else similarity * 100, 2
+        ),
+        "match_level": _get_match_level_from_score(similarity),
+    }
+
+
 def _get_match_level_from_score(similarity_score: float) -> str:
     """Convert similarity score to match level"""
     if similarity_score >= 0.8:
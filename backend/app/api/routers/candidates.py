@@ -11,9 +11,15 @@ from fastapi import (
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.session import get_session
-from app.schemas.common import CandidateCreate, CandidateRead
+from app.schemas.common import (
+    CandidateCreate,
+    CandidateDuplicateRead,
+    CandidateMergeRequest,
+    CandidateRead,
+)
 from app.services import candidates as candidates_service
-from app.services.exceptions import NotFoundError
+from app.services.candidate_dedup import candidate_dedup_service
+from app.services.exceptions import ConflictError, NotFoundError
 from app.services.pdf_parser import (
     get_pdf_parser_service,
     PDFParsingError,
@@ -100,6 +106,44 @@ async def delete_candidate(
     return None
 
 
+@router.get("/{candidate_id}/duplicates", response_model=list[CandidateDuplicateRead])
+async def list_candidate_duplicates(
+    candidate_id: str, session: AsyncSession = Depends(get_session)
+):
+    """Candidates flagged as likely duplicates of this one, newest first."""
+    try:
+        await candidates_service.get_candidate(session, candidate_id)
+    except NotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    duplicates = await candidate_dedup_service.list_duplicates(session, candidate_id)
+    return [
+        {
+            "candidate": other,
+            "reason": flag.reason,
+            "similarity": flag.similarity,
+            "created_at": flag.created_at,
+        }
+        for flag, other in duplicates
+    ]
+
+
+@router.post("/{candidate_id}/merge", response_model=CandidateRead)
+async def merge_candidate(
+    candidate_id: str,
+    payload: CandidateMergeRequest,
+    session: AsyncSession = Depends(get_session),
+):
+    """Merge a duplicate into this candidate; the duplicate is deleted."""
+    try:
+        return await candidates_service.merge_candidates(
+            session, candidate_id, payload.duplicate_id
+        )
+    except NotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
 @router.post(
     "/upload-cv", response_model=CandidateRead, status_code=status.HTTP_201_CREATED
 )
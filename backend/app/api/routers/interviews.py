@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
+from app.core.config import settings
 from app.db.session import get_session
 from app.schemas.common import (
     InterviewCreate,
@@ -19,14 +20,21 @@ router = APIRouter()
 
 @router.post("/", response_model=InterviewRead, status_code=status.HTTP_201_CREATED)
 async def create_interview(
-    payload: InterviewCreate, session: AsyncSession = Depends(get_session)
+    payload: InterviewCreate,
+    background_tasks: BackgroundTasks,
+    session: AsyncSession = Depends(get_session),
 ):
     try:
-        return await interviews_service.create_interview(session, payload)
+        interview = await interviews_service.create_interview(session, payload)
     except IntegrityError:
         raise HTTPException(
             status_code=400, detail="Invalid candidate_id or vacancy_id"
         )
+    if settings.interview_greeting_prewarm and interview.state == "initialized":
+        background_tasks.add_task(
+            interviews_service.prewarm_interview_greeting, interview.id
+        )
+    return interview
 
 
 @router.get("/", response_model=list[InterviewRead])
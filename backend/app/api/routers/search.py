@@ -0,0 +1,132 @@
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_session
+from app.schemas.common import (
+    CandidateSearchResult,
+    CandidateStatus,
+    CandidateTextSearchResult,
+    InterviewMessageSearchResult,
+    VacancySearchResult,
+    VacancyTextSearchResult,
+)
+from app.services.embedding_service import embedding_service
+from app.services.search_filters import CandidateFilters, VacancyFilters
+from app.services.text_search import text_search_service
+
+router = APIRouter()
+
+QUERY_EMBEDDING_UNAVAILABLE = "Search query could not be embedded"
+
+
+@router.get("/semantic/candidates", response_model=list[CandidateSearchResult])
+async def semantic_search_candidates(
+    q: str = Query(min_length=1, max_length=1000),
+    limit: int = Query(default=10, ge=1, le=50),
+    offset: int = Query(default=0, ge=0, le=1000),
+    location: Optional[str] = None,
+    employment_type: Optional[str] = None,
+    status: Optional[CandidateStatus] = None,
+    min_experience_years: Optional[int] = Query(default=None, ge=0),
+    skills: List[str] = Query(default=[]),
+    session: AsyncSession = Depends(get_session),
+):
+    """Candidates ranked by similarity to a free-text query, e.g.
+    "Python backend, fintech, Moscow"; filters apply before ranking."""
+    filters = CandidateFilters(
+        location=location,
+        employment_type=employment_type,
+        status=status,
+        min_experience_years=min_experience_years,
+        skills=skills,
+    )
+    results = await embedding_service.search_candidates(
+        session, q, limit, offset, filters
+    )
+    if results is None:
+        raise HTTPException(status_code=503, detail=QUERY_EMBEDDING_UNAVAILABLE)
+    return [
+        {
+            "candidate": item["candidate"],
+            "similarity_score": round(item["similarity"] * 100, 2),
+        }
+        for item in results
+    ]
+
+
+@router.get("/semantic/vacancies", response_model=list[VacancySearchResult])
+async def semantic_search_vacancies(
+    q: str = Query(min_length=1, max_length=1000),
+    limit: int = Query(default=10, ge=1, le=50),
+    offset: int = Query(default=0, ge=0, le=1000),
+    location: Optional[str] = None,
+    employment_type: Optional[str] = None,
+    session: AsyncSession = Depends(get_session),
+):
+    """Vacancies ranked by similarity to a free-text query; filters apply
+    before ranking."""
+    filters = VacancyFilters(location=location, employment_type=employment_type)
+    results = await embedding_service.search_vacancies(
+        session, q, limit, offset, filters
+    )
+    if results is None:
+        raise HTTPException(status_code=503, detail=QUERY_EMBEDDING_UNAVAILABLE)
+    return [
+        {
+            "vacancy": item["vacancy"],
+            "similarity_score": round(item["similarity"] * 100, 2),
+        }
+        for item in results
+    ]
+
+
+@router.get("/candidates", response_model=list[CandidateTextSearchResult])
+async def search_candidates(
+    q: str = Query(min_length=1, max_length=1000),
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
+    session: AsyncSession = Depends(get_session),
+):
+    """Candidates by keywords in name, position and experience, plus fuzzy
+    name and email matches, best first."""
+    results = await text_search_service.search_candidates(session, q, limit, offset)
+    return [{"candidate": candidate, "rank": rank} for candidate, rank in results]
+
+
+@router.get("/vacancies", response_model=list[VacancyTextSearchResult])
+async def search_vacancies(
+    q: str = Query(min_length=1, max_length=1000),
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
+    session: AsyncSession = Depends(get_session),
+):
+    """Vacancies by keywords in title, description and requirements."""
+    results = await text_search_service.search_vacancies(session, q, limit, offset)
+    return [{"vacancy": vacancy, "rank": rank} for vacancy, rank in results]
+
+
+@router.get("/interview-messages", response_model=list[InterviewMessageSearchResult])
+async def search_interview_messages(
+    q: str = Query(min_length=1, max_length=1000),
+    interview_id: Optional[str] = None,
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0),
+    session: AsyncSession = Depends(get_session),
+):
+    """Interview transcript messages by keywords, optionally in one interview."""
+    results = await text_search_service.search_interview_messages(
+        session, q, interview_id, limit, offset
+    )
+    return [
+        {
+            "interview_id": message.interview_id,
+            "index": message.index,
+            "text": message.text,
+            "type": message.type,
+            "snippet": snippet,
+            "rank": rank,
+        }
+        for message, snippet, rank in results
+    ]
@@ -3,31 +3,34 @@ from enum import StrEnum, auto
 import logging
 import subprocess
 from pathlib import Path
-import time
-from typing import Dict, List
+from typing import List, Optional
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
 
-from app.clients.yandex import (
-    get_yandex_speech_recognition_model,
-    get_yandex_speech_synthesis_client,
-)
+from app.clients.yandex import get_yandex_speech_recognition_model
 from app.schemas.common import InterviewMessageCreateRequest
 from app.core.config import settings
 from app.db.session import AsyncSessionLocal
 from app.services import interviews as interviews_service
-
+from app.services.admission import (
+    AdmissionAbandoned,
+    AdmissionRejected,
+    admission_controller,
+)
+from app.services.interview_sessions import (
+    InterviewSessionState,
+    interview_session_registry,
+)
+from app.services.recordings import RECORDINGS_DIR, RecordingKind, recording_manager
+from app.services.speech_synthesis import SentenceSplitter, speech_synthesis_service
 
 logger = logging.getLogger("app")
 
 router = APIRouter()
 
 
-RECORDINGS_DIR = Path("recordings")
-RECORDINGS_DIR.mkdir(parents=True, exist_ok=True)
-
-
 class InterviewSocketState(StrEnum):
+    QUEUED = auto()
     AWAITING_USER_ANSWER = auto()
     SPEECH_RECOGNITION = auto()
     GENERATING_RESPONSE = auto()
@@ -37,21 +40,44 @@ class InterviewSocketState(StrEnum):
 class InterviewWebsocketService:
     """Service to manage WebSocket connections and state for a single interview."""
 
-    def __init__(self, interview_id: str, websocket: WebSocket, prefix: str = ""):
+    def __init__(
+        self,
+        interview_id: str,
+        websocket: WebSocket,
+        prefix: str = "",
+        state: InterviewSessionState | None = None,
+    ):
         self.interview_id = interview_id
         self.websocket = websocket
         self.prefix = prefix
-        self.connection_started_monotonic = time.monotonic()
-        self.audio_marker_timings: List[int] = []
-        self.received_chunks: List[bytes] = []
-        self.total_bytes = 0
+        # Resumable state shared between workers; received media is spooled
+        # to a segment of this connection instead of being buffered in memory
+        self.state = state or InterviewSessionState.new(
+            interview_id, prefix, RECORDINGS_DIR
+        )
         self.chunk_index = 0
-        self.fragment_index = 0
 
         # File paths
         self.base_filename = f"{prefix}{interview_id}" if prefix else interview_id
         self.file_path = RECORDINGS_DIR / f"{self.base_filename}.webm"
-        self.temp_path = RECORDINGS_DIR / f"{self.base_filename}.raw.webm"
+        self.spool_path = self.state.new_spool_segment()
+        recording_manager.protect_session(self.base_filename)
+
+    @property
+    def audio_marker_timings(self) -> List[int]:
+        return self.state.audio_marker_timings
+
+    @property
+    def fragment_index(self) -> int:
+        return self.state.fragment_index
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(
+            segment.stat().st_size
+            for segment in self.state.spool_segments()
+            if segment.exists()
+        )
 
     async def update_state(self, state: InterviewSocketState) -> None:
         """Update the state of the interview socket."""
@@ -191,19 +217,62 @@ class InterviewWebsocketService:
 
         payload = InterviewMessageCreateRequest(text=text)
 
-        async with AsyncSessionLocal() as session:
+        async with admission_controller.stage("llm"), AsyncSessionLocal() as session:
             messages = await interviews_service.create_interview_message(
                 session, interview_id, payload
             )
 
             return messages[-1].text
 
+    async def stream_answer_to_user(self, text: str) -> None:
+        """Submit the user answer and voice the streamed reply sentence by sentence.
+
+        LLM deltas are split at sentence boundaries and every completed sentence
+        is synthesized and sent as its own audio frame, while the rest of the
+        reply is still being generated.
+        """
+        logger.debug("Streaming answer for interview %s: %s", self.interview_id, text)
+        payload = InterviewMessageCreateRequest(text=text)
+        sentences: asyncio.Queue[str | None] = asyncio.Queue()
+
+        async def produce_sentences() -> None:
+            splitter = SentenceSplitter()
+            try:
+                async with (
+                    admission_controller.stage("llm"),
+                    AsyncSessionLocal() as session,
+                ):
+                    async for delta in interviews_service.stream_interview_message(
+                        session, self.interview_id, payload
+                    ):
+                        for sentence in splitter.feed(delta):
+                            await sentences.put(sentence)
+                tail = splitter.flush()
+                if tail:
+                    await sentences.put(tail)
+            finally:
+                await sentences.put(None)
+
+        producer = asyncio.create_task(produce_sentences())
+        try:
+            first_sentence = True
+            while (sentence := await sentences.get()) is not None:
+                if first_sentence:
+                    await self.update_state(InterviewSocketState.SPEECH_SYNTHESIS)
+                    first_sentence = False
+                async with admission_controller.stage("tts"):
+                    audio = await speech_synthesis_service.synthesize(sentence)
+                await self.websocket.send_bytes(audio)
+        finally:
+            # Let the reply finish and be stored even if the socket went away
+            await producer
+
     async def handle_audio_marker(self) -> None:
         """Handle audio ready marker by calculating elapsed time and storing it."""
 
         await self.update_state(InterviewSocketState.SPEECH_RECOGNITION)
 
-        elapsed_ms = int((time.monotonic() - self.connection_started_monotonic) * 1000)
+        elapsed_ms = self.state.elapsed_ms()
         self.audio_marker_timings.append(elapsed_ms)
         logger.info(
             "Audio ready marker received for interview %s at %d ms (total markers: %d)",
@@ -212,8 +281,11 @@ class InterviewWebsocketService:
             len(self.audio_marker_timings),
         )
 
-        fragment_path = self.save_interview_video(f".{self.fragment_index}")
-        self.fragment_index += 1
+        fragment_path = await admission_controller.run_blocking(
+            "ffmpeg", self.save_interview_video, f".{self.fragment_index}"
+        )
+        self.state.fragment_index += 1
+        await interview_session_registry.save(self.state)
 
         if not fragment_path:
             logger.warning(
@@ -221,39 +293,26 @@ class InterviewWebsocketService:
             )
             return
 
-        # Get the two latest markers
-        start_ms, end_ms = self.get_latest_markers()
-        logger.debug(
-            "Using markers for cutting: start=%dms, end=%dms (all markers: %s)",
-            start_ms,
-            end_ms,
-            self.audio_marker_timings,
-        )
-
-        # Cut the fragment video to only include time between markers
-        if not self.cut_fragment_video(fragment_path, start_ms, end_ms):
-            logger.warning("Failed to cut fragment: %s", fragment_path)
-            return
-
-        logger.info("Fragment cut successfully: %s", fragment_path)
-
-        audio_path = self.extract_audio_from_video(fragment_path)
-        if not audio_path:
-            logger.warning("Failed to extract audio from: %s", fragment_path)
-            return
-
-        logger.info("Audio extracted successfully: %s", audio_path)
+        try:
+            recognized_text = await self.transcribe_fragment(fragment_path)
+        finally:
+            self.archive_fragment(fragment_path)
 
-        # Recognize speech from the audio
-        recognized_text = self.recognize_user_answer(audio_path)
         if not recognized_text:
-            logger.warning("Failed to recognize speech from: %s", audio_path)
             return
 
         logger.info("User said: %s", recognized_text)
 
         await self.update_state(InterviewSocketState.GENERATING_RESPONSE)
 
+        if (
+            settings.use_yandex_speech_synthesis
+            and settings.interview_streaming_responses
+        ):
+            await self.stream_answer_to_user(recognized_text)
+            await self.update_state(InterviewSocketState.AWAITING_USER_ANSWER)
+            return
+
         # Submit the recognized text to the interview messages endpoint
         latest_message = await self.submit_user_answer(
             self.interview_id, recognized_text
@@ -277,25 +336,72 @@ class InterviewWebsocketService:
 
         await self.update_state(InterviewSocketState.AWAITING_USER_ANSWER)
 
+    async def transcribe_fragment(self, fragment_path: str) -> str | None:
+        """Cut the latest answer out of the fragment and recognize its speech."""
+        # Get the two latest markers
+        start_ms, end_ms = self.get_latest_markers()
+        logger.debug(
+            "Using markers for cutting: start=%dms, end=%dms (all markers: %s)",
+            start_ms,
+            end_ms,
+            self.audio_marker_timings,
+        )
+
+        # Cut the fragment video to only include time between markers
+        if not await admission_controller.run_blocking(
+            "ffmpeg", self.cut_fragment_video, fragment_path, start_ms, end_ms
+        ):
+            logger.warning("Failed to cut fragment: %s", fragment_path)
+            return None
+
+        logger.info("Fragment cut successfully: %s", fragment_path)
+
+        audio_path = await admission_controller.run_blocking(
+            "ffmpeg", self.extract_audio_from_video, fragment_path
+        )
+        if not audio_path:
+            logger.warning("Failed to extract audio from: %s", fragment_path)
+            return None
+
+        logger.info("Audio extracted successfully: %s", audio_path)
+
+        # Recognize speech from the audio
+        recognized_text = await admission_controller.run_blocking(
+            "stt", self.recognize_user_answer, audio_path
+        )
+        if not recognized_text:
+            logger.warning("Failed to recognize speech from: %s", audio_path)
+            return None
+
+        return recognized_text
+
+    def archive_fragment(self, fragment_path: str) -> None:
+        """Hand the answer fragment and its WAV over to the recording manager."""
+        recording_manager.enqueue(
+            fragment_path, self.interview_id, RecordingKind.FRAGMENT
+        )
+        audio_path = Path(fragment_path.replace(".webm", ".wav"))
+        if audio_path.exists():
+            recording_manager.enqueue(
+                audio_path, self.interview_id, RecordingKind.AUDIO
+            )
+
     async def send_message_to_user(self, message: str) -> None:
         """Synthesize message and send it to the user."""
         logger.info("Sending message to user: %s", message)
-        model = get_yandex_speech_synthesis_client()
-
-        result = model.synthesize(message)
-        result_mp3_file = result.export()
-        result_mp3_bytes = result_mp3_file.read()
+        async with admission_controller.stage("tts"):
+            result_mp3_bytes = await speech_synthesis_service.synthesize(message)
 
         await self.websocket.send_bytes(result_mp3_bytes)
 
     def add_video_chunk(self, chunk: bytes) -> None:
-        """Add a video chunk to the buffer."""
+        """Append a video chunk to this connection's spool segment."""
         self.chunk_index += 1
-        self.received_chunks.append(chunk)
-        self.total_bytes += len(chunk)
+        with open(self.spool_path, "ab") as f:
+            f.write(chunk)
 
     def save_interview_video(self, suffix: str = "") -> str | None:
-        """Save buffered video chunks to file and return the path to the saved file."""
+        """Remux the spooled video to a file and return the path to the saved file."""
         if self.total_bytes == 0:
             logger.warning(
                 "No video chunks received for interview %s; nothing to save",
@@ -303,21 +409,37 @@ class InterviewWebsocketService:
             )
             return None
 
-        # Generate file paths with suffix
-        temp_file_path = RECORDINGS_DIR / f"{self.base_filename}{suffix}.raw.webm"
+        # Generate file path with suffix
         final_file_path = RECORDINGS_DIR / f"{self.base_filename}{suffix}.webm"
+        concat_list = Path(f"{final_file_path}.concat.txt")
+        try:
+            return self._remux_spool(final_file_path, concat_list)
+        finally:
+            concat_list.unlink(missing_ok=True)
+
+    def _spool_input(self, concat_list: Path) -> List[str]:
+        """ffmpeg input arguments reading the spool segments as one stream."""
+        segments = self.state.spool_segments()
+        if len(segments) == 1:
+            return ["-i", str(segments[0])]
+        # Each reconnect started a new WebM stream with its own header
+        concat_list.write_text(
+            "".join(
+                "file '{}'\n".format(str(segment.resolve()).replace("'", "'\\''"))
+                for segment in segments
+            ),
+            encoding="utf-8",
+        )
+        return ["-f", "concat", "-safe", "0", "-i", str(concat_list)]
 
-        # Write all chunks to temp file
-        with open(temp_file_path, "wb") as f:
-            for chunk in self.received_chunks:
-                f.write(chunk)
+    def _remux_spool(self, final_file_path: Path, concat_list: Path) -> str | None:
+        spool_input = self._spool_input(concat_list)
 
         # Try remux (copy) first
         cmd_copy = [
             "ffmpeg",
             "-y",
-            "-i",
-            str(temp_file_path),
+            *spool_input,
             "-c",
             "copy",
             str(final_file_path),
@@ -334,8 +456,7 @@ class InterviewWebsocketService:
             cmd_reencode = [
                 "ffmpeg",
                 "-y",
-                "-i",
-                str(temp_file_path),
+                *spool_input,
                 "-c:v",
                 "libvpx-vp9",
                 "-c:a",
@@ -351,48 +472,41 @@ class InterviewWebsocketService:
                 )
                 return None
 
-        # Cleanup temp file
-        try:
-            if temp_file_path.exists():
-                temp_file_path.unlink()
-        except Exception as e:
-            logger.warning("Failed to cleanup temp file %s: %s", temp_file_path, e)
-
         return str(final_file_path)
 
-    def cleanup(self) -> None:
-        """Clean up resources and save video."""
-        self.save_interview_video()
+    async def cleanup(self) -> None:
+        """Clean up resources, save video and schedule it for upload."""
+        saved_path = await admission_controller.run_blocking(
+            "ffmpeg", self.save_interview_video
+        )
         logger.info(
             "WS video stream closed for interview %s, file at %s",
             self.interview_id,
             self.file_path,
         )
+        recording_manager.release_session(self.base_filename)
+        if saved_path:
+            recording_manager.enqueue(saved_path, self.interview_id, RecordingKind.FULL)
 
 
-# Global registry of active interview services
-_interview_services: Dict[str, InterviewWebsocketService] = {}
-
-
-def get_or_create_interview_service(
+async def get_or_create_interview_service(
     interview_id: str, websocket: WebSocket, prefix: str = ""
 ) -> InterviewWebsocketService:
-    """Get existing or create new interview service."""
-    service_key = f"{prefix}{interview_id}" if prefix else interview_id
-    if service_key not in _interview_services:
-        _interview_services[service_key] = InterviewWebsocketService(
-            interview_id, websocket, prefix
-        )
-    return _interview_services[service_key]
+    """Create an interview service, resuming its state from the session registry."""
+    state = await interview_session_registry.acquire(interview_id, prefix)
+    return InterviewWebsocketService(interview_id, websocket, prefix, state)
 
 
-def cleanup_interview_service(interview_id: str, prefix: str = "") -> None:
-    """Clean up and remove interview service."""
-    service_key = f"{prefix}{interview_id}" if prefix else interview_id
-    if service_key in _interview_services:
-        service = _interview_services[service_key]
-        service.cleanup()
-        del _interview_services[service_key]
+async def cleanup_interview_service(service: InterviewWebsocketService) -> None:
+    """Clean up the service and persist its state for a later reconnect."""
+    await service.cleanup()
+    await interview_session_registry.save(service.state)
+
+
+@router.get("/ws/stats")
+async def websocket_admission_stats() -> dict:
+    """Active and queued interviews and per-stage concurrency of this process."""
+    return admission_controller.stats()
 
 
 @router.websocket("/ws/{interview_id}/video")
@@ -403,8 +517,47 @@ async def websocket_video_stream(
 ) -> None:
     await websocket.accept()
 
+    async def report_queue_position(position: int) -> None:
+        await websocket.send_json(
+            {"state": InterviewSocketState.QUEUED.value, "position": position}
+        )
+
+    # Only one message is read while the interview waits for a slot, so the
+    # client is throttled by WebSocket backpressure, but its disconnect
+    # gives up the place in the queue
+    left = asyncio.Event()
+    first_message = asyncio.create_task(websocket.receive())
+
+    def note_disconnect(task: asyncio.Task) -> None:
+        if task.cancelled():
+            return
+        if (
+            task.exception() is not None
+            or task.result()["type"] == "websocket.disconnect"
+        ):
+            left.set()
+
+    first_message.add_done_callback(note_disconnect)
+    try:
+        async with admission_controller.session(report_queue_position, left):
+            await serve_interview(websocket, interview_id, prefix, first_message)
+    except AdmissionAbandoned:
+        logger.info("Interview %s left the queue", interview_id)
+    except AdmissionRejected as e:
+        logger.warning("Interview %s rejected: %s", interview_id, e)
+        await websocket.close(code=1013, reason=str(e))
+    finally:
+        first_message.cancel()
+
+
+async def serve_interview(
+    websocket: WebSocket,
+    interview_id: str,
+    prefix: str,
+    first_message: Optional[asyncio.Task] = None,
+) -> None:
     # Get or create interview service
-    service = get_or_create_interview_service(interview_id, websocket, prefix)
+    service = await get_or_create_interview_service(interview_id, websocket, prefix)
     await service.update_state(InterviewSocketState.AWAITING_USER_ANSWER)
 
     logger.info(
@@ -414,10 +567,18 @@ async def websocket_video_stream(
     )
 
     # Receive binary chunks and store them as individual files for later concatenation
+    keep_alive = asyncio.create_task(
+        interview_session_registry.keep_alive(service.state)
+    )
     try:
         while True:
             try:
-                message = await websocket.receive()
+                if first_message is not None:
+                    # Read ahead while the interview was queued
+                    pending, first_message = first_message, None
+                    message = await pending
+                else:
+                    message = await websocket.receive()
             except WebSocketDisconnect:
                 logger.info("WS video disconnected for interview %s", interview_id)
                 break
@@ -446,4 +607,5 @@ async def websocket_video_stream(
                 # Small pause to avoid hot loop on non-binary frames
                 await asyncio.sleep(0)
     finally:
-        cleanup_interview_service(interview_id, prefix)
+        keep_alive.cancel()
+        await cleanup_interview_service(service)
@@ -1,4 +1,9 @@
+from contextlib import contextmanager
+from typing import Iterator
+
 from gigachat import GigaChat
+from gigachat.context import session_id_cvar
+
 from app.core.config import settings
 
 
@@ -7,3 +12,21 @@ def get_gigachat_client():
         credentials=settings.gigachat_credentials,
         verify_ssl_certs=False,
     )
+
+
+@contextmanager
+def gigachat_session(session_id: str) -> Iterator[None]:
+    """Send GigaChat requests made in this block with an X-Session-ID header.
+
+    Requests sharing a session id are routed to the same model instance, which
+    lets the provider reuse the cached prefix (the static system prompt)
+    instead of reprocessing it on every turn.
+    """
+    if not settings.gigachat_prefix_caching:
+        yield
+        return
+    token = session_id_cvar.set(session_id)
+    try:
+        yield
+    finally:
+        session_id_cvar.reset(token)
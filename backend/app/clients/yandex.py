@@ -5,6 +5,11 @@ from speechkit.tts import SynthesisModel
 
 from app.core.config import settings
 
+# Interviewer voice settings; also part of the TTS audio cache key
+TTS_VOICE = "yulduz_ru"
+TTS_ROLE = "friendly"
+TTS_AUDIO_FORMAT = "mp3"
+
 
 def get_yandex_speech_recognition_model() -> RecognitionModel:
     configure_credentials(
@@ -30,8 +35,8 @@ def get_yandex_speech_synthesis_client() -> SynthesisModel:
     )
     model = model_repository.synthesis_model()
 
-    model.voice = "yulduz_ru"
-    model.role = "friendly"
+    model.voice = TTS_VOICE
+    model.role = TTS_ROLE
     model.unsafe_mode = True
 
     return model
@@ -3,8 +3,20 @@ from sqlalchemy.pool import NullPool
 
 from app.core.config import settings
 
+
+def _pool_options() -> dict:
+    if settings.db_pool_size <= 0:
+        return {"poolclass": NullPool}
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "pool_pre_ping": True,
+    }
+
+
 engine = create_async_engine(
-    settings.database_url, future=True, echo=False, poolclass=NullPool
+    settings.database_url, future=True, echo=False, **_pool_options()
 )
 AsyncSessionLocal = async_sessionmaker(
     engine, expire_on_commit=False, class_=AsyncSession
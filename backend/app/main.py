@@ -1,14 +1,25 @@
+import asyncio
 import logging
 import sys
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from app.api.routers.auth import router as auth_router
 from app.api.routers.candidates import router as candidates_router
 from app.api.routers.interviews import router as interviews_router
+from app.api.routers.search import router as search_router
 from app.api.routers.users import router as users_router
 from app.api.routers.vacancies import router as vacancies_router
 from app.api.routers.ws import router as ws_router
 from app.api.compatibility import router as compatibility_router
+from app.core.config import settings
+from app.services.entity_cache import entity_cache
+from app.services.interview_messages import FIXED_INTERVIEWER_PHRASES
+from app.services.interview_sessions import interview_session_registry
+from app.services.match_matrix import match_matrix_service
+from app.services.recordings import recording_manager
+from app.services.speech_synthesis import speech_synthesis_service
 
 
 def _configure_logging() -> None:
@@ -51,7 +62,39 @@ def _configure_logging() -> None:
 
 _configure_logging()
 
-app = FastAPI(title="AI HR Backend")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    background_tasks = []
+    if settings.use_yandex_speech_synthesis and settings.tts_cache_enabled:
+        # Pre-render fixed interviewer phrases without delaying startup
+        background_tasks.append(
+            asyncio.create_task(
+                speech_synthesis_service.warm_up(FIXED_INTERVIEWER_PHRASES)
+            )
+        )
+    if settings.match_matrix_enabled:
+        # Refresh matches missing or stale after a restart; unchanged skills
+        # skip the LLM; the other workers skip this while one rebuilds
+        background_tasks.append(asyncio.create_task(match_matrix_service.rebuild()))
+    # Spool files of sessions that will never be resumed
+    background_tasks.append(
+        asyncio.create_task(interview_session_registry.purge_abandoned())
+    )
+    # Archive recordings a restart left behind, then drop other leftovers of
+    # previous runs if the spool directory is over quota
+    recording_manager.recover()
+    recording_manager.enforce_quota()
+    entity_cache.start()
+    yield
+    for task in background_tasks:
+        task.cancel()
+    await recording_manager.stop()
+    await match_matrix_service.stop()
+    await entity_cache.stop()
+
+
+app = FastAPI(title="AI HR Backend", lifespan=lifespan)
 
 # Emit a startup log to verify logging pipeline
 logging.info("Application logging configured and FastAPI initialized")
@@ -68,5 +111,6 @@ app.include_router(candidates_router, prefix="/candidates", tags=["candidates"])
 app.include_router(vacancies_router, prefix="/vacancies", tags=["vacancies"])
 app.include_router(interviews_router, prefix="/interviews", tags=["interviews"])
 app.include_router(auth_router, prefix="/auth", tags=["auth"])
+app.include_router(search_router, prefix="/search", tags=["search"])
 app.include_router(compatibility_router)
 app.include_router(ws_router)
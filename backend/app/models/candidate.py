@@ -2,7 +2,8 @@ import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import String, func, Text, JSON
+from sqlalchemy import FetchedValue, Integer, String, func, Text, JSON
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -36,12 +37,25 @@ class Candidate(Base):
     geo: Mapped[str | None] = mapped_column(String(255), nullable=True)
     employment_type: Mapped[str | None] = mapped_column(String(255), nullable=True)
     document_s3_key: Mapped[str | None] = mapped_column(String(512), nullable=True)
+    # Derived from experience/skills/tech for indexed filtering in searches
+    experience_years: Mapped[int] = mapped_column(Integer, default=0)
+    skill_tags: Mapped[list[str]] = mapped_column(ARRAY(String), default=list)
+    # Order- and case-insensitive name, an exact key for duplicate detection
+    name_key: Mapped[str] = mapped_column(String(255), default="", index=True)
+    # Generated from name, position and experience (migration 000037)
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR, server_default=FetchedValue(), deferred=True
+    )
     created_at: Mapped[datetime] = mapped_column(default=func.now())
     updated_at: Mapped[datetime] = mapped_column(
         default=func.now(), onupdate=func.now()
     )
 
     # Relationships
-    embedding: Mapped["CandidateEmbedding | None"] = relationship(
-        "CandidateEmbedding", back_populates="candidate", uselist=False
+    # One per embedding generation; deleted by the database's ON DELETE CASCADE
+    embeddings: Mapped[list["CandidateEmbedding"]] = relationship(
+        "CandidateEmbedding",
+        back_populates="candidate",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
@@ -0,0 +1,27 @@
+from datetime import datetime
+
+from sqlalchemy import Float, ForeignKey, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class CandidateDuplicate(Base):
+    """A likely duplicate pair, flagged when the newer candidate was added."""
+
+    __tablename__ = "candidate_duplicate"
+
+    candidate_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("candidate.id", ondelete="CASCADE"), primary_key=True
+    )
+    duplicate_of_id: Mapped[str] = mapped_column(
+        String(36),
+        ForeignKey("candidate.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
+    )
+    # email | name | embedding
+    reason: Mapped[str] = mapped_column(String(16))
+    # Calibrated embedding similarity; None for email matches without embeddings
+    similarity: Mapped[float | None] = mapped_column(Float, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(default=func.now())
@@ -0,0 +1,27 @@
+from datetime import datetime
+
+from sqlalchemy import Float, ForeignKey, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class CandidateVacancyMatch(Base):
+    """Precomputed match of a candidate against an open vacancy."""
+
+    __tablename__ = "candidate_vacancy_match"
+
+    vacancy_id: Mapped[int] = mapped_column(
+        ForeignKey("vacancy.id", ondelete="CASCADE"), primary_key=True
+    )
+    candidate_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("candidate.id", ondelete="CASCADE"), primary_key=True
+    )
+    embedding_similarity: Mapped[float] = mapped_column(Float)
+    skills_pct: Mapped[int] = mapped_column(Integer)
+    overall_score: Mapped[float] = mapped_column(Float)
+    # Hash of both skill lists; skills_pct is reused while it is unchanged
+    skills_fingerprint: Mapped[str] = mapped_column(String(64))
+    computed_at: Mapped[datetime] = mapped_column(
+        default=func.now(), onupdate=func.now()
+    )
@@ -0,0 +1,49 @@
+from datetime import datetime
+
+from sqlalchemy import (
+    JSON,
+    Float,
+    ForeignKey,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+    func,
+)
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class CompatibilityReportRecord(Base):
+    """Compatibility report computed for a (candidate, vacancy) version."""
+
+    __tablename__ = "compatibility_report"
+    __table_args__ = (
+        UniqueConstraint(
+            "candidate_id",
+            "vacancy_id",
+            "fingerprint",
+            name="uq_compatibility_report_fingerprint",
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    candidate_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("candidate.id", ondelete="CASCADE")
+    )
+    vacancy_id: Mapped[int] = mapped_column(
+        ForeignKey("vacancy.id", ondelete="CASCADE")
+    )
+    # Hash of both records' versions and the scoring version
+    fingerprint: Mapped[str] = mapped_column(String(64))
+    scoring_version: Mapped[int] = mapped_column(Integer)
+    status: Mapped[str] = mapped_column(String(32), default="pending")
+    report: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    overall_score: Mapped[float | None] = mapped_column(Float, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    computed_at: Mapped[datetime | None] = mapped_column(nullable=True)
+    created_at: Mapped[datetime] = mapped_column(default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(
+        default=func.now(), onupdate=func.now()
+    )
@@ -1,8 +1,9 @@
 import uuid
 from datetime import datetime
+from enum import StrEnum
 from typing import TYPE_CHECKING
 
-from sqlalchemy import String, func, ForeignKey, Column
+from sqlalchemy import Integer, String, Text, UniqueConstraint, func, ForeignKey, Column
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -19,21 +20,55 @@ if TYPE_CHECKING:
     from app.models.vacancy import Vacancy
 
 
+class EmbeddingGenerationStatus(StrEnum):
+    # Being filled by a reindex; written on updates but not searched
+    BUILDING = "building"
+    # The one generation searches read
+    ACTIVE = "active"
+    RETIRED = "retired"
+
+
+class EmbeddingGeneration(Base):
+    """A set of embeddings produced by one model, e.g. during a model switch"""
+
+    __tablename__ = "embedding_generation"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    # Embedding provider ("gigachat" or "local") and its model
+    provider: Mapped[str] = mapped_column(String(16), default="gigachat")
+    model: Mapped[str] = mapped_column(String(64))
+    dimension: Mapped[int] = mapped_column(Integer)
+    status: Mapped[str] = mapped_column(
+        String(16), default=EmbeddingGenerationStatus.BUILDING
+    )
+    created_at: Mapped[datetime] = mapped_column(default=func.now())
+    activated_at: Mapped[datetime | None] = mapped_column(nullable=True)
+
+
+def _generation_column() -> Mapped[str]:
+    return mapped_column(
+        String(64), ForeignKey("embedding_generation.name", ondelete="CASCADE")
+    )
+
+
 class CandidateEmbedding(Base):
     """Embedding model for candidate CVs"""
 
     __tablename__ = "candidate_embeddings"
+    __table_args__ = (UniqueConstraint("candidate_id", "generation"),)
 
     id: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=lambda: str(uuid.uuid4())
     )
     candidate_id: Mapped[str] = mapped_column(
-        String(36), ForeignKey("candidate.id", ondelete="CASCADE"), unique=True
+        String(36), ForeignKey("candidate.id", ondelete="CASCADE")
     )
+    generation: Mapped[str] = _generation_column()
     embedding: Mapped[list[float]] = mapped_column(
-        Vector(1024)
+        # Dimension depends on the generation's model (1024 for GigaChat)
+        Vector()
         if Vector
-        else Column("embedding", String)  # 1024-dimensional vector (GigaChat)
+        else Column("embedding", String)
     )
     text_content: Mapped[str] = mapped_column(
         String(10000)
@@ -45,7 +80,7 @@ class CandidateEmbedding(Base):
 
     # Relationships
     candidate: Mapped["Candidate"] = relationship(
-        "Candidate", back_populates="embedding"
+        "Candidate", back_populates="embeddings"
     )
 
 
@@ -53,17 +88,20 @@ class VacancyEmbedding(Base):
     """Embedding model for vacancies"""
 
     __tablename__ = "vacancy_embeddings"
+    __table_args__ = (UniqueConstraint("vacancy_id", "generation"),)
 
     id: Mapped[str] = mapped_column(
         String(36), primary_key=True, default=lambda: str(uuid.uuid4())
     )
     vacancy_id: Mapped[int] = mapped_column(
-        ForeignKey("vacancy.id", ondelete="CASCADE"), unique=True
+        ForeignKey("vacancy.id", ondelete="CASCADE")
     )
+    generation: Mapped[str] = _generation_column()
     embedding: Mapped[list[float]] = mapped_column(
-        Vector(1024)
+        # Dimension depends on the generation's model (1024 for GigaChat)
+        Vector()
         if Vector
-        else Column("embedding", String)  # 1024-dimensional vector (GigaChat)
+        else Column("embedding", String)
     )
     text_content: Mapped[str] = mapped_column(
         String(10000)
@@ -74,4 +112,38 @@ class VacancyEmbedding(Base):
     )
 
     # Relationships
-    vacancy: Mapped["Vacancy"] = relationship("Vacancy", back_populates="embedding")
+    vacancy: Mapped["Vacancy"] = relationship("Vacancy", back_populates="embeddings")
+
+
+class CandidateEmbeddingChunk(Base):
+    """Embedding of one chunk of a candidate CV"""
+
+    __tablename__ = "candidate_embedding_chunks"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    candidate_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("candidate.id", ondelete="CASCADE"), index=True
+    )
+    generation: Mapped[str] = _generation_column()
+    chunk_index: Mapped[int] = mapped_column(Integer)
+    embedding: Mapped[list[float]] = mapped_column(
+        Vector() if Vector else Column("embedding", String)
+    )
+    text_content: Mapped[str] = mapped_column(Text)
+
+
+class VacancyEmbeddingChunk(Base):
+    """Embedding of one chunk of a vacancy"""
+
+    __tablename__ = "vacancy_embedding_chunks"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    vacancy_id: Mapped[int] = mapped_column(
+        ForeignKey("vacancy.id", ondelete="CASCADE"), index=True
+    )
+    generation: Mapped[str] = _generation_column()
+    chunk_index: Mapped[int] = mapped_column(Integer)
+    embedding: Mapped[list[float]] = mapped_column(
+        Vector() if Vector else Column("embedding", String)
+    )
+    text_content: Mapped[str] = mapped_column(Text)
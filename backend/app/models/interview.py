@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from sqlalchemy import Boolean, ForeignKey, String, Text, func
+from sqlalchemy import Boolean, ForeignKey, Integer, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -23,6 +23,13 @@ class Interview(Base):
     state: Mapped[str] = mapped_column(String(32), default="initialized")
     feedback: Mapped[str | None] = mapped_column(Text, nullable=True)
     feedback_positive: Mapped[bool | None] = mapped_column(Boolean, nullable=True)
+    # Next free InterviewMessage.index, reserved with UPDATE ... RETURNING
+    message_seq: Mapped[int] = mapped_column(Integer, default=0)
+    # Greeting generated in the background before the interview is opened
+    pending_greeting: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Rolling summary of turns that no longer fit the LLM context window
+    context_summary: Mapped[str | None] = mapped_column(Text, nullable=True)
+    context_summary_index: Mapped[int | None] = mapped_column(Integer, nullable=True)
     created_at: Mapped[datetime] = mapped_column(default=func.now())
     updated_at: Mapped[datetime] = mapped_column(
         default=func.now(), onupdate=func.now()
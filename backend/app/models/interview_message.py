@@ -1,4 +1,5 @@
-from sqlalchemy import ForeignKey, Integer, String, Text
+from sqlalchemy import FetchedValue, ForeignKey, Integer, String, Text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -22,5 +23,9 @@ class InterviewMessage(Base):
         String(64),
         nullable=False,
     )
+    # Generated from text (migration 000037)
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR, server_default=FetchedValue(), deferred=True
+    )
 
     interview = relationship("Interview", back_populates="messages")
@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from sqlalchemy import ForeignKey, String, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class InterviewPromptTemplate(Base):
+    """Rendered interview system prompt for a (candidate, vacancy) version."""
+
+    __tablename__ = "interview_prompt_template"
+
+    cache_key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    candidate_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("candidate.id", ondelete="CASCADE")
+    )
+    vacancy_id: Mapped[int | None] = mapped_column(
+        ForeignKey("vacancy.id", ondelete="CASCADE"), nullable=True
+    )
+    prompt: Mapped[str] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(default=func.now())
@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from sqlalchemy import JSON, Float, ForeignKey, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class InterviewWsSession(Base):
+    """Shared state of an interview WebSocket session, so any worker can resume it."""
+
+    __tablename__ = "interview_ws_session"
+
+    session_key: Mapped[str] = mapped_column(String(128), primary_key=True)
+    interview_id: Mapped[str] = mapped_column(
+        String(36), ForeignKey("interview.id", ondelete="CASCADE")
+    )
+    prefix: Mapped[str] = mapped_column(String(64), default="")
+    # Wall-clock start (epoch seconds); monotonic clocks differ between hosts
+    started_at: Mapped[float] = mapped_column(Float)
+    audio_marker_timings: Mapped[list] = mapped_column(JSON, default=list)
+    fragment_index: Mapped[int] = mapped_column(Integer, default=0)
+    spool_path: Mapped[str] = mapped_column(String(1024))
+    updated_at: Mapped[datetime] = mapped_column(
+        default=func.now(), onupdate=func.now()
+    )
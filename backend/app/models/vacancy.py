@@ -1,7 +1,8 @@
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import String, Text, func, Integer
+from sqlalchemy import FetchedValue, String, Text, func, Integer
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base
@@ -37,6 +38,10 @@ class Vacancy(Base):
         Text, nullable=True
     )  # JSON list[str]
     company_info: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Generated from title, description and requirements (migration 000037)
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR, server_default=FetchedValue(), deferred=True
+    )
 
     created_at: Mapped[datetime] = mapped_column(default=func.now())
     updated_at: Mapped[datetime] = mapped_column(
@@ -44,6 +49,10 @@ class Vacancy(Base):
     )
 
     # Relationships
-    embedding: Mapped["VacancyEmbedding | None"] = relationship(
-        "VacancyEmbedding", back_populates="vacancy", uselist=False
+    # One per embedding generation; deleted by the database's ON DELETE CASCADE
+    embeddings: Mapped[list["VacancyEmbedding"]] = relationship(
+        "VacancyEmbedding",
+        back_populates="vacancy",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
     )
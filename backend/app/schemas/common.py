@@ -219,6 +219,20 @@ class CandidateRead(CandidateBase, Timestamped):
     id: str
 
 
+class CandidateDuplicateRead(BaseModel):
+    candidate: CandidateRead
+    # email, name or embedding
+    reason: str
+    # Calibrated CV similarity, when the CVs have embeddings
+    similarity: float | None = None
+    created_at: IsoDatetime
+
+
+class CandidateMergeRequest(BaseModel):
+    # Merged into the candidate of the path and deleted
+    duplicate_id: str
+
+
 class VacancyBase(BaseModel):
     title: str
     description: str | None = None
@@ -549,3 +563,40 @@ class InterviewNoteCreate(InterviewNoteBase):
 class InterviewNoteRead(InterviewNoteBase):
     id: int
     created_at: IsoDatetime | None = None
+
+
+class CandidateSearchResult(BaseModel):
+    candidate: CandidateRead
+    # Calibrated similarity percentage
+    similarity_score: float
+
+
+class VacancySearchResult(BaseModel):
+    vacancy: VacancyRead
+    # Calibrated similarity percentage
+    similarity_score: float
+
+
+class CandidateTextSearchResult(BaseModel):
+    candidate: CandidateRead
+    rank: float
+
+
+class VacancyTextSearchResult(BaseModel):
+    vacancy: VacancyRead
+    rank: float
+
+
+class InterviewMessageSearchResult(InterviewMessageRead):
+    # Matching fragments with the matched words in <b></b>
+    snippet: str
+    rank: float
+
+
+class CompatibilityPair(BaseModel):
+    candidate_id: str
+    vacancy_id: int
+
+
+class CompatibilityBatchRequest(BaseModel):
+    pairs: list[CompatibilityPair] = Field(min_length=1)
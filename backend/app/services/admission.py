@@ -0,0 +1,206 @@
+"""
+Admission control for interview WebSockets.
+
+Limits how many interviews a process serves at once and how many ffmpeg,
+speech recognition, LLM and speech synthesis calls run concurrently. Extra
+interviews wait in a FIFO queue and are told their position; while they wait
+the socket is read at most one message ahead, so the client is slowed down by
+WebSocket backpressure instead of the pod buffering its media, yet a client
+that disconnects gives up its place.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PositionCallback = Callable[[int], Awaitable[None]]
+
+
+class AdmissionRejected(Exception):
+    """Raised when an interview cannot be queued or waited too long."""
+
+
+class AdmissionAbandoned(Exception):
+    """Raised when the client leaves the queue before it is admitted."""
+
+
+class StageLimiter:
+    """Semaphore for one pipeline stage that also counts waiters."""
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = limit
+        self.active = 0
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(limit)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict[str, int]:
+        return {"limit": self.limit, "active": self.active, "waiting": self.waiting}
+
+
+class AdmissionController:
+    """FIFO admission of interviews plus per-stage concurrency limits."""
+
+    def __init__(
+        self,
+        max_active: int,
+        max_queued: int,
+        queue_timeout: float,
+        stage_limits: Dict[str, int],
+    ):
+        self.max_active = max_active
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self._waiters: Deque[Tuple[asyncio.Future, PositionCallback]] = deque()
+        self._notifications: Set[asyncio.Task] = set()
+        self.stages = {
+            name: StageLimiter(name, limit) for name, limit in stage_limits.items()
+        }
+
+    async def admit(
+        self, on_position: PositionCallback, left: Optional[asyncio.Event] = None
+    ) -> None:
+        """Wait for an interview slot, reporting the queue position meanwhile.
+
+        Setting ``left`` while queued drops the place in the queue.
+        """
+        if self.active < self.max_active and not self._waiters:
+            self.active += 1
+            return
+
+        if len(self._waiters) >= self.max_queued:
+            raise AdmissionRejected("Interview queue is full")
+
+        ticket = asyncio.get_running_loop().create_future()
+        self._waiters.append((ticket, on_position))
+        logger.info("Interview queued at position %d", len(self._waiters))
+        try:
+            await on_position(len(self._waiters))
+            await asyncio.wait_for(self._wait(ticket, left), self.queue_timeout)
+        except BaseException as e:
+            if not ticket.done():
+                ticket.cancel()
+                self._remove_waiter(ticket)
+            elif not ticket.cancelled():
+                # The slot was handed over while we were giving up
+                self.release()
+            if isinstance(e, asyncio.TimeoutError):
+                raise AdmissionRejected("Timed out waiting in interview queue") from e
+            raise
+
+    @staticmethod
+    async def _wait(ticket: asyncio.Future, left: Optional[asyncio.Event]) -> None:
+        # asyncio.wait leaves the ticket alone when the wait is cancelled
+        waits = {ticket}
+        if left is not None:
+            waits.add(asyncio.ensure_future(left.wait()))
+        try:
+            await asyncio.wait(waits, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waits - {ticket}:
+                waiter.cancel()
+        if not ticket.done():
+            raise AdmissionAbandoned("Client left the interview queue")
+
+    def release(self) -> None:
+        """Free an interview slot, handing it to the first waiter if any."""
+        while self._waiters:
+            ticket, _ = self._waiters.popleft()
+            if not ticket.done():
+                # The slot passes to the waiter, so the active count stays
+                ticket.set_result(None)
+                self._notify_positions()
+                return
+        self.active -= 1
+
+    def _remove_waiter(self, ticket: asyncio.Future) -> None:
+        self._waiters = deque(w for w in self._waiters if w[0] is not ticket)
+        self._notify_positions()
+
+    def _notify_positions(self) -> None:
+        for position, (_, on_position) in enumerate(self._waiters, start=1):
+            task = asyncio.create_task(self._notify(on_position, position))
+            self._notifications.add(task)
+            task.add_done_callback(self._notifications.discard)
+
+    @staticmethod
+    async def _notify(on_position: PositionCallback, position: int) -> None:
+        try:
+            await on_position(position)
+        except Exception as e:
+            logger.debug("Failed to report queue position: %s", e)
+
+    @asynccontextmanager
+    async def session(
+        self, on_position: PositionCallback, left: Optional[asyncio.Event] = None
+    ) -> AsyncIterator[None]:
+        """Hold an interview slot for the duration of the block."""
+        await self.admit(on_position, left)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stage(self, name: str):
+        """Async context manager limiting concurrency of a pipeline stage."""
+        return self.stages[name].slot()
+
+    async def run_blocking(self, name: str, func: Callable, *args: Any) -> Any:
+        """Run a blocking call in a worker thread under a stage limit."""
+        async with self.stage(name):
+            return await asyncio.to_thread(func, *args)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "interviews": {
+                "limit": self.max_active,
+                "active": self.active,
+                "queued": len(self._waiters),
+            },
+            "stages": {name: stage.stats() for name, stage in self.stages.items()},
+        }
+
+
+# Global instance
+admission_controller = AdmissionController(
+    max_active=settings.interview_max_active,
+    max_queued=settings.interview_max_queued,
+    queue_timeout=settings.interview_queue_timeout_seconds,
+    stage_limits={
+        "ffmpeg": settings.interview_ffmpeg_concurrency,
+        "stt": settings.interview_stt_concurrency,
+        "llm": settings.interview_llm_concurrency,
+        "tts": settings.interview_tts_concurrency,
+    },
+)
@@ -0,0 +1,170 @@
+"""
+Detection of duplicate candidates, e.g. from repeated CV uploads.
+
+When a candidate is added it is compared with existing ones by exact keys
+(email, normalized name; both indexed lookups) and by its nearest CV
+embeddings. Namesakes count as duplicates only when their CVs are similar too.
+The neighbour search is the index-backed vector ranking, so it does not grow
+linearly with the number of candidates. Likely duplicates are flagged for review and can be
+merged (app.services.candidates.merge_candidates).
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from enum import StrEnum
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import case, func, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.candidate import Candidate
+from app.models.candidate_duplicate import CandidateDuplicate
+from app.services.embedding_service import embedding_service
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_name(name) -> str:
+    """ "Иванов Иван" and "иван  ИВАНОВ" share a key."""
+    words = re.findall(r"\w+", str(name or "").casefold().replace("ё", "е"))
+    return " ".join(sorted(words))
+
+
+class DuplicateReason(StrEnum):
+    EMAIL = "email"
+    # Same name and similar CVs; namesakes have different CVs
+    NAME = "name"
+    EMBEDDING = "embedding"
+
+
+@dataclass(frozen=True)
+class DuplicateMatch:
+    candidate_id: str
+    reason: DuplicateReason
+    similarity: Optional[float] = None
+
+
+class CandidateDedupService:
+    """Finds, flags and lists likely duplicate candidates."""
+
+    async def find_duplicates(
+        self, session: AsyncSession, candidate: Candidate
+    ) -> List[DuplicateMatch]:
+        matches: Dict[str, DuplicateMatch] = {}
+        if candidate.email:
+            same_email = await session.scalars(
+                select(Candidate.id).where(
+                    func.lower(Candidate.email) == candidate.email.lower(),
+                    Candidate.id != candidate.id,
+                )
+            )
+            for other_id in same_email:
+                matches[other_id] = DuplicateMatch(other_id, DuplicateReason.EMAIL)
+
+        if candidate.name_key:
+            namesakes = list(
+                await session.scalars(
+                    select(Candidate.id).where(
+                        Candidate.name_key == candidate.name_key,
+                        Candidate.id != candidate.id,
+                    )
+                )
+            )
+            if namesakes:
+                self._add_similar(
+                    matches,
+                    await embedding_service.nearest_candidates(
+                        session, candidate.id, len(namesakes), among=namesakes
+                    ),
+                    DuplicateReason.NAME,
+                    settings.candidate_duplicate_name_similarity,
+                )
+
+        neighbours = await embedding_service.nearest_candidates(
+            session, candidate.id, settings.candidate_duplicate_neighbours
+        )
+        self._add_similar(
+            matches,
+            neighbours,
+            DuplicateReason.EMBEDDING,
+            settings.candidate_duplicate_similarity,
+        )
+        return list(matches.values())
+
+    @staticmethod
+    def _add_similar(
+        matches: Dict[str, DuplicateMatch],
+        ranked: List[Tuple[Candidate, float]],
+        reason: DuplicateReason,
+        threshold: float,
+    ) -> None:
+        for other, similarity in ranked:
+            if other.id in matches:
+                if matches[other.id].similarity is None:
+                    matches[other.id] = DuplicateMatch(
+                        other.id, matches[other.id].reason, similarity
+                    )
+            elif similarity >= threshold:
+                matches[other.id] = DuplicateMatch(other.id, reason, similarity)
+
+    async def flag_duplicates(
+        self, session: AsyncSession, candidate: Candidate
+    ) -> List[DuplicateMatch]:
+        """Record the likely duplicates of a newly added candidate."""
+        matches = await self.find_duplicates(session, candidate)
+        if not matches:
+            return matches
+        await session.execute(
+            insert(CandidateDuplicate)
+            .values(
+                [
+                    {
+                        "candidate_id": candidate.id,
+                        "duplicate_of_id": match.candidate_id,
+                        "reason": match.reason,
+                        "similarity": match.similarity,
+                    }
+                    for match in matches
+                ]
+            )
+            .on_conflict_do_nothing()
+        )
+        await session.commit()
+        logger.info(
+            "Candidate %s has %d likely duplicates: %s",
+            candidate.id,
+            len(matches),
+            [match.candidate_id for match in matches],
+        )
+        return matches
+
+    async def list_duplicates(
+        self, session: AsyncSession, candidate_id: str
+    ) -> List[Tuple[CandidateDuplicate, Candidate]]:
+        """Flagged pairs involving the candidate, with the other candidate."""
+        other_id = case(
+            (
+                CandidateDuplicate.candidate_id == candidate_id,
+                CandidateDuplicate.duplicate_of_id,
+            ),
+            else_=CandidateDuplicate.candidate_id,
+        )
+        result = await session.execute(
+            select(CandidateDuplicate, Candidate)
+            .join(Candidate, Candidate.id == other_id)
+            .where(
+                or_(
+                    CandidateDuplicate.candidate_id == candidate_id,
+                    CandidateDuplicate.duplicate_of_id == candidate_id,
+                )
+            )
+            .order_by(CandidateDuplicate.created_at.desc())
+        )
+        return [tuple(row) for row in result.all()]
+
+
+# Global instance
+candidate_dedup_service = CandidateDedupService()
@@ -1,15 +1,70 @@
 import json
 import logging
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.candidate import Candidate
+from app.models.interview import Interview
 from app.schemas.common import CandidateCreate
-from app.services.exceptions import NotFoundError
+from app.services.candidate_dedup import candidate_dedup_service, normalize_name
+from app.services.entity_cache import EntitySnapshot, entity_cache
+from app.services.exceptions import ConflictError, NotFoundError
 from app.services.embedding_service import embedding_service
+from app.services.match_matrix import match_matrix_service
+from app.services.search_filters import normalize_skill
 
 logger = logging.getLogger(__name__)
 
+# Filled from a merged duplicate when empty on the kept candidate
+MERGE_FILL_FIELDS = [
+    "email",
+    "position",
+    "geo",
+    "employment_type",
+    "experience",
+    "education",
+    "gigachat_file_id",
+    "document_s3_key",
+]
+
+
+def _parse_list(value) -> list:
+    if not value:
+        return []
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except json.JSONDecodeError:
+            return [value]
+    return value if isinstance(value, list) else []
+
+
+def candidate_skill_tags(candidate: Candidate) -> list[str]:
+    """Normalized skills and tech of a candidate, matched by search filters."""
+    tags = {
+        normalize_skill(skill)
+        for skill in _parse_list(candidate.skills) + _parse_list(candidate.tech)
+    }
+    return sorted(tag for tag in tags if tag)
+
+
+def candidate_experience_years(candidate: Candidate) -> int:
+    total_years = 0
+    for item in _parse_list(candidate.experience):
+        if isinstance(item, dict) and "years" in item:
+            try:
+                total_years += int(item["years"])
+            except (ValueError, TypeError):
+                pass
+    return total_years
+
+
+def update_search_fields(candidate: Candidate) -> None:
+    """Refresh the columns derived from name, skills and experience."""
+    candidate.name_key = normalize_name(candidate.name)
+    candidate.skill_tags = candidate_skill_tags(candidate)
+    candidate.experience_years = candidate_experience_years(candidate)
+
 
 def serialize_datetime_fields(data_list):
     """Convert datetime objects to ISO strings for JSON serialization"""
@@ -46,6 +101,7 @@ async def create_candidate(
         data["experience"] = json.dumps(experience_data, ensure_ascii=False)
 
     candidate = Candidate(**data)
+    update_search_fields(candidate)
     session.add(candidate)
     await session.commit()
     await session.refresh(candidate)
@@ -54,13 +110,23 @@ async def create_candidate(
     try:
         logger.info(f"Generating embedding for new candidate: {candidate.id}")
         await embedding_service.generate_candidate_embedding(session, candidate)
-        await session.commit()  # Commit after embedding generation
+        await embedding_service.commit_embeddings(session)
         logger.info(f"Successfully generated embedding for candidate: {candidate.id}")
     except Exception as e:
         logger.error(f"Failed to generate embedding for candidate {candidate.id}: {e}")
         await session.rollback()  # Rollback if embedding generation fails
         # Don't fail the candidate creation if embedding generation fails
 
+    # Flag likely duplicates (e.g. the same CV uploaded again) for merging
+    try:
+        await candidate_dedup_service.flag_duplicates(session, candidate)
+    except Exception as e:
+        logger.error(f"Failed to check candidate {candidate.id} for duplicates: {e}")
+        await session.rollback()
+
+    # Refresh candidate×vacancy matches in the background
+    match_matrix_service.enqueue_candidate(candidate.id)
+
     return candidate
 
 
@@ -69,8 +135,9 @@ async def list_candidates(session: AsyncSession) -> list[Candidate]:
     return list(result)
 
 
-async def get_candidate(session: AsyncSession, candidate_id: str) -> Candidate:
-    candidate = await session.get(Candidate, candidate_id)
+async def get_candidate(session: AsyncSession, candidate_id: str) -> EntitySnapshot:
+    """Read-only snapshot of the candidate, served from the entity cache."""
+    candidate = await entity_cache.get(session, Candidate, candidate_id)
     if not candidate:
         raise NotFoundError("Candidate not found")
     return candidate
@@ -98,18 +165,23 @@ async def update_candidate(
 
     for key, value in data.items():
         setattr(candidate, key, value)
+    update_search_fields(candidate)
     await session.commit()
+    await entity_cache.invalidate(Candidate, candidate_id)
     await session.refresh(candidate)
 
     # Regenerate embedding after updates
     try:
         logger.info(f"Regenerating embedding for updated candidate: {candidate.id}")
         await embedding_service.generate_candidate_embedding(session, candidate)
-        await session.commit()  # Commit after embedding regeneration
+        await embedding_service.commit_embeddings(session)
     except Exception as e:
         logger.error(f"Failed to regenerate candidate embedding {candidate.id}: {e}")
         await session.rollback()  # Rollback if embedding generation fails
 
+    # Refresh candidate×vacancy matches in the background
+    match_matrix_service.enqueue_candidate(candidate_id)
+
     return candidate
 
 
@@ -121,3 +193,59 @@ async def delete_candidate(session: AsyncSession, candidate_id: str) -> None:
     # Delete the candidate - this will cascade to delete the embedding due to ondelete="CASCADE"
     await session.delete(candidate)
     await session.commit()
+    await entity_cache.invalidate(Candidate, candidate_id)
+
+
+async def merge_candidates(
+    session: AsyncSession, candidate_id: str, duplicate_id: str
+) -> Candidate:
+    """Merge a duplicate into a candidate and delete the duplicate.
+
+    The candidate keeps its own values, fills empty fields from the duplicate,
+    gains the duplicate's skills and tech and takes over its interviews.
+    """
+    if candidate_id == duplicate_id:
+        raise ConflictError("Candidate cannot be merged into itself")
+    candidate = await session.get(Candidate, candidate_id)
+    duplicate = await session.get(Candidate, duplicate_id)
+    if not candidate or not duplicate:
+        raise NotFoundError("Candidate not found")
+
+    for field in MERGE_FILL_FIELDS:
+        if not getattr(candidate, field) and getattr(duplicate, field):
+            setattr(candidate, field, getattr(duplicate, field))
+    for field in ("skills", "tech"):
+        values = _parse_list(getattr(candidate, field))
+        values += [
+            value
+            for value in _parse_list(getattr(duplicate, field))
+            if value not in values
+        ]
+        if values:
+            setattr(candidate, field, json.dumps(values, ensure_ascii=False))
+
+    await session.execute(
+        update(Interview)
+        .where(Interview.candidate_id == duplicate_id)
+        .values(candidate_id=candidate_id)
+    )
+    # Embeddings, matches and reports of the duplicate cascade in the database
+    await session.delete(duplicate)
+    update_search_fields(candidate)
+    await session.commit()
+    await entity_cache.invalidate(Candidate, candidate_id)
+    await entity_cache.invalidate(Candidate, duplicate_id)
+    await session.refresh(candidate)
+    logger.info(f"Merged candidate {duplicate_id} into {candidate_id}")
+
+    try:
+        await embedding_service.generate_candidate_embedding(session, candidate)
+        await embedding_service.commit_embeddings(session)
+    except Exception as e:
+        logger.error(f"Failed to regenerate candidate embedding {candidate.id}: {e}")
+        await session.rollback()
+
+    # Refresh candidate×vacancy matches in the background
+    match_matrix_service.enqueue_candidate(candidate_id)
+
+    return candidate
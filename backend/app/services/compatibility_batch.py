@@ -0,0 +1,172 @@
+"""
+Compatibility scores of many (candidate, vacancy) pairs in one request.
+
+Candidates, vacancies, embeddings and stored match rows are loaded with one
+query per table, and the embedding similarities of all pairs are computed in
+one vectorized pass. The blocking skills LLM calls run in threads, at most
+settings.compatibility_batch_concurrency at a time. A stored match row with
+the same skills fingerprint spares the call. Scores are yielded as each pair
+finishes, so they come in completion order, not request order.
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.candidate import Candidate
+from app.models.candidate_vacancy_match import CandidateVacancyMatch
+from app.models.vacancy import Vacancy
+from app.services.compatibility_service import compatibility_service
+from app.services.embedding_service import embedding_service
+from app.services.entity_cache import EntitySnapshot
+from app.services.match_matrix import skills_fingerprint
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PairInput:
+    """Everything needed to score a pair, loaded up front."""
+
+    candidate_id: str
+    vacancy_id: int
+    candidate: Optional[EntitySnapshot] = None
+    vacancy: Optional[EntitySnapshot] = None
+    # 0.0 while either side has no embedding, like the single report
+    embedding_similarity: float = 0.0
+    # From a stored match row computed for the same skill lists
+    skills_pct: Optional[int] = None
+
+
+class CompatibilityBatchService:
+    """Scores batches of pairs; no connection is held while scoring."""
+
+    def __init__(self, concurrency: int = settings.compatibility_batch_concurrency):
+        self.concurrency = concurrency
+
+    async def load(
+        self, session: AsyncSession, pairs: Sequence[Tuple[str, int]]
+    ) -> List[PairInput]:
+        # Repeated pairs are scored once
+        pairs = list(dict.fromkeys(pairs))
+        candidate_ids = list({candidate_id for candidate_id, _ in pairs})
+        vacancy_ids = list({vacancy_id for _, vacancy_id in pairs})
+
+        candidates = {
+            candidate.id: EntitySnapshot.of(candidate)
+            for candidate in await session.scalars(
+                select(Candidate).where(Candidate.id.in_(candidate_ids))
+            )
+        }
+        vacancies = {
+            vacancy.id: EntitySnapshot.of(vacancy)
+            for vacancy in await session.scalars(
+                select(Vacancy).where(Vacancy.id.in_(vacancy_ids))
+            )
+        }
+        found = [
+            (candidate_id, vacancy_id)
+            for candidate_id, vacancy_id in pairs
+            if candidate_id in candidates and vacancy_id in vacancies
+        ]
+        similarities = await embedding_service.similarities_by_ids(session, found)
+        matches = {}
+        if found:
+            matches = {
+                (match.candidate_id, match.vacancy_id): match
+                for match in await session.scalars(
+                    select(CandidateVacancyMatch).where(
+                        tuple_(
+                            CandidateVacancyMatch.candidate_id,
+                            CandidateVacancyMatch.vacancy_id,
+                        ).in_(found)
+                    )
+                )
+            }
+
+        inputs = []
+        for candidate_id, vacancy_id in pairs:
+            pair = PairInput(
+                candidate_id,
+                vacancy_id,
+                candidates.get(candidate_id),
+                vacancies.get(vacancy_id),
+                similarities.get((candidate_id, vacancy_id), 0.0),
+            )
+            match = matches.get((candidate_id, vacancy_id))
+            if match is not None and match.skills_fingerprint == skills_fingerprint(
+                pair.candidate, pair.vacancy
+            ):
+                pair.skills_pct = match.skills_pct
+            inputs.append(pair)
+        # Return the connection to the pool before the response starts
+        # streaming; the request's session is only closed after the last line
+        await session.commit()
+        return inputs
+
+    async def _score(
+        self, pair: PairInput, semaphore: asyncio.Semaphore
+    ) -> Dict[str, Any]:
+        result: Dict[str, Any] = {
+            "candidate_id": pair.candidate_id,
+            "vacancy_id": pair.vacancy_id,
+        }
+        if pair.candidate is None or pair.vacancy is None:
+            return {
+                **result,
+                "status": "failed",
+                "error": "Candidate or vacancy not found",
+            }
+
+        skills_pct = pair.skills_pct
+        if skills_pct is None:
+            try:
+                async with semaphore:
+                    skills_pct = await asyncio.to_thread(
+                        compatibility_service.skills_match_percentage,
+                        pair.candidate,
+                        pair.vacancy,
+                    )
+            except Exception as e:
+                logger.warning(
+                    "Skills match of candidate %s and vacancy %s failed: %s",
+                    pair.candidate_id,
+                    pair.vacancy_id,
+                    e,
+                )
+                return {**result, "status": "failed", "error": "Skills match failed"}
+
+        return {
+            **result,
+            "status": "done",
+            # Calibrated similarity percentage, as in top-k lists
+            "similarity_score": round(pair.embedding_similarity * 100, 2),
+            "skills_pct": skills_pct,
+            "overall_score": round(
+                compatibility_service.overall_score(
+                    pair.embedding_similarity, skills_pct
+                ),
+                2,
+            ),
+        }
+
+    async def score(self, pairs: List[PairInput]) -> AsyncIterator[Dict[str, Any]]:
+        """Scores of the loaded pairs, each as soon as it is computed."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = [asyncio.create_task(self._score(pair, semaphore)) for pair in pairs]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # The client went away; running LLM calls finish in their threads
+            for task in tasks:
+                task.cancel()
+
+
+# Global instance
+compatibility_batch_service = CompatibilityBatchService()
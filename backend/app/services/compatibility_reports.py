@@ -0,0 +1,235 @@
+"""
+Persisted compatibility reports.
+
+A report is computed by a background job and stored in the
+compatibility_report table keyed by (candidate_id, vacancy_id, fingerprint).
+The fingerprint covers both records' ``updated_at`` and SCORING_VERSION, so a
+stored report is served as is until the candidate, the vacancy or the scoring
+logic changes; reads never call GigaChat.
+"""
+
+import asyncio
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from enum import StrEnum
+from typing import Callable, Dict, Tuple
+
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.candidate import Candidate
+from app.models.compatibility_report import CompatibilityReportRecord
+from app.models.vacancy import Vacancy
+from app.services.compatibility_service import compatibility_service
+from app.services.entity_cache import EntitySnapshot, entity_cache
+from app.services.exceptions import NotFoundError
+
+logger = logging.getLogger(__name__)
+
+# Bump when the scoring in compatibility_service changes to recompute reports
+SCORING_VERSION = 1
+
+
+class ReportStatus(StrEnum):
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+def _timestamp(value: datetime | None) -> str:
+    return value.isoformat() if value else "-"
+
+
+def report_fingerprint(candidate: Candidate, vacancy: Vacancy) -> str:
+    parts = [
+        str(SCORING_VERSION),
+        str(candidate.id),
+        _timestamp(candidate.updated_at),
+        str(vacancy.id),
+        _timestamp(vacancy.updated_at),
+    ]
+    return hashlib.sha256(":".join(parts).encode("utf-8")).hexdigest()
+
+
+class CompatibilityReportService:
+    """Stores compatibility reports and computes them in background jobs."""
+
+    def __init__(
+        self,
+        session_factory: Callable = AsyncSessionLocal,
+        job_timeout_seconds: int = settings.compatibility_report_job_timeout_seconds,
+    ):
+        self.session_factory = session_factory
+        self.job_timeout_seconds = job_timeout_seconds
+        self._jobs: Dict[int, asyncio.Task] = {}
+
+    async def _load_pair(
+        self, session: AsyncSession, candidate_id: str, vacancy_id: int
+    ) -> Tuple[EntitySnapshot, EntitySnapshot]:
+        candidate = await entity_cache.get(session, Candidate, candidate_id)
+        vacancy = await entity_cache.get(session, Vacancy, vacancy_id)
+        if not candidate or not vacancy:
+            raise NotFoundError("Candidate or vacancy not found")
+        return candidate, vacancy
+
+    async def get_report(
+        self, session: AsyncSession, candidate_id: str, vacancy_id: int
+    ) -> CompatibilityReportRecord | None:
+        """Return the report for the current candidate and vacancy versions."""
+        candidate, vacancy = await self._load_pair(session, candidate_id, vacancy_id)
+        return await session.scalar(
+            select(CompatibilityReportRecord).where(
+                CompatibilityReportRecord.candidate_id == candidate_id,
+                CompatibilityReportRecord.vacancy_id == vacancy_id,
+                CompatibilityReportRecord.fingerprint
+                == report_fingerprint(candidate, vacancy),
+            )
+        )
+
+    async def request_report(
+        self,
+        session: AsyncSession,
+        candidate_id: str,
+        vacancy_id: int,
+        retry_failed: bool = False,
+    ) -> CompatibilityReportRecord:
+        """Return the current report, starting a compute job if it is not done."""
+        candidate, vacancy = await self._load_pair(session, candidate_id, vacancy_id)
+        fingerprint = report_fingerprint(candidate, vacancy)
+        await session.execute(
+            insert(CompatibilityReportRecord)
+            .values(
+                candidate_id=candidate_id,
+                vacancy_id=vacancy_id,
+                fingerprint=fingerprint,
+                scoring_version=SCORING_VERSION,
+                status=ReportStatus.PENDING,
+            )
+            .on_conflict_do_nothing(
+                index_elements=[
+                    CompatibilityReportRecord.candidate_id,
+                    CompatibilityReportRecord.vacancy_id,
+                    CompatibilityReportRecord.fingerprint,
+                ]
+            )
+        )
+        await session.commit()
+        record = await session.scalar(
+            select(CompatibilityReportRecord).where(
+                CompatibilityReportRecord.candidate_id == candidate_id,
+                CompatibilityReportRecord.vacancy_id == vacancy_id,
+                CompatibilityReportRecord.fingerprint == fingerprint,
+            )
+            # The job may have updated a row already in the identity map
+            .execution_options(populate_existing=True)
+        )
+
+        if record.status == ReportStatus.DONE:
+            return record
+        if record.status == ReportStatus.FAILED and not retry_failed:
+            return record
+        self._start_job(record)
+        return record
+
+    def _start_job(self, record: CompatibilityReportRecord) -> None:
+        if record.id in self._jobs:
+            return
+        task = asyncio.create_task(
+            self.compute(record.id, record.candidate_id, record.vacancy_id)
+        )
+        self._jobs[record.id] = task
+        task.add_done_callback(lambda _: self._jobs.pop(record.id, None))
+
+    async def _claim(self, report_id: int) -> bool:
+        """Mark the report as running unless another worker already runs it."""
+        stale_before = datetime.now() - timedelta(seconds=self.job_timeout_seconds)
+        async with self.session_factory() as session:
+            claimed = await session.scalar(
+                update(CompatibilityReportRecord)
+                .where(CompatibilityReportRecord.id == report_id)
+                .where(
+                    or_(
+                        CompatibilityReportRecord.status.in_(
+                            [ReportStatus.PENDING, ReportStatus.FAILED]
+                        ),
+                        and_(
+                            CompatibilityReportRecord.status == ReportStatus.RUNNING,
+                            CompatibilityReportRecord.updated_at < stale_before,
+                        ),
+                    )
+                )
+                .values(status=ReportStatus.RUNNING, error=None)
+                .returning(CompatibilityReportRecord.id)
+            )
+            await session.commit()
+        return claimed is not None
+
+    async def _fail(self, report_id: int, error: str) -> None:
+        async with self.session_factory() as session:
+            await session.execute(
+                update(CompatibilityReportRecord)
+                .where(CompatibilityReportRecord.id == report_id)
+                .values(status=ReportStatus.FAILED, error=error)
+            )
+            await session.commit()
+
+    async def compute(self, report_id: int, candidate_id: str, vacancy_id: int) -> bool:
+        """Compute and store a report; returns False if it was not computed here."""
+        if not await self._claim(report_id):
+            return False
+
+        logger.info(
+            "Computing compatibility report %s (candidate %s, vacancy %s)",
+            report_id,
+            candidate_id,
+            vacancy_id,
+        )
+        try:
+            async with self.session_factory() as session:
+                report = await compatibility_service.analyze_compatibility(
+                    session, candidate_id, vacancy_id
+                )
+        except Exception as e:
+            # Left RUNNING, the report would only be retried once it is stale
+            logger.error(
+                "Failed to compute compatibility report %s: %s",
+                report_id,
+                e,
+                exc_info=True,
+            )
+            await self._fail(report_id, str(e))
+            return False
+        if report is None:
+            await self._fail(report_id, "Unable to generate report")
+            return False
+
+        async with self.session_factory() as session:
+            await session.execute(
+                update(CompatibilityReportRecord)
+                .where(CompatibilityReportRecord.id == report_id)
+                .values(
+                    status=ReportStatus.DONE,
+                    report=report.to_dict(),
+                    overall_score=report.overall_score,
+                    computed_at=datetime.now(),
+                )
+            )
+            # Reports of older versions of the pair are never served again
+            await session.execute(
+                delete(CompatibilityReportRecord).where(
+                    CompatibilityReportRecord.candidate_id == candidate_id,
+                    CompatibilityReportRecord.vacancy_id == vacancy_id,
+                    CompatibilityReportRecord.id != report_id,
+                )
+            )
+            await session.commit()
+        return True
+
+
+# Global instance
+compatibility_report_service = CompatibilityReportService()
@@ -3,6 +3,7 @@ Compatibility analysis service for matching candidates with vacancies.
 Provides detailed compatibility reports and recommendations.
 """
 
+import asyncio
 import json
 import logging
 from typing import Dict, List, Any, Optional
@@ -12,9 +13,9 @@ from enum import Enum
 from app.models.candidate import Candidate
 from app.models.vacancy import Vacancy
 from app.services.embedding_service import embedding_service
+from app.services.entity_cache import entity_cache
 from app.services.skills_llm_service import skills_llm_service
 from app.db.session import AsyncSession
-from sqlalchemy import select
 
 logger = logging.getLogger(__name__)
 
@@ -52,6 +53,18 @@ class CompatibilityReport:
     potential_concerns: List[str]
     hiring_recommendation: str
     next_steps: List[str]
+    overall_score: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Report as returned by the API."""
+        return {
+            "executive_summary": self.executive_summary,
+            "candidate_profile": self.candidate_profile,
+            "detailed_analysis": self.detailed_analysis,
+            "potential_concerns": self.potential_concerns,
+            "hiring_recommendation": self.hiring_recommendation,
+            "next_steps": self.next_steps,
+        }
 
 
 class CompatibilityService:
@@ -256,6 +269,17 @@ class CompatibilityService:
         except Exception:
             return embedding_similarity * 100.0
 
+    def skills_match_percentage(self, candidate: Candidate, vacancy: Vacancy) -> int:
+        """LLM skills match percentage of a pair (blocking GigaChat call)."""
+        return self._analyze_skills_match(candidate, vacancy).matched_percentage
+
+    def overall_score(
+        self, embedding_similarity: float, skills_match_percentage: int
+    ) -> float:
+        return self._calculate_overall_score(
+            embedding_similarity, skills_match_percentage
+        )
+
     def _determine_match_level(self, overall_score: float) -> MatchLevel:
         """Determine overall match level based on score"""
         if overall_score >= 80:
@@ -356,15 +380,9 @@ class CompatibilityService:
     ) -> Optional[CompatibilityReport]:
         """Generate comprehensive compatibility report"""
         try:
-            # Get candidate and vacancy
-            candidate_query = select(Candidate).where(Candidate.id == candidate_id)
-            vacancy_query = select(Vacancy).where(Vacancy.id == vacancy_id)
-
-            candidate_result = await session.execute(candidate_query)
-            vacancy_result = await session.execute(vacancy_query)
-
-            candidate = candidate_result.scalar_one_or_none()
-            vacancy = vacancy_result.scalar_one_or_none()
+            # Get candidate and vacancy (cached snapshots)
+            candidate = await entity_cache.get(session, Candidate, candidate_id)
+            vacancy = await entity_cache.get(session, Vacancy, vacancy_id)
 
             if not candidate or not vacancy:
                 logger.error(
@@ -379,8 +397,10 @@ class CompatibilityService:
                 )
             )
 
-            # Analyze skills and experience
-            skills_analysis = self._analyze_skills_match(candidate, vacancy)
+            # Analyze skills and experience; the skills LLM call is blocking
+            skills_analysis = await asyncio.to_thread(
+                self._analyze_skills_match, candidate, vacancy
+            )
             experience_analysis = self._analyze_experience(candidate, vacancy)
 
             # Combine calibrated embedding similarity with LLM skills percent
@@ -473,6 +493,7 @@ class CompatibilityService:
                 potential_concerns=concerns,
                 hiring_recommendation=recommendation,
                 next_steps=next_steps,
+                overall_score=overall_score,
             )
 
         except Exception as e:
@@ -0,0 +1,351 @@
+"""
+Backfill and reindex of candidate and vacancy embeddings.
+
+Finds candidates and vacancies whose embedding in a generation (the active
+one by default) is missing, older than the record itself or, in chunked mode,
+has no chunks, embeds them in batches with a bounded number of concurrent
+GigaChat requests and writes every batch with bulk inserts. Progress is
+checkpointed to a file after each batch, so a crashed run resumes after the
+last stored batch:
+
+    python -m app.services.embedding_backfill [--reindex] [--target candidate]
+        [--generation NAME]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from enum import StrEnum
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, exists, insert, or_, select
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.candidate import Candidate
+from app.models.embedding import (
+    CandidateEmbedding,
+    CandidateEmbeddingChunk,
+    EmbeddingGeneration,
+    VacancyEmbedding,
+    VacancyEmbeddingChunk,
+)
+from app.models.vacancy import Vacancy
+from app.services.embedding_service import DocumentEmbedding, embedding_service
+from app.services.embedding_snapshot import embedding_snapshot_store
+from app.services.exceptions import NotFoundError
+
+logger = logging.getLogger(__name__)
+
+
+class BackfillTarget(StrEnum):
+    CANDIDATE = "candidate"
+    VACANCY = "vacancy"
+
+
+@dataclass(frozen=True)
+class _TargetModels:
+    model: Any
+    embedding_model: Any
+    chunk_model: Any
+    owner_key: str
+    embed: Callable
+
+
+TARGET_MODELS = {
+    BackfillTarget.CANDIDATE: _TargetModels(
+        Candidate,
+        CandidateEmbedding,
+        CandidateEmbeddingChunk,
+        "candidate_id",
+        lambda record, generation: embedding_service.embed_candidate(
+            record, generation
+        ),
+    ),
+    BackfillTarget.VACANCY: _TargetModels(
+        Vacancy,
+        VacancyEmbedding,
+        VacancyEmbeddingChunk,
+        "vacancy_id",
+        lambda record, generation: embedding_service.embed_vacancy(record, generation),
+    ),
+}
+
+
+@dataclass
+class BackfillStats:
+    processed: int = 0
+    embedded: int = 0
+    failed: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def rows_per_second(self) -> float:
+        elapsed = time.monotonic() - self.started_at
+        return self.embedded / elapsed if elapsed > 0 else 0.0
+
+
+class EmbeddingBackfillService:
+    """Embeds records with missing or stale embeddings in resumable batches."""
+
+    def __init__(
+        self,
+        session_factory: Callable = AsyncSessionLocal,
+        batch_size: int = settings.embedding_backfill_batch_size,
+        concurrency: int = settings.embedding_backfill_concurrency,
+        checkpoint_path: str = settings.embedding_backfill_checkpoint_path,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.checkpoint_path = checkpoint_path
+
+    def _load_checkpoint(self, reindex: bool, generation: str) -> Dict[str, Any]:
+        fresh = {"reindex": reindex, "generation": generation}
+        try:
+            with open(self.checkpoint_path, encoding="utf-8") as f:
+                checkpoint = json.load(f)
+        except FileNotFoundError:
+            return fresh
+        # A checkpoint of another mode or generation does not apply to this run
+        if any(checkpoint.get(key) != value for key, value in fresh.items()):
+            return fresh
+        logger.info("Resuming embedding backfill from %s", checkpoint)
+        return checkpoint
+
+    def _save_checkpoint(self, checkpoint: Dict[str, Any]) -> None:
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _clear_checkpoint(self) -> None:
+        try:
+            os.remove(self.checkpoint_path)
+        except FileNotFoundError:
+            pass
+
+    def _pending_ids(
+        self, target: BackfillTarget, reindex: bool, generation: str, after_id: Any
+    ):
+        models = TARGET_MODELS[target]
+        owner = getattr(models.embedding_model, models.owner_key)
+        query = (
+            select(models.model.id)
+            .outerjoin(
+                models.embedding_model,
+                (owner == models.model.id)
+                & (models.embedding_model.generation == generation),
+            )
+            .order_by(models.model.id)
+            .limit(self.batch_size)
+        )
+        if after_id is not None:
+            query = query.where(models.model.id > after_id)
+        if not reindex:
+            stale = [
+                models.embedding_model.id.is_(None),
+                models.embedding_model.updated_at < models.model.updated_at,
+            ]
+            if settings.embedding_chunking_enabled:
+                chunk_owner = getattr(models.chunk_model, models.owner_key)
+                stale.append(
+                    ~exists().where(
+                        chunk_owner == models.model.id,
+                        models.chunk_model.generation == generation,
+                    )
+                )
+            query = query.where(or_(*stale))
+        return query
+
+    async def run(
+        self,
+        targets: Sequence[BackfillTarget],
+        reindex: bool = False,
+        generation_name: Optional[str] = None,
+    ) -> BackfillStats:
+        """Embed every pending record of the targets in the generation (the
+        active one by default); returns the run's stats."""
+        async with self.session_factory() as session:
+            generation = await embedding_service.get_generation(
+                session, generation_name
+            )
+        if generation is None:
+            raise NotFoundError("Embedding generation not found")
+
+        stats = BackfillStats()
+        checkpoint = self._load_checkpoint(reindex, generation.name)
+
+        for target in targets:
+            models = TARGET_MODELS[target]
+            after_id = checkpoint.get(target)
+            while True:
+                async with self.session_factory() as session:
+                    ids = list(
+                        await session.scalars(
+                            self._pending_ids(
+                                target, reindex, generation.name, after_id
+                            )
+                        )
+                    )
+                    if not ids:
+                        break
+                    records = list(
+                        await session.scalars(
+                            select(models.model)
+                            .where(models.model.id.in_(ids))
+                            .order_by(models.model.id)
+                        )
+                    )
+                    # No connection is held during the GigaChat calls
+                    await session.commit()
+
+                documents = await self._embed_batch(models, records, generation)
+                async with self.session_factory() as session:
+                    await self._write_batch(session, models, generation.name, documents)
+
+                stats.processed += len(records)
+                stats.embedded += len(documents)
+                stats.failed += len(records) - len(documents)
+                after_id = ids[-1]
+                checkpoint[target] = after_id
+                self._save_checkpoint(checkpoint)
+                logger.info(
+                    "Embedded %d/%d %ss up to %s (%.1f rows/s)",
+                    len(documents),
+                    len(records),
+                    target.value,
+                    after_id,
+                    stats.rows_per_second,
+                )
+
+        self._clear_checkpoint()
+        logger.info(
+            "Embedding backfill finished: %d embedded, %d failed, %.1f rows/s",
+            stats.embedded,
+            stats.failed,
+            stats.rows_per_second,
+        )
+        return stats
+
+    async def _embed_batch(
+        self,
+        models: _TargetModels,
+        records: List[Any],
+        generation: EmbeddingGeneration,
+    ) -> List[Tuple[Any, DocumentEmbedding]]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def embed(record) -> Optional[Tuple[Any, DocumentEmbedding]]:
+            async with semaphore:
+                try:
+                    document = await models.embed(record, generation)
+                except Exception as e:
+                    logger.error("Failed to embed %s: %s", record.id, e)
+                    return None
+            return (record.id, document) if document else None
+
+        results = await asyncio.gather(*(embed(record) for record in records))
+        return [result for result in results if result is not None]
+
+    @staticmethod
+    async def _write_batch(
+        session,
+        models: _TargetModels,
+        generation: str,
+        documents: List[Tuple[Any, DocumentEmbedding]],
+    ) -> None:
+        """Replace the embeddings and chunks of a batch with bulk inserts."""
+        if not documents:
+            return
+        owner_ids = [owner_id for owner_id, _ in documents]
+        for model in (models.embedding_model, models.chunk_model):
+            owner = getattr(model, models.owner_key)
+            await session.execute(
+                delete(model).where(
+                    owner.in_(owner_ids), model.generation == generation
+                )
+            )
+
+        await session.execute(
+            insert(models.embedding_model),
+            [
+                {
+                    "id": str(uuid.uuid4()),
+                    models.owner_key: owner_id,
+                    "generation": generation,
+                    "embedding": document.vector,
+                    "text_content": document.text_content,
+                }
+                for owner_id, document in documents
+            ],
+        )
+        chunk_rows = [
+            {
+                models.owner_key: owner_id,
+                "generation": generation,
+                "chunk_index": index,
+                "embedding": vector,
+                "text_content": chunk,
+            }
+            for owner_id, document in documents
+            for index, (chunk, vector) in enumerate(document.chunks)
+        ]
+        if chunk_rows:
+            await session.execute(insert(models.chunk_model), chunk_rows)
+        await session.commit()
+        embedding_snapshot_store.record(
+            models.embedding_model,
+            generation,
+            [(owner_id, document.vector) for owner_id, document in documents],
+        )
+
+
+# Global instance
+embedding_backfill_service = EmbeddingBackfillService()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Embed candidates and vacancies with missing or stale embeddings"
+    )
+    parser.add_argument(
+        "--target",
+        choices=[target.value for target in BackfillTarget],
+        action="append",
+        help="Record type to embed; repeat for several (default: all)",
+    )
+    parser.add_argument(
+        "--reindex",
+        action="store_true",
+        help="Re-embed every record, not only missing or stale ones",
+    )
+    parser.add_argument(
+        "--generation",
+        help="Embedding generation to fill (default: the active one)",
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=settings.embedding_backfill_batch_size
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=settings.embedding_backfill_concurrency
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    service = EmbeddingBackfillService(
+        batch_size=args.batch_size, concurrency=args.concurrency
+    )
+    targets = [BackfillTarget(t) for t in args.target or list(BackfillTarget)]
+    asyncio.run(
+        service.run(targets, reindex=args.reindex, generation_name=args.generation)
+    )
+
+
+if __name__ == "__main__":
+    main()
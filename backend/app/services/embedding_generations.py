@@ -0,0 +1,261 @@
+"""
+Embedding generations: switching embedding models without search downtime.
+
+Every stored embedding belongs to a generation (a model and its dimension).
+Searches read only the active generation. A new generation is created in the
+building state, filled by the backfill job while searches keep using the old
+one (candidate and vacancy edits are written to both), and then activated in
+a single transaction:
+
+    python -m app.services.embedding_generations reindex NAME --model MODEL
+    python -m app.services.embedding_generations drop OLD_NAME
+"""
+
+import argparse
+import asyncio
+import logging
+from datetime import datetime
+from typing import Callable, List
+
+from sqlalchemy import func, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.embedding import (
+    CandidateEmbedding,
+    EmbeddingGeneration,
+    EmbeddingGenerationStatus,
+    VacancyEmbedding,
+)
+from app.services.embedding_backfill import (
+    BackfillTarget,
+    EmbeddingBackfillService,
+    embedding_backfill_service,
+)
+from app.services.embedding_providers import PROVIDERS, get_embedding_provider
+from app.services.exceptions import ConflictError, NotFoundError
+from app.services.match_matrix import match_matrix_service
+from app.services.vector_quantization import (
+    create_index_statements,
+    drop_index_statements,
+    supports_compact_indexes,
+)
+
+logger = logging.getLogger(__name__)
+
+# Tables searched by a first pass on compact vectors
+INDEXED_TABLES = ["candidate_embeddings", "vacancy_embeddings"]
+
+
+class EmbeddingGenerationService:
+    """Creates, fills, activates and drops embedding generations."""
+
+    def __init__(
+        self,
+        session_factory: Callable = AsyncSessionLocal,
+        backfill: EmbeddingBackfillService = embedding_backfill_service,
+    ):
+        self.session_factory = session_factory
+        self.backfill = backfill
+
+    async def list_generations(
+        self, session: AsyncSession
+    ) -> List[EmbeddingGeneration]:
+        result = await session.scalars(
+            select(EmbeddingGeneration).order_by(EmbeddingGeneration.created_at)
+        )
+        return list(result)
+
+    async def _get(self, session: AsyncSession, name: str) -> EmbeddingGeneration:
+        generation = await session.get(EmbeddingGeneration, name)
+        if generation is None:
+            raise NotFoundError("Embedding generation not found")
+        return generation
+
+    async def create(
+        self,
+        session: AsyncSession,
+        name: str,
+        model: str,
+        dimension: int,
+        provider: str = settings.embedding_provider,
+    ) -> EmbeddingGeneration:
+        """Add a generation in the building state; edits start reaching it."""
+        if await session.get(EmbeddingGeneration, name) is not None:
+            raise ConflictError("Embedding generation already exists")
+        # Unknown providers fail here rather than on every edit
+        get_embedding_provider(provider)
+        generation = EmbeddingGeneration(
+            name=name,
+            provider=provider,
+            model=model,
+            dimension=dimension,
+            status=EmbeddingGenerationStatus.BUILDING,
+        )
+        session.add(generation)
+        await session.flush()
+        if await self._compact_indexes_supported(session):
+            for table in INDEXED_TABLES:
+                for statement in create_index_statements(table, name, dimension):
+                    await session.execute(text(statement))
+        await session.commit()
+        return generation
+
+    @staticmethod
+    async def _compact_indexes_supported(session: AsyncSession) -> bool:
+        version = await session.scalar(
+            text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+        )
+        return supports_compact_indexes(version)
+
+    async def build(self, name: str) -> None:
+        """Embed every candidate and vacancy into the generation (resumable)."""
+        await self.backfill.run(list(BackfillTarget), generation_name=name)
+
+    async def _coverage(self, session: AsyncSession, name: str) -> tuple:
+        counts = []
+        for model in (CandidateEmbedding, VacancyEmbedding):
+            counts.append(
+                await session.scalar(
+                    select(func.count()).where(model.generation == name)
+                )
+            )
+        return tuple(counts)
+
+    async def activate(
+        self, session: AsyncSession, name: str, force: bool = False
+    ) -> EmbeddingGeneration:
+        """Make the generation the one searches read, retiring the current one.
+
+        Refuses a generation with fewer embeddings than the active one unless
+        forced, so a half-built generation is not switched to by mistake.
+        """
+        generation = await self._get(session, name)
+        if generation.status == EmbeddingGenerationStatus.ACTIVE:
+            return generation
+
+        active = await session.scalar(
+            select(EmbeddingGeneration).where(
+                EmbeddingGeneration.status == EmbeddingGenerationStatus.ACTIVE
+            )
+        )
+        if active is not None and not force:
+            new_counts = await self._coverage(session, name)
+            active_counts = await self._coverage(session, active.name)
+            if any(new < old for new, old in zip(new_counts, active_counts)):
+                raise ConflictError(
+                    f"Embedding generation {name} is incomplete: "
+                    f"{new_counts} embeddings, active has {active_counts}"
+                )
+
+        # Both updates commit together; readers see one active generation
+        await session.execute(
+            update(EmbeddingGeneration)
+            .where(EmbeddingGeneration.status == EmbeddingGenerationStatus.ACTIVE)
+            .values(status=EmbeddingGenerationStatus.RETIRED)
+        )
+        await session.execute(
+            update(EmbeddingGeneration)
+            .where(EmbeddingGeneration.name == name)
+            .values(
+                status=EmbeddingGenerationStatus.ACTIVE, activated_at=datetime.now()
+            )
+        )
+        await session.commit()
+        await session.refresh(generation)
+        logger.info(
+            "Embedding generation %s activated (was %s)",
+            name,
+            active.name if active else None,
+        )
+        return generation
+
+    async def drop(self, session: AsyncSession, name: str) -> None:
+        """Delete a generation that is not active, with all its embeddings."""
+        generation = await self._get(session, name)
+        if generation.status == EmbeddingGenerationStatus.ACTIVE:
+            raise ConflictError("The active embedding generation cannot be dropped")
+        # Embeddings and chunks go with it (ON DELETE CASCADE)
+        await session.delete(generation)
+        for table in INDEXED_TABLES:
+            for statement in drop_index_statements(table, name):
+                await session.execute(text(statement))
+        await session.commit()
+
+
+# Global instance
+embedding_generation_service = EmbeddingGenerationService()
+
+
+async def _refresh_matches() -> None:
+    # Stored match scores use the previous generation's similarities; skills
+    # percentages are reused, so this only recomputes similarities
+    if settings.match_matrix_enabled:
+        await match_matrix_service.rebuild()
+        await match_matrix_service.stop()
+
+
+async def _main(args: argparse.Namespace) -> None:
+    service = embedding_generation_service
+    if args.command in ("create", "reindex"):
+        async with service.session_factory() as session:
+            await service.create(
+                session, args.name, args.model, args.dimension, args.provider
+            )
+    if args.command in ("build", "reindex"):
+        await service.build(args.name)
+    if args.command in ("activate", "reindex"):
+        async with service.session_factory() as session:
+            await service.activate(session, args.name, force=args.force)
+        await _refresh_matches()
+    if args.command == "drop":
+        async with service.session_factory() as session:
+            await service.drop(session, args.name)
+    if args.command == "list":
+        async with service.session_factory() as session:
+            for generation in await service.list_generations(session):
+                print(
+                    f"{generation.name}\t{generation.status}\t"
+                    f"{generation.provider}\t{generation.model}\t"
+                    f"{generation.dimension}"
+                )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage embedding generations")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="List generations")
+    for command, help_text in [
+        ("create", "Add a building generation"),
+        ("build", "Embed everything into a generation (resumable)"),
+        ("activate", "Switch searches to a generation"),
+        ("reindex", "Create, build and activate a generation"),
+        ("drop", "Delete a retired or building generation"),
+    ]:
+        command_parser = commands.add_parser(command, help=help_text)
+        command_parser.add_argument("name")
+        if command in ("create", "reindex"):
+            command_parser.add_argument(
+                "--provider",
+                choices=list(PROVIDERS),
+                default=settings.embedding_provider,
+            )
+            command_parser.add_argument("--model", default=settings.embedding_model)
+            command_parser.add_argument(
+                "--dimension", type=int, default=settings.embedding_dimension
+            )
+        if command in ("activate", "reindex"):
+            command_parser.add_argument(
+                "--force",
+                action="store_true",
+                help="Activate even if it has fewer embeddings than the active one",
+            )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+Embedding providers: the backends that turn texts into vectors.
+
+Every embedding generation names its provider and model, so a generation
+built by one provider is never searched with vectors from another:
+
+- ``gigachat``: GigaChat's embeddings API (the model is a GigaChat model name);
+- ``local``: CPU models in process, with no network round trip. The model
+  ``hashing`` is a stateless character n-gram hashing vectorizer; any other
+  model name is a TF-IDF + SVD model trained on our own CVs and vacancies:
+
+    python -m app.services.embedding_providers train NAME --dimension 256
+    python -m app.services.embedding_generations reindex NAME --provider local \\
+        --model NAME --dimension 256
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from app.clients.gigachat import get_gigachat_client
+from app.core.config import settings
+
+try:
+    import joblib
+    import numpy as np
+    from sklearn.decomposition import TruncatedSVD
+    from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import Normalizer
+
+    HAS_ML_LIBS = True
+except ImportError:
+    HAS_ML_LIBS = False
+
+logger = logging.getLogger(__name__)
+
+# GigaChat limit is 514 tokens; ~1200 characters is safe for Russian text
+GIGACHAT_MAX_CHARS = 1200
+# Built-in local model that needs no training
+HASHING_MODEL = "hashing"
+# Character n-grams cope with Russian inflection without a stemmer
+NGRAM_RANGE = (3, 5)
+TRAINED_MODEL_FEATURES = 2**20
+
+
+class EmbeddingProvider(ABC):
+    """Embeds a batch of texts with a model into vectors of a dimension."""
+
+    name: str
+
+    @abstractmethod
+    async def embed(
+        self, texts: List[str], model: str, dimension: int
+    ) -> List[List[float]]:
+        """One vector per text, in order; raises on failure."""
+
+
+class GigaChatEmbeddingProvider(EmbeddingProvider):
+    name = "gigachat"
+
+    async def embed(
+        self, texts: List[str], model: str, dimension: int
+    ) -> List[List[float]]:
+        texts = [text[:GIGACHAT_MAX_CHARS] for text in texts]
+        logger.info(f"Requesting {len(texts)} embeddings from GigaChat")
+        async with get_gigachat_client() as giga:
+            response = await giga.aembeddings(texts, model=model)
+        # The batch may come back out of order
+        data = sorted(response.data, key=lambda item: item.index) if response else []
+        return [item.embedding for item in data]
+
+
+class LocalEmbeddingProvider(EmbeddingProvider):
+    """CPU models run batched in a thread pool, off the event loop."""
+
+    name = "local"
+
+    def __init__(
+        self,
+        model_dir: str = settings.local_embedding_model_dir,
+        max_workers: int = settings.local_embedding_workers,
+    ):
+        self.model_dir = model_dir
+        self.max_workers = max_workers
+        self._executor: ThreadPoolExecutor | None = None
+        self._models: Dict[tuple, Any] = {}
+        self._lock = threading.Lock()
+
+    def model_path(self, model: str) -> str:
+        return os.path.join(self.model_dir, f"{model}.joblib")
+
+    def _load(self, model: str, dimension: int):
+        key = (model, dimension)
+        with self._lock:
+            if key not in self._models:
+                if model == HASHING_MODEL:
+                    self._models[key] = hashing_vectorizer(dimension)
+                else:
+                    pipeline = joblib.load(self.model_path(model))
+                    components = pipeline[-2].n_components
+                    if components != dimension:
+                        raise ValueError(
+                            f"Local embedding model {model} has dimension "
+                            f"{components}, expected: {dimension}"
+                        )
+                    self._models[key] = pipeline
+            return self._models[key]
+
+    def embed_sync(
+        self, texts: List[str], model: str, dimension: int
+    ) -> List[List[float]]:
+        matrix = self._load(model, dimension).transform(texts)
+        if hasattr(matrix, "toarray"):
+            matrix = matrix.toarray()
+        return np.asarray(matrix, dtype=np.float32).tolist()
+
+    async def embed(
+        self, texts: List[str], model: str, dimension: int
+    ) -> List[List[float]]:
+        if not HAS_ML_LIBS:
+            raise RuntimeError("Local embeddings need numpy and scikit-learn")
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                self.max_workers, thread_name_prefix="local-embeddings"
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, self.embed_sync, texts, model, dimension
+        )
+
+
+def hashing_vectorizer(dimension: int, **kwargs):
+    return HashingVectorizer(
+        n_features=kwargs.pop("n_features", dimension),
+        analyzer="char_wb",
+        ngram_range=NGRAM_RANGE,
+        **kwargs,
+    )
+
+
+def train_local_model(texts: List[str], dimension: int):
+    """TF-IDF over hashed character n-grams, reduced to dimension by SVD."""
+    if len(texts) <= dimension:
+        raise ValueError(
+            f"Training a {dimension}-dimensional model needs more than "
+            f"{dimension} texts, got {len(texts)}"
+        )
+    pipeline = make_pipeline(
+        hashing_vectorizer(
+            dimension,
+            n_features=TRAINED_MODEL_FEATURES,
+            alternate_sign=False,
+            norm=None,
+        ),
+        TfidfTransformer(sublinear_tf=True),
+        TruncatedSVD(n_components=dimension, random_state=0),
+        Normalizer(),
+    )
+    pipeline.fit(texts)
+    return pipeline
+
+
+# Global instances
+gigachat_embedding_provider = GigaChatEmbeddingProvider()
+local_embedding_provider = LocalEmbeddingProvider()
+
+PROVIDERS: Dict[str, EmbeddingProvider] = {
+    provider.name: provider
+    for provider in (gigachat_embedding_provider, local_embedding_provider)
+}
+
+
+def get_embedding_provider(name: str) -> EmbeddingProvider:
+    try:
+        return PROVIDERS[name]
+    except KeyError:
+        raise ValueError(f"Unknown embedding provider: {name}") from None
+
+
+async def _corpus() -> List[str]:
+    from sqlalchemy import select
+
+    from app.db.session import AsyncSessionLocal
+    from app.models.candidate import Candidate
+    from app.models.vacancy import Vacancy
+    from app.services.embedding_service import embedding_service, split_into_chunks
+
+    texts = []
+    async with AsyncSessionLocal() as session:
+        for candidate in await session.scalars(select(Candidate)):
+            texts.append(embedding_service._prepare_text_for_embedding(candidate))
+        for vacancy in await session.scalars(select(Vacancy)):
+            texts.append(embedding_service._prepare_text_for_embedding_vacancy(vacancy))
+    # Train on chunks, the units that are embedded
+    return [
+        chunk
+        for text in texts
+        for chunk in split_into_chunks(
+            text,
+            settings.embedding_chunk_max_tokens,
+            settings.embedding_chunk_overlap_tokens,
+        )
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Manage local embedding models")
+    commands = parser.add_subparsers(dest="command", required=True)
+    train = commands.add_parser(
+        "train", help="Fit a TF-IDF + SVD model on the stored CVs and vacancies"
+    )
+    train.add_argument("name")
+    train.add_argument("--dimension", type=int, default=256)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    texts = asyncio.run(_corpus())
+    pipeline = train_local_model(texts, args.dimension)
+    path = local_embedding_provider.model_path(args.name)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    joblib.dump(pipeline, path)
+    logger.info("Trained local embedding model %s on %d texts", path, len(texts))
+
+
+if __name__ == "__main__":
+    main()
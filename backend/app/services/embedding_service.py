@@ -1,11 +1,14 @@
 """
 Embedding service for generating and managing text embeddings for candidates and vacancies.
-Uses GigaChat API for Russian text embeddings.
+Texts are embedded by the generation's provider (GigaChat or a local CPU model).
 """
 
 import json
 import logging
-from typing import List, Optional, Dict, Any
+import math
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 # Optional imports for similarity calculations
 try:
@@ -20,21 +23,142 @@ except ImportError:
 
 from app.models.candidate import Candidate
 from app.models.vacancy import Vacancy
-from app.models.embedding import CandidateEmbedding, VacancyEmbedding
+from app.models.embedding import (
+    CandidateEmbedding,
+    CandidateEmbeddingChunk,
+    EmbeddingGeneration,
+    EmbeddingGenerationStatus,
+    VacancyEmbedding,
+    VacancyEmbeddingChunk,
+)
+from app.core.cache import LRUCache
+from app.core.config import settings
 from app.db.session import AsyncSession
-from app.clients.gigachat import get_gigachat_client
-from sqlalchemy import select, delete
-from sqlalchemy.orm import selectinload
+from app.services.embedding_providers import get_embedding_provider
+from app.services.embedding_snapshot import OWNER_KEYS, embedding_snapshot_store
+from app.services.search_filters import CandidateFilters, VacancyFilters
+from app.services.vector_quantization import (
+    Quantization,
+    compact_distance,
+    int8_top_indices,
+    quantize_int8,
+    supports_iterative_scan,
+)
+from sqlalchemy import select, delete, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import contains_eager
 
 logger = logging.getLogger(__name__)
 
+# Very conservative estimate for Russian text: 1 token ≈ 2.5 characters
+EMBEDDING_CHARS_PER_TOKEN = 2.5
+# Rows fetched by document vector before reranking by chunk max-sim
+CHUNK_RERANK_POOL_FACTOR = 5
+# pgvector's default and maximum hnsw.ef_search
+HNSW_DEFAULT_EF_SEARCH = 40
+HNSW_MAX_EF_SEARCH = 1000
+# undefined_function (no such operator) and undefined_object (no such type)
+MISSING_IN_DATABASE_SQLSTATES = {"42883", "42704"}
+# session.info key of vectors to append to the snapshot delta logs on commit
+SNAPSHOT_DELTAS_KEY = "embedding_snapshot_deltas"
+
+
+def _clean_text(text: str) -> str:
+    """Remove HTML tags and extra whitespace"""
+    text = text.replace("<br>", " ").replace("<p>", " ").replace("</p>", " ")
+    return " ".join(text.split())
+
+
+def _token_cost(word: str) -> int:
+    # The word plus the space before it
+    return math.ceil((len(word) + 1) / EMBEDDING_CHARS_PER_TOKEN)
+
+
+def split_into_chunks(text: str, max_tokens: int, overlap_tokens: int) -> List[str]:
+    """Split text into word-aligned chunks of at most max_tokens estimated
+    tokens; each chunk repeats up to overlap_tokens of the previous one."""
+    max_chars = int(max_tokens * EMBEDDING_CHARS_PER_TOKEN) - 1
+    words: List[str] = []
+    for word in _clean_text(text).split(" "):
+        # Overlong "words" (links, encoded data) are cut into pieces
+        words.extend(word[i : i + max_chars] for i in range(0, len(word), max_chars))
+
+    chunks = []
+    start = 0
+    while start < len(words):
+        end = start
+        tokens = 0
+        while end < len(words) and (
+            end == start or tokens + _token_cost(words[end]) <= max_tokens
+        ):
+            tokens += _token_cost(words[end])
+            end += 1
+        chunks.append(" ".join(words[start:end]))
+        if end == len(words):
+            break
+
+        # Step back over the tail of this chunk, always moving forward
+        next_start = end
+        overlap = 0
+        while (
+            next_start - 1 > start
+            and overlap + _token_cost(words[next_start - 1]) <= overlap_tokens
+        ):
+            next_start -= 1
+            overlap += _token_cost(words[next_start])
+        start = next_start
+    return chunks
+
+
+def _missing_in_database(error: DBAPIError) -> bool:
+    """Whether a vector search failed for lack of a type or operator, as
+    opposed to a transient error worth trying again."""
+    sqlstate = getattr(error.orig, "sqlstate", None) or getattr(
+        error.orig, "pgcode", None
+    )
+    return sqlstate in MISSING_IN_DATABASE_SQLSTATES
+
+
+def active_generation():
+    """Name of the generation searches read, as a scalar subquery.
+
+    Switching generations is one committed UPDATE, so each query sees either
+    the old or the new generation, never a mix.
+    """
+    return (
+        select(EmbeddingGeneration.name)
+        .where(EmbeddingGeneration.status == EmbeddingGenerationStatus.ACTIVE)
+        .scalar_subquery()
+    )
+
+
+@dataclass
+class DocumentEmbedding:
+    """Embedded text of a candidate or vacancy, not yet stored"""
+
+    text_content: str
+    vector: List[float]
+    # (chunk text, chunk vector) pairs; empty when chunking is disabled
+    chunks: List[Tuple[str, List[float]]] = field(default_factory=list)
+
 
 class EmbeddingService:
-    """Service for managing text embeddings using GigaChat API"""
+    """Service for managing text embeddings of candidates and vacancies"""
 
     def __init__(self):
-        self.embedding_dimension = 1024  # GigaChat embeddings are 1024-dimensional
-        self.model = "Embeddings"  # Use GigaChat's embedding model
+        # Used when no generation is given; generations carry their own model
+        self.embedding_dimension = settings.embedding_dimension
+        self.provider = settings.embedding_provider
+        self.model = settings.embedding_model
+        # None until the first search shows whether pgvector ordering works
+        self._vector_search_available: Optional[bool] = None
+        # False once the database lacks the halfvec/bit types (pgvector < 0.7)
+        self._compact_search_available: Optional[bool] = None
+        self._pgvector_version: Optional[str] = None
+        # Free-text queries repeat a lot; keyed by generation and query text
+        self._query_embeddings: LRUCache[Tuple[str, str], List[float]] = LRUCache(
+            settings.query_embedding_cache_size
+        )
 
     def _prepare_text_for_embedding(self, candidate: Candidate) -> str:
         """Подготовка текста кандидата для генерации эмбеддингов.
@@ -149,145 +273,268 @@ class EmbeddingService:
 
         return " ".join(text_parts)
 
-    async def _get_embedding_from_gigachat(self, text: str) -> Optional[List[float]]:
-        """Get embedding from GigaChat API"""
-        if not text.strip():
+    async def _embed_texts(
+        self,
+        texts: List[str],
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        dimension: Optional[int] = None,
+    ) -> Optional[List[List[float]]]:
+        """Embed several texts with a provider in one batch"""
+        if not texts:
             return None
+        provider = provider or self.provider
+        model = model or self.model
+        dimension = dimension or self.embedding_dimension
 
         try:
-            # Clean text - remove HTML tags and special characters
-            clean_text = (
-                text.replace("<br>", " ").replace("<p>", " ").replace("</p>", " ")
+            vectors = await get_embedding_provider(provider).embed(
+                texts, model, dimension
             )
-            clean_text = " ".join(clean_text.split())  # Remove extra whitespace
-
-            # Truncate text if too long (GigaChat has token limits)
-            # Very conservative estimate: 1 token ≈ 2.5 characters for Russian text
-            # GigaChat limit is 514 tokens, so we use ~1200 characters to be extremely safe
-            if len(clean_text) > 1200:
-                clean_text = clean_text[:1200]
+        except Exception as e:
+            logger.error(f"Error getting embeddings from {provider}: {e}")
+            return None
 
-            logger.info(f"Requesting embedding for text: {clean_text[:100]}...")
+        if len(vectors) != len(texts):
+            logger.warning(
+                f"Got {len(vectors)} embeddings from {provider}, expected: {len(texts)}"
+            )
+            return None
+        if any(len(vector) != dimension for vector in vectors):
+            logger.warning(f"Wrong embedding dimension from {provider}")
+            return None
+        return vectors
 
-            # Get GigaChat client and generate embedding
-            with get_gigachat_client() as giga:
-                response = giga.embeddings([clean_text])
+    async def _embed_document(
+        self, text: str, provider: str, model: str, dimension: int
+    ) -> Tuple[Optional[List[float]], List[Tuple[str, List[float]]]]:
+        """Document vector and (chunk text, chunk vector) pairs of a text.
 
-                if response and response.data and len(response.data) > 0:
-                    embedding = response.data[0].embedding
-                    if len(embedding) == self.embedding_dimension:
-                        logger.info(
-                            f"Successfully got embedding with dimension: {len(embedding)}"
-                        )
-                        return embedding
-                    else:
-                        logger.warning(
-                            f"Wrong embedding dimension: {len(embedding)}, expected: {self.embedding_dimension}"
-                        )
-                else:
-                    logger.warning("No embedding data in GigaChat response")
-                    return None
+        In chunked mode the whole text is embedded as overlapping chunks in a
+        single request and the document vector is the mean of the chunks;
+        otherwise only the truncated text is embedded and there are no chunks.
+        """
+        if not settings.embedding_chunking_enabled:
+            clean_text = _clean_text(text)
+            if not clean_text:
+                return None, []
+            vectors = await self._embed_texts([clean_text], provider, model, dimension)
+            return (vectors[0] if vectors else None), []
+
+        chunks = split_into_chunks(
+            text,
+            settings.embedding_chunk_max_tokens,
+            settings.embedding_chunk_overlap_tokens,
+        )
+        vectors = await self._embed_texts(chunks, provider, model, dimension)
+        if not vectors:
+            return None, []
+        document_vector = [sum(values) / len(vectors) for values in zip(*vectors)]
+        return document_vector, list(zip(chunks, vectors))
+
+    async def _embed(
+        self,
+        label: str,
+        text_content: str,
+        generation: Optional[EmbeddingGeneration],
+    ) -> Optional[DocumentEmbedding]:
+        provider = generation.provider if generation else self.provider
+        model = generation.model if generation else self.model
+        dimension = generation.dimension if generation else self.embedding_dimension
+        embedding_vector, chunks = await self._embed_document(
+            text_content, provider, model, dimension
+        )
+
+        if not embedding_vector:
+            logger.warning(f"Could not generate embedding for {label}")
+            return None
 
-        except Exception as e:
-            logger.error(f"Error getting embedding from GigaChat: {e}")
+        # Ensure vector has correct dimension
+        if len(embedding_vector) != dimension:
+            logger.warning(
+                f"Embedding dimension mismatch for {label}: {len(embedding_vector)}"
+            )
             return None
 
+        return DocumentEmbedding(text_content, embedding_vector, chunks)
+
+    async def embed_candidate(
+        self, candidate: Candidate, generation: Optional[EmbeddingGeneration] = None
+    ) -> Optional[DocumentEmbedding]:
+        """Embed a candidate with the generation's model without storing it"""
+        return await self._embed(
+            f"candidate {candidate.id}",
+            self._prepare_text_for_embedding(candidate),
+            generation,
+        )
+
+    async def embed_vacancy(
+        self, vacancy: Vacancy, generation: Optional[EmbeddingGeneration] = None
+    ) -> Optional[DocumentEmbedding]:
+        """Embed a vacancy with the generation's model without storing it"""
+        return await self._embed(
+            f"vacancy {vacancy.id}",
+            self._prepare_text_for_embedding_vacancy(vacancy),
+            generation,
+        )
+
+    async def get_generation(
+        self, session: AsyncSession, name: Optional[str] = None
+    ) -> Optional[EmbeddingGeneration]:
+        """The named generation, or the active one when no name is given"""
+        if name is not None:
+            return await session.get(EmbeddingGeneration, name)
+        return await session.scalar(
+            select(EmbeddingGeneration).where(
+                EmbeddingGeneration.status == EmbeddingGenerationStatus.ACTIVE
+            )
+        )
+
+    async def writable_generations(
+        self, session: AsyncSession
+    ) -> List[EmbeddingGeneration]:
+        """The active generation and those being built; edits must reach all of
+        them so a generation built during edits is current when activated."""
+        result = await session.scalars(
+            select(EmbeddingGeneration).where(
+                EmbeddingGeneration.status.in_(
+                    [
+                        EmbeddingGenerationStatus.ACTIVE,
+                        EmbeddingGenerationStatus.BUILDING,
+                    ]
+                )
+            )
+        )
+        return list(result)
+
+    async def commit_embeddings(self, session: AsyncSession) -> None:
+        """Commit the session, then append the embeddings generated in it to
+        the snapshot delta logs, so no worker ranks uncommitted vectors"""
+        try:
+            await session.commit()
+        finally:
+            deltas = session.info.pop(SNAPSHOT_DELTAS_KEY, [])
+        for embedding_model, generation, owner_id, vector in deltas:
+            embedding_snapshot_store.record(
+                embedding_model, generation, [(owner_id, vector)]
+            )
+
     async def generate_candidate_embedding(
         self, session: AsyncSession, candidate: Candidate
     ) -> Optional[CandidateEmbedding]:
-        """Generate and store embedding for a candidate"""
+        """Generate and store embeddings of a candidate in every writable
+        generation; returns the one of the active generation"""
         try:
-            # Prepare text for embedding
-            text_content = self._prepare_text_for_embedding(candidate)
-
-            # Get embedding from GigaChat API
-            embedding_vector = await self._get_embedding_from_gigachat(text_content)
-
-            if not embedding_vector:
-                logger.warning(
-                    f"Could not generate embedding for candidate {candidate.id}"
+            active_embedding = None
+            for generation in await self.writable_generations(session):
+                # Embed with the generation's provider
+                document = await self.embed_candidate(candidate, generation)
+                if document is None:
+                    continue
+
+                # Remove existing embedding if any
+                for model in (CandidateEmbedding, CandidateEmbeddingChunk):
+                    await session.execute(
+                        delete(model).where(
+                            model.candidate_id == candidate.id,
+                            model.generation == generation.name,
+                        )
+                    )
+
+                # Create new embedding
+                candidate_embedding = CandidateEmbedding(
+                    candidate_id=candidate.id,
+                    generation=generation.name,
+                    embedding=document.vector,
+                    text_content=document.text_content,
                 )
-                return None
 
-            # Ensure vector has correct dimension
-            if len(embedding_vector) != self.embedding_dimension:
-                logger.warning(
-                    f"Embedding dimension mismatch for candidate {candidate.id}: {len(embedding_vector)}"
+                session.add(candidate_embedding)
+                session.add_all(
+                    CandidateEmbeddingChunk(
+                        candidate_id=candidate.id,
+                        generation=generation.name,
+                        chunk_index=index,
+                        embedding=vector,
+                        text_content=chunk,
+                    )
+                    for index, (chunk, vector) in enumerate(document.chunks)
                 )
-                return None
-
-            # Remove existing embedding if any
-            await session.execute(
-                delete(CandidateEmbedding).where(
-                    CandidateEmbedding.candidate_id == candidate.id
+                session.info.setdefault(SNAPSHOT_DELTAS_KEY, []).append(
+                    (CandidateEmbedding, generation.name, candidate.id, document.vector)
                 )
-            )
+                if generation.status == EmbeddingGenerationStatus.ACTIVE:
+                    active_embedding = candidate_embedding
 
-            # Create new embedding
-            candidate_embedding = CandidateEmbedding(
-                candidate_id=candidate.id,
-                embedding=embedding_vector,
-                text_content=text_content,
-            )
-
-            session.add(candidate_embedding)
-            # Don't commit here - let the calling code handle the transaction
+            # Don't commit here - the caller commits with commit_embeddings
             await session.flush()  # Flush to get the ID without committing
 
             logger.info(f"Generated embedding for candidate {candidate.id}")
-            return candidate_embedding
+            return active_embedding
 
         except Exception as e:
             logger.error(f"Error generating candidate embedding: {e}")
             await session.rollback()
+            session.info.pop(SNAPSHOT_DELTAS_KEY, None)
             return None
 
     async def generate_vacancy_embedding(
         self, session: AsyncSession, vacancy: Vacancy
     ) -> Optional[VacancyEmbedding]:
-        """Generate and store embedding for a vacancy"""
+        """Generate and store embeddings of a vacancy in every writable
+        generation; returns the one of the active generation"""
         try:
-            # Prepare text for embedding
-            text_content = self._prepare_text_for_embedding_vacancy(vacancy)
-
-            # Get embedding from GigaChat API
-            embedding_vector = await self._get_embedding_from_gigachat(text_content)
-
-            if not embedding_vector:
-                logger.warning(f"Could not generate embedding for vacancy {vacancy.id}")
-                return None
-
-            # Ensure vector has correct dimension
-            if len(embedding_vector) != self.embedding_dimension:
-                logger.warning(
-                    f"Embedding dimension mismatch for vacancy {vacancy.id}: {len(embedding_vector)}"
+            active_embedding = None
+            for generation in await self.writable_generations(session):
+                # Embed with the generation's provider
+                document = await self.embed_vacancy(vacancy, generation)
+                if document is None:
+                    continue
+
+                # Remove existing embedding if any
+                for model in (VacancyEmbedding, VacancyEmbeddingChunk):
+                    await session.execute(
+                        delete(model).where(
+                            model.vacancy_id == vacancy.id,
+                            model.generation == generation.name,
+                        )
+                    )
+
+                # Create new embedding
+                vacancy_embedding = VacancyEmbedding(
+                    vacancy_id=vacancy.id,
+                    generation=generation.name,
+                    embedding=document.vector,
+                    text_content=document.text_content,
                 )
-                return None
 
-            # Remove existing embedding if any
-            await session.execute(
-                delete(VacancyEmbedding).where(
-                    VacancyEmbedding.vacancy_id == vacancy.id
+                session.add(vacancy_embedding)
+                session.add_all(
+                    VacancyEmbeddingChunk(
+                        vacancy_id=vacancy.id,
+                        generation=generation.name,
+                        chunk_index=index,
+                        embedding=vector,
+                        text_content=chunk,
+                    )
+                    for index, (chunk, vector) in enumerate(document.chunks)
                 )
-            )
-
-            # Create new embedding
-            vacancy_embedding = VacancyEmbedding(
-                vacancy_id=vacancy.id,
-                embedding=embedding_vector,
-                text_content=text_content,
-            )
+                session.info.setdefault(SNAPSHOT_DELTAS_KEY, []).append(
+                    (VacancyEmbedding, generation.name, vacancy.id, document.vector)
+                )
+                if generation.status == EmbeddingGenerationStatus.ACTIVE:
+                    active_embedding = vacancy_embedding
 
-            session.add(vacancy_embedding)
-            # Don't commit here - let the calling code handle the transaction
+            # Don't commit here - the caller commits with commit_embeddings
             await session.flush()  # Flush to get the ID without committing
 
             logger.info(f"Generated embedding for vacancy {vacancy.id}")
-            return vacancy_embedding
+            return active_embedding
 
         except Exception as e:
             logger.error(f"Error generating vacancy embedding: {e}")
             await session.rollback()
+            session.info.pop(SNAPSHOT_DELTAS_KEY, None)
             return None
 
     async def calculate_similarity(
@@ -314,6 +561,22 @@ class EmbeddingService:
             logger.error(f"Error calculating similarity: {e}")
             return 0.0
 
+    def _pairwise_cosine_similarity(
+        self, vectors1: List[List[float]], vectors2: List[List[float]]
+    ) -> List[float]:
+        """Cosine similarity of each vector in vectors1 to its counterpart"""
+        if not HAS_ML_LIBS:
+            return [
+                self._manual_cosine_similarity(vec1, vec2)
+                for vec1, vec2 in zip(vectors1, vectors2)
+            ]
+        matrix1 = np.asarray(vectors1, dtype=np.float32)
+        matrix2 = np.asarray(vectors2, dtype=np.float32)
+        norms = np.linalg.norm(matrix1, axis=1) * np.linalg.norm(matrix2, axis=1)
+        dots = np.einsum("ij,ij->i", matrix1, matrix2)
+        similarities = np.divide(dots, norms, out=np.zeros_like(dots), where=norms != 0)
+        return similarities.tolist()
+
     def _calibrate_similarity_score(self, raw_similarity: float) -> float:
         """
         Calibrate similarity score to make it more realistic.
@@ -396,14 +659,249 @@ class EmbeddingService:
             logger.error(f"Error in manual cosine similarity: {e}")
             return 0.0
 
+    def _max_sim(
+        self, query_vectors: List[List[float]], document_vectors: List[List[float]]
+    ) -> float:
+        """Mean over query chunks of the best cosine similarity to any chunk of
+        the document, so a match anywhere in a long text counts.
+
+        Vacancy chunks are always the query side, so a pair gets the same score
+        in candidate and vacancy searches.
+        """
+        if HAS_ML_LIBS:
+            similarities = cosine_similarity(
+                np.array(query_vectors), np.array(document_vectors)
+            )
+            return float(similarities.max(axis=1).mean())
+
+        best = [
+            max(
+                self._manual_cosine_similarity(query, document)
+                for document in document_vectors
+            )
+            for query in query_vectors
+        ]
+        return sum(best) / len(best)
+
+    async def _chunk_vectors(
+        self, session: AsyncSession, owner_column, owner_ids: list
+    ) -> Dict[Any, List[List[float]]]:
+        """Chunk vectors of the given candidates or vacancies by owner id"""
+        chunk_model = owner_column.class_
+        result = await session.execute(
+            select(owner_column, chunk_model.embedding)
+            .where(owner_column.in_(owner_ids))
+            .where(chunk_model.generation == active_generation())
+            .order_by(owner_column, chunk_model.chunk_index)
+        )
+        chunks = defaultdict(list)
+        for owner_id, vector in result.all():
+            chunks[owner_id].append(vector)
+        return chunks
+
+    def _rerank_by_chunks(
+        self,
+        ranked: List[Tuple[Any, float]],
+        document_chunks: Dict[Any, List[List[float]]],
+        owner_of: Callable[[Any], Any],
+        score: Callable[[List[List[float]]], float],
+    ) -> List[Tuple[Any, float]]:
+        """Rescore ranked rows by their chunks; rows without chunks keep their
+        document similarity until they are re-embedded."""
+        rescored = []
+        for row, similarity in ranked:
+            document_vectors = document_chunks.get(owner_of(row))
+            if document_vectors:
+                similarity = self._calibrate_similarity_score(score(document_vectors))
+            rescored.append((row, similarity))
+        rescored.sort(key=lambda x: x[1], reverse=True)
+        return rescored
+
+    async def _rank_with_pgvector(
+        self,
+        session: AsyncSession,
+        query,
+        embedding_model,
+        relationship,
+        generation: str,
+        query_vector,
+        conditions: list,
+        limit: int,
+        pool_size: int,
+        quantization: str,
+    ) -> list:
+        """(row, cosine distance) of the top rows, ordered by pgvector."""
+        distance = embedding_model.embedding.cosine_distance(query_vector)
+        ranked_query = query.add_columns(distance)
+        if quantization != Quantization.NONE:
+            compact = compact_distance(
+                embedding_model.embedding,
+                query_vector,
+                len(query_vector),
+                quantization,
+            )
+            pool = (
+                select(embedding_model.id)
+                .join(relationship)
+                .where(embedding_model.generation == generation)
+                .where(*conditions)
+                .order_by(compact)
+                .limit(pool_size)
+            )
+            ranked_query = ranked_query.where(embedding_model.id.in_(pool))
+        # A savepoint keeps the caller's transaction usable on failure
+        async with session.begin_nested():
+            if quantization != Quantization.NONE:
+                await self._set_hnsw_search_options(session, pool_size)
+            result = await session.execute(ranked_query.order_by(distance).limit(limit))
+            return result.all()
+
+    async def _set_hnsw_search_options(
+        self, session: AsyncSession, pool_size: int
+    ) -> None:
+        """An HNSW scan returns at most hnsw.ef_search rows, fewer once filters
+        drop some, so the pool scan gets an ef_search of the pool size and, on
+        pgvector 0.8+, iterative scans that continue until the pool is full."""
+        if self._pgvector_version is None:
+            self._pgvector_version = (
+                await session.scalar(
+                    text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+                )
+                or ""
+            )
+        ef_search = min(max(pool_size, HNSW_DEFAULT_EF_SEARCH), HNSW_MAX_EF_SEARCH)
+        await session.execute(text(f"SET LOCAL hnsw.ef_search = {int(ef_search)}"))
+        if supports_iterative_scan(self._pgvector_version):
+            await session.execute(text("SET LOCAL hnsw.iterative_scan = relaxed_order"))
+
+    async def _rank_by_vector(
+        self,
+        session: AsyncSession,
+        embedding_model,
+        relationship,
+        generation: str,
+        query_vector,
+        conditions: list,
+        limit: int,
+    ) -> List[Tuple[Any, float]]:
+        """Top rows of embedding_model by similarity to query_vector.
+
+        Filters and ordering run in SQL with pgvector's cosine distance, so the
+        result holds exactly `limit` matching rows when there are enough. With
+        a quantization configured, a pool of rows is first picked by distance
+        on the compact vectors (index-backed) and only the pool is ranked
+        exactly. When the embeddings are stored as text (no pgvector) they are
+        ranked in Python instead, still after filtering in SQL; the pool is then
+        picked from the workers' shared embedding snapshot when there is one.
+        """
+        quantization = settings.embedding_search_quantization
+        pool_size = max(limit, settings.embedding_rerank_pool)
+        query = (
+            select(embedding_model)
+            .join(relationship)
+            .options(contains_eager(relationship))
+            # The generation is a value, not a subquery, so the partial
+            # compact-vector indexes of the generation can be used
+            .where(embedding_model.generation == generation)
+            .where(*conditions)
+        )
+
+        if self._vector_search_available is not False:
+            search_quantization = quantization
+            if self._compact_search_available is False:
+                search_quantization = Quantization.NONE
+            while True:
+                try:
+                    rows = await self._rank_with_pgvector(
+                        session,
+                        query,
+                        embedding_model,
+                        relationship,
+                        generation,
+                        query_vector,
+                        conditions,
+                        limit,
+                        pool_size,
+                        search_quantization,
+                    )
+                except DBAPIError as e:
+                    if search_quantization != Quantization.NONE:
+                        # Retried once with exact ordering only
+                        logger.warning(f"Compact vector search failed: {e}")
+                        if _missing_in_database(e):
+                            # halfvec/bit need pgvector 0.7
+                            self._compact_search_available = False
+                        search_quantization = Quantization.NONE
+                        continue
+                    if not _missing_in_database(e):
+                        raise
+                    logger.warning(
+                        f"pgvector ordering unavailable, ranking in Python: {e}"
+                    )
+                    self._vector_search_available = False
+                    break
+                except AttributeError as e:
+                    # Embeddings stored as text have no cosine_distance
+                    logger.warning(
+                        f"pgvector ordering unavailable, ranking in Python: {e}"
+                    )
+                    self._vector_search_available = False
+                    break
+                self._vector_search_available = True
+                return [
+                    (row[0], self._calibrate_similarity_score(1.0 - float(row[1])))
+                    for row in rows
+                ]
+
+        snapshot = embedding_snapshot_store.get(embedding_model, generation)
+        if snapshot is not None:
+            # Only the ids are read from the database for the first pass; the
+            # vectors come from the snapshot shared by all workers
+            owner = getattr(embedding_model, OWNER_KEYS[embedding_model])
+            owner_ids = await session.scalars(
+                select(owner)
+                .join(relationship)
+                .where(embedding_model.generation == generation)
+                .where(*conditions)
+            )
+            pool = snapshot.top(query_vector, owner_ids, pool_size)
+            query = query.where(owner.in_(pool))
+
+        result = await session.execute(query)
+        rows = result.scalars().all()
+        if (
+            HAS_ML_LIBS
+            and snapshot is None
+            and quantization != Quantization.NONE
+            and len(rows) > pool_size
+        ):
+            try:
+                codes, scales = quantize_int8([row.embedding for row in rows])
+                keep = int8_top_indices(query_vector, codes, scales, pool_size)
+                rows = [rows[index] for index in keep]
+            except (TypeError, ValueError) as e:
+                logger.warning(f"int8 pre-ranking failed, ranking all rows: {e}")
+
+        ranked = []
+        for row in rows:
+            similarity = await self.calculate_similarity(query_vector, row.embedding)
+            ranked.append((row, similarity))
+        ranked.sort(key=lambda x: x[1], reverse=True)
+        return ranked[:limit]
+
     async def find_similar_candidates(
-        self, session: AsyncSession, vacancy_id: int, limit: int = 10
+        self,
+        session: AsyncSession,
+        vacancy_id: int,
+        limit: int = 10,
+        filters: Optional[CandidateFilters] = None,
     ) -> List[Dict[str, Any]]:
-        """Find candidates most similar to a vacancy"""
+        """Find candidates most similar to a vacancy, restricted by filters"""
         try:
             # Get vacancy embedding
             vacancy_embedding_query = select(VacancyEmbedding).where(
-                VacancyEmbedding.vacancy_id == vacancy_id
+                VacancyEmbedding.vacancy_id == vacancy_id,
+                VacancyEmbedding.generation == active_generation(),
             )
             result = await session.execute(vacancy_embedding_query)
             vacancy_embedding = result.scalar_one_or_none()
@@ -412,35 +910,150 @@ class EmbeddingService:
                 logger.warning(f"No embedding found for vacancy {vacancy_id}")
                 return []
 
-            # Get all candidate embeddings
-            candidate_embeddings_query = select(CandidateEmbedding).options(
-                selectinload(CandidateEmbedding.candidate)
+            chunked = settings.embedding_chunking_enabled
+            ranked = await self._rank_by_vector(
+                session,
+                CandidateEmbedding,
+                CandidateEmbedding.candidate,
+                vacancy_embedding.generation,
+                vacancy_embedding.embedding,
+                filters.conditions() if filters else [],
+                limit * CHUNK_RERANK_POOL_FACTOR if chunked else limit,
             )
-            result = await session.execute(candidate_embeddings_query)
-            candidate_embeddings = result.scalars().all()
-
-            # Calculate similarities
-            similarities = []
-            for candidate_embedding in candidate_embeddings:
-                similarity = await self.calculate_similarity(
-                    vacancy_embedding.embedding, candidate_embedding.embedding
+            if chunked and ranked:
+                vacancy_chunks = await self._chunk_vectors(
+                    session, VacancyEmbeddingChunk.vacancy_id, [vacancy_id]
                 )
-                similarities.append(
-                    {
-                        "candidate": candidate_embedding.candidate,
-                        "similarity": similarity,
-                        "embedding_id": candidate_embedding.id,
-                    }
+                candidate_chunks = await self._chunk_vectors(
+                    session,
+                    CandidateEmbeddingChunk.candidate_id,
+                    [row.candidate_id for row, _ in ranked],
                 )
-
-            # Sort by similarity and return top results
-            similarities.sort(key=lambda x: x["similarity"], reverse=True)
-            return similarities[:limit]
+                vacancy_vectors = vacancy_chunks.get(vacancy_id)
+                if vacancy_vectors:
+                    ranked = self._rerank_by_chunks(
+                        ranked,
+                        candidate_chunks,
+                        lambda row: row.candidate_id,
+                        lambda vectors: self._max_sim(vacancy_vectors, vectors),
+                    )
+            return [
+                {
+                    "candidate": candidate_embedding.candidate,
+                    "similarity": similarity,
+                    "embedding_id": candidate_embedding.id,
+                }
+                for candidate_embedding, similarity in ranked[:limit]
+            ]
 
         except Exception as e:
             logger.error(f"Error finding similar candidates: {e}")
             return []
 
+    async def nearest_candidates(
+        self,
+        session: AsyncSession,
+        candidate_id: str,
+        limit: int,
+        among: Optional[List[str]] = None,
+    ) -> List[Tuple[Candidate, float]]:
+        """Other candidates with the most similar CV embeddings, optionally
+        only among the given candidate ids"""
+        result = await session.execute(
+            select(CandidateEmbedding).where(
+                CandidateEmbedding.candidate_id == candidate_id,
+                CandidateEmbedding.generation == active_generation(),
+            )
+        )
+        candidate_embedding = result.scalar_one_or_none()
+        if candidate_embedding is None:
+            return []
+
+        conditions = [CandidateEmbedding.candidate_id != candidate_id]
+        if among is not None:
+            conditions.append(CandidateEmbedding.candidate_id.in_(among))
+        ranked = await self._rank_by_vector(
+            session,
+            CandidateEmbedding,
+            CandidateEmbedding.candidate,
+            candidate_embedding.generation,
+            candidate_embedding.embedding,
+            conditions,
+            limit,
+        )
+        return [(row.candidate, similarity) for row, similarity in ranked]
+
+    async def similarities_by_ids(
+        self, session: AsyncSession, pairs: List[Tuple[str, int]]
+    ) -> Dict[Tuple[str, int], float]:
+        """Similarities of many (candidate id, vacancy id) pairs, as
+        calculate_similarity_by_ids computes them, with one query per table;
+        document similarities are computed in one vectorized pass. Pairs
+        missing an embedding are left out."""
+        candidate_ids = list({candidate_id for candidate_id, _ in pairs})
+        vacancy_ids = list({vacancy_id for _, vacancy_id in pairs})
+        candidate_vectors = dict(
+            (
+                await session.execute(
+                    select(
+                        CandidateEmbedding.candidate_id, CandidateEmbedding.embedding
+                    ).where(
+                        CandidateEmbedding.candidate_id.in_(candidate_ids),
+                        CandidateEmbedding.generation == active_generation(),
+                    )
+                )
+            ).all()
+        )
+        vacancy_vectors = dict(
+            (
+                await session.execute(
+                    select(
+                        VacancyEmbedding.vacancy_id, VacancyEmbedding.embedding
+                    ).where(
+                        VacancyEmbedding.vacancy_id.in_(vacancy_ids),
+                        VacancyEmbedding.generation == active_generation(),
+                    )
+                )
+            ).all()
+        )
+        pairs = [
+            (candidate_id, vacancy_id)
+            for candidate_id, vacancy_id in pairs
+            if candidate_id in candidate_vectors and vacancy_id in vacancy_vectors
+        ]
+        if not pairs:
+            return {}
+
+        similarities = {}
+        if settings.embedding_chunking_enabled:
+            vacancy_chunks = await self._chunk_vectors(
+                session, VacancyEmbeddingChunk.vacancy_id, vacancy_ids
+            )
+            candidate_chunks = await self._chunk_vectors(
+                session, CandidateEmbeddingChunk.candidate_id, candidate_ids
+            )
+            for candidate_id, vacancy_id in pairs:
+                if vacancy_id in vacancy_chunks and candidate_id in candidate_chunks:
+                    similarities[(candidate_id, vacancy_id)] = (
+                        self._calibrate_similarity_score(
+                            self._max_sim(
+                                vacancy_chunks[vacancy_id],
+                                candidate_chunks[candidate_id],
+                            )
+                        )
+                    )
+
+        pairs = [pair for pair in pairs if pair not in similarities]
+        if not pairs:
+            return similarities
+        raw_similarities = self._pairwise_cosine_similarity(
+            [candidate_vectors[candidate_id] for candidate_id, _ in pairs],
+            [vacancy_vectors[vacancy_id] for _, vacancy_id in pairs],
+        )
+        for pair, raw_similarity in zip(pairs, raw_similarities):
+            similarities[pair] = float(self._calibrate_similarity_score(raw_similarity))
+        return similarities
+
     async def calculate_similarity_by_ids(
         self, session: AsyncSession, candidate_id: str, vacancy_id: int
     ) -> float:
@@ -448,7 +1061,8 @@ class EmbeddingService:
         try:
             # Get candidate embedding
             candidate_embedding_query = select(CandidateEmbedding).where(
-                CandidateEmbedding.candidate_id == candidate_id
+                CandidateEmbedding.candidate_id == candidate_id,
+                CandidateEmbedding.generation == active_generation(),
             )
             result = await session.execute(candidate_embedding_query)
             candidate_embedding = result.scalar_one_or_none()
@@ -459,7 +1073,8 @@ class EmbeddingService:
 
             # Get vacancy embedding
             vacancy_embedding_query = select(VacancyEmbedding).where(
-                VacancyEmbedding.vacancy_id == vacancy_id
+                VacancyEmbedding.vacancy_id == vacancy_id,
+                VacancyEmbedding.generation == active_generation(),
             )
             result = await session.execute(vacancy_embedding_query)
             vacancy_embedding = result.scalar_one_or_none()
@@ -468,6 +1083,20 @@ class EmbeddingService:
                 logger.warning(f"No embedding found for vacancy {vacancy_id}")
                 return 0.0
 
+            if settings.embedding_chunking_enabled:
+                vacancy_chunks = await self._chunk_vectors(
+                    session, VacancyEmbeddingChunk.vacancy_id, [vacancy_id]
+                )
+                candidate_chunks = await self._chunk_vectors(
+                    session, CandidateEmbeddingChunk.candidate_id, [candidate_id]
+                )
+                if vacancy_chunks and candidate_chunks:
+                    return self._calibrate_similarity_score(
+                        self._max_sim(
+                            vacancy_chunks[vacancy_id], candidate_chunks[candidate_id]
+                        )
+                    )
+
             # Calculate similarity
             similarity = await self.calculate_similarity(
                 candidate_embedding.embedding, vacancy_embedding.embedding
@@ -480,13 +1109,18 @@ class EmbeddingService:
             return 0.0
 
     async def find_similar_vacancies(
-        self, session: AsyncSession, candidate_id: str, limit: int = 10
+        self,
+        session: AsyncSession,
+        candidate_id: str,
+        limit: int = 10,
+        filters: Optional[VacancyFilters] = None,
     ) -> List[Dict[str, Any]]:
-        """Find vacancies most similar to a candidate"""
+        """Find vacancies most similar to a candidate, restricted by filters"""
         try:
             # Get candidate embedding
             candidate_embedding_query = select(CandidateEmbedding).where(
-                CandidateEmbedding.candidate_id == candidate_id
+                CandidateEmbedding.candidate_id == candidate_id,
+                CandidateEmbedding.generation == active_generation(),
             )
             result = await session.execute(candidate_embedding_query)
             candidate_embedding = result.scalar_one_or_none()
@@ -495,35 +1129,163 @@ class EmbeddingService:
                 logger.warning(f"No embedding found for candidate {candidate_id}")
                 return []
 
-            # Get all vacancy embeddings
-            vacancy_embeddings_query = select(VacancyEmbedding).options(
-                selectinload(VacancyEmbedding.vacancy)
+            chunked = settings.embedding_chunking_enabled
+            ranked = await self._rank_by_vector(
+                session,
+                VacancyEmbedding,
+                VacancyEmbedding.vacancy,
+                candidate_embedding.generation,
+                candidate_embedding.embedding,
+                filters.conditions() if filters else [],
+                limit * CHUNK_RERANK_POOL_FACTOR if chunked else limit,
             )
-            result = await session.execute(vacancy_embeddings_query)
-            vacancy_embeddings = result.scalars().all()
-
-            # Calculate similarities
-            similarities = []
-            for vacancy_embedding in vacancy_embeddings:
-                similarity = await self.calculate_similarity(
-                    candidate_embedding.embedding, vacancy_embedding.embedding
+            if chunked and ranked:
+                candidate_chunks = await self._chunk_vectors(
+                    session, CandidateEmbeddingChunk.candidate_id, [candidate_id]
                 )
-                similarities.append(
-                    {
-                        "vacancy": vacancy_embedding.vacancy,
-                        "similarity": similarity,
-                        "embedding_id": vacancy_embedding.id,
-                    }
+                vacancy_chunks = await self._chunk_vectors(
+                    session,
+                    VacancyEmbeddingChunk.vacancy_id,
+                    [row.vacancy_id for row, _ in ranked],
                 )
-
-            # Sort by similarity and return top results
-            similarities.sort(key=lambda x: x["similarity"], reverse=True)
-            return similarities[:limit]
+                candidate_vectors = candidate_chunks.get(candidate_id)
+                if candidate_vectors:
+                    ranked = self._rerank_by_chunks(
+                        ranked,
+                        vacancy_chunks,
+                        lambda row: row.vacancy_id,
+                        lambda vectors: self._max_sim(vectors, candidate_vectors),
+                    )
+            return [
+                {
+                    "vacancy": vacancy_embedding.vacancy,
+                    "similarity": similarity,
+                    "embedding_id": vacancy_embedding.id,
+                }
+                for vacancy_embedding, similarity in ranked[:limit]
+            ]
 
         except Exception as e:
             logger.error(f"Error finding similar vacancies: {e}")
             return []
 
+    async def embed_query(
+        self, generation: EmbeddingGeneration, query: str
+    ) -> Optional[List[float]]:
+        """Embedding of a search query with the generation's model, cached"""
+        clean_query = _clean_text(query)
+        if not clean_query:
+            return None
+        key = (generation.name, clean_query)
+        vector = self._query_embeddings.get(key)
+        if vector is None:
+            vectors = await self._embed_texts(
+                [clean_query],
+                generation.provider,
+                generation.model,
+                generation.dimension,
+            )
+            if not vectors:
+                return None
+            vector = vectors[0]
+            self._query_embeddings.set(key, vector)
+        return vector
+
+    async def _search_by_text(
+        self,
+        session: AsyncSession,
+        query: str,
+        embedding_model,
+        relationship,
+        chunk_owner_column,
+        owner_of: Callable[[Any], Any],
+        conditions: list,
+        count: int,
+    ) -> Optional[List[Tuple[Any, float]]]:
+        generation = await self.get_generation(session)
+        if generation is None:
+            logger.warning("No active embedding generation to search")
+            return []
+        query_vector = await self.embed_query(generation, query)
+        if query_vector is None:
+            return None
+
+        chunked = settings.embedding_chunking_enabled
+        ranked = await self._rank_by_vector(
+            session,
+            embedding_model,
+            relationship,
+            generation.name,
+            query_vector,
+            conditions,
+            count * CHUNK_RERANK_POOL_FACTOR if chunked else count,
+        )
+        if chunked and ranked:
+            document_chunks = await self._chunk_vectors(
+                session, chunk_owner_column, [owner_of(row) for row, _ in ranked]
+            )
+            ranked = self._rerank_by_chunks(
+                ranked,
+                document_chunks,
+                owner_of,
+                lambda vectors: self._max_sim([query_vector], vectors),
+            )
+        return ranked
+
+    async def search_candidates(
+        self,
+        session: AsyncSession,
+        query: str,
+        limit: int = 10,
+        offset: int = 0,
+        filters: Optional[CandidateFilters] = None,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Candidates ranked by similarity to a free-text query, restricted by
+        filters; None when the query could not be embedded"""
+        ranked = await self._search_by_text(
+            session,
+            query,
+            CandidateEmbedding,
+            CandidateEmbedding.candidate,
+            CandidateEmbeddingChunk.candidate_id,
+            lambda row: row.candidate_id,
+            filters.conditions() if filters else [],
+            offset + limit,
+        )
+        if ranked is None:
+            return None
+        return [
+            {"candidate": row.candidate, "similarity": similarity}
+            for row, similarity in ranked[offset : offset + limit]
+        ]
+
+    async def search_vacancies(
+        self,
+        session: AsyncSession,
+        query: str,
+        limit: int = 10,
+        offset: int = 0,
+        filters: Optional[VacancyFilters] = None,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Vacancies ranked by similarity to a free-text query, restricted by
+        filters; None when the query could not be embedded"""
+        ranked = await self._search_by_text(
+            session,
+            query,
+            VacancyEmbedding,
+            VacancyEmbedding.vacancy,
+            VacancyEmbeddingChunk.vacancy_id,
+            lambda row: row.vacancy_id,
+            filters.conditions() if filters else [],
+            offset + limit,
+        )
+        if ranked is None:
+            return None
+        return [
+            {"vacancy": row.vacancy, "similarity": similarity}
+            for row, similarity in ranked[offset : offset + limit]
+        ]
+
 
 # Global instance
 embedding_service = EmbeddingService()
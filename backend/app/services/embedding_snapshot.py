@@ -0,0 +1,335 @@
+"""
+Memory-mapped snapshots of stored embeddings for in-process search.
+
+One process writes a snapshot of a generation's candidate or vacancy vectors:
+a contiguous, unit-normalized float16 (or float32) matrix in a .npy file, the
+owner id of every row and a manifest naming the current version. Every
+uvicorn worker maps the matrix read-only, so the operating system shares one
+copy of it between all workers and a worker starts without scanning the
+database:
+
+    python -m app.services.embedding_snapshot [--generation NAME]
+
+Embeddings written after the snapshot are appended to a delta log, which
+workers read incrementally on top of the matrix. The log is rotated by the
+next snapshot. A file lock orders appends, rotation and reads across
+processes.
+"""
+
+import argparse
+import asyncio
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.embedding import (
+    CandidateEmbedding,
+    EmbeddingGeneration,
+    EmbeddingGenerationStatus,
+    VacancyEmbedding,
+)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger(__name__)
+
+OWNER_KEYS = {CandidateEmbedding: "candidate_id", VacancyEmbedding: "vacancy_id"}
+SCAN_BATCH_SIZE = 1000
+
+
+def _normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+@dataclass
+class EmbeddingSnapshot:
+    """A mapped snapshot version plus the delta log entries read so far."""
+
+    version: int
+    matrix: Any
+    row_of: Dict[Any, int]
+    # Vectors written after the snapshot, by owner id
+    delta: Dict[Any, Any]
+    delta_offset: int = 0
+
+    def top(
+        self, query_vector: Sequence[float], owner_ids: Iterable[Any], count: int
+    ) -> List[Any]:
+        """The count owner ids most similar to the query, followed by the ids
+        the snapshot has no vector for (to be ranked from the database)."""
+        query = _normalize(np.asarray(query_vector, dtype=np.float32))
+        snapshot_ids, delta_ids, missing = [], [], []
+        for owner_id in owner_ids:
+            if owner_id in self.delta:
+                delta_ids.append(owner_id)
+            elif owner_id in self.row_of:
+                snapshot_ids.append(owner_id)
+            else:
+                missing.append(owner_id)
+
+        ids = snapshot_ids + delta_ids
+        if not ids:
+            return missing
+        rows = np.fromiter(
+            (self.row_of[owner_id] for owner_id in snapshot_ids),
+            dtype=np.int64,
+            count=len(snapshot_ids),
+        )
+        # Only the filtered rows are read from the mapped matrix, in file order
+        order = np.argsort(rows)
+        scores = np.empty(len(rows), dtype=np.float32)
+        scores[order] = self.matrix[rows[order]] @ query
+        if delta_ids:
+            delta_matrix = np.stack([self.delta[owner_id] for owner_id in delta_ids])
+            scores = np.concatenate([scores, delta_matrix @ query])
+
+        if count < len(ids):
+            best = np.argpartition(-scores, count)[:count]
+        else:
+            best = np.arange(len(ids))
+        best = best[np.argsort(-scores[best])]
+        return [ids[index] for index in best] + missing
+
+
+class EmbeddingSnapshotStore:
+    """Writes snapshots and delta logs and keeps this process's mapped copy."""
+
+    def __init__(
+        self,
+        directory: str = settings.embedding_snapshot_dir,
+        dtype: str = settings.embedding_snapshot_dtype,
+    ):
+        self.directory = directory
+        self.dtype = dtype
+        self._snapshots: Dict[str, EmbeddingSnapshot] = {}
+        self._lock = threading.Lock()
+
+    def _base(self, embedding_model, generation: str) -> str:
+        # Generation names are free-form; a digest keeps them out of paths
+        digest = hashlib.sha1(generation.encode("utf-8")).hexdigest()[:8]
+        return os.path.join(self.directory, f"{embedding_model.__tablename__}-{digest}")
+
+    @contextmanager
+    def _locked(self, base: str, exclusive: bool):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(f"{base}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def _read_manifest(base: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(f"{base}.json", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    async def write(
+        self,
+        embedding_model,
+        generation: str,
+        rows: AsyncIterable[Tuple[Any, Sequence[float]]],
+        count: int,
+        dimension: int,
+        delta_offset: int = 0,
+    ) -> int:
+        """Write up to count (owner id, vector) rows as a new snapshot version.
+
+        delta_offset is the size of the delta log when the rows were read;
+        log entries after it are carried over to the rotated log.
+        """
+        base = self._base(embedding_model, generation)
+        os.makedirs(self.directory, exist_ok=True)
+        manifest = self._read_manifest(base)
+        version = manifest["version"] + 1 if manifest else 1
+
+        matrix_path = f"{base}.v{version}.npy"
+        matrix = np.lib.format.open_memmap(
+            matrix_path, mode="w+", dtype=self.dtype, shape=(count, dimension)
+        )
+        owner_ids = []
+        async for owner_id, vector in rows:
+            if len(owner_ids) == count:
+                break
+            matrix[len(owner_ids)] = _normalize(np.asarray(vector, dtype=np.float32))
+            owner_ids.append(owner_id)
+        matrix.flush()
+        del matrix
+        with open(f"{base}.v{version}.ids.json", "w", encoding="utf-8") as f:
+            json.dump(owner_ids, f)
+
+        with self._locked(base, exclusive=True):
+            delta_path = f"{base}.delta"
+            with open(f"{delta_path}.tmp", "wb") as rotated:
+                if os.path.exists(delta_path):
+                    with open(delta_path, "rb") as log:
+                        log.seek(delta_offset)
+                        rotated.write(log.read())
+            os.replace(f"{delta_path}.tmp", delta_path)
+            with open(f"{base}.json.tmp", "w", encoding="utf-8") as f:
+                json.dump({"version": version, "rows": len(owner_ids)}, f)
+            os.replace(f"{base}.json.tmp", f"{base}.json")
+
+        # Workers that still map older versions keep them until they reload
+        if manifest:
+            for suffix in (".npy", ".ids.json"):
+                try:
+                    os.remove(f"{base}.v{manifest['version']}{suffix}")
+                except FileNotFoundError:
+                    pass
+        logger.info(
+            "Wrote embedding snapshot %s v%d with %d rows",
+            base,
+            version,
+            len(owner_ids),
+        )
+        return version
+
+    def start_delta(self, embedding_model, generation: str) -> int:
+        """Start logging vectors written from now on; returns the log size."""
+        base = self._base(embedding_model, generation)
+        with self._locked(base, exclusive=True):
+            with open(f"{base}.delta", "ab") as log:
+                return log.tell()
+
+    def record(
+        self,
+        embedding_model,
+        generation: str,
+        vectors: Sequence[Tuple[Any, Sequence[float]]],
+    ) -> None:
+        """Append newly stored vectors to the delta log of the generation."""
+        base = self._base(embedding_model, generation)
+        if not vectors or not os.path.exists(f"{base}.delta"):
+            # No snapshot to patch; the next one reads them from the database
+            return
+        lines = "".join(
+            json.dumps({"id": owner_id, "vector": list(map(float, vector))}) + "\n"
+            for owner_id, vector in vectors
+        )
+        with self._locked(base, exclusive=True):
+            with open(f"{base}.delta", "a", encoding="utf-8") as log:
+                log.write(lines)
+
+    def get(self, embedding_model, generation: str) -> Optional[EmbeddingSnapshot]:
+        """The current snapshot with the delta log applied, or None."""
+        if np is None:
+            return None
+        base = self._base(embedding_model, generation)
+        if not os.path.exists(f"{base}.json"):
+            return None
+        with self._lock, self._locked(base, exclusive=False):
+            manifest = self._read_manifest(base)
+            if manifest is None:
+                return None
+            snapshot = self._snapshots.get(base)
+            if snapshot is None or snapshot.version != manifest["version"]:
+                snapshot = self._load(base, manifest)
+                self._snapshots[base] = snapshot
+            self._read_delta(base, snapshot)
+        return snapshot
+
+    @staticmethod
+    def _load(base: str, manifest: Dict[str, Any]) -> EmbeddingSnapshot:
+        version = manifest["version"]
+        matrix = np.load(f"{base}.v{version}.npy", mmap_mode="r")
+        with open(f"{base}.v{version}.ids.json", encoding="utf-8") as f:
+            owner_ids = json.load(f)
+        return EmbeddingSnapshot(
+            version=version,
+            matrix=matrix[: manifest["rows"]],
+            row_of={owner_id: row for row, owner_id in enumerate(owner_ids)},
+            delta={},
+        )
+
+    @staticmethod
+    def _read_delta(base: str, snapshot: EmbeddingSnapshot) -> None:
+        try:
+            with open(f"{base}.delta", "rb") as log:
+                log.seek(snapshot.delta_offset)
+                data = log.read()
+        except FileNotFoundError:
+            return
+        # Appends happen under the lock, so the data ends with a whole line
+        for line in data.splitlines():
+            entry = json.loads(line)
+            snapshot.delta[entry["id"]] = _normalize(
+                np.asarray(entry["vector"], dtype=np.float32)
+            )
+        snapshot.delta_offset += len(data)
+
+    async def build(self, session, embedding_model, generation: EmbeddingGeneration):
+        """Snapshot every stored vector of the generation from the database."""
+        owner = getattr(embedding_model, OWNER_KEYS[embedding_model])
+        # Vectors written during the scan are replayed from the log
+        delta_offset = self.start_delta(embedding_model, generation.name)
+        count = await session.scalar(
+            select(func.count()).where(embedding_model.generation == generation.name)
+        )
+        result = await session.stream(
+            select(owner, embedding_model.embedding)
+            .where(embedding_model.generation == generation.name)
+            .execution_options(yield_per=SCAN_BATCH_SIZE)
+        )
+        return await self.write(
+            embedding_model,
+            generation.name,
+            result.tuples(),
+            count,
+            generation.dimension,
+            delta_offset,
+        )
+
+
+# Global instance
+embedding_snapshot_store = EmbeddingSnapshotStore()
+
+
+async def _build(generation_name: Optional[str]) -> None:
+    async with AsyncSessionLocal() as session:
+        if generation_name:
+            generation = await session.get(EmbeddingGeneration, generation_name)
+        else:
+            generation = await session.scalar(
+                select(EmbeddingGeneration).where(
+                    EmbeddingGeneration.status == EmbeddingGenerationStatus.ACTIVE
+                )
+            )
+        if generation is None:
+            raise SystemExit("Embedding generation not found")
+        for embedding_model in OWNER_KEYS:
+            await embedding_snapshot_store.build(session, embedding_model, generation)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Write memory-mapped snapshots of stored embeddings"
+    )
+    parser.add_argument(
+        "--generation", help="Embedding generation to snapshot (default: active)"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_build(args.generation))
+
+
+if __name__ == "__main__":
+    main()
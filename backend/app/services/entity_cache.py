@@ -0,0 +1,207 @@
+"""
+Read-through cache of candidate and vacancy snapshots.
+
+Reports, interview initialization, document downloads and top-k listings
+read the same candidates and vacancies over and over. They get a read-only
+snapshot of the row's columns from a per-process LRU cache instead of a
+database round trip. Snapshots keep updated_at, so caches downstream that
+are keyed by id and updated_at (prompts, report fingerprints) still see
+every edit.
+
+The service functions that write candidates and vacancies invalidate their
+entries. With settings.entity_cache_notify every worker also listens on a
+Postgres NOTIFY channel, and an invalidation is published to all of them;
+without it other workers see an edit once their entry's TTL expires.
+"""
+
+import asyncio
+import copy
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import inspect
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.models.candidate import Candidate
+from app.models.vacancy import Vacancy
+
+try:
+    import asyncpg
+except ImportError:
+    asyncpg = None
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "entity_cache_invalidate"
+RECONNECT_DELAY_SECONDS = 5
+MODELS = {model.__tablename__: model for model in (Candidate, Vacancy)}
+
+
+class EntitySnapshot:
+    """Read-only copy of an entity's loaded columns, read like the entity."""
+
+    __slots__ = ("_model", "_values")
+
+    def __init__(self, model, values: Dict[str, Any]):
+        object.__setattr__(self, "_model", model)
+        object.__setattr__(self, "_values", values)
+
+    @classmethod
+    def of(cls, entity) -> "EntitySnapshot":
+        mapper = inspect(type(entity))
+        # Deferred columns (search vectors) are not loaded and not needed
+        values = {
+            column.key: copy.deepcopy(getattr(entity, column.key))
+            for column in mapper.column_attrs
+            if not column.deferred
+        }
+        return cls(type(entity), values)
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self._values[name]
+        except KeyError:
+            raise AttributeError(
+                f"{self._model.__name__} snapshot has no attribute {name!r}"
+            ) from None
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{self._model.__name__} snapshots are read-only")
+
+    def __repr__(self) -> str:
+        return f"<{self._model.__name__} snapshot {self._values.get('id')!r}>"
+
+
+def _key(model, entity_id) -> Tuple[str, str]:
+    # Ids arrive as path strings or ints; NOTIFY payloads are strings
+    return model.__tablename__, str(entity_id)
+
+
+class EntityCache:
+    """Per-process snapshot cache with local and cross-worker invalidation."""
+
+    def __init__(
+        self,
+        max_size: int = settings.entity_cache_size,
+        ttl_seconds: float = settings.entity_cache_ttl_seconds,
+        notify: bool = settings.entity_cache_notify,
+    ):
+        self.notify = notify
+        self._entries: LRUCache[Tuple[str, str], EntitySnapshot] = LRUCache(
+            max_size, ttl_seconds
+        )
+        # Bumped by every invalidation; a load that raced one is not stored
+        self._epoch = 0
+        self._connection = None
+        self._publish_lock = asyncio.Lock()
+        self._listener: Optional[asyncio.Task] = None
+
+    def _cacheable(self) -> bool:
+        # Without the channel connected, other workers' edits would be missed
+        return not self.notify or self._connection is not None
+
+    async def get(
+        self, session: AsyncSession, model, entity_id
+    ) -> Optional[EntitySnapshot]:
+        """Snapshot of the entity with the id, or None if there is none."""
+        key = _key(model, entity_id)
+        snapshot = self._entries.get(key)
+        if snapshot is not None:
+            return snapshot
+
+        epoch = self._epoch
+        entity = await session.get(model, entity_id)
+        if entity is None:
+            return None
+        snapshot = EntitySnapshot.of(entity)
+        if epoch == self._epoch and self._cacheable():
+            self._entries.set(key, snapshot)
+        return snapshot
+
+    def _drop(self, key: Tuple[str, str]) -> None:
+        self._entries.invalidate(key)
+        self._epoch += 1
+
+    async def invalidate(self, model, entity_id) -> None:
+        """Drop the entity here and, with notifications, in every worker.
+
+        Called after the write is committed, so no worker reloads the old row.
+        """
+        key = _key(model, entity_id)
+        self._drop(key)
+        if self._connection is None:
+            return
+        try:
+            async with self._publish_lock:
+                await self._connection.execute(
+                    "SELECT pg_notify($1, $2)", NOTIFY_CHANNEL, ":".join(key)
+                )
+        except Exception as e:
+            logger.warning(f"Failed to publish entity cache invalidation: {e}")
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._epoch += 1
+
+    def _on_notification(self, connection, pid, channel, payload: str) -> None:
+        if pid == connection.get_server_pid():
+            # Published by this worker, which has dropped the entry already
+            return
+        table, _, entity_id = payload.partition(":")
+        if table in MODELS:
+            self._drop((table, entity_id))
+
+    async def _listen(self) -> None:
+        url = make_url(settings.database_url).set(drivername="postgresql")
+        while True:
+            closed = asyncio.Event()
+            try:
+                connection = await asyncpg.connect(
+                    url.render_as_string(hide_password=False)
+                )
+                connection.add_termination_listener(lambda _: closed.set())
+                await connection.add_listener(NOTIFY_CHANNEL, self._on_notification)
+            except Exception as e:
+                logger.warning(f"Entity cache channel unavailable: {e}")
+                await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+                continue
+
+            # Edits made while disconnected were not heard
+            self.clear()
+            self._connection = connection
+            logger.info("Listening for entity cache invalidations")
+            try:
+                await closed.wait()
+                logger.warning("Entity cache channel closed, reconnecting")
+            finally:
+                self._connection = None
+                self.clear()
+                if not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+
+    def start(self) -> None:
+        """Start listening for other workers' invalidations, if enabled."""
+        if not self.notify or self._listener is not None:
+            return
+        if asyncpg is None:
+            logger.warning("Entity cache notifications need asyncpg; disabled")
+            return
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is None:
+            return
+        self._listener.cancel()
+        try:
+            await self._listener
+        except asyncio.CancelledError:
+            pass
+        self._listener = None
+
+
+# Global instance
+entity_cache = EntityCache()
@@ -0,0 +1,206 @@
+"""
+Token-budgeted context window for interview chat turns.
+
+Instead of sending the whole conversation to GigaChat on every turn, the
+prompt is built from the system prompt, a rolling summary of older turns and
+as many recent messages as fit into a fixed token budget. The summary is
+stored on the interview and refreshed in the background once enough
+messages have fallen out of the window. Until the summary covers them,
+those messages stay in the prompt over budget, so no turn is ever lost.
+"""
+
+import asyncio
+import logging
+import math
+from typing import Callable, Dict, List, Optional, Set
+
+from gigachat.models import MessagesRole
+from sqlalchemy import or_, update
+
+from app.clients.gigachat import get_gigachat_client
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.interview import Interview
+from app.models.interview_message import InterviewMessage, InterviewMessageType
+
+logger = logging.getLogger(__name__)
+
+# Rough chars-per-token ratio for Russian text with GigaChat's tokenizer; a
+# local estimate avoids a tokens_count round trip per message
+CHARS_PER_TOKEN = 3
+# Per-message overhead of role markup
+MESSAGE_OVERHEAD_TOKENS = 4
+
+SUMMARY_TEMPERATURE = 0.1
+SUMMARY_PREFIX = "Краткое содержание предыдущей части интервью:\n"
+SUMMARY_INSTRUCTION = (
+    "Ты помогаешь HR-ассистенту. Обнови краткое содержание интервью: "
+    "добавь к нему новые реплики, сохрани факты об опыте, навыках, мотивации "
+    "и ожиданиях кандидата, а также заданные вопросы. Пиши кратко, "
+    "без оценок и без выдуманных деталей."
+)
+
+ROLE_BY_TYPE = {
+    InterviewMessageType.SYSTEM: MessagesRole.SYSTEM,
+    InterviewMessageType.USER: MessagesRole.USER,
+    InterviewMessageType.ASSISTANT: MessagesRole.ASSISTANT,
+}
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    return math.ceil(len(text or "") / CHARS_PER_TOKEN) + MESSAGE_OVERHEAD_TOKENS
+
+
+class InterviewContextManager:
+    """Builds GigaChat prompts within a token budget and keeps the summary fresh."""
+
+    def __init__(
+        self,
+        max_prompt_tokens: int = settings.interview_context_max_tokens,
+        summary_trigger_tokens: int = settings.interview_context_summary_trigger_tokens,
+        summary_max_tokens: int = settings.interview_context_summary_max_tokens,
+        client_factory: Callable = get_gigachat_client,
+        session_factory: Callable = AsyncSessionLocal,
+    ):
+        self.max_prompt_tokens = max_prompt_tokens
+        self.summary_trigger_tokens = summary_trigger_tokens
+        self.summary_max_tokens = summary_max_tokens
+        self.client_factory = client_factory
+        self.session_factory = session_factory
+        self._refreshing: Set[str] = set()
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def build_messages(
+        self,
+        interview: Interview,
+        history: List[InterviewMessage],
+        user_message: str,
+    ) -> List[dict]:
+        """Return the system prompt, summary, recent window and the new message."""
+        system = [m for m in history if m.type == InterviewMessageType.SYSTEM]
+        dialog = [m for m in history if m.type != InterviewMessageType.SYSTEM]
+
+        prefix = [{"role": MessagesRole.SYSTEM, "content": m.text} for m in system]
+        summary_index = interview.context_summary_index
+        if interview.context_summary:
+            prefix.append(
+                {
+                    "role": MessagesRole.SYSTEM,
+                    "content": SUMMARY_PREFIX + interview.context_summary,
+                }
+            )
+
+        budget = self.max_prompt_tokens - sum(
+            estimate_tokens(m["content"]) for m in prefix
+        )
+        budget -= estimate_tokens(user_message)
+
+        # Walk back from the newest message; the latest one (usually the
+        # question being answered) is always kept
+        window: List[InterviewMessage] = []
+        for message in reversed(dialog):
+            if summary_index is not None and message.index <= summary_index:
+                break
+            cost = estimate_tokens(message.text)
+            if window and cost > budget:
+                break
+            window.append(message)
+            budget -= cost
+        window.reverse()
+
+        # Turns past the budget that the summary does not cover yet are kept
+        window_start = window[0].index if window else math.inf
+        pending = [
+            m
+            for m in dialog
+            if m.index < window_start
+            and (summary_index is None or m.index > summary_index)
+        ]
+        self._maybe_refresh_summary(interview, pending)
+        window = pending + window
+
+        return [
+            *prefix,
+            *({"role": ROLE_BY_TYPE[m.type], "content": m.text} for m in window),
+            {"role": MessagesRole.USER, "content": user_message},
+        ]
+
+    def _maybe_refresh_summary(
+        self, interview: Interview, pending: List[InterviewMessage]
+    ) -> None:
+        pending_tokens = sum(estimate_tokens(m.text) for m in pending)
+        if pending_tokens < self.summary_trigger_tokens:
+            return
+        if interview.id in self._refreshing:
+            return
+
+        self._refreshing.add(interview.id)
+        task = asyncio.create_task(
+            self.refresh_summary(interview.id, interview.context_summary, pending)
+        )
+        self._tasks[interview.id] = task
+        task.add_done_callback(lambda _: self._finish_refresh(interview.id))
+
+    def _finish_refresh(self, interview_id: str) -> None:
+        self._refreshing.discard(interview_id)
+        self._tasks.pop(interview_id, None)
+
+    async def refresh_summary(
+        self,
+        interview_id: str,
+        summary: Optional[str],
+        messages: List[InterviewMessage],
+    ) -> Optional[str]:
+        """Fold messages into the stored summary of the interview."""
+        transcript = "\n".join(
+            f"{'Кандидат' if m.type == InterviewMessageType.USER else 'HR'}: {m.text}"
+            for m in messages
+        )
+        prompt = (
+            f"Текущее краткое содержание:\n{summary or 'пока нет'}\n\n"
+            f"Новые реплики:\n{transcript}"
+        )
+        try:
+            client = self.client_factory()
+            response = await client.achat(
+                {
+                    "messages": [
+                        {"role": MessagesRole.SYSTEM, "content": SUMMARY_INSTRUCTION},
+                        {"role": MessagesRole.USER, "content": prompt},
+                    ],
+                    "temperature": SUMMARY_TEMPERATURE,
+                    "max_tokens": self.summary_max_tokens,
+                    "stream": False,
+                }
+            )
+            new_summary = response.choices[0].message.content
+        except Exception as e:
+            logger.warning(
+                "Failed to summarize interview %s context: %s", interview_id, e
+            )
+            return None
+
+        last_index = messages[-1].index
+        async with self.session_factory() as session:
+            # Never overwrite a summary that already covers more messages
+            await session.execute(
+                update(Interview)
+                .where(Interview.id == interview_id)
+                .where(
+                    or_(
+                        Interview.context_summary_index.is_(None),
+                        Interview.context_summary_index < last_index,
+                    )
+                )
+                .values(context_summary=new_summary, context_summary_index=last_index)
+            )
+            await session.commit()
+
+        logger.info(
+            "Interview %s context summarized up to message %d", interview_id, last_index
+        )
+        return new_summary
+
+
+# Global instance
+interview_context_manager = InterviewContextManager()
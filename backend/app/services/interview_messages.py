@@ -1,17 +1,25 @@
 import logging
-from typing import List
+from dataclasses import dataclass, field
+from typing import AsyncIterator, List
 from gigachat import GigaChat
 from gigachat.models import Function, FunctionParameters, MessagesRole
-from sqlalchemy import select, func
+from sqlalchemy import select, func, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
 from app.models.interview import Interview
 from app.models.candidate import Candidate
 from app.models.vacancy import Vacancy
 from app.models.interview_message import InterviewMessage, InterviewMessageType
 from app.schemas.common import InterviewMessageCreateRequest
+from app.services.entity_cache import entity_cache
 from app.services.exceptions import NotFoundError, ConflictError
-from app.clients.gigachat import get_gigachat_client
+from app.services.interview_context import interview_context_manager
+from app.services.interview_prompts import interview_prompt_service
+from app.clients.gigachat import get_gigachat_client, gigachat_session
 
 logger = logging.getLogger(__name__)
 
@@ -24,12 +32,54 @@ INITIAL_GREETING_MAX_TOKENS = 200
 # Business rules
 MIN_MESSAGES_FOR_FINISH_FUNCTION = 8
 
+# Fixed interviewer phrases
+FALLBACK_GREETING_TEXT = (
+    "Здравствуйте! Я виртуальный HR-ассистент. "
+    "Готовы начать интервью? Расскажите немного о себе."
+)
+FALLBACK_RESPONSE_TEXT = (
+    "Извините, произошла ошибка при обработке вашего сообщения. Попробуйте еще раз."
+)
+CONTINUE_INTERVIEW_TEXT = "Спасибо! Давайте продолжим интервью, чтобы собрать достаточно информации перед завершением."
+CLOSING_TEXT = (
+    "Спасибо за беседу! Интервью завершено. "
+    "HR-команда свяжется с вами по результатам."
+)
+# Phrases voiced verbatim; pre-rendered into the TTS cache at startup
+FIXED_INTERVIEWER_PHRASES = [
+    FALLBACK_GREETING_TEXT,
+    FALLBACK_RESPONSE_TEXT,
+    CONTINUE_INTERVIEW_TEXT,
+    CLOSING_TEXT,
+]
+
+
+@dataclass
+class ConversationState:
+    """Ordered messages of an interview, as stored in the database."""
+
+    messages: List[InterviewMessage] = field(default_factory=list)
+
+    @property
+    def next_index(self) -> int:
+        return self.messages[-1].index + 1 if self.messages else 0
+
+    @property
+    def count(self) -> int:
+        return len(self.messages)
+
 
 class InterviewMessagesService:
     """Service for managing interview messages with GigaChat integration."""
 
     def __init__(self):
         self.gigachat_client = None
+        # Per-interview conversation cache; a chat turn reads the history from
+        # here and appends to it in place after its batched insert commits
+        self.conversations: LRUCache[str, ConversationState] = LRUCache(
+            settings.conversation_cache_size,
+            settings.conversation_cache_ttl_seconds,
+        )
 
     async def _get_gigachat_client(self):
         """Get GigaChat client instance."""
@@ -41,19 +91,16 @@ class InterviewMessagesService:
         """Call GigaChat client async method."""
         return await client.achat(chat_params)
 
-    async def _prepare_functions(self, session: AsyncSession, interview_id: str):
+    def _stream_gigachat_async(self, client: GigaChat, chat_params):
+        """Call GigaChat client async streaming method."""
+        return client.astream(chat_params)
+
+    def _prepare_functions(self, messages_count: int):
         """Prepare functions for GigaChat.
 
         The "finish_interview" function is exposed to the model only when the
         conversation has at least MIN_MESSAGES_FOR_FINISH_FUNCTION messages.
         """
-        # Count messages for gating the finish_interview function exposure
-        messages_count = await session.scalar(
-            select(func.count())
-            .select_from(InterviewMessage)
-            .where(InterviewMessage.interview_id == interview_id)
-        )
-        messages_count = int(messages_count or 0)
         if messages_count < MIN_MESSAGES_FOR_FINISH_FUNCTION:
             return []
         finish_interview = Function(
@@ -84,6 +131,14 @@ class InterviewMessagesService:
         if not interview:
             raise NotFoundError("Interview not found")
 
+        messages = await self._load_messages(session, interview_id)
+        # Reading the history anyway, so refresh the conversation cache with it
+        self.conversations.set(interview_id, ConversationState(list(messages)))
+        return messages
+
+    async def _load_messages(
+        self, session: AsyncSession, interview_id: str
+    ) -> List[InterviewMessage]:
         result = await session.scalars(
             select(InterviewMessage)
             # Filter out first system message
@@ -93,14 +148,88 @@ class InterviewMessagesService:
         )
         return list(result)
 
-    async def create_message(
+    async def _get_conversation(
+        self, session: AsyncSession, interview: Interview
+    ) -> ConversationState:
+        """Return the cached conversation, loading it on a miss.
+
+        interview.message_seq is the next index to be taken, so a cached
+        conversation that ends elsewhere misses turns appended by another
+        worker (or the HTTP path) and is reloaded.
+        """
+        conversation = self.conversations.get(interview.id)
+        if conversation is not None and (
+            interview.message_seq is None
+            or conversation.next_index == interview.message_seq
+        ):
+            return conversation
+        return await self._reload_conversation(session, interview.id)
+
+    async def _reload_conversation(
+        self, session: AsyncSession, interview_id: str
+    ) -> ConversationState:
+        messages = await self._load_messages(session, interview_id)
+        conversation = ConversationState(messages)
+        self.conversations.set(interview_id, conversation)
+        return conversation
+
+    async def _end_read_phase(self, session: AsyncSession) -> None:
+        """Return the connection to the pool before a slow GigaChat call.
+
+        Loaded objects stay usable (expire_on_commit=False) and the write
+        phase of the turn starts a new transaction.
+        """
+        if session.in_transaction():
+            await session.commit()
+
+    async def _append_messages(
         self,
         session: AsyncSession,
         interview_id: str,
-        payload: InterviewMessageCreateRequest,
-    ) -> List[InterviewMessage]:
-        """Create a new user message and get AI response."""
-        logger.info(f"Creating message for interview {interview_id}")
+        conversation: ConversationState,
+        messages: List[InterviewMessage],
+    ) -> ConversationState:
+        """Insert the messages of a turn in one commit and append them to the cache.
+
+        Indexes are reserved from interview.message_seq with a single
+        UPDATE ... RETURNING in the same transaction; the row lock serializes
+        concurrent turns until commit, so they never get the same index. If
+        someone else appended since the cache was filled, the conversation is
+        reloaded. Returns the conversation including the new messages.
+        """
+        end = await session.scalar(
+            update(Interview)
+            .where(Interview.id == interview_id)
+            .values(message_seq=Interview.message_seq + len(messages))
+            .returning(Interview.message_seq)
+        )
+        if end is None:
+            raise NotFoundError("Interview not found")
+        start = end - len(messages)
+        for offset, message in enumerate(messages):
+            message.index = start + offset
+
+        session.add_all(messages)
+        try:
+            await session.commit()
+        except IntegrityError as e:
+            await session.rollback()
+            self.conversations.invalidate(interview_id)
+            logger.warning(
+                "Conversation of interview %s changed concurrently: %s",
+                interview_id,
+                e,
+            )
+            raise ConflictError("Conversation was updated concurrently, retry") from e
+        if start == conversation.next_index:
+            conversation.messages.extend(messages)
+            return conversation
+        return await self._reload_conversation(session, interview_id)
+
+    async def _get_active_interview(
+        self, session: AsyncSession, interview_id: str
+    ) -> Interview:
+        """Load the interview and check that it accepts user messages."""
         interview = await session.get(Interview, interview_id)
         if not interview:
             raise NotFoundError("Interview not found")
@@ -118,99 +247,132 @@ class InterviewMessagesService:
             or interview.status == "completed"
         ):
             raise ConflictError("Interview already completed")
+        return interview
 
-        # Get next index for user message
-        next_index_result = await session.execute(
-            select(func.coalesce(func.max(InterviewMessage.index), -1) + 1).where(
-                InterviewMessage.interview_id == interview_id
-            )
-        )
-        next_index = next_index_result.scalar_one()
+    def _turn_messages(
+        self, interview_id: str, user_text: str, assistant_text: str
+    ) -> List[InterviewMessage]:
+        """Messages of a turn; indexes are assigned by _append_messages."""
+        return [
+            InterviewMessage(
+                interview_id=interview_id,
+                text=user_text,
+                type=InterviewMessageType.USER,
+            ),
+            InterviewMessage(
+                interview_id=interview_id,
+                text=assistant_text,
+                type=InterviewMessageType.ASSISTANT,
+            ),
+        ]
 
-        # Create user message
-        user_message = InterviewMessage(
-            interview_id=interview_id,
-            index=next_index,
-            text=payload.text,
-            type=InterviewMessageType.USER,
-        )
-        session.add(user_message)
-        await session.commit()
-        await session.flush()  # Flush to get the user message saved
+    async def create_message(
+        self,
+        session: AsyncSession,
+        interview_id: str,
+        payload: InterviewMessageCreateRequest,
+    ) -> List[InterviewMessage]:
+        """Create a new user message and get AI response."""
+        logger.info(f"Creating message for interview {interview_id}")
+        interview = await self._get_active_interview(session, interview_id)
+        conversation = await self._get_conversation(session, interview)
+        await self._end_read_phase(session)
 
         try:
             # Get AI response from GigaChat
             ai_response = await self._get_ai_response(
-                session, interview_id, payload.text
+                session, interview, conversation, payload.text
             )
+        except Exception as e:
+            logger.error(f"Failed to get AI response: {e}", exc_info=True)
+            # Use fallback message
+            ai_response = FALLBACK_RESPONSE_TEXT
+
+        conversation = await self._append_messages(
+            session,
+            interview_id,
+            conversation,
+            self._turn_messages(interview_id, payload.text, ai_response),
+        )
 
-            # Create AI response message
-            ai_message = InterviewMessage(
-                interview_id=interview_id,
-                index=next_index + 1,
-                text=ai_response,
-                type=InterviewMessageType.ASSISTANT,
-            )
-            session.add(ai_message)
+        # Return updated list of messages
+        return list(conversation.messages)
 
+    async def stream_message(
+        self,
+        session: AsyncSession,
+        interview_id: str,
+        payload: InterviewMessageCreateRequest,
+    ) -> AsyncIterator[str]:
+        """Create a new user message and stream the AI response as text deltas.
+
+        Behaves like create_message, but uses the streaming GigaChat API so the
+        caller can start voicing the reply before it is complete. The messages
+        of the turn are stored once the stream is over.
+        """
+        logger.info(f"Streaming message for interview {interview_id}")
+        interview = await self._get_active_interview(session, interview_id)
+        conversation = await self._get_conversation(session, interview)
+        await self._end_read_phase(session)
+
+        parts: List[str] = []
+        try:
+            async for delta in self._stream_ai_response(
+                session, interview, conversation, payload.text
+            ):
+                parts.append(delta)
+                yield delta
         except Exception as e:
-            logger.error(f"Failed to get AI response: {e}", exc_info=True)
-            # Create fallback message
-            fallback_message = InterviewMessage(
-                interview_id=interview_id,
-                index=next_index + 1,
-                text="Извините, произошла ошибка при обработке вашего сообщения. Попробуйте еще раз.",
-                type=InterviewMessageType.ASSISTANT,
-            )
-            session.add(fallback_message)
+            logger.error(f"Failed to stream AI response: {e}", exc_info=True)
+            if not parts:
+                parts.append(FALLBACK_RESPONSE_TEXT)
+                yield FALLBACK_RESPONSE_TEXT
+
+        await self._append_messages(
+            session,
+            interview_id,
+            conversation,
+            self._turn_messages(interview_id, payload.text, "".join(parts)),
+        )
 
-        await session.commit()
+    def _build_chat_params(
+        self, interview: Interview, conversation: ConversationState, user_message: str
+    ) -> dict:
+        """Build GigaChat chat parameters from the conversation history.
 
-        # Return updated list of messages
-        return await self.list_messages(session, interview_id)
+        The history is trimmed to a token budget by the context manager: system
+        prompt, rolling summary of older turns and the most recent messages.
+        """
+        gigachat_messages = interview_context_manager.build_messages(
+            interview, conversation.messages, user_message
+        )
+
+        logger.info(f"Sending {len(gigachat_messages)} messages to GigaChat")
+
+        return {
+            "messages": gigachat_messages,
+            # The pending user message counts towards the finish gate
+            "functions": self._prepare_functions(conversation.count + 1),
+            "temperature": GIGACHAT_TEMPERATURE,
+            "max_tokens": GIGACHAT_MAX_TOKENS,
+        }
 
     async def _get_ai_response(
-        self, session: AsyncSession, interview_id: str, user_message: str
+        self,
+        session: AsyncSession,
+        interview: Interview,
+        conversation: ConversationState,
+        user_message: str,
     ) -> str:
         """Get AI response from GigaChat based on conversation history."""
         try:
-            # Get conversation history
-            messages = await self.list_messages(session, interview_id)
-
-            # Prepare messages for GigaChat
-            gigachat_messages = []
-            for msg in messages:
-                if msg.type == InterviewMessageType.SYSTEM:
-                    gigachat_messages.append(
-                        {"role": MessagesRole.SYSTEM, "content": msg.text}
-                    )
-                elif msg.type == InterviewMessageType.USER:
-                    gigachat_messages.append(
-                        {"role": MessagesRole.USER, "content": msg.text}
-                    )
-                elif msg.type == InterviewMessageType.ASSISTANT:
-                    gigachat_messages.append(
-                        {"role": MessagesRole.ASSISTANT, "content": msg.text}
-                    )
-
-            # Add current user message
-            gigachat_messages.append(
-                {"role": MessagesRole.USER, "content": user_message}
-            )
+            chat_params = self._build_chat_params(interview, conversation, user_message)
+            chat_params["stream"] = False
 
             # Get GigaChat client and make request
             client = await self._get_gigachat_client()
-
-            logger.info(f"Sending {len(gigachat_messages)} messages to GigaChat")
-
-            chat_params = {
-                "messages": gigachat_messages,
-                "functions": await self._prepare_functions(session, interview_id),
-                "temperature": GIGACHAT_TEMPERATURE,
-                "max_tokens": GIGACHAT_MAX_TOKENS,
-                "stream": False,
-            }
-            response = await self._call_gigachat_async(client, chat_params)
+            with gigachat_session(interview.id):
+                response = await self._call_gigachat_async(client, chat_params)
 
             choice = response.choices[0]
             message = choice.message
@@ -225,83 +387,14 @@ class InterviewMessagesService:
             if finish_reason == "function_call" and getattr(
                 message, "function_call", None
             ):
-                function_call = message.function_call
-                func_name = getattr(function_call, "name", None)
-                func_args = getattr(function_call, "arguments", {})
-                logger.info(
-                    "GigaChat requested function_call '%s' for interview %s",
-                    func_name,
-                    interview_id,
+                override = await self._handle_function_call(
+                    session,
+                    interview.id,
+                    message.function_call,
+                    conversation.count + 1,
                 )
-                try:
-                    # arguments may be dict or JSON string
-                    if isinstance(func_args, str):
-                        import json
-
-                        func_args = json.loads(func_args)
-                except Exception:  # pragma: no cover - safe fallback
-                    func_args = {}
-                logger.debug(
-                    "function_call arguments type=%s", type(func_args).__name__
-                )
-
-                if func_name == "finish_interview":
-                    # Guard: skip handling finish_interview if not enough messages yet
-                    messages_count = await session.scalar(
-                        select(func.count())
-                        .select_from(InterviewMessage)
-                        .where(InterviewMessage.interview_id == interview_id)
-                    )
-                    messages_count = int(messages_count or 0)
-                    if messages_count < MIN_MESSAGES_FOR_FINISH_FUNCTION:
-                        logger.info(
-                            "Skipping finish_interview for interview %s: messages_count=%s < min=%s",
-                            interview_id,
-                            messages_count,
-                            MIN_MESSAGES_FOR_FINISH_FUNCTION,
-                        )
-                        return "Спасибо! Давайте продолжим интервью, чтобы собрать достаточно информации перед завершением."
-                    feedback = func_args.get("feedback")
-                    positive = func_args.get("positive")
-                    logger.info(
-                        "Handling finish_interview for interview %s (positive=%s, feedback_len=%s)",
-                        interview_id,
-                        positive,
-                        len(feedback) if isinstance(feedback, str) else 0,
-                    )
-
-                    interview = await session.get(Interview, interview_id)
-                    if not interview:
-                        logger.warning(
-                            "Interview %s not found while finishing",
-                            interview_id,
-                        )
-                        raise NotFoundError("Interview not found")
-
-                    interview.status = "completed"
-                    # Mark interview as done/read-only
-                    interview.state = "done"
-                    interview.feedback = feedback
-                    interview.feedback_positive = (
-                        bool(positive) if positive is not None else None
-                    )
-                    await session.commit()
-
-                    logger.info(
-                        "Interview %s marked completed with feedback.", interview_id
-                    )
-                else:
-                    logger.warning(
-                        "Unhandled function_call '%s' for interview %s",
-                        func_name,
-                        interview_id,
-                    )
-
-                    # Return a closing assistant message
-                    return (
-                        "Спасибо за беседу! Интервью завершено. "
-                        "HR-команда свяжется с вами по результатам."
-                    )
+                if override is not None:
+                    return override
 
             # Default: return normal assistant content
             ai_response = message.content
@@ -313,6 +406,111 @@ class InterviewMessagesService:
             logger.error(f"GigaChat API error: {e}", exc_info=True)
             raise
 
+    async def _stream_ai_response(
+        self,
+        session: AsyncSession,
+        interview: Interview,
+        conversation: ConversationState,
+        user_message: str,
+    ) -> AsyncIterator[str]:
+        """Stream AI response deltas from GigaChat."""
+        chat_params = self._build_chat_params(interview, conversation, user_message)
+        chat_params["stream"] = True
+
+        client = await self._get_gigachat_client()
+        function_call = None
+        with gigachat_session(interview.id):
+            async for chunk in self._stream_gigachat_async(client, chat_params):
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                if getattr(delta, "function_call", None):
+                    function_call = delta.function_call
+                if delta.content:
+                    yield delta.content
+
+        if function_call is not None:
+            override = await self._handle_function_call(
+                session, interview.id, function_call, conversation.count + 1
+            )
+            if override is not None:
+                yield override
+
+    async def _handle_function_call(
+        self,
+        session: AsyncSession,
+        interview_id: str,
+        function_call,
+        messages_count: int,
+    ) -> str | None:
+        """Handle a function call requested by the model.
+
+        Returns the assistant text to use instead of the model content, or None
+        when the model content should be kept as is. Interview changes are
+        committed together with the messages of the turn.
+        """
+        func_name = getattr(function_call, "name", None)
+        func_args = getattr(function_call, "arguments", {})
+        logger.info(
+            "GigaChat requested function_call '%s' for interview %s",
+            func_name,
+            interview_id,
+        )
+        try:
+            # arguments may be dict or JSON string
+            if isinstance(func_args, str):
+                import json
+
+                func_args = json.loads(func_args)
+        except Exception:  # pragma: no cover - safe fallback
+            func_args = {}
+        logger.debug("function_call arguments type=%s", type(func_args).__name__)
+
+        if func_name != "finish_interview":
+            logger.warning(
+                "Unhandled function_call '%s' for interview %s",
+                func_name,
+                interview_id,
+            )
+
+            # Return a closing assistant message
+            return CLOSING_TEXT
+
+        # Guard: skip handling finish_interview if not enough messages yet
+        if messages_count < MIN_MESSAGES_FOR_FINISH_FUNCTION:
+            logger.info(
+                "Skipping finish_interview for interview %s: messages_count=%s < min=%s",
+                interview_id,
+                messages_count,
+                MIN_MESSAGES_FOR_FINISH_FUNCTION,
+            )
+            return CONTINUE_INTERVIEW_TEXT
+        feedback = func_args.get("feedback")
+        positive = func_args.get("positive")
+        logger.info(
+            "Handling finish_interview for interview %s (positive=%s, feedback_len=%s)",
+            interview_id,
+            positive,
+            len(feedback) if isinstance(feedback, str) else 0,
+        )
+
+        interview = await session.get(Interview, interview_id)
+        if not interview:
+            logger.warning(
+                "Interview %s not found while finishing",
+                interview_id,
+            )
+            raise NotFoundError("Interview not found")
+
+        interview.status = "completed"
+        # Mark interview as done/read-only
+        interview.state = "done"
+        interview.feedback = feedback
+        interview.feedback_positive = bool(positive) if positive is not None else None
+
+        logger.info("Interview %s marked completed with feedback.", interview_id)
+        return None
+
     async def initialize_conversation(
         self, session: AsyncSession, interview_id: str
     ) -> List[InterviewMessage]:
@@ -335,16 +533,18 @@ class InterviewMessagesService:
             raise ConflictError("Conversation already initialized")
 
         # Get candidate and vacancy info
-        candidate = await session.get(Candidate, interview.candidate_id)
+        candidate = await entity_cache.get(session, Candidate, interview.candidate_id)
         if not candidate:
             raise NotFoundError("Candidate not found for interview")
 
-        vacancy: Vacancy | None = None
+        vacancy = None
         if interview.vacancy_id is not None:
-            vacancy = await session.get(Vacancy, interview.vacancy_id)
+            vacancy = await entity_cache.get(session, Vacancy, interview.vacancy_id)
 
-        # Create system prompt
-        system_prompt = self._create_system_prompt(candidate, vacancy)
+        # Rendered once per candidate/vacancy version
+        system_prompt = await interview_prompt_service.get_system_prompt(
+            session, candidate, vacancy
+        )
 
         # Store system prompt as first message
         system_message = InterviewMessage(
@@ -353,12 +553,19 @@ class InterviewMessagesService:
             text=system_prompt,
             type=InterviewMessageType.SYSTEM,
         )
-        session.add(system_message)
-        await session.flush()
+
+        # No connection is held while waiting for the greeting
+        await self._end_read_phase(session)
 
         try:
-            # Get initial AI greeting
-            initial_greeting = await self._get_initial_greeting(system_prompt)
+            if interview.pending_greeting:
+                # Pre-generated in the background when the interview was created
+                initial_greeting = interview.pending_greeting
+            else:
+                # Get initial AI greeting; shares the system prompt prefix with
+                # the following turns
+                with gigachat_session(interview_id):
+                    initial_greeting = await self._get_initial_greeting(system_prompt)
 
             # Create initial AI message
             initial_message = InterviewMessage(
@@ -367,202 +574,81 @@ class InterviewMessagesService:
                 text=initial_greeting,
                 type=InterviewMessageType.ASSISTANT,
             )
-            session.add(initial_message)
 
         except Exception as e:
             logger.error(f"Failed to get initial greeting: {e}", exc_info=True)
             # Use fallback greeting
-            fallback_greeting = (
-                "Здравствуйте! Я виртуальный HR-ассистент. "
-                "Готовы начать интервью? Расскажите немного о себе."
-            )
             initial_message = InterviewMessage(
                 interview_id=interview_id,
                 index=1,
-                text=fallback_greeting,
+                text=FALLBACK_GREETING_TEXT,
                 type=InterviewMessageType.ASSISTANT,
             )
-            session.add(initial_message)
 
+        session.add_all([system_message, initial_message])
         # After first message, mark interview as in progress
         interview.state = "in_progress"
-        await session.commit()
+        interview.pending_greeting = None
+        interview.message_seq = 2
+        try:
+            await session.commit()
+        except IntegrityError as e:
+            await session.rollback()
+            raise ConflictError("Conversation already initialized") from e
 
-        # Return all messages
-        return await self.list_messages(session, interview_id)
+        messages = [system_message, initial_message]
+        self.conversations.set(interview_id, ConversationState(list(messages)))
+        return messages
 
-    def _create_system_prompt(
-        self, candidate: Candidate, vacancy: Vacancy | None
-    ) -> str:
-        """Create system prompt for the interview."""
-
-        # Helpers for safe extraction and formatting of fields
-        def to_list(value) -> list:
-            if value is None:
-                return []
-            if isinstance(value, list):
-                return value
-            if isinstance(value, str):
-                try:
-                    import json
-
-                    parsed = json.loads(value)
-                    return parsed if isinstance(parsed, list) else [value]
-                except Exception:
-                    return [item.strip() for item in value.split(",") if item.strip()]
-            return [str(value)]
-
-        def join_list(values: list) -> str:
-            if not values:
-                return "не указано"
-            return ", ".join(str(v) for v in values if v is not None and str(v).strip())
-
-        def format_experience(value) -> str:
-            items = to_list(value)
-            if not items:
-                return "не указано"
-            formatted = []
-            for item in items:
-                if isinstance(item, dict):
-                    company = item.get("company") or "?"
-                    position = item.get("position") or "?"
-                    years = item.get("years")
-                    years_str = f"{years} лет" if years not in (None, "") else "?"
-                    formatted.append(f"• {company}, {position}, {years_str}")
-                else:
-                    formatted.append(f"• {item}")
-            return "\n".join(formatted)
-
-        def format_education(value) -> str:
-            items = to_list(value)
-            if not items:
-                return "не указано"
-            formatted = []
-            for item in items:
-                if isinstance(item, dict):
-                    org = item.get("organization") or "?"
-                    spec = item.get("speciality") or "?"
-                    typ = item.get("type")
-                    if typ:
-                        formatted.append(f"• {org} — {spec} ({typ})")
-                    else:
-                        formatted.append(f"• {org} — {spec}")
-                else:
-                    formatted.append(f"• {item}")
-            return "\n".join(formatted)
-
-        def format_salary(min_val, max_val) -> str:
-            if min_val and max_val:
-                return f"{min_val}–{max_val}"
-            if min_val and not max_val:
-                return f"от {min_val}"
-            if max_val and not min_val:
-                return f"до {max_val}"
-            return "не указано"
-
-        # Candidate fields
-        c_name = getattr(candidate, "name", None) or "не указан"
-        c_email = getattr(candidate, "email", None) or "не указан"
-        c_position = getattr(candidate, "position", None) or "не указана"
-        c_status = getattr(candidate, "status", None) or "не указан"
-        c_geo = getattr(candidate, "geo", None) or "не указано"
-        c_employment_type = getattr(candidate, "employment_type", None) or "не указан"
-        c_skills = join_list(to_list(getattr(candidate, "skills", None)))
-        c_tech = join_list(to_list(getattr(candidate, "tech", None)))
-        c_experience_block = format_experience(getattr(candidate, "experience", None))
-        c_education_block = format_education(getattr(candidate, "education", None))
-
-        candidate_block = (
-            "Информация о кандидате:\n"
-            f"- Имя: {c_name}\n"
-            f"- Email: {c_email}\n"
-            f"- Позиция: {c_position}\n"
-            f"- Статус: {c_status}\n"
-            f"- Гео: {c_geo}\n"
-            f"- Тип занятости: {c_employment_type}\n"
-            f"- Навыки: {c_skills}\n"
-            f"- Техстек: {c_tech}\n"
-            f"- Опыт:\n{c_experience_block}\n"
-            f"- Образование:\n{c_education_block}\n"
-        )
+    async def prewarm_greeting(self, interview_id: str) -> str | None:
+        """Generate the greeting of a new interview ahead of time.
 
-        # Vacancy fields
-        if vacancy is not None:
-            v_title = getattr(vacancy, "title", None) or "не указана"
-            v_company = getattr(vacancy, "company", None) or "не указана"
-            v_location = getattr(vacancy, "location", None) or "не указана"
-            v_status = getattr(vacancy, "status", None) or "не указан"
-            v_employment_type = getattr(vacancy, "employment_type", None) or "не указан"
-            v_experience_level = (
-                getattr(vacancy, "experience_level", None) or "не указан"
-            )
-            v_salary = format_salary(
-                getattr(vacancy, "salary_min", None),
-                getattr(vacancy, "salary_max", None),
-            )
-            v_requirements = getattr(vacancy, "requirements", None) or "не указано"
-            v_benefits = getattr(vacancy, "benefits", None) or "не указано"
-            v_description = getattr(vacancy, "description", None) or "не указано"
-            v_domain = getattr(vacancy, "domain", None) or "не указан"
-            v_education = getattr(vacancy, "education", None) or "не указано"
-            v_company_info = getattr(vacancy, "company_info", None) or "не указано"
-            v_skills = join_list(to_list(getattr(vacancy, "skills", None)))
-            v_minor_skills = join_list(to_list(getattr(vacancy, "minor_skills", None)))
-            v_responsibilities = join_list(
-                to_list(getattr(vacancy, "responsibilities", None))
-            )
+        Runs in the background after the interview is created. The greeting is
+        stored as interview.pending_greeting for initialize_conversation.
+        """
+        try:
+            async with AsyncSessionLocal() as session:
+                interview = await session.get(Interview, interview_id)
+                if (
+                    not interview
+                    or interview.state != "initialized"
+                    or interview.pending_greeting
+                ):
+                    return None
+                candidate = await entity_cache.get(
+                    session, Candidate, interview.candidate_id
+                )
+                if not candidate:
+                    return None
+                vacancy = None
+                if interview.vacancy_id is not None:
+                    vacancy = await entity_cache.get(
+                        session, Vacancy, interview.vacancy_id
+                    )
+                system_prompt = await interview_prompt_service.get_system_prompt(
+                    session, candidate, vacancy
+                )
+                await session.commit()
+
+            # No connection is held while waiting for GigaChat
+            with gigachat_session(interview_id):
+                greeting = await self._get_initial_greeting(system_prompt)
+
+            async with AsyncSessionLocal() as session:
+                # Skip if the interview was initialized in the meantime
+                await session.execute(
+                    update(Interview)
+                    .where(Interview.id == interview_id)
+                    .where(Interview.state == "initialized")
+                    .values(pending_greeting=greeting)
+                )
+                await session.commit()
 
-            vacancy_block = (
-                "Информация о вакансии:\n"
-                f"- Название: {v_title}\n"
-                f"- Компания: {v_company}\n"
-                f"- Локация: {v_location}\n"
-                f"- Статус вакансии: {v_status}\n"
-                f"- Уровень: {v_experience_level}\n"
-                f"- Тип занятости: {v_employment_type}\n"
-                f"- Зарплата: {v_salary}\n"
-                f"- Навыки: {v_skills}\n"
-                f"- Доп. навыки: {v_minor_skills}\n"
-                f"- Обязанности: {v_responsibilities}\n"
-                f"- Домен: {v_domain}\n"
-                f"- Требования (текст): {v_requirements}\n"
-                f"- Бенефиты: {v_benefits}\n"
-                f"- Образование: {v_education}\n"
-                f"- Описание: {v_description}\n"
-                f"- Информация о компании: {v_company_info}\n"
-            )
-        else:
-            vacancy_block = "Вакансия не указана"
-
-        return f"""
-Ты — ассистент HR. Проводишь первичное интервью с кандидатом.
-
-Твоя цель:
-- собрать краткую информацию о кандидате,
-- оценить его профессиональный опыт,
-- проверить знания и умения, специфичные для вакансии,
-- оценить коммуникацию и общую культуру
-
-Правила интервью:
-1. Всегда начинай с приветствия и короткого объяснения формата (несколько вопросов).
-2. Сначала задавай вопросы и получай ответы. Используй стиль живого интервью.
-3. НЕ завершай интервью и НЕ вызывай функцию finish_interview, пока:
-   - не уточнишь опыт работы и проекты,
-   - не проверишь знания ключевых технологий,
-   - не спросишь о мотивации и ожиданиях,
-   - не оценишь soft skills (коммуникацию, культуру),
-   - кандидат не ответит на все вопросы, перечисленные выше.
-4. Если кандидат забывает ответить на твой вопрос — повтори его.
-5. Ты ведёшь интервью ТОЛЬКО со своей стороны. НИКОГДА не пиши ответы за кандидата. Все ответы кандидата вводятся пользователем. Если информации не хватает — задай уточняющий вопрос, но не придумывай ответ.
-6. Только когда собрана вся информация, сделай вывод и вызови finish_interview.
-7. Твоё финальное сообщение с вызовом функции finish_interview должно быть коротким (до 100 символов) и не содержать информации о твоих намерениях относительно кандидата. Только прощание и обещание скорого фидбека.
-
-Очень важно: не переходи к финальному шагу раньше времени. Сначала проведи полноценное интервью!
-
-{candidate_block}
-
-{vacancy_block}
-"""
+            logger.info(f"Pre-generated greeting for interview {interview_id}")
+            return greeting
+        except Exception as e:
+            logger.warning(f"Failed to pre-generate greeting for {interview_id}: {e}")
+            return None
 
     async def _get_initial_greeting(self, system_prompt: str) -> str:
         """Get initial greeting from GigaChat."""
@@ -0,0 +1,267 @@
+"""
+Interview system prompts.
+
+The system prompt depends only on the candidate and vacancy, so it is
+rendered once per (candidate, vacancy) version and stored in the
+interview_prompt_template table, with an in-process LRU in front of it. The
+cache key includes both records' ``updated_at``, so editing either one
+produces a new prompt without explicit invalidation; storing it drops the
+prompts of the pair's older versions.
+"""
+
+import hashlib
+import logging
+from datetime import datetime
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.models.candidate import Candidate
+from app.models.interview_prompt import InterviewPromptTemplate
+from app.models.vacancy import Vacancy
+
+logger = logging.getLogger(__name__)
+
+# Bump when build_system_prompt changes to stop serving stored prompts
+PROMPT_TEMPLATE_VERSION = 1
+
+
+def build_system_prompt(candidate: Candidate, vacancy: Vacancy | None) -> str:
+    """Render the interview system prompt from candidate and vacancy fields."""
+
+    # Helpers for safe extraction and formatting of fields
+    def to_list(value) -> list:
+        if value is None:
+            return []
+        if isinstance(value, list):
+            return value
+        if isinstance(value, str):
+            try:
+                import json
+
+                parsed = json.loads(value)
+                return parsed if isinstance(parsed, list) else [value]
+            except Exception:
+                return [item.strip() for item in value.split(",") if item.strip()]
+        return [str(value)]
+
+    def join_list(values: list) -> str:
+        if not values:
+            return "не указано"
+        return ", ".join(str(v) for v in values if v is not None and str(v).strip())
+
+    def format_experience(value) -> str:
+        items = to_list(value)
+        if not items:
+            return "не указано"
+        formatted = []
+        for item in items:
+            if isinstance(item, dict):
+                company = item.get("company") or "?"
+                position = item.get("position") or "?"
+                years = item.get("years")
+                years_str = f"{years} лет" if years not in (None, "") else "?"
+                formatted.append(f"• {company}, {position}, {years_str}")
+            else:
+                formatted.append(f"• {item}")
+        return "\n".join(formatted)
+
+    def format_education(value) -> str:
+        items = to_list(value)
+        if not items:
+            return "не указано"
+        formatted = []
+        for item in items:
+            if isinstance(item, dict):
+                org = item.get("organization") or "?"
+                spec = item.get("speciality") or "?"
+                typ = item.get("type")
+                if typ:
+                    formatted.append(f"• {org} — {spec} ({typ})")
+                else:
+                    formatted.append(f"• {org} — {spec}")
+            else:
+                formatted.append(f"• {item}")
+        return "\n".join(formatted)
+
+    def format_salary(min_val, max_val) -> str:
+        if min_val and max_val:
+            return f"{min_val}–{max_val}"
+        if min_val and not max_val:
+            return f"от {min_val}"
+        if max_val and not min_val:
+            return f"до {max_val}"
+        return "не указано"
+
+    # Candidate fields
+    c_name = getattr(candidate, "name", None) or "не указан"
+    c_email = getattr(candidate, "email", None) or "не указан"
+    c_position = getattr(candidate, "position", None) or "не указана"
+    c_status = getattr(candidate, "status", None) or "не указан"
+    c_geo = getattr(candidate, "geo", None) or "не указано"
+    c_employment_type = getattr(candidate, "employment_type", None) or "не указан"
+    c_skills = join_list(to_list(getattr(candidate, "skills", None)))
+    c_tech = join_list(to_list(getattr(candidate, "tech", None)))
+    c_experience_block = format_experience(getattr(candidate, "experience", None))
+    c_education_block = format_education(getattr(candidate, "education", None))
+
+    candidate_block = (
+        "Информация о кандидате:\n"
+        f"- Имя: {c_name}\n"
+        f"- Email: {c_email}\n"
+        f"- Позиция: {c_position}\n"
+        f"- Статус: {c_status}\n"
+        f"- Гео: {c_geo}\n"
+        f"- Тип занятости: {c_employment_type}\n"
+        f"- Навыки: {c_skills}\n"
+        f"- Техстек: {c_tech}\n"
+        f"- Опыт:\n{c_experience_block}\n"
+        f"- Образование:\n{c_education_block}\n"
+    )
+
+    # Vacancy fields
+    if vacancy is not None:
+        v_title = getattr(vacancy, "title", None) or "не указана"
+        v_company = getattr(vacancy, "company", None) or "не указана"
+        v_location = getattr(vacancy, "location", None) or "не указана"
+        v_status = getattr(vacancy, "status", None) or "не указан"
+        v_employment_type = getattr(vacancy, "employment_type", None) or "не указан"
+        v_experience_level = getattr(vacancy, "experience_level", None) or "не указан"
+        v_salary = format_salary(
+            getattr(vacancy, "salary_min", None),
+            getattr(vacancy, "salary_max", None),
+        )
+        v_requirements = getattr(vacancy, "requirements", None) or "не указано"
+        v_benefits = getattr(vacancy, "benefits", None) or "не указано"
+        v_description = getattr(vacancy, "description", None) or "не указано"
+        v_domain = getattr(vacancy, "domain", None) or "не указан"
+        v_education = getattr(vacancy, "education", None) or "не указано"
+        v_company_info = getattr(vacancy, "company_info", None) or "не указано"
+        v_skills = join_list(to_list(getattr(vacancy, "skills", None)))
+        v_minor_skills = join_list(to_list(getattr(vacancy, "minor_skills", None)))
+        v_responsibilities = join_list(
+            to_list(getattr(vacancy, "responsibilities", None))
+        )
+
+        vacancy_block = (
+            "Информация о вакансии:\n"
+            f"- Название: {v_title}\n"
+            f"- Компания: {v_company}\n"
+            f"- Локация: {v_location}\n"
+            f"- Статус вакансии: {v_status}\n"
+            f"- Уровень: {v_experience_level}\n"
+            f"- Тип занятости: {v_employment_type}\n"
+            f"- Зарплата: {v_salary}\n"
+            f"- Навыки: {v_skills}\n"
+            f"- Доп. навыки: {v_minor_skills}\n"
+            f"- Обязанности: {v_responsibilities}\n"
+            f"- Домен: {v_domain}\n"
+            f"- Требования (текст): {v_requirements}\n"
+            f"- Бенефиты: {v_benefits}\n"
+            f"- Образование: {v_education}\n"
+            f"- Описание: {v_description}\n"
+            f"- Информация о компании: {v_company_info}\n"
+        )
+    else:
+        vacancy_block = "Вакансия не указана"
+
+    return f"""
+Ты — ассистент HR. Проводишь первичное интервью с кандидатом.
+
+Твоя цель:
+- собрать краткую информацию о кандидате,
+- оценить его профессиональный опыт,
+- проверить знания и умения, специфичные для вакансии,
+- оценить коммуникацию и общую культуру
+
+Правила интервью:
+1. Всегда начинай с приветствия и короткого объяснения формата (несколько вопросов).
+2. Сначала задавай вопросы и получай ответы. Используй стиль живого интервью.
+3. НЕ завершай интервью и НЕ вызывай функцию finish_interview, пока:
+   - не уточнишь опыт работы и проекты,
+   - не проверишь знания ключевых технологий,
+   - не спросишь о мотивации и ожиданиях,
+   - не оценишь soft skills (коммуникацию, культуру),
+   - кандидат не ответит на все вопросы, перечисленные выше.
+4. Если кандидат забывает ответить на твой вопрос — повтори его.
+5. Ты ведёшь интервью ТОЛЬКО со своей стороны. НИКОГДА не пиши ответы за кандидата. Все ответы кандидата вводятся пользователем. Если информации не хватает — задай уточняющий вопрос, но не придумывай ответ.
+6. Только когда собрана вся информация, сделай вывод и вызови finish_interview.
+7. Твоё финальное сообщение с вызовом функции finish_interview должно быть коротким (до 100 символов) и не содержать информации о твоих намерениях относительно кандидата. Только прощание и обещание скорого фидбека.
+
+Очень важно: не переходи к финальному шагу раньше времени. Сначала проведи полноценное интервью!
+
+{candidate_block}
+
+{vacancy_block}
+"""
+
+
+def _timestamp(value: datetime | None) -> str:
+    return value.isoformat() if value else "-"
+
+
+def prompt_cache_key(candidate: Candidate, vacancy: Vacancy | None) -> str:
+    parts = [
+        str(PROMPT_TEMPLATE_VERSION),
+        str(candidate.id),
+        _timestamp(candidate.updated_at),
+        str(vacancy.id) if vacancy else "-",
+        _timestamp(vacancy.updated_at) if vacancy else "-",
+    ]
+    return hashlib.sha256(":".join(parts).encode("utf-8")).hexdigest()
+
+
+class InterviewPromptService:
+    """Serves rendered system prompts per (candidate, vacancy) version."""
+
+    def __init__(self, cache_size: int = settings.prompt_template_cache_size):
+        self.cache: LRUCache[str, str] = LRUCache(cache_size)
+
+    async def get_system_prompt(
+        self, session: AsyncSession, candidate: Candidate, vacancy: Vacancy | None
+    ) -> str:
+        key = prompt_cache_key(candidate, vacancy)
+        prompt = self.cache.get(key)
+        if prompt is not None:
+            return prompt
+
+        prompt = await session.scalar(
+            select(InterviewPromptTemplate.prompt).where(
+                InterviewPromptTemplate.cache_key == key
+            )
+        )
+        if prompt is None:
+            prompt = build_system_prompt(candidate, vacancy)
+            await session.execute(
+                insert(InterviewPromptTemplate)
+                .values(
+                    cache_key=key,
+                    candidate_id=candidate.id,
+                    vacancy_id=vacancy.id if vacancy else None,
+                    prompt=prompt,
+                )
+                .on_conflict_do_nothing(index_elements=["cache_key"])
+            )
+            # Prompts of older versions of the pair are never served again
+            await session.execute(
+                delete(InterviewPromptTemplate).where(
+                    InterviewPromptTemplate.candidate_id == candidate.id,
+                    (
+                        InterviewPromptTemplate.vacancy_id == vacancy.id
+                        if vacancy
+                        else InterviewPromptTemplate.vacancy_id.is_(None)
+                    ),
+                    InterviewPromptTemplate.cache_key != key,
+                )
+            )
+            logger.info("Stored system prompt for candidate %s", candidate.id)
+
+        self.cache.set(key, prompt)
+        return prompt
+
+
+# Global instance
+interview_prompt_service = InterviewPromptService()
@@ -0,0 +1,261 @@
+"""
+Interview WebSocket session state.
+
+A session is keyed by ``{prefix}{interview_id}`` and keeps everything needed
+to resume it after a reconnect: the wall-clock start, audio marker timings,
+the fragment index and the location of the spooled media. Every connection
+spools to a segment file of its own, since a reconnecting browser starts a
+new WebM stream; the segments are concatenated when the video is saved.
+The state lives in a pluggable store: an in-memory one for a single worker,
+or the ``interview_ws_session`` table when WebSockets are spread over
+several workers or pods (the spool directory must then be a shared volume).
+An open connection saves its state periodically, so it never expires.
+"""
+
+import asyncio
+import glob
+import logging
+import time
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.interview_session import InterviewWsSession
+from app.services.recordings import RECORDINGS_DIR
+
+logger = logging.getLogger(__name__)
+
+
+def make_session_key(interview_id: str, prefix: str = "") -> str:
+    return f"{prefix}{interview_id}" if prefix else interview_id
+
+
+@dataclass
+class InterviewSessionState:
+    session_key: str
+    interview_id: str
+    prefix: str
+    started_at: float
+    spool_path: str
+    audio_marker_timings: List[int] = field(default_factory=list)
+    fragment_index: int = 0
+
+    @classmethod
+    def new(
+        cls, interview_id: str, prefix: str, spool_dir: Path
+    ) -> "InterviewSessionState":
+        session_key = make_session_key(interview_id, prefix)
+        return cls(
+            session_key=session_key,
+            interview_id=interview_id,
+            prefix=prefix,
+            started_at=time.time(),
+            spool_path=str(spool_dir / f"{session_key}.spool.webm"),
+        )
+
+    def elapsed_ms(self) -> int:
+        return int((time.time() - self.started_at) * 1000)
+
+    def _numbered_segments(self) -> List[Tuple[int, Path]]:
+        spool = Path(self.spool_path)
+        stem = spool.name.removesuffix(".webm")
+        segments = []
+        for path in spool.parent.glob(f"{glob.escape(stem)}.*.webm"):
+            number = path.name[len(stem) + 1 : -len(".webm")]
+            if number.isdigit():
+                segments.append((int(number), path))
+        return sorted(segments)
+
+    def spool_segments(self) -> List[Path]:
+        """Spooled media files in connection order."""
+        spool = Path(self.spool_path)
+        # Sessions spooled before segments wrote to spool_path itself
+        legacy = [spool] if spool.exists() else []
+        return legacy + [path for _, path in self._numbered_segments()]
+
+    def new_spool_segment(self) -> Path:
+        """Path of the segment a new connection spools to."""
+        segments = self._numbered_segments()
+        number = segments[-1][0] + 1 if segments else 0
+        spool = Path(self.spool_path)
+        return spool.with_name(f"{spool.name.removesuffix('.webm')}.{number}.webm")
+
+
+class MemorySessionStore:
+    """Session store for a single worker process."""
+
+    def __init__(self):
+        self._states: Dict[str, Tuple[InterviewSessionState, float]] = {}
+
+    @staticmethod
+    def _copy(state: InterviewSessionState) -> InterviewSessionState:
+        return replace(state, audio_marker_timings=list(state.audio_marker_timings))
+
+    async def load(self, session_key: str) -> Optional[InterviewSessionState]:
+        entry = self._states.get(session_key)
+        return self._copy(entry[0]) if entry else None
+
+    async def save(self, state: InterviewSessionState) -> None:
+        self._states[state.session_key] = (self._copy(state), time.time())
+
+    async def pop_expired(self, ttl_seconds: int) -> List[InterviewSessionState]:
+        cutoff = time.time() - ttl_seconds
+        expired = [
+            key for key, (_, updated_at) in self._states.items() if updated_at < cutoff
+        ]
+        return [self._states.pop(key)[0] for key in expired]
+
+
+class PostgresSessionStore:
+    """Session store shared by all workers through the interview_ws_session table."""
+
+    def __init__(self, session_factory: Callable = AsyncSessionLocal):
+        self.session_factory = session_factory
+
+    @staticmethod
+    def _to_state(row: InterviewWsSession) -> InterviewSessionState:
+        return InterviewSessionState(
+            session_key=row.session_key,
+            interview_id=row.interview_id,
+            prefix=row.prefix,
+            started_at=row.started_at,
+            spool_path=row.spool_path,
+            audio_marker_timings=list(row.audio_marker_timings or []),
+            fragment_index=row.fragment_index,
+        )
+
+    async def load(self, session_key: str) -> Optional[InterviewSessionState]:
+        async with self.session_factory() as session:
+            row = await session.get(InterviewWsSession, session_key)
+            return self._to_state(row) if row else None
+
+    async def save(self, state: InterviewSessionState) -> None:
+        values = {
+            "session_key": state.session_key,
+            "interview_id": state.interview_id,
+            "prefix": state.prefix,
+            "started_at": state.started_at,
+            "spool_path": state.spool_path,
+            "audio_marker_timings": state.audio_marker_timings,
+            "fragment_index": state.fragment_index,
+            "updated_at": datetime.now(),
+        }
+        stmt = insert(InterviewWsSession).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[InterviewWsSession.session_key],
+            set_={k: v for k, v in values.items() if k != "session_key"},
+        )
+        async with self.session_factory() as session:
+            await session.execute(stmt)
+            await session.commit()
+
+    async def pop_expired(self, ttl_seconds: int) -> List[InterviewSessionState]:
+        cutoff = datetime.now() - timedelta(seconds=ttl_seconds)
+        async with self.session_factory() as session:
+            result = await session.execute(
+                delete(InterviewWsSession)
+                .where(InterviewWsSession.updated_at < cutoff)
+                .returning(InterviewWsSession)
+            )
+            states = [self._to_state(row) for row in result.scalars().all()]
+            await session.commit()
+            return states
+
+
+class InterviewSessionRegistry:
+    """Loads, persists and expires interview WebSocket session state."""
+
+    def __init__(self, store, spool_dir: Path, ttl_seconds: int):
+        self.store = store
+        self.spool_dir = Path(spool_dir)
+        self.ttl_seconds = ttl_seconds
+
+    async def acquire(
+        self, interview_id: str, prefix: str = ""
+    ) -> InterviewSessionState:
+        """Resume the session from the store or start a new one."""
+        await self.purge_expired()
+
+        session_key = make_session_key(interview_id, prefix)
+        state = await self.store.load(session_key)
+        if state is None:
+            state = InterviewSessionState.new(interview_id, prefix, self.spool_dir)
+            logger.info("Started interview session %s", session_key)
+        else:
+            logger.info(
+                "Resumed interview session %s (%d markers)",
+                session_key,
+                len(state.audio_marker_timings),
+            )
+        await self.store.save(state)
+        return state
+
+    async def save(self, state: InterviewSessionState) -> None:
+        await self.store.save(state)
+
+    async def keep_alive(self, state: InterviewSessionState) -> None:
+        """Save the state of a connected session until cancelled.
+
+        Markers may be far apart; without this, another connection's
+        purge_expired would drop a live session and its spool segments.
+        """
+        interval = max(self.ttl_seconds / 3, 1)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.store.save(state)
+            except Exception as e:
+                logger.warning(
+                    "Failed to refresh interview session %s: %s", state.session_key, e
+                )
+
+    async def purge_expired(self) -> int:
+        """Drop sessions idle for longer than the TTL along with their spool files."""
+        expired = await self.store.pop_expired(self.ttl_seconds)
+        for state in expired:
+            for segment in state.spool_segments():
+                segment.unlink(missing_ok=True)
+            logger.info("Expired interview session %s", state.session_key)
+        return len(expired)
+
+    async def purge_abandoned(self) -> int:
+        """Drop expired sessions and the spool files of sessions no longer stored.
+
+        Run at startup: the in-memory store forgets every session on restart,
+        which would leave their spool files behind for good.
+        """
+        await self.purge_expired()
+        stored: Dict[str, bool] = {}
+        removed = 0
+        for path in self.spool_dir.glob("*.spool*.webm"):
+            session_key = path.name.rpartition(".spool.")[0]
+            if not session_key:
+                continue
+            if session_key not in stored:
+                stored[session_key] = await self.store.load(session_key) is not None
+            if not stored[session_key]:
+                path.unlink(missing_ok=True)
+                removed += 1
+        if removed:
+            logger.info("Removed %d spool files of abandoned sessions", removed)
+        return removed
+
+
+def _create_store():
+    if settings.interview_session_backend == "postgres":
+        return PostgresSessionStore()
+    return MemorySessionStore()
+
+
+# Global instance
+interview_session_registry = InterviewSessionRegistry(
+    _create_store(),
+    RECORDINGS_DIR,
+    settings.interview_session_ttl_seconds,
+)
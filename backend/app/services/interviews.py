@@ -1,4 +1,6 @@
 import logging
+from typing import AsyncIterator
+
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -43,6 +45,11 @@ async def create_interview(
     return interview
 
 
+async def prewarm_interview_greeting(interview_id: str) -> None:
+    """Pre-generate the greeting of a new interview (background task)."""
+    await interview_messages_service.prewarm_greeting(interview_id)
+
+
 async def list_interviews(session: AsyncSession) -> list[Interview]:
     result = await session.scalars(
         select(Interview).order_by(Interview.created_at.desc())
@@ -138,6 +145,13 @@ async def create_interview_message(
     )
 
 
+def stream_interview_message(
+    session: AsyncSession, interview_id: str, payload: InterviewMessageCreateRequest
+) -> AsyncIterator[str]:
+    """Create a new user message and stream the AI response text."""
+    return interview_messages_service.stream_message(session, interview_id, payload)
+
+
 # Interview notes
 async def list_notes(
     session: AsyncSession, interview_id: str, *, limit: int = 10, offset: int = 0
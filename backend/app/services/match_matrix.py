@@ -0,0 +1,470 @@
+"""
+Precomputed candidate×vacancy match matrix.
+
+The candidate_vacancy_match table holds the embedding similarity, LLM skills
+percentage and overall score of every embedded candidate against every open
+vacancy, so top-k lists are an indexed ``ORDER BY overall_score LIMIT k``. A
+background worker refreshes the rows of a candidate or vacancy after it
+changes; the skills LLM call is skipped while both skill lists stay the same.
+Similarities are chunk-aware like the compatibility report's, so a stored
+score equals the one the report shows.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from enum import StrEnum
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, exists, func, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, engine
+from app.models.candidate import Candidate
+from app.models.candidate_vacancy_match import CandidateVacancyMatch
+from app.models.embedding import CandidateEmbedding, VacancyEmbedding
+from app.models.vacancy import Vacancy
+from app.services.compatibility_service import compatibility_service
+from app.services.embedding_service import active_generation, embedding_service
+from app.services.search_filters import CandidateFilters, VacancyFilters
+
+logger = logging.getLogger(__name__)
+
+OPEN_VACANCY_STATUS = "open"
+UPSERT_BATCH_SIZE = 500
+# Application-wide key of the advisory lock held by a rebuilding worker
+REBUILD_LOCK_KEY = 0x6D61746368
+
+
+class MatchTarget(StrEnum):
+    CANDIDATE = "candidate"
+    VACANCY = "vacancy"
+
+
+@dataclass(frozen=True)
+class MatchUpdate:
+    target: MatchTarget
+    target_id: Any
+
+
+def skills_fingerprint(candidate: Candidate, vacancy: Vacancy) -> str:
+    parts = [
+        candidate.skills,
+        candidate.tech,
+        vacancy.skills,
+        vacancy.minor_skills,
+    ]
+    payload = json.dumps(parts, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MatchMatrixService:
+    """Maintains candidate_vacancy_match and serves top-k lists from it."""
+
+    def __init__(
+        self,
+        session_factory: Callable = AsyncSessionLocal,
+        connect: Callable = engine.connect,
+    ):
+        self.session_factory = session_factory
+        self.connect = connect
+        self._queue: asyncio.Queue[MatchUpdate] | None = None
+        self._worker: asyncio.Task | None = None
+        self._queued: Set[MatchUpdate] = set()
+
+    def enqueue_candidate(self, candidate_id: str) -> None:
+        """Schedule a refresh of the candidate's matches against open vacancies."""
+        self._enqueue(MatchUpdate(MatchTarget.CANDIDATE, candidate_id))
+
+    def enqueue_vacancy(self, vacancy_id: int) -> None:
+        """Schedule a refresh of the vacancy's matches against all candidates."""
+        self._enqueue(MatchUpdate(MatchTarget.VACANCY, vacancy_id))
+
+    def _enqueue(self, update: MatchUpdate) -> None:
+        if not settings.match_matrix_enabled or update in self._queued:
+            return
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+        self._queued.add(update)
+        self._queue.put_nowait(update)
+
+    async def drain(self) -> None:
+        """Wait until every queued refresh has been processed."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def _run(self) -> None:
+        while True:
+            update = await self._queue.get()
+            # Changes arriving from now on need another pass
+            self._queued.discard(update)
+            try:
+                if update.target == MatchTarget.CANDIDATE:
+                    await self.refresh_candidate(update.target_id)
+                else:
+                    await self.refresh_vacancy(update.target_id)
+            except Exception as e:
+                logger.error(
+                    "Failed to refresh matches of %s %s: %s",
+                    update.target.value,
+                    update.target_id,
+                    e,
+                    exc_info=True,
+                )
+            finally:
+                self._queue.task_done()
+
+    async def rebuild(self) -> int:
+        """Refresh matches missing or older than the last change.
+
+        Covers open vacancies and candidates whose queued refresh was lost in
+        a restart; returns the number of refreshes scheduled. One worker at a
+        time rebuilds: it holds an advisory lock until its refreshes are done,
+        and the other workers skip the rebuild meanwhile.
+        """
+        async with self.connect() as connection:
+            locked = await connection.scalar(
+                select(func.pg_try_advisory_lock(REBUILD_LOCK_KEY))
+            )
+            if not locked:
+                logger.info("Match matrix is rebuilt by another worker")
+                return 0
+            # The lock outlives the transaction; the connection is not left
+            # idle in one
+            await connection.commit()
+            try:
+                scheduled = await self._schedule_stale()
+                await self.drain()
+                return scheduled
+            finally:
+                await connection.scalar(
+                    select(func.pg_advisory_unlock(REBUILD_LOCK_KEY))
+                )
+                await connection.commit()
+
+    async def _schedule_stale(self) -> int:
+        async with self.session_factory() as session:
+            vacancy_ids = list(
+                await session.scalars(
+                    self._stale(
+                        Vacancy, VacancyEmbedding, CandidateVacancyMatch.vacancy_id
+                    ).where(Vacancy.status == OPEN_VACANCY_STATUS)
+                )
+            )
+            open_vacancies = await session.scalar(
+                select(exists().where(Vacancy.status == OPEN_VACANCY_STATUS))
+            )
+            # Without open vacancies no candidate has matches to refresh
+            candidate_ids = (
+                list(
+                    await session.scalars(
+                        self._stale(
+                            Candidate,
+                            CandidateEmbedding,
+                            CandidateVacancyMatch.candidate_id,
+                        )
+                    )
+                )
+                if open_vacancies
+                else []
+            )
+        for vacancy_id in vacancy_ids:
+            self.enqueue_vacancy(vacancy_id)
+        for candidate_id in candidate_ids:
+            self.enqueue_candidate(candidate_id)
+        if vacancy_ids or candidate_ids:
+            logger.info(
+                "Scheduled match refreshes of %d vacancies and %d candidates",
+                len(vacancy_ids),
+                len(candidate_ids),
+            )
+        return len(vacancy_ids) + len(candidate_ids)
+
+    @staticmethod
+    def _stale(model, embedding_model, match_column):
+        """Ids of embedded entities without matches or changed since computed."""
+        entity_column = (
+            embedding_model.vacancy_id
+            if model is Vacancy
+            else embedding_model.candidate_id
+        )
+        computed = (
+            select(
+                match_column.label("entity_id"),
+                func.min(CandidateVacancyMatch.computed_at).label("computed_at"),
+            )
+            .group_by(match_column)
+            .subquery()
+        )
+        return (
+            select(model.id)
+            .join(embedding_model, entity_column == model.id)
+            .outerjoin(computed, computed.c.entity_id == model.id)
+            .where(embedding_model.generation == active_generation())
+            .where(
+                or_(
+                    computed.c.computed_at.is_(None),
+                    computed.c.computed_at
+                    < func.greatest(model.updated_at, embedding_model.updated_at),
+                )
+            )
+        )
+
+    async def refresh_candidate(self, candidate_id: str) -> int:
+        """Recompute the candidate's matches; returns the number of rows stored."""
+        async with self.session_factory() as session:
+            candidate = await session.get(Candidate, candidate_id)
+            embedded = await session.scalar(
+                select(
+                    exists().where(
+                        CandidateEmbedding.candidate_id == candidate_id,
+                        CandidateEmbedding.generation == active_generation(),
+                    )
+                )
+            )
+            if candidate is None or not embedded:
+                await self._replace(
+                    session, CandidateVacancyMatch.candidate_id == candidate_id, []
+                )
+                return 0
+
+            vacancies = (
+                await session.scalars(
+                    select(Vacancy).where(Vacancy.status == OPEN_VACANCY_STATUS)
+                )
+            ).all()
+            similarities = await embedding_service.similarities_by_ids(
+                session, [(candidate_id, vacancy.id) for vacancy in vacancies]
+            )
+            existing = await self._existing(
+                session, CandidateVacancyMatch.candidate_id == candidate_id
+            )
+            # No connection is held during the skills LLM calls
+            await session.commit()
+
+        rows = []
+        for vacancy in vacancies:
+            similarity = similarities.get((candidate_id, vacancy.id))
+            if similarity is None:
+                continue
+            row = await self._score(
+                candidate,
+                vacancy,
+                similarity,
+                existing.get((vacancy.id, candidate_id)),
+            )
+            if row is not None:
+                rows.append(row)
+
+        async with self.session_factory() as session:
+            await self._replace(
+                session, CandidateVacancyMatch.candidate_id == candidate_id, rows
+            )
+        logger.info("Refreshed %d matches of candidate %s", len(rows), candidate_id)
+        return len(rows)
+
+    async def refresh_vacancy(self, vacancy_id: int) -> int:
+        """Recompute the vacancy's matches; closed vacancies lose theirs."""
+        async with self.session_factory() as session:
+            vacancy = await session.get(Vacancy, vacancy_id)
+            embedded = await session.scalar(
+                select(
+                    exists().where(
+                        VacancyEmbedding.vacancy_id == vacancy_id,
+                        VacancyEmbedding.generation == active_generation(),
+                    )
+                )
+            )
+            if vacancy is None or vacancy.status != OPEN_VACANCY_STATUS or not embedded:
+                await self._replace(
+                    session, CandidateVacancyMatch.vacancy_id == vacancy_id, []
+                )
+                return 0
+
+            candidates = (
+                await session.scalars(
+                    select(Candidate)
+                    .join(
+                        CandidateEmbedding,
+                        CandidateEmbedding.candidate_id == Candidate.id,
+                    )
+                    .where(CandidateEmbedding.generation == active_generation())
+                )
+            ).all()
+            similarities = await embedding_service.similarities_by_ids(
+                session, [(candidate.id, vacancy_id) for candidate in candidates]
+            )
+            existing = await self._existing(
+                session, CandidateVacancyMatch.vacancy_id == vacancy_id
+            )
+            await session.commit()
+
+        rows = []
+        for candidate in candidates:
+            similarity = similarities.get((candidate.id, vacancy_id))
+            if similarity is None:
+                continue
+            row = await self._score(
+                candidate,
+                vacancy,
+                similarity,
+                existing.get((vacancy_id, candidate.id)),
+            )
+            if row is not None:
+                rows.append(row)
+
+        async with self.session_factory() as session:
+            await self._replace(
+                session, CandidateVacancyMatch.vacancy_id == vacancy_id, rows
+            )
+        logger.info("Refreshed %d matches of vacancy %s", len(rows), vacancy_id)
+        return len(rows)
+
+    @staticmethod
+    async def _existing(
+        session: AsyncSession, condition
+    ) -> Dict[Tuple[int, str], CandidateVacancyMatch]:
+        matches = await session.scalars(select(CandidateVacancyMatch).where(condition))
+        return {(m.vacancy_id, m.candidate_id): m for m in matches}
+
+    async def _score(
+        self,
+        candidate: Candidate,
+        vacancy: Vacancy,
+        similarity: float,
+        existing: Optional[CandidateVacancyMatch],
+    ) -> Optional[Dict[str, Any]]:
+        fingerprint = skills_fingerprint(candidate, vacancy)
+        if existing is not None and existing.skills_fingerprint == fingerprint:
+            skills_pct = existing.skills_pct
+        else:
+            try:
+                skills_pct = await asyncio.to_thread(
+                    compatibility_service.skills_match_percentage, candidate, vacancy
+                )
+            except Exception as e:
+                logger.warning(
+                    "Skills match of candidate %s and vacancy %s failed: %s",
+                    candidate.id,
+                    vacancy.id,
+                    e,
+                )
+                if existing is None:
+                    return None
+                # Keep the previous percentage; the old fingerprint forces a retry
+                skills_pct = existing.skills_pct
+                fingerprint = existing.skills_fingerprint
+
+        return {
+            "vacancy_id": vacancy.id,
+            "candidate_id": candidate.id,
+            "embedding_similarity": similarity,
+            "skills_pct": skills_pct,
+            "overall_score": compatibility_service.overall_score(
+                similarity, skills_pct
+            ),
+            "skills_fingerprint": fingerprint,
+        }
+
+    @staticmethod
+    async def _replace(
+        session: AsyncSession, condition, rows: List[Dict[str, Any]]
+    ) -> None:
+        """Upsert rows and drop the other matches selected by condition."""
+        stale = delete(CandidateVacancyMatch).where(condition)
+        if rows:
+            stale = stale.where(
+                tuple_(
+                    CandidateVacancyMatch.vacancy_id,
+                    CandidateVacancyMatch.candidate_id,
+                ).not_in([(row["vacancy_id"], row["candidate_id"]) for row in rows])
+            )
+        await session.execute(stale)
+
+        for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+            stmt = insert(CandidateVacancyMatch).values(
+                rows[start : start + UPSERT_BATCH_SIZE]
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[
+                    CandidateVacancyMatch.vacancy_id,
+                    CandidateVacancyMatch.candidate_id,
+                ],
+                set_={
+                    "embedding_similarity": stmt.excluded.embedding_similarity,
+                    "skills_pct": stmt.excluded.skills_pct,
+                    "overall_score": stmt.excluded.overall_score,
+                    "skills_fingerprint": stmt.excluded.skills_fingerprint,
+                    "computed_at": stmt.excluded.computed_at,
+                },
+            )
+            await session.execute(stmt)
+        await session.commit()
+
+    @staticmethod
+    async def has_vacancy_matches(session: AsyncSession, vacancy_id: int) -> bool:
+        """Whether the vacancy's matches are computed, regardless of filters."""
+        return await session.scalar(
+            select(exists().where(CandidateVacancyMatch.vacancy_id == vacancy_id))
+        )
+
+    @staticmethod
+    async def has_candidate_matches(session: AsyncSession, candidate_id: str) -> bool:
+        """Whether the candidate's matches are computed, regardless of filters."""
+        return await session.scalar(
+            select(exists().where(CandidateVacancyMatch.candidate_id == candidate_id))
+        )
+
+    async def top_candidates(
+        self,
+        session: AsyncSession,
+        vacancy_id: int,
+        limit: int,
+        filters: Optional[CandidateFilters] = None,
+    ) -> List[Tuple[CandidateVacancyMatch, Candidate]]:
+        result = await session.execute(
+            select(CandidateVacancyMatch, Candidate)
+            .join(Candidate, Candidate.id == CandidateVacancyMatch.candidate_id)
+            .where(CandidateVacancyMatch.vacancy_id == vacancy_id)
+            .where(*(filters.conditions() if filters else []))
+            .order_by(CandidateVacancyMatch.overall_score.desc())
+            .limit(limit)
+        )
+        return [tuple(row) for row in result.all()]
+
+    async def top_vacancies(
+        self,
+        session: AsyncSession,
+        candidate_id: str,
+        limit: int,
+        filters: Optional[VacancyFilters] = None,
+    ) -> List[Tuple[CandidateVacancyMatch, Vacancy]]:
+        result = await session.execute(
+            select(CandidateVacancyMatch, Vacancy)
+            .join(Vacancy, Vacancy.id == CandidateVacancyMatch.vacancy_id)
+            .where(CandidateVacancyMatch.candidate_id == candidate_id)
+            .where(*(filters.conditions() if filters else []))
+            .order_by(CandidateVacancyMatch.overall_score.desc())
+            .limit(limit)
+        )
+        return [tuple(row) for row in result.all()]
+
+
+# Global instance
+match_matrix_service = MatchMatrixService()
@@ -0,0 +1,339 @@
+"""
+Recording lifecycle management for interview videos.
+
+The interview WebSocket writes full recordings, per-answer fragments and
+extracted WAVs to a local spool directory. This module uploads finished
+files to S3 in the background (multipart), removes the local copies once
+they are stored, keeps the spool directory under a disk quota and fills
+Interview.recording_url for full recordings.
+
+Every queued file has a manifest next to it until it is archived, so files
+left by a restart are queued again at startup (recover) and the quota never
+evicts a recording that has no copy in S3. A worker locks a manifest while it
+owns the upload, so workers sharing the directory upload each file once, and
+the lock goes away with a crashed worker. Files written within the session
+TTL are never evicted either: they may belong to a live session of any
+worker.
+"""
+
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from enum import StrEnum
+from pathlib import Path
+from typing import Callable, Dict, Set
+
+from boto3.s3.transfer import TransferConfig
+
+from app.clients.s3 import get_s3_client
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.interview import Interview
+
+logger = logging.getLogger(__name__)
+
+RECORDINGS_DIR = Path(settings.recordings_dir)
+RECORDINGS_DIR.mkdir(parents=True, exist_ok=True)
+
+UPLOAD_ATTEMPTS = 3
+UPLOAD_RETRY_DELAY_SECONDS = 2.0
+# Files whose upload attempts all failed are queued again after this delay
+FAILED_UPLOAD_RETRY_SECONDS = 5 * 60
+MANIFEST_SUFFIX = ".upload.json"
+
+
+class RecordingKind(StrEnum):
+    FULL = "full"
+    FRAGMENT = "fragment"
+    AUDIO = "audio"
+
+
+@dataclass(frozen=True)
+class RecordingUpload:
+    path: Path
+    interview_id: str
+    kind: RecordingKind
+
+
+def manifest_path(path: Path) -> Path:
+    """Marks path as not archived yet; holds what its upload needs."""
+    return path.with_name(path.name + MANIFEST_SUFFIX)
+
+
+class RecordingLifecycleManager:
+    """Uploads spooled recordings to S3 and enforces the local disk quota."""
+
+    def __init__(
+        self,
+        directory: Path = RECORDINGS_DIR,
+        max_bytes: int = settings.recordings_max_bytes,
+        s3_client_factory: Callable = get_s3_client,
+        session_factory: Callable = AsyncSessionLocal,
+        live_seconds: int = settings.interview_session_ttl_seconds,
+    ):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.live_seconds = live_seconds
+        self.s3_client_factory = s3_client_factory
+        self.session_factory = session_factory
+        self._queue: asyncio.Queue[RecordingUpload] | None = None
+        self._worker: asyncio.Task | None = None
+        # Files queued or uploading, and base names of live interview sessions;
+        # neither may be evicted by the quota
+        self._pending: Set[Path] = set()
+        self._active_sessions: Set[str] = set()
+        self._retries: Set[asyncio.TimerHandle] = set()
+        # Locked manifest descriptors of the uploads this worker owns
+        self._claims: Dict[Path, int] = {}
+
+    def s3_key(self, upload: RecordingUpload) -> str:
+        prefix = settings.recordings_s3_prefix.strip("/")
+        return f"{prefix}/{upload.interview_id}/{upload.path.name}"
+
+    def s3_url(self, key: str) -> str:
+        endpoint = settings.s3_endpoint_url.rstrip("/")
+        return f"{endpoint}/{settings.s3_bucket_name}/{key}"
+
+    def protect_session(self, base_filename: str) -> None:
+        """Exclude the files of a live interview session from eviction."""
+        self._active_sessions.add(base_filename)
+
+    def release_session(self, base_filename: str) -> None:
+        self._active_sessions.discard(base_filename)
+
+    def enqueue(self, path: str | Path, interview_id: str, kind: RecordingKind) -> None:
+        """Schedule a finished file for upload to S3."""
+        path = Path(path)
+        if not path.exists():
+            logger.warning("Recording %s does not exist; skipping upload", path)
+            return
+        manifest_path(path).write_text(
+            json.dumps({"interview_id": interview_id, "kind": kind.value}),
+            encoding="utf-8",
+        )
+        if not settings.recordings_upload_enabled:
+            # Kept locally; uploaded by recover() once uploads are enabled
+            self.enforce_quota()
+            return
+        self._put(RecordingUpload(path, interview_id, kind))
+
+    def _claim(self, path: Path) -> bool:
+        """Lock the manifest of path unless another worker owns its upload."""
+        if path in self._claims:
+            return True
+        try:
+            fd = os.open(manifest_path(path), os.O_RDWR)
+        except FileNotFoundError:
+            return False
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        if not manifest_path(path).exists():
+            # Archived by the worker that held the lock until now
+            os.close(fd)
+            return False
+        self._claims[path] = fd
+        return True
+
+    def _release(self, path: Path) -> None:
+        fd = self._claims.pop(path, None)
+        if fd is not None:
+            os.close(fd)
+
+    def _put(self, upload: RecordingUpload) -> bool:
+        if upload.path in self._pending:
+            return False
+        if not self._claim(upload.path):
+            logger.debug("Recording %s is uploaded by another worker", upload.path)
+            return False
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+        self._pending.add(upload.path)
+        self._queue.put_nowait(upload)
+        logger.debug(
+            "Queued %s recording %s for upload", upload.kind.value, upload.path
+        )
+        return True
+
+    def recover(self) -> int:
+        """Queue the files left unarchived by a restart; returns their number."""
+        if not settings.recordings_upload_enabled:
+            return 0
+        queued = 0
+        for manifest in sorted(self.directory.glob(f"*{MANIFEST_SUFFIX}")):
+            path = manifest.with_name(manifest.name[: -len(MANIFEST_SUFFIX)])
+            if not path.exists():
+                manifest.unlink(missing_ok=True)
+                continue
+            try:
+                data = json.loads(manifest.read_text(encoding="utf-8"))
+                upload = RecordingUpload(
+                    path, data["interview_id"], RecordingKind(data["kind"])
+                )
+            except (KeyError, ValueError) as e:
+                logger.error("Unreadable upload manifest %s: %s", manifest, e)
+                continue
+            if self._put(upload):
+                queued += 1
+        if queued:
+            logger.info("Queued %d recordings left unarchived for upload", queued)
+        return queued
+
+    async def drain(self) -> None:
+        """Wait until every queued upload has been processed."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def stop(self) -> None:
+        """Stop the upload worker; queued files stay on disk for recover()."""
+        for retry in self._retries:
+            retry.cancel()
+        self._retries.clear()
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        for path in list(self._claims):
+            self._release(path)
+
+    async def _run(self) -> None:
+        while True:
+            upload = await self._queue.get()
+            try:
+                await self._process(upload)
+            except Exception as e:
+                logger.error(
+                    "Failed to archive recording %s, retrying in %ds: %s",
+                    upload.path,
+                    FAILED_UPLOAD_RETRY_SECONDS,
+                    e,
+                    exc_info=True,
+                )
+                self._retry_later(upload)
+            finally:
+                self._pending.discard(upload.path)
+                self._queue.task_done()
+                self.enforce_quota()
+
+    def _retry_later(self, upload: RecordingUpload) -> None:
+        def retry():
+            self._retries.discard(handle)
+            if upload.path.exists():
+                self._put(upload)
+
+        handle = asyncio.get_running_loop().call_later(
+            FAILED_UPLOAD_RETRY_SECONDS, retry
+        )
+        self._retries.add(handle)
+
+    async def _process(self, upload: RecordingUpload) -> None:
+        key = self.s3_key(upload)
+        for attempt in range(1, UPLOAD_ATTEMPTS + 1):
+            try:
+                await asyncio.to_thread(self._upload_file, upload.path, key)
+                break
+            except Exception as e:
+                if attempt == UPLOAD_ATTEMPTS:
+                    # Keep the local copy and its manifest for a later retry
+                    raise
+                logger.warning(
+                    "Upload of %s failed (attempt %d/%d): %s",
+                    upload.path,
+                    attempt,
+                    UPLOAD_ATTEMPTS,
+                    e,
+                )
+                await asyncio.sleep(UPLOAD_RETRY_DELAY_SECONDS * attempt)
+
+        logger.info("Uploaded recording %s to s3://%s", upload.path, key)
+        if upload.kind == RecordingKind.FULL:
+            await self._set_recording_url(upload.interview_id, self.s3_url(key))
+
+        # Only now is the recording archived; a crash before this re-uploads it
+        manifest_path(upload.path).unlink(missing_ok=True)
+        upload.path.unlink(missing_ok=True)
+        self._release(upload.path)
+
+    def _upload_file(self, path: Path, key: str) -> None:
+        s3 = self.s3_client_factory()
+        s3.upload_file(
+            str(path),
+            settings.s3_bucket_name,
+            key,
+            Config=TransferConfig(
+                multipart_threshold=settings.recordings_upload_part_size,
+                multipart_chunksize=settings.recordings_upload_part_size,
+                max_concurrency=4,
+            ),
+        )
+
+    async def _set_recording_url(self, interview_id: str, url: str) -> None:
+        async with self.session_factory() as session:
+            interview = await session.get(Interview, interview_id)
+            if not interview:
+                logger.warning(
+                    "Interview %s not found while storing recording url", interview_id
+                )
+                return
+            interview.recording_url = url
+            await session.commit()
+
+    def disk_usage(self) -> int:
+        return sum(p.stat().st_size for p in self.directory.glob("*") if p.is_file())
+
+    def _is_evictable(self, path: Path, now: float) -> bool:
+        if path in self._pending or path.name.endswith(MANIFEST_SUFFIX):
+            return False
+        if manifest_path(path).exists():
+            # Not archived yet: the only copy of the recording
+            return False
+        if now - path.stat().st_mtime < self.live_seconds:
+            # May be spooled by a live session of another worker
+            return False
+        return not any(path.name.startswith(base) for base in self._active_sessions)
+
+    def enforce_quota(self) -> int:
+        """Delete the oldest evictable files while over quota; return bytes freed."""
+        usage = self.disk_usage()
+        if usage <= self.max_bytes:
+            return 0
+
+        files = sorted(
+            (p for p in self.directory.glob("*") if p.is_file()),
+            key=lambda p: p.stat().st_mtime,
+        )
+        freed = 0
+        now = time.time()
+        for path in files:
+            if usage - freed <= self.max_bytes:
+                break
+            if not self._is_evictable(path, now):
+                continue
+            size = path.stat().st_size
+            path.unlink(missing_ok=True)
+            freed += size
+            logger.warning("Evicted recording %s (%d bytes) over quota", path, size)
+
+        if usage - freed > self.max_bytes:
+            logger.warning(
+                "Recordings directory still over quota: %d > %d bytes",
+                usage - freed,
+                self.max_bytes,
+            )
+        return freed
+
+
+# Global instance
+recording_manager = RecordingLifecycleManager()
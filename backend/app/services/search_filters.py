@@ -0,0 +1,57 @@
+"""
+Structured filters for candidate and vacancy searches.
+
+The filters become SQL conditions applied together with the similarity
+ordering, so a filtered top-k query still returns k rows. Every condition is
+backed by an index from migration 000032.
+"""
+
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from sqlalchemy import func
+
+from app.models.candidate import Candidate
+from app.models.vacancy import Vacancy
+
+
+def normalize_skill(skill) -> str:
+    return " ".join(str(skill).lower().split())
+
+
+@dataclass
+class CandidateFilters:
+    location: Optional[str] = None
+    employment_type: Optional[str] = None
+    status: Optional[str] = None
+    min_experience_years: Optional[int] = None
+    skills: List[str] = field(default_factory=list)
+
+    def conditions(self) -> list:
+        conditions = []
+        if self.location:
+            conditions.append(func.lower(Candidate.geo) == self.location.lower())
+        if self.employment_type:
+            conditions.append(Candidate.employment_type == self.employment_type)
+        if self.status:
+            conditions.append(Candidate.status == self.status)
+        if self.min_experience_years is not None:
+            conditions.append(Candidate.experience_years >= self.min_experience_years)
+        skills = [normalize_skill(skill) for skill in self.skills if skill.strip()]
+        if skills:
+            conditions.append(Candidate.skill_tags.contains(skills))
+        return conditions
+
+
+@dataclass
+class VacancyFilters:
+    location: Optional[str] = None
+    employment_type: Optional[str] = None
+
+    def conditions(self) -> list:
+        conditions = []
+        if self.location:
+            conditions.append(func.lower(Vacancy.location) == self.location.lower())
+        if self.employment_type:
+            conditions.append(Vacancy.employment_type == self.employment_type)
+        return conditions
@@ -0,0 +1,216 @@
+"""
+Speech synthesis for interviewer replies.
+
+Wraps the Yandex SpeechKit synthesis client and provides incremental
+sentence splitting, so a streamed LLM reply can be voiced sentence by
+sentence while the rest of it is still being generated. Synthesized audio
+is kept in a content-addressed on-disk cache, so recurring phrases are
+rendered only once.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from app.clients.yandex import (
+    TTS_AUDIO_FORMAT,
+    TTS_ROLE,
+    TTS_VOICE,
+    get_yandex_speech_synthesis_client,
+)
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Sentence terminators followed by whitespace (or a line break on its own)
+SENTENCE_BOUNDARY_RE = re.compile(r"(?<=[.!?…])\s+|\n+")
+
+# Sentences shorter than this are merged with the next one to avoid
+# spending a synthesis round trip on fragments like "Хорошо."
+MIN_SENTENCE_CHARS = 20
+
+
+class SentenceSplitter:
+    """Accumulates streamed text and emits complete sentences."""
+
+    def __init__(self, min_chars: int = MIN_SENTENCE_CHARS):
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, delta: str) -> List[str]:
+        """Add a text delta and return sentences completed by it."""
+        self._buffer += delta
+        sentences: List[str] = []
+        pending = ""
+        start = 0
+        for match in SENTENCE_BOUNDARY_RE.finditer(self._buffer):
+            candidate = (pending + " " + self._buffer[start : match.start()]).strip()
+            start = match.end()
+            if len(candidate) < self.min_chars:
+                pending = candidate
+                continue
+            sentences.append(candidate)
+            pending = ""
+        # Keep the unfinished tail (and any too-short sentence) for later
+        tail = self._buffer[start:]
+        self._buffer = f"{pending} {tail}" if pending else tail
+        return sentences
+
+    def flush(self) -> Optional[str]:
+        """Return whatever text is left once the stream is over."""
+        rest = self._buffer.strip()
+        self._buffer = ""
+        return rest or None
+
+
+class TTSAudioCache:
+    """Content-addressed on-disk audio cache with an LRU size cap.
+
+    Entries are files named by the SHA-256 of text + voice + role + format.
+    Recency is kept in memory and mirrored to file mtimes, so the LRU order
+    survives restarts.
+    """
+
+    def __init__(self, directory: str | Path, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._total_bytes = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(text: str, voice: str, role: str, audio_format: str) -> str:
+        raw = "\x1f".join([voice, role, audio_format, text.strip()])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.audio"
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        files = sorted(self.directory.glob("*.audio"), key=lambda p: p.stat().st_mtime)
+        for path in files:
+            size = path.stat().st_size
+            self._entries[path.stem] = size
+            self._total_bytes += size
+        self._loaded = True
+        self._evict()
+
+    def _evict(self) -> None:
+        while self._total_bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            try:
+                self._path(key).unlink()
+            except FileNotFoundError:
+                pass
+            logger.debug("Evicted TTS cache entry %s (%d bytes)", key, size)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            self._load()
+            if key not in self._entries:
+                return None
+            path = self._path(key)
+            try:
+                data = path.read_bytes()
+            except FileNotFoundError:
+                self._total_bytes -= self._entries.pop(key)
+                return None
+            self._entries.move_to_end(key)
+            os.utime(path)
+            return data
+
+    def put(self, key: str, data: bytes) -> None:
+        with self._lock:
+            self._load()
+            path = self._path(key)
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_bytes(data)
+            tmp_path.replace(path)
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)
+            self._entries[key] = len(data)
+            self._total_bytes += len(data)
+            self._evict()
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            self._load()
+            return key in self._entries
+
+
+class SpeechSynthesisService:
+    """Service for turning interviewer text into MP3 audio."""
+
+    def __init__(self, cache: TTSAudioCache | None = None):
+        if cache is None:
+            cache = TTSAudioCache(settings.tts_cache_dir, settings.tts_cache_max_bytes)
+        self.cache = cache
+
+    def _cache_key(self, text: str) -> str:
+        return TTSAudioCache.make_key(text, TTS_VOICE, TTS_ROLE, TTS_AUDIO_FORMAT)
+
+    def _synthesize_sync(self, text: str) -> bytes:
+        key = self._cache_key(text)
+        if settings.tts_cache_enabled:
+            cached = self.cache.get(key)
+            if cached is not None:
+                logger.debug("TTS cache hit for %s", key)
+                return cached
+
+        model = get_yandex_speech_synthesis_client()
+        result = model.synthesize(text)
+        audio = result.export(format=TTS_AUDIO_FORMAT).read()
+
+        if settings.tts_cache_enabled:
+            self.cache.put(key, audio)
+        return audio
+
+    async def synthesize(self, text: str) -> bytes:
+        """Synthesize text to MP3 bytes without blocking the event loop."""
+        logger.debug("Synthesizing %d characters of speech", len(text))
+        return await asyncio.to_thread(self._synthesize_sync, text)
+
+    async def warm_up(self, phrases: Iterable[str]) -> int:
+        """Pre-render fixed phrases into the cache.
+
+        Each phrase is rendered whole (non-streaming replies) and split into
+        sentences the way the streaming path splits it. Returns the number of
+        newly rendered entries.
+        """
+        texts: List[str] = []
+        for phrase in phrases:
+            splitter = SentenceSplitter()
+            pieces = splitter.feed(phrase)
+            tail = splitter.flush()
+            if tail:
+                pieces.append(tail)
+            for text in [phrase.strip(), *pieces]:
+                if text and text not in texts:
+                    texts.append(text)
+
+        rendered = 0
+        for text in texts:
+            if self._cache_key(text) in self.cache:
+                continue
+            try:
+                await self.synthesize(text)
+                rendered += 1
+            except Exception as e:
+                logger.warning(f"Failed to pre-render TTS phrase: {e}")
+        logger.info(f"TTS cache warm-up rendered {rendered} of {len(texts)} phrases")
+        return rendered
+
+
+# Global instance
+speech_synthesis_service = SpeechSynthesisService()
@@ -0,0 +1,101 @@
+"""
+Russian full-text search over candidates, vacancies and interview transcripts.
+
+Documents are the generated search_vector columns of migration 000037, so
+searches are served by their GIN indexes. Queries use web search syntax:
+"python -java", "\"data engineer\"", "go or rust". Candidate names and emails
+are also matched by trigram word similarity, which finds misspelled names and
+partial emails that have no full-text match.
+"""
+
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func, literal, literal_column, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.candidate import Candidate
+from app.models.interview_message import InterviewMessage
+from app.models.vacancy import Vacancy
+
+RUSSIAN = literal_column("'russian'::regconfig")
+HEADLINE_OPTIONS = "MaxFragments=2, MaxWords=20, MinWords=5"
+
+
+def _ts_query(query: str):
+    return func.websearch_to_tsquery(RUSSIAN, query)
+
+
+class TextSearchService:
+    """Ranked, paginated keyword search."""
+
+    async def search_candidates(
+        self, session: AsyncSession, query: str, limit: int = 20, offset: int = 0
+    ) -> List[Tuple[Candidate, float]]:
+        ts_query = _ts_query(query)
+        # q <% column: the query is similar to some word sequence in column
+        fuzzy = [
+            literal(query).op("<%")(column)
+            for column in (Candidate.name, Candidate.email)
+        ]
+        rank = func.ts_rank_cd(Candidate.search_vector, ts_query) + func.greatest(
+            func.word_similarity(query, Candidate.name),
+            func.word_similarity(query, func.coalesce(Candidate.email, "")),
+        )
+        result = await session.execute(
+            select(Candidate, rank)
+            .where(or_(Candidate.search_vector.bool_op("@@")(ts_query), *fuzzy))
+            .order_by(rank.desc(), Candidate.id)
+            .limit(limit)
+            .offset(offset)
+        )
+        return [(candidate, float(score)) for candidate, score in result.all()]
+
+    async def search_vacancies(
+        self, session: AsyncSession, query: str, limit: int = 20, offset: int = 0
+    ) -> List[Tuple[Vacancy, float]]:
+        ts_query = _ts_query(query)
+        rank = func.ts_rank_cd(Vacancy.search_vector, ts_query)
+        result = await session.execute(
+            select(Vacancy, rank)
+            .where(Vacancy.search_vector.bool_op("@@")(ts_query))
+            .order_by(rank.desc(), Vacancy.id)
+            .limit(limit)
+            .offset(offset)
+        )
+        return [(vacancy, float(score)) for vacancy, score in result.all()]
+
+    async def search_interview_messages(
+        self,
+        session: AsyncSession,
+        query: str,
+        interview_id: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0,
+    ) -> List[Tuple[InterviewMessage, str, float]]:
+        """Matching transcript messages with a highlighted snippet of each."""
+        ts_query = _ts_query(query)
+        rank = func.ts_rank_cd(InterviewMessage.search_vector, ts_query)
+        # Computed for the returned page only
+        snippet = func.ts_headline(
+            RUSSIAN, InterviewMessage.text, ts_query, HEADLINE_OPTIONS
+        )
+        statement = (
+            select(InterviewMessage, snippet, rank)
+            .where(InterviewMessage.search_vector.bool_op("@@")(ts_query))
+            .order_by(
+                rank.desc(), InterviewMessage.interview_id, InterviewMessage.index
+            )
+            .limit(limit)
+            .offset(offset)
+        )
+        if interview_id is not None:
+            statement = statement.where(InterviewMessage.interview_id == interview_id)
+        result = await session.execute(statement)
+        return [
+            (message, headline, float(score))
+            for message, headline, score in result.all()
+        ]
+
+
+# Global instance
+text_search_service = TextSearchService()
@@ -8,6 +8,8 @@ from app.schemas.common import VacancyCreate, VacancyUpdate, NoteCreate, NoteUpd
 import json
 from app.services.exceptions import NotFoundError
 from app.services.embedding_service import embedding_service
+from app.services.entity_cache import EntitySnapshot, entity_cache
+from app.services.match_matrix import match_matrix_service
 
 logger = logging.getLogger(__name__)
 
@@ -42,13 +44,16 @@ async def create_vacancy(session: AsyncSession, payload: VacancyCreate) -> Vacan
     try:
         logger.info(f"Generating embedding for new vacancy: {vacancy.id}")
         await embedding_service.generate_vacancy_embedding(session, vacancy)
-        await session.commit()  # Commit after embedding generation
+        await embedding_service.commit_embeddings(session)
         logger.info(f"Successfully generated embedding for vacancy: {vacancy.id}")
     except Exception as e:
         logger.error(f"Failed to generate embedding for vacancy {vacancy.id}: {e}")
         await session.rollback()  # Rollback if embedding generation fails
         # Don't fail the vacancy creation if embedding generation fails
 
+    # Refresh candidate×vacancy matches in the background
+    match_matrix_service.enqueue_vacancy(vacancy.id)
+
     return vacancy
 
 
@@ -57,8 +62,9 @@ async def list_vacancies(session: AsyncSession) -> list[Vacancy]:
     return list(result)
 
 
-async def get_vacancy(session: AsyncSession, vacancy_id: int) -> Vacancy:
-    vacancy = await session.get(Vacancy, vacancy_id)
+async def get_vacancy(session: AsyncSession, vacancy_id: int) -> EntitySnapshot:
+    """Read-only snapshot of the vacancy, served from the entity cache."""
+    vacancy = await entity_cache.get(session, Vacancy, vacancy_id)
     if not vacancy:
         raise NotFoundError("Vacancy not found")
     return vacancy
@@ -92,17 +98,21 @@ async def update_vacancy(
     for key, value in data.items():
         setattr(vacancy, key, value)
     await session.commit()
+    await entity_cache.invalidate(Vacancy, vacancy_id)
     await session.refresh(vacancy)
 
     # Regenerate embedding after updates
     try:
         logger.info(f"Regenerating embedding for updated vacancy: {vacancy.id}")
         await embedding_service.generate_vacancy_embedding(session, vacancy)
-        await session.commit()  # Commit after embedding regeneration
+        await embedding_service.commit_embeddings(session)
     except Exception as e:
         logger.error(f"Failed to regenerate vacancy embedding {vacancy.id}: {e}")
         await session.rollback()  # Rollback if embedding generation fails
 
+    # Refresh candidate×vacancy matches in the background
+    match_matrix_service.enqueue_vacancy(vacancy_id)
+
     return vacancy
 
 
@@ -114,6 +124,7 @@ async def delete_vacancy(session: AsyncSession, vacancy_id: int) -> None:
     # Delete the vacancy - this will cascade to delete the embedding due to ondelete="CASCADE"
     await session.delete(vacancy)
     await session.commit()
+    await entity_cache.invalidate(Vacancy, vacancy_id)
 
 
 # Notes
@@ -0,0 +1,123 @@
+"""
+Compact vector forms for the first pass of similarity searches.
+
+A search orders the rows by a distance on a quantized form of the vectors,
+which a small HNSW index can serve, keeps the best embedding_rerank_pool rows
+and re-ranks only those by exact cosine distance on the full-precision
+vectors:
+
+- ``halfvec``: 16-bit floats, half the size of the vectors, near-exact order;
+- ``bit``: binary quantization (the sign of each dimension), 1/32 of the size,
+  compared by Hamming distance; coarser, so it relies on the re-rank pool;
+- ``none``: exact distance only.
+
+The indexes are expression indexes over the full-precision column, partial on
+the generation since their dimension is fixed. Without pgvector the same idea
+is applied in process with int8 scalar quantization.
+"""
+
+import hashlib
+from enum import StrEnum
+from typing import List, Sequence
+
+from sqlalchemy import cast, func, literal
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from pgvector.sqlalchemy import BIT, HALFVEC, VECTOR
+except ImportError:
+    BIT = HALFVEC = VECTOR = None
+
+# halfvec and bit vectors (and their index operator classes) need pgvector 0.7
+MIN_PGVECTOR_VERSION = (0, 7)
+# hnsw.iterative_scan appeared in pgvector 0.8
+ITERATIVE_SCAN_PGVECTOR_VERSION = (0, 8)
+
+
+class Quantization(StrEnum):
+    NONE = "none"
+    HALFVEC = "halfvec"
+    BIT = "bit"
+
+
+def compact_distance(column, query_vector, dimension: int, quantization: str):
+    """Distance on the quantized form, matching the index expressions."""
+    if quantization == Quantization.HALFVEC:
+        return cast(column, HALFVEC(dimension)).cosine_distance(
+            literal(list(query_vector), HALFVEC(dimension))
+        )
+    if quantization == Quantization.BIT:
+        return cast(func.binary_quantize(column), BIT(dimension)).hamming_distance(
+            func.binary_quantize(literal(list(query_vector), VECTOR(dimension)))
+        )
+    raise ValueError(f"Unknown quantization: {quantization}")
+
+
+def index_name(table: str, quantization: str, generation: str) -> str:
+    # Generation names are free-form; a digest keeps the name a valid identifier
+    digest = hashlib.sha1(generation.encode("utf-8")).hexdigest()[:8]
+    return f"ix_{table}_{quantization}_{digest}"
+
+
+def create_index_statements(table: str, generation: str, dimension: int) -> List[str]:
+    """HNSW indexes over both compact forms of one generation's vectors."""
+    predicate = "generation = '{}'".format(generation.replace("'", "''"))
+    return [
+        f"CREATE INDEX IF NOT EXISTS {index_name(table, Quantization.HALFVEC, generation)} "
+        f"ON {table} USING hnsw ((embedding::halfvec({dimension})) halfvec_cosine_ops) "
+        f"WHERE {predicate}",
+        f"CREATE INDEX IF NOT EXISTS {index_name(table, Quantization.BIT, generation)} "
+        f"ON {table} USING hnsw "
+        f"((binary_quantize(embedding)::bit({dimension})) bit_hamming_ops) "
+        f"WHERE {predicate}",
+    ]
+
+
+def drop_index_statements(table: str, generation: str) -> List[str]:
+    return [
+        f"DROP INDEX IF EXISTS {index_name(table, quantization, generation)}"
+        for quantization in (Quantization.HALFVEC, Quantization.BIT)
+    ]
+
+
+def _version_at_least(extension_version: str | None, minimum) -> bool:
+    if not extension_version:
+        return False
+    parts = tuple(int(part) for part in extension_version.split(".")[:2])
+    return parts >= minimum
+
+
+def supports_compact_indexes(extension_version: str | None) -> bool:
+    return _version_at_least(extension_version, MIN_PGVECTOR_VERSION)
+
+
+def supports_iterative_scan(extension_version: str | None) -> bool:
+    return _version_at_least(extension_version, ITERATIVE_SCAN_PGVECTOR_VERSION)
+
+
+def _normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def quantize_int8(vectors: Sequence[Sequence[float]]):
+    """Unit-normalize and scale every vector to int8; returns (codes, scales)."""
+    matrix = _normalize(np.asarray(vectors, dtype=np.float32))
+    scales = np.abs(matrix).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.round(matrix / scales[:, None]).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def int8_top_indices(query_vector, codes, scales, count: int) -> List[int]:
+    """Indices of the count rows with the highest approximate cosine."""
+    query = _normalize(np.asarray(query_vector, dtype=np.float32))
+    scores = (codes.astype(np.float32) @ query) * scales
+    if count >= len(scores):
+        return list(np.argsort(-scores))
+    best = np.argpartition(-scores, count)[:count]
+    return list(best[np.argsort(-scores[best])])
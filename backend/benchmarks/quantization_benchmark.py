@@ -0,0 +1,150 @@
+"""
+Recall@k, memory and latency of compact vector forms against exact cosine.
+
+The baseline is EmbeddingService.calculate_similarity called per row, which
+is how candidates are ranked when pgvector ordering is unavailable. Every
+compact form (halfvec-like float16, int8, binary) is measured on its own and
+with exact re-ranking of its best --pool rows, the way searches use it.
+
+Vectors are synthetic: clustered unit vectors, so that near neighbours exist
+as they do for CVs of the same profession.
+
+    uv run python benchmarks/quantization_benchmark.py --rows 20000 --k 10
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.services.embedding_service import embedding_service  # noqa: E402
+from app.services.vector_quantization import (  # noqa: E402
+    int8_top_indices,
+    quantize_int8,
+)
+
+
+def _dataset(rows: int, queries: int, dimension: int, seed: int):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(rows // 200, 1), dimension))
+    labels = rng.integers(len(centers), size=rows + queries)
+    vectors = centers[labels] + 0.6 * rng.normal(size=(rows + queries, dimension))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = vectors.astype(np.float32)
+    return vectors[:rows], vectors[rows:]
+
+
+def _top(scores: np.ndarray, count: int) -> np.ndarray:
+    best = np.argpartition(-scores, count)[:count]
+    return best[np.argsort(-scores[best])]
+
+
+def _recall(found, truth) -> float:
+    return len(set(found) & set(truth)) / len(truth)
+
+
+def _rerank(matrix, query, pool, k):
+    scores = matrix[pool] @ query
+    return np.asarray(pool)[np.argsort(-scores)[:k]]
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - start) * 1000
+
+
+async def _baseline_latency_ms(matrix, query, sample_rows: int) -> float:
+    # calculate_similarity per row, extrapolated from a sample of rows
+    rows = matrix[:sample_rows].tolist()
+    query_list = query.tolist()
+    start = time.perf_counter()
+    for row in rows:
+        await embedding_service.calculate_similarity(query_list, row)
+    elapsed = (time.perf_counter() - start) * 1000
+    return elapsed * len(matrix) / len(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--dimension", type=int, default=1024)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--pool", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    matrix, queries = _dataset(args.rows, args.queries, args.dimension, args.seed)
+    truth = [_top(matrix @ query, args.k) for query in queries]
+
+    half = matrix.astype(np.float16)
+    codes, scales = quantize_int8(matrix)
+    bits = np.packbits(matrix > 0, axis=1)
+    bit_counts = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(1)
+
+    def by_half(query, count):
+        return _top((half @ query.astype(np.float16)).astype(np.float32), count)
+
+    def by_int8(query, count):
+        return np.asarray(int8_top_indices(query, codes, scales, count))
+
+    def by_bit(query, count):
+        query_bits = np.packbits(query > 0)
+        distances = bit_counts[np.bitwise_xor(bits, query_bits)].sum(axis=1)
+        return _top(-distances.astype(np.float32), count)
+
+    methods = [
+        ("float32 exact", matrix.nbytes, lambda q: _top(matrix @ q, args.k)),
+        ("halfvec", half.nbytes, lambda q: by_half(q, args.k)),
+        (
+            "halfvec + rerank",
+            half.nbytes,
+            lambda q: _rerank(matrix, q, by_half(q, args.pool), args.k),
+        ),
+        ("int8", codes.nbytes + scales.nbytes, lambda q: by_int8(q, args.k)),
+        (
+            "int8 + rerank",
+            codes.nbytes + scales.nbytes,
+            lambda q: _rerank(matrix, q, by_int8(q, args.pool), args.k),
+        ),
+        ("bit", bits.nbytes, lambda q: by_bit(q, args.k)),
+        (
+            "bit + rerank",
+            bits.nbytes,
+            lambda q: _rerank(matrix, q, by_bit(q, args.pool), args.k),
+        ),
+    ]
+
+    baseline_ms = asyncio.run(
+        _baseline_latency_ms(matrix, queries[0], min(args.rows, 2000))
+    )
+    print(
+        f"{args.rows} rows x {args.dimension} dims, {args.queries} queries, "
+        f"k={args.k}, re-rank pool={args.pool}"
+    )
+    print(f"{'method':<22}{'recall@k':>10}{'MiB':>10}{'ms/query':>12}")
+    print(
+        f"{'calculate_similarity':<22}{1.0:>10.3f}"
+        f"{matrix.nbytes / 2**20:>10.1f}{baseline_ms:>12.1f}"
+    )
+    for name, size, search in methods:
+        recalls = []
+        total_ms = 0.0
+        for query, expected in zip(queries, truth):
+            found, elapsed = _timed(lambda: search(query))
+            recalls.append(_recall(found, expected))
+            total_ms += elapsed
+        print(
+            f"{name:<22}{np.mean(recalls):>10.3f}{size / 2**20:>10.1f}"
+            f"{total_ms / len(queries):>12.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
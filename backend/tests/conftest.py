@@ -1,6 +1,7 @@
 import asyncio
 import os
 from collections.abc import AsyncGenerator
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from app.core.config import settings
@@ -95,6 +96,19 @@ def event_loop():
     loop.close()
 
 
+@pytest.fixture()
+def mock_session_factory():
+    """Build a mock session factory whose ``async with`` yields the given session."""
+
+    def build(session):
+        context = MagicMock()
+        context.__aenter__ = AsyncMock(return_value=session)
+        context.__aexit__ = AsyncMock(return_value=None)
+        return MagicMock(return_value=context)
+
+    return build
+
+
 @pytest.fixture()
 async def db_session(
     postgres_container, minio_container
@@ -112,7 +126,10 @@ async def client(
 ) -> AsyncGenerator[AsyncClient, None]:
     """Create test client with database container."""
     from app.main import app
+    from app.services.entity_cache import entity_cache
 
+    # Tests also write rows directly, bypassing the services' invalidation
+    entity_cache.clear()
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://testserver") as ac:
         yield ac
@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from app.services.admission import (
+    AdmissionAbandoned,
+    AdmissionController,
+    AdmissionRejected,
+)
+
+
+async def _ignore_position(position):
+    pass
+
+
+def _controller(max_active=1, max_queued=10, queue_timeout=5.0):
+    return AdmissionController(max_active, max_queued, queue_timeout, {"stt": 1})
+
+
+class TestAdmissionController:
+    """Test interview admission queue and stage concurrency limits."""
+
+    @pytest.mark.asyncio
+    async def test_waiters_are_admitted_in_order_with_positions(self):
+        controller = _controller()
+        positions = {"first": [], "second": []}
+        admitted = []
+
+        async def join(name):
+            async def report(position):
+                positions[name].append(position)
+
+            await controller.admit(report)
+            admitted.append(name)
+
+        await controller.admit(_ignore_position)
+        first = asyncio.create_task(join("first"))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(join("second"))
+        await asyncio.sleep(0)
+
+        assert controller.stats()["interviews"]["queued"] == 2
+
+        controller.release()
+        await first
+        await asyncio.sleep(0)
+        assert admitted == ["first"]
+        assert positions["second"] == [2, 1]
+
+        controller.release()
+        await second
+        assert admitted == ["first", "second"]
+        assert positions["first"] == [1]
+        assert controller.active == 1
+
+    @pytest.mark.asyncio
+    async def test_full_queue_and_timeout_are_rejected(self):
+        controller = _controller(max_queued=1, queue_timeout=0.01)
+        await controller.admit(_ignore_position)
+        waiter = asyncio.create_task(controller.admit(_ignore_position))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejected):
+            await controller.admit(_ignore_position)
+        with pytest.raises(AdmissionRejected):
+            await waiter
+
+        assert controller.stats()["interviews"] == {
+            "limit": 1,
+            "active": 1,
+            "queued": 0,
+        }
+
+    @pytest.mark.asyncio
+    async def test_client_leaving_the_queue_drops_its_ticket(self):
+        controller = _controller()
+        left = asyncio.Event()
+        await controller.admit(_ignore_position)
+        waiter = asyncio.create_task(controller.admit(_ignore_position, left))
+        await asyncio.sleep(0)
+
+        left.set()
+        with pytest.raises(AdmissionAbandoned):
+            await waiter
+
+        assert controller.stats()["interviews"]["queued"] == 0
+        controller.release()
+        assert controller.active == 0
+
+    @pytest.mark.asyncio
+    async def test_stage_limit_serializes_calls(self):
+        controller = _controller()
+        running = []
+
+        async def work():
+            async with controller.stage("stt"):
+                running.append(controller.stats()["stages"]["stt"]["active"])
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(work(), work(), work())
+
+        assert running == [1, 1, 1]
+        assert controller.stats()["stages"]["stt"] == {
+            "limit": 1,
+            "active": 0,
+            "waiting": 0,
+        }
@@ -0,0 +1,39 @@
+from unittest.mock import patch
+
+from app.core.cache import LRUCache
+
+
+class TestLRUCache:
+    """Test the in-process LRU cache."""
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1
+
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert len(cache) == 2
+
+    def test_entries_expire_after_ttl(self):
+        cache = LRUCache(max_size=10, ttl_seconds=60)
+        with patch("app.core.cache.time.monotonic", return_value=100.0):
+            cache.set("a", 1)
+        with patch("app.core.cache.time.monotonic", return_value=150.0):
+            assert cache.get("a") == 1
+        with patch("app.core.cache.time.monotonic", return_value=161.0):
+            assert cache.get("a") is None
+        assert "a" not in cache
+
+    def test_invalidate_removes_entry(self):
+        cache = LRUCache(max_size=10)
+        cache.set("a", 1)
+
+        cache.invalidate("a")
+        cache.invalidate("missing")
+
+        assert cache.get("a") is None
@@ -0,0 +1,187 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.candidate import Candidate
+from app.models.embedding import (
+    CandidateEmbedding,
+    EmbeddingGeneration,
+    EmbeddingGenerationStatus,
+)
+from app.services import candidates as candidates_service
+from app.services.candidate_dedup import (
+    CandidateDedupService,
+    DuplicateMatch,
+    DuplicateReason,
+    normalize_name,
+)
+from app.services.exceptions import ConflictError, NotFoundError
+
+
+def _candidate(candidate_id, name_key=""):
+    return SimpleNamespace(id=candidate_id, name_key=name_key)
+
+
+class TestCandidateDedupService:
+    """Test how likely duplicates of a new candidate are found."""
+
+    def test_name_key_ignores_case_order_and_punctuation(self):
+        assert normalize_name("Иванов Иван") == normalize_name("иван,  ИВАНОВ")
+        assert normalize_name("Семён Петров") == normalize_name("петров семен")
+        assert normalize_name(None) == ""
+
+    @pytest.mark.asyncio
+    async def test_duplicates_by_email_name_and_embedding(self):
+        candidate = Candidate(id="new", name="Иван Иванов", email="Ivan@Example.com")
+        candidate.name_key = normalize_name(candidate.name)
+        session = AsyncMock()
+        session.scalars.side_effect = [
+            ["same-email"],
+            ["namesake", "namesake-other-cv", "namesake-far-away"],
+        ]
+        # Namesakes are ranked among themselves, however far from the top
+        # neighbours their CVs are
+        namesakes = [
+            (_candidate("namesake-far-away", candidate.name_key), 0.8),
+            (_candidate("namesake-other-cv", candidate.name_key), 0.3),
+        ]
+        neighbours = [
+            (_candidate("same-email"), 0.5),
+            (_candidate("same-cv"), 0.97),
+            (_candidate("similar-cv"), 0.9),
+        ]
+        nearest = AsyncMock(side_effect=[namesakes, neighbours])
+
+        with patch(
+            "app.services.candidate_dedup.embedding_service.nearest_candidates",
+            nearest,
+        ):
+            matches = await CandidateDedupService().find_duplicates(session, candidate)
+
+        assert matches == [
+            DuplicateMatch("same-email", DuplicateReason.EMAIL, 0.5),
+            DuplicateMatch("namesake-far-away", DuplicateReason.NAME, 0.8),
+            DuplicateMatch("same-cv", DuplicateReason.EMBEDDING, 0.97),
+        ]
+        namesake_query = session.scalars.call_args_list[1].args[0]
+        assert "candidate.name_key = " in str(namesake_query)
+        assert nearest.call_args_list[0].kwargs["among"] == [
+            "namesake",
+            "namesake-other-cv",
+            "namesake-far-away",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_no_duplicates_writes_nothing(self):
+        session = AsyncMock()
+
+        with patch(
+            "app.services.candidate_dedup.embedding_service.nearest_candidates",
+            AsyncMock(return_value=[]),
+        ):
+            matches = await CandidateDedupService().flag_duplicates(
+                session, Candidate(id="new", name="Иван Иванов")
+            )
+
+        assert matches == []
+        session.execute.assert_not_called()
+        session.commit.assert_not_called()
+
+
+class TestMergeCandidates:
+    """Test merging a duplicate candidate into another."""
+
+    @pytest.mark.asyncio
+    async def test_merge_fills_gaps_unions_skills_and_deletes_duplicate(self):
+        kept = Candidate(
+            id="kept",
+            name="Иван Иванов",
+            email=None,
+            geo="Москва",
+            skills=json.dumps(["Python"]),
+            tech=None,
+        )
+        duplicate = Candidate(
+            id="dup",
+            name="Иванов Иван",
+            email="ivan@example.com",
+            geo="Казань",
+            skills=json.dumps(["Python", "SQL"]),
+            tech=json.dumps(["Docker"]),
+        )
+        session = AsyncMock()
+        session.info = {}
+        session.get.side_effect = [kept, duplicate]
+
+        with patch.object(
+            candidates_service.embedding_service,
+            "generate_candidate_embedding",
+            AsyncMock(),
+        ), patch.object(
+            candidates_service.match_matrix_service, "enqueue_candidate"
+        ) as enqueue:
+            merged = await candidates_service.merge_candidates(session, "kept", "dup")
+
+        assert merged is kept
+        assert kept.email == "ivan@example.com"
+        assert kept.geo == "Москва"
+        assert json.loads(kept.skills) == ["Python", "SQL"]
+        assert json.loads(kept.tech) == ["Docker"]
+        assert kept.skill_tags == ["docker", "python", "sql"]
+        # Interviews are moved before the duplicate is deleted
+        interviews_update = session.execute.call_args.args[0]
+        assert interviews_update.table.name == "interview"
+        session.delete.assert_awaited_once_with(duplicate)
+        enqueue.assert_called_once_with("kept")
+
+    @pytest.mark.asyncio
+    async def test_merge_rejects_missing_or_same_candidate(self):
+        session = AsyncMock()
+        session.get.return_value = None
+
+        with pytest.raises(ConflictError):
+            await candidates_service.merge_candidates(session, "c1", "c1")
+        with pytest.raises(NotFoundError):
+            await candidates_service.merge_candidates(session, "c1", "c2")
+        session.delete.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_merge_deletes_the_duplicates_embeddings_in_the_database(db_session):
+    kept = Candidate(name="Иван Иванов", position="Backend developer")
+    duplicate = Candidate(name="Иванов Иван", position="Python developer")
+    db_session.add_all([kept, duplicate])
+    await db_session.commit()
+    generation = await db_session.scalar(
+        select(EmbeddingGeneration.name).where(
+            EmbeddingGeneration.status == EmbeddingGenerationStatus.ACTIVE
+        )
+    )
+    db_session.add(
+        CandidateEmbedding(
+            candidate_id=duplicate.id,
+            generation=generation,
+            embedding=[0.1] * 1024,
+            text_content="Иванов Иван, Python developer",
+        )
+    )
+    await db_session.commit()
+    duplicate_id = duplicate.id
+
+    with patch.object(
+        candidates_service.embedding_service,
+        "generate_candidate_embedding",
+        AsyncMock(),
+    ), patch.object(candidates_service.match_matrix_service, "enqueue_candidate"):
+        await candidates_service.merge_candidates(db_session, kept.id, duplicate_id)
+
+    assert await db_session.get(Candidate, duplicate_id) is None
+    remaining = await db_session.scalar(
+        select(func.count())
+        .select_from(CandidateEmbedding)
+        .where(CandidateEmbedding.candidate_id == duplicate_id)
+    )
+    assert remaining == 0
@@ -0,0 +1,141 @@
+import threading
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.models.candidate import Candidate
+from app.models.candidate_vacancy_match import CandidateVacancyMatch
+from app.models.vacancy import Vacancy
+from app.services.compatibility_batch import CompatibilityBatchService, PairInput
+from app.services.embedding_service import EmbeddingService
+from app.services.entity_cache import EntitySnapshot
+from app.services.match_matrix import skills_fingerprint
+
+
+def _pair(candidate_id, vacancy_id, skills_pct=None):
+    return PairInput(
+        candidate_id,
+        vacancy_id,
+        EntitySnapshot.of(Candidate(id=candidate_id, name=candidate_id)),
+        EntitySnapshot.of(Vacancy(id=vacancy_id, title=str(vacancy_id))),
+        0.5,
+        skills_pct,
+    )
+
+
+async def _collect(results):
+    return [result async for result in results]
+
+
+class TestCompatibilityBatchService:
+    """Test batch scoring of candidate/vacancy pairs."""
+
+    def test_pairwise_similarity_matches_single_pair_similarity(self):
+        service = EmbeddingService()
+        candidates = [[1.0, 0.0, 1.0], [0.2, 0.9, 0.1], [0.0, 0.0, 0.0]]
+        vacancies = [[1.0, 0.1, 0.9], [0.9, 0.1, 0.3], [1.0, 0.0, 0.0]]
+
+        batch = service._pairwise_cosine_similarity(candidates, vacancies)
+
+        for index, (candidate, vacancy) in enumerate(zip(candidates, vacancies)):
+            assert batch[index] == pytest.approx(
+                service._manual_cosine_similarity(candidate, vacancy), abs=1e-6
+            )
+
+    @pytest.mark.asyncio
+    async def test_load_queries_each_table_once_and_reuses_stored_skills(self):
+        candidate = Candidate(id="c1", name="Иван", skills='["Python"]')
+        vacancy = Vacancy(id=1, title="Python developer", skills='["Python"]')
+        match = CandidateVacancyMatch(
+            candidate_id="c1",
+            vacancy_id=1,
+            skills_pct=80,
+            skills_fingerprint=skills_fingerprint(candidate, vacancy),
+        )
+        session = AsyncMock()
+        session.scalars.side_effect = [[candidate], [vacancy], [match]]
+        similarities = AsyncMock(return_value={("c1", 1): 0.7})
+
+        with patch(
+            "app.services.compatibility_batch.embedding_service.similarities_by_ids",
+            similarities,
+        ):
+            pairs = await CompatibilityBatchService().load(
+                session, [("c1", 1), ("c1", 1), ("missing", 1)]
+            )
+
+        assert session.scalars.await_count == 3
+        session.commit.assert_awaited_once()
+        similarities.assert_awaited_once_with(session, [("c1", 1)])
+        assert [(p.candidate_id, p.vacancy_id) for p in pairs] == [
+            ("c1", 1),
+            ("missing", 1),
+        ]
+        assert pairs[0].embedding_similarity == 0.7
+        assert pairs[0].skills_pct == 80
+        assert pairs[1].candidate is None
+
+    @pytest.mark.asyncio
+    async def test_results_stream_in_completion_order_within_the_limit(self):
+        running = 0
+        most_running = 0
+        lock = threading.Lock()
+
+        def skills_match(candidate, vacancy):
+            nonlocal running, most_running
+            with lock:
+                running += 1
+                most_running = max(most_running, running)
+            # The first pair is the slowest
+            time.sleep(0.3 if candidate.id == "c0" else 0.05)
+            with lock:
+                running -= 1
+            return 60
+
+        pairs = [_pair(f"c{index}", index) for index in range(5)]
+        pairs.append(_pair("stored", 9, skills_pct=90))
+        pairs.append(PairInput("missing", 1))
+
+        with patch(
+            "app.services.compatibility_batch.compatibility_service"
+            ".skills_match_percentage",
+            side_effect=skills_match,
+        ) as llm:
+            results = await _collect(
+                CompatibilityBatchService(concurrency=2).score(pairs)
+            )
+
+        assert llm.call_count == 5
+        assert most_running == 2
+        assert len(results) == 7
+        assert results[-1]["candidate_id"] == "c0"
+        by_candidate = {result["candidate_id"]: result for result in results}
+        assert by_candidate["stored"]["skills_pct"] == 90
+        assert by_candidate["c1"]["status"] == "done"
+        assert by_candidate["c1"]["similarity_score"] == 50.0
+        assert by_candidate["missing"] == {
+            "candidate_id": "missing",
+            "vacancy_id": 1,
+            "status": "failed",
+            "error": "Candidate or vacancy not found",
+        }
+
+    @pytest.mark.asyncio
+    async def test_failed_skills_match_fails_only_its_pair(self):
+        def skills_match(candidate, vacancy):
+            if candidate.id == "c1":
+                raise RuntimeError("GigaChat unavailable")
+            return 70
+
+        with patch(
+            "app.services.compatibility_batch.compatibility_service"
+            ".skills_match_percentage",
+            side_effect=skills_match,
+        ):
+            results = await _collect(
+                CompatibilityBatchService().score([_pair("c1", 1), _pair("c2", 1)])
+            )
+
+        statuses = {result["candidate_id"]: result["status"] for result in results}
+        assert statuses == {"c1": "failed", "c2": "done"}
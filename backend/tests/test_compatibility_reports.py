@@ -0,0 +1,144 @@
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.models.candidate import Candidate
+from app.models.compatibility_report import CompatibilityReportRecord
+from app.models.vacancy import Vacancy
+from app.services.compatibility_reports import (
+    CompatibilityReportService,
+    ReportStatus,
+    report_fingerprint,
+)
+from app.services.compatibility_service import CompatibilityReport
+from app.services.exceptions import NotFoundError
+
+
+def _pair():
+    candidate = Candidate(id="candidate-1", updated_at=datetime(2026, 1, 1))
+    vacancy = Vacancy(id=7, updated_at=datetime(2026, 1, 2))
+    return candidate, vacancy
+
+
+def _report():
+    return CompatibilityReport(
+        executive_summary={"overall_match_score": "72%"},
+        candidate_profile={},
+        detailed_analysis={},
+        potential_concerns=[],
+        hiring_recommendation="",
+        next_steps=[],
+        overall_score=72.0,
+    )
+
+
+class TestReportFingerprint:
+    def test_changes_with_candidate_version(self):
+        candidate, vacancy = _pair()
+        before = report_fingerprint(candidate, vacancy)
+
+        candidate.updated_at = datetime(2026, 2, 1)
+
+        assert report_fingerprint(candidate, vacancy) != before
+
+    def test_changes_with_scoring_version(self):
+        candidate, vacancy = _pair()
+        before = report_fingerprint(candidate, vacancy)
+
+        with patch("app.services.compatibility_reports.SCORING_VERSION", 2):
+            assert report_fingerprint(candidate, vacancy) != before
+
+
+class TestCompatibilityReportService:
+    """Test persisted compatibility reports and their compute jobs."""
+
+    @pytest.mark.asyncio
+    async def test_stored_report_is_returned_without_a_job(self):
+        candidate, vacancy = _pair()
+        record = CompatibilityReportRecord(
+            id=1, status=ReportStatus.DONE, report={"next_steps": []}
+        )
+        session = AsyncMock()
+        session.get.side_effect = [candidate, vacancy]
+        session.scalar.return_value = record
+        service = CompatibilityReportService(session_factory=MagicMock())
+
+        with patch(
+            "app.services.compatibility_reports.compatibility_service"
+        ) as analysis:
+            result = await service.request_report(session, candidate.id, vacancy.id)
+
+        assert result is record
+        analysis.analyze_compatibility.assert_not_called()
+        assert not service._jobs
+
+    @pytest.mark.asyncio
+    async def test_missing_pair_raises_not_found(self):
+        session = AsyncMock()
+        session.get.return_value = None
+        service = CompatibilityReportService(session_factory=MagicMock())
+
+        with pytest.raises(NotFoundError):
+            await service.request_report(session, "missing", 1)
+
+    @pytest.mark.asyncio
+    async def test_compute_stores_report(self, mock_session_factory):
+        session = AsyncMock()
+        session.scalar.return_value = 1  # claimed
+        service = CompatibilityReportService(
+            session_factory=mock_session_factory(session)
+        )
+
+        with patch(
+            "app.services.compatibility_reports.compatibility_service"
+        ) as analysis:
+            analysis.analyze_compatibility = AsyncMock(return_value=_report())
+            computed = await service.compute(1, "candidate-1", 7)
+
+        assert computed is True
+        stored = session.execute.call_args_list[0].args[0].compile().params
+        assert stored["status"] == ReportStatus.DONE
+        assert stored["overall_score"] == 72.0
+        assert stored["report"]["executive_summary"] == {"overall_match_score": "72%"}
+
+    @pytest.mark.asyncio
+    async def test_compute_marks_report_failed_when_analysis_raises(
+        self, mock_session_factory
+    ):
+        session = AsyncMock()
+        session.scalar.return_value = 1  # claimed
+        service = CompatibilityReportService(
+            session_factory=mock_session_factory(session)
+        )
+
+        with patch(
+            "app.services.compatibility_reports.compatibility_service"
+        ) as analysis:
+            analysis.analyze_compatibility = AsyncMock(
+                side_effect=RuntimeError("GigaChat unavailable")
+            )
+            computed = await service.compute(1, "candidate-1", 7)
+
+        assert computed is False
+        stored = session.execute.call_args_list[-1].args[0].compile().params
+        assert stored["status"] == ReportStatus.FAILED
+        assert stored["error"] == "GigaChat unavailable"
+        session.commit.assert_awaited()
+
+    @pytest.mark.asyncio
+    async def test_compute_skips_report_claimed_elsewhere(self, mock_session_factory):
+        session = AsyncMock()
+        session.scalar.return_value = None
+        service = CompatibilityReportService(
+            session_factory=mock_session_factory(session)
+        )
+
+        with patch(
+            "app.services.compatibility_reports.compatibility_service"
+        ) as analysis:
+            analysis.analyze_compatibility = AsyncMock()
+            computed = await service.compute(1, "candidate-1", 7)
+
+        assert computed is False
+        analysis.analyze_compatibility.assert_not_called()
@@ -0,0 +1,89 @@
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.models.candidate import Candidate
+from app.models.embedding import EmbeddingGeneration
+from app.services.embedding_backfill import BackfillTarget, EmbeddingBackfillService
+from app.services.embedding_service import DocumentEmbedding
+
+
+def _generation():
+    return EmbeddingGeneration(
+        name="Embeddings", model="Embeddings", dimension=1, status="active"
+    )
+
+
+def _service(session_factory, tmp_path):
+    return EmbeddingBackfillService(
+        session_factory=session_factory,
+        batch_size=2,
+        concurrency=2,
+        checkpoint_path=str(tmp_path / "checkpoint.json"),
+    )
+
+
+class TestEmbeddingBackfillService:
+    """Test the resumable embedding backfill job."""
+
+    @pytest.mark.asyncio
+    @patch("app.services.embedding_backfill.embedding_service")
+    async def test_batch_is_bulk_written_and_checkpointed(
+        self, mock_embedding, tmp_path, mock_session_factory
+    ):
+        candidates = [Candidate(id="c1"), Candidate(id="c2")]
+        session = AsyncMock()
+        session.scalars.side_effect = [["c1", "c2"], candidates, []]
+        mock_embedding.get_generation = AsyncMock(return_value=_generation())
+        mock_embedding.embed_candidate = AsyncMock(
+            side_effect=[
+                DocumentEmbedding("text", [0.1], [("text", [0.1])]),
+                None,  # GigaChat failed for c2
+            ]
+        )
+        service = _service(mock_session_factory(session), tmp_path)
+        saved = []
+        service._save_checkpoint = lambda checkpoint: saved.append(dict(checkpoint))
+
+        stats = await service.run([BackfillTarget.CANDIDATE])
+
+        assert (stats.processed, stats.embedded, stats.failed) == (2, 1, 1)
+        assert saved == [
+            {"reindex": False, "generation": "Embeddings", "candidate": "c2"}
+        ]
+        inserts = [
+            call.args
+            for call in session.execute.call_args_list
+            if len(call.args) == 2  # executemany form
+        ]
+        assert [len(rows) for _, rows in inserts] == [1, 1]
+        assert inserts[0][1][0]["candidate_id"] == "c1"
+        assert inserts[0][1][0]["generation"] == "Embeddings"
+        assert inserts[1][1][0]["chunk_index"] == 0
+
+    @pytest.mark.asyncio
+    async def test_run_resumes_after_checkpoint(self, tmp_path, mock_session_factory):
+        session = AsyncMock()
+        session.scalar.return_value = _generation()
+        session.scalars.return_value = []
+        service = _service(mock_session_factory(session), tmp_path)
+        with open(service.checkpoint_path, "w") as f:
+            json.dump(
+                {"reindex": False, "generation": "Embeddings", "candidate": "c2"}, f
+            )
+
+        await service.run([BackfillTarget.CANDIDATE])
+
+        query = session.scalars.call_args.args[0]
+        assert "c2" in query.compile().params.values()
+
+    def test_checkpoint_of_other_generation_is_ignored(self, tmp_path):
+        service = _service(MagicMock(), tmp_path)
+        with open(service.checkpoint_path, "w") as f:
+            json.dump({"reindex": False, "generation": "old", "candidate": "c2"}, f)
+
+        assert service._load_checkpoint(False, "new") == {
+            "reindex": False,
+            "generation": "new",
+        }
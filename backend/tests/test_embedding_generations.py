@@ -0,0 +1,70 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.models.embedding import EmbeddingGeneration, EmbeddingGenerationStatus
+from app.services.embedding_generations import EmbeddingGenerationService
+from app.services.embedding_service import active_generation
+from app.services.exceptions import ConflictError
+
+
+def _generation(name, status):
+    return EmbeddingGeneration(
+        name=name, model="Embeddings", dimension=1024, status=status
+    )
+
+
+class TestEmbeddingGenerationService:
+    """Test blue/green switching between embedding generations."""
+
+    @pytest.mark.asyncio
+    async def test_activate_switches_in_one_commit(self):
+        session = AsyncMock()
+        session.get.return_value = _generation("v2", EmbeddingGenerationStatus.BUILDING)
+        session.scalar.side_effect = [
+            _generation("v1", EmbeddingGenerationStatus.ACTIVE),
+            10,  # v2 candidates
+            5,  # v2 vacancies
+            10,  # v1 candidates
+            5,  # v1 vacancies
+        ]
+        service = EmbeddingGenerationService(session_factory=MagicMock())
+
+        await service.activate(session, "v2")
+
+        retire, activate = [call.args[0] for call in session.execute.call_args_list]
+        assert retire.compile().params["status"] == EmbeddingGenerationStatus.RETIRED
+        assert activate.compile().params["status"] == EmbeddingGenerationStatus.ACTIVE
+        session.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_incomplete_generation_is_not_activated(self):
+        session = AsyncMock()
+        session.get.return_value = _generation("v2", EmbeddingGenerationStatus.BUILDING)
+        session.scalar.side_effect = [
+            _generation("v1", EmbeddingGenerationStatus.ACTIVE),
+            3,
+            5,
+            10,
+            5,
+        ]
+        service = EmbeddingGenerationService(session_factory=MagicMock())
+
+        with pytest.raises(ConflictError):
+            await service.activate(session, "v2")
+        session.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_active_generation_cannot_be_dropped(self):
+        session = AsyncMock()
+        session.get.return_value = _generation("v1", EmbeddingGenerationStatus.ACTIVE)
+        service = EmbeddingGenerationService(session_factory=MagicMock())
+
+        with pytest.raises(ConflictError):
+            await service.drop(session, "v1")
+        session.delete.assert_not_called()
+
+    def test_searches_read_the_active_generation(self):
+        sql = str(active_generation().compile())
+
+        assert "embedding_generation.status = " in sql
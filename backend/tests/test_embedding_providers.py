@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from app.services.embedding_providers import (
+    HASHING_MODEL,
+    LocalEmbeddingProvider,
+    get_embedding_provider,
+    train_local_model,
+)
+from app.services.embedding_service import EmbeddingService
+
+TEXTS = [
+    "Python разработчик, FastAPI и PostgreSQL",
+    "Разработчик на Python: Django, PostgreSQL",
+    "Бухгалтер, 1С и налоговая отчётность",
+]
+
+
+def _cosine(a, b):
+    return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+
+class TestLocalEmbeddingProvider:
+    """Test offline embeddings computed on the CPU."""
+
+    @pytest.mark.asyncio
+    async def test_hashing_model_embeds_a_batch(self, tmp_path):
+        provider = LocalEmbeddingProvider(model_dir=str(tmp_path), max_workers=1)
+
+        vectors = await provider.embed(TEXTS, HASHING_MODEL, 256)
+
+        assert len(vectors) == 3
+        assert all(len(vector) == 256 for vector in vectors)
+        assert np.linalg.norm(vectors[0]) == pytest.approx(1.0, abs=1e-5)
+        assert _cosine(vectors[0], vectors[1]) > _cosine(vectors[0], vectors[2])
+
+    @pytest.mark.asyncio
+    async def test_trained_model_is_loaded_by_name(self, tmp_path):
+        import joblib
+
+        corpus = [f"{text} {i}" for i in range(4) for text in TEXTS]
+        joblib.dump(train_local_model(corpus, 4), tmp_path / "hr.joblib")
+        provider = LocalEmbeddingProvider(model_dir=str(tmp_path), max_workers=1)
+
+        vectors = await provider.embed(TEXTS, "hr", 4)
+
+        assert np.asarray(vectors).shape == (3, 4)
+        with pytest.raises(ValueError):
+            await provider.embed(TEXTS, "hr", 8)
+
+    @pytest.mark.asyncio
+    async def test_service_embeds_documents_offline(self):
+        service = EmbeddingService()
+
+        vector, chunks = await service._embed_document(
+            " ".join(TEXTS), "local", HASHING_MODEL, 64
+        )
+
+        assert len(vector) == 64
+        assert all(len(chunk_vector) == 64 for _, chunk_vector in chunks)
+
+    def test_unknown_provider_is_rejected(self):
+        with pytest.raises(ValueError):
+            get_embedding_provider("openai")
@@ -0,0 +1,272 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy.exc import DBAPIError
+
+from app.models.candidate import Candidate
+from app.models.embedding import (
+    CandidateEmbedding,
+    EmbeddingGeneration,
+    EmbeddingGenerationStatus,
+)
+from app.services.embedding_service import (
+    DocumentEmbedding,
+    EmbeddingService,
+    _token_cost,
+    split_into_chunks,
+)
+
+
+def _embeddings_response(vectors):
+    # GigaChat may return the batch out of order
+    data = [MagicMock(index=i, embedding=v) for i, v in enumerate(vectors)]
+    return MagicMock(data=list(reversed(data)))
+
+
+class TestSplitIntoChunks:
+    def test_short_text_is_one_chunk(self):
+        assert split_into_chunks("Python <br> разработчик", 100, 10) == [
+            "Python разработчик"
+        ]
+
+    def test_chunks_are_bounded_and_overlap(self):
+        words = [f"word{i}" for i in range(200)]
+
+        chunks = split_into_chunks(" ".join(words), 40, 8)
+
+        assert len(chunks) > 1
+        for chunk in chunks:
+            assert sum(_token_cost(word) for word in chunk.split()) <= 40
+        for previous, current in zip(chunks, chunks[1:]):
+            assert current.split()[0] in previous.split()
+        assert chunks[-1].split()[-1] == "word199"
+
+    def test_overlong_word_is_cut(self):
+        chunks = split_into_chunks("x" * 500, 40, 8)
+
+        assert "".join(chunks) == "x" * 500
+        assert all(_token_cost(chunk) <= 40 for chunk in chunks)
+
+    def test_empty_text_has_no_chunks(self):
+        assert split_into_chunks("  ", 40, 8) == []
+
+
+class TestChunkedEmbeddings:
+    @pytest.mark.asyncio
+    @patch("app.services.embedding_service.settings")
+    @patch("app.services.embedding_providers.get_gigachat_client")
+    async def test_document_is_embedded_in_one_request(
+        self, mock_client_factory, mock_settings
+    ):
+        mock_settings.embedding_chunking_enabled = True
+        mock_settings.embedding_chunk_max_tokens = 40
+        mock_settings.embedding_chunk_overlap_tokens = 8
+        service = EmbeddingService()
+        giga = MagicMock()
+        mock_client_factory.return_value.__aenter__ = AsyncMock(return_value=giga)
+        mock_client_factory.return_value.__aexit__ = AsyncMock(return_value=None)
+        giga.aembeddings = AsyncMock(
+            side_effect=lambda texts, model: _embeddings_response(
+                [[1.0, float(i)] for i in range(len(texts))]
+            )
+        )
+
+        vector, chunks = await service._embed_document(
+            " ".join(f"word{i}" for i in range(60)), "gigachat", "Embeddings", 2
+        )
+
+        giga.aembeddings.assert_awaited_once()
+        assert giga.aembeddings.call_args.kwargs["model"] == "Embeddings"
+        assert len(chunks) > 1
+        assert [v for _, v in chunks] == [[1.0, float(i)] for i in range(len(chunks))]
+        assert vector == [1.0, (len(chunks) - 1) / 2]
+
+    def test_max_sim_rewards_a_match_anywhere_in_the_document(self):
+        service = EmbeddingService()
+        query = [[1.0, 0.0]]
+
+        matching_tail = service._max_sim(query, [[0.0, 1.0], [1.0, 0.0]])
+        no_match = service._max_sim(query, [[0.0, 1.0]])
+
+        assert matching_tail == pytest.approx(1.0)
+        assert no_match == pytest.approx(0.0)
+
+
+class TestSemanticSearch:
+    @pytest.mark.asyncio
+    async def test_repeated_queries_are_embedded_once(self):
+        service = EmbeddingService()
+        service._embed_texts = AsyncMock(return_value=[[1.0, 0.0]])
+        generation = MagicMock(provider="local", model="hashing", dimension=2)
+        generation.name = "v1"
+
+        first = await service.embed_query(generation, "Python  backend, Moscow")
+        second = await service.embed_query(generation, "Python backend, Moscow")
+
+        assert first == second == [1.0, 0.0]
+        service._embed_texts.assert_awaited_once_with(
+            ["Python backend, Moscow"], "local", "hashing", 2
+        )
+
+    @pytest.mark.asyncio
+    @patch("app.services.embedding_service.settings")
+    async def test_search_pages_through_ranked_candidates(self, mock_settings):
+        mock_settings.embedding_chunking_enabled = False
+        service = EmbeddingService()
+        service.get_generation = AsyncMock(return_value=MagicMock())
+        service.embed_query = AsyncMock(return_value=[1.0, 0.0])
+        rows = [MagicMock(candidate=f"candidate-{i}") for i in range(5)]
+        service._rank_by_vector = AsyncMock(
+            return_value=[(row, 1.0 - i / 10) for i, row in enumerate(rows)]
+        )
+
+        page = await service.search_candidates(MagicMock(), "Python", 2, 2)
+
+        assert service._rank_by_vector.call_args.args[-1] == 4
+        assert [item["candidate"] for item in page] == ["candidate-2", "candidate-3"]
+
+    @pytest.mark.asyncio
+    async def test_search_reports_unembeddable_query(self):
+        service = EmbeddingService()
+        service.get_generation = AsyncMock(return_value=MagicMock())
+        service.embed_query = AsyncMock(return_value=None)
+
+        assert await service.search_vacancies(MagicMock(), "Python") is None
+
+
+def _db_error(sqlstate):
+    return DBAPIError("SELECT", {}, MagicMock(sqlstate=sqlstate))
+
+
+def _search_session(*results):
+    session = AsyncMock()
+    session.begin_nested = MagicMock(return_value=AsyncMock())
+    session.scalar.return_value = "0.8.0"
+    session.execute.side_effect = list(results)
+    return session
+
+
+def _executed(session):
+    return [str(call.args[0]) for call in session.execute.call_args_list]
+
+
+class TestVectorSearch:
+    """Test pgvector ranking, its compact first pass and its fallbacks."""
+
+    async def _rank(self, service, session):
+        from app.models.embedding import CandidateEmbedding
+
+        return await service._rank_by_vector(
+            session,
+            CandidateEmbedding,
+            CandidateEmbedding.candidate,
+            "v1",
+            [0.1, 0.2, 0.3],
+            [],
+            5,
+        )
+
+    @pytest.mark.asyncio
+    @patch("app.services.embedding_service.settings")
+    async def test_pool_scan_widens_hnsw_ef_search(self, mock_settings):
+        mock_settings.embedding_search_quantization = "halfvec"
+        mock_settings.embedding_rerank_pool = 200
+        rows = MagicMock()
+        rows.all.return_value = [("row", 0.1)]
+        session = _search_session(None, None, rows)
+
+        ranked = await self._rank(EmbeddingService(), session)
+
+        assert [row for row, _ in ranked] == ["row"]
+        executed = _executed(session)
+        assert executed[0] == "SET LOCAL hnsw.ef_search = 200"
+        assert executed[1] == "SET LOCAL hnsw.iterative_scan = relaxed_order"
+
+    @pytest.mark.asyncio
+    @patch("app.services.embedding_service.settings")
+    async def test_missing_halfvec_falls_back_to_exact_ordering(self, mock_settings):
+        mock_settings.embedding_search_quantization = "halfvec"
+        mock_settings.embedding_rerank_pool = 200
+        rows = MagicMock()
+        rows.all.return_value = [("row", 0.1)]
+        service = EmbeddingService()
+        session = _search_session(None, None, _db_error("42704"), rows)
+
+        ranked = await self._rank(service, session)
+
+        assert [row for row, _ in ranked] == ["row"]
+        assert service._compact_search_available is False
+        assert service._vector_search_available is True
+        assert "halfvec" not in _executed(session)[-1].lower()
+
+        # Later searches go straight to exact ordering
+        session = _search_session(rows)
+        await self._rank(service, session)
+        assert len(_executed(session)) == 1
+
+    @pytest.mark.asyncio
+    @patch("app.services.embedding_service.settings")
+    async def test_transient_errors_do_not_disable_pgvector(self, mock_settings):
+        mock_settings.embedding_search_quantization = "none"
+        mock_settings.embedding_rerank_pool = 200
+        service = EmbeddingService()
+        session = _search_session(_db_error("57P01"))
+
+        with pytest.raises(DBAPIError):
+            await self._rank(service, session)
+
+        assert service._vector_search_available is not False
+
+
+def _write_session():
+    session = MagicMock()
+    session.info = {}
+    session.execute = AsyncMock()
+    session.flush = AsyncMock()
+    session.commit = AsyncMock()
+    session.rollback = AsyncMock()
+    return session
+
+
+class TestSnapshotDeltas:
+    """Test that embeddings reach the snapshot delta log only once committed."""
+
+    async def _generate(self, service, session):
+        generation = EmbeddingGeneration(
+            name="v1", status=EmbeddingGenerationStatus.ACTIVE
+        )
+        service.writable_generations = AsyncMock(return_value=[generation])
+        service.embed_candidate = AsyncMock(
+            return_value=DocumentEmbedding("Python", [0.6, 0.8])
+        )
+        await service.generate_candidate_embedding(session, Candidate(id="c1"))
+
+    @pytest.mark.asyncio
+    @patch("app.services.embedding_service.embedding_snapshot_store")
+    async def test_vectors_are_recorded_after_the_commit(self, mock_store):
+        service = EmbeddingService()
+        session = _write_session()
+
+        await self._generate(service, session)
+        mock_store.record.assert_not_called()
+
+        await service.commit_embeddings(session)
+
+        mock_store.record.assert_called_once_with(
+            CandidateEmbedding, "v1", [("c1", [0.6, 0.8])]
+        )
+        assert session.info == {}
+
+    @pytest.mark.asyncio
+    @patch("app.services.embedding_service.embedding_snapshot_store")
+    async def test_failed_commit_records_nothing(self, mock_store):
+        service = EmbeddingService()
+        session = _write_session()
+        session.commit.side_effect = RuntimeError("connection lost")
+        await self._generate(service, session)
+
+        with pytest.raises(RuntimeError):
+            await service.commit_embeddings(session)
+
+        mock_store.record.assert_not_called()
+        assert session.info == {}
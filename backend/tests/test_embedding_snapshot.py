@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from app.models.embedding import CandidateEmbedding
+from app.services.embedding_snapshot import EmbeddingSnapshotStore
+
+
+async def _rows(rows):
+    for row in rows:
+        yield row
+
+
+VECTORS = [
+    ("c1", [1.0, 0.0, 0.0]),
+    ("c2", [0.0, 1.0, 0.0]),
+    ("c3", [0.7, 0.7, 0.0]),
+]
+
+
+async def _write(store, rows=VECTORS, delta_offset=0):
+    return await store.write(
+        CandidateEmbedding, "v1", _rows(rows), len(rows), 3, delta_offset
+    )
+
+
+class TestEmbeddingSnapshotStore:
+    """Test memory-mapped embedding snapshots and their delta log."""
+
+    @pytest.mark.asyncio
+    async def test_snapshot_ranks_filtered_ids_read_only(self, tmp_path):
+        await _write(EmbeddingSnapshotStore(str(tmp_path)))
+        worker = EmbeddingSnapshotStore(str(tmp_path))
+
+        snapshot = worker.get(CandidateEmbedding, "v1")
+
+        assert isinstance(snapshot.matrix, np.memmap)
+        assert snapshot.matrix.dtype == np.float16
+        assert not snapshot.matrix.flags.writeable
+        assert snapshot.top([1.0, 0.1, 0.0], ["c1", "c2", "c3"], 2) == ["c1", "c3"]
+        # Ids filtered out in SQL are never ranked; unknown ids go last
+        assert snapshot.top([1.0, 0.1, 0.0], ["c2", "c9"], 1) == ["c2", "c9"]
+
+    @pytest.mark.asyncio
+    async def test_workers_see_delta_log_and_new_versions(self, tmp_path):
+        writer = EmbeddingSnapshotStore(str(tmp_path))
+        worker = EmbeddingSnapshotStore(str(tmp_path))
+        await _write(writer)
+        assert worker.get(CandidateEmbedding, "v1").version == 1
+
+        assert worker.get(CandidateEmbedding, "v1").top(
+            [0.8, 0.6, 0.0], ["c1", "c2"], 1
+        ) == ["c1"]
+        writer.record(CandidateEmbedding, "v1", [("c2", [0.9, 0.4, 0.0])])
+        snapshot = worker.get(CandidateEmbedding, "v1")
+        assert snapshot.top([0.8, 0.6, 0.0], ["c1", "c2"], 1) == ["c2"]
+
+        # A snapshot taken after the update rotates the log
+        offset = writer.start_delta(CandidateEmbedding, "v1")
+        await _write(writer, [("c1", [1.0, 0.0, 0.0]), ("c2", [1.0, 0.0, 0.0])], offset)
+        snapshot = worker.get(CandidateEmbedding, "v1")
+        assert snapshot.version == 2
+        assert snapshot.delta == {}
+        assert not list(tmp_path.glob("*.v1.npy"))
+
+    @pytest.mark.asyncio
+    async def test_updates_during_a_snapshot_are_replayed(self, tmp_path):
+        store = EmbeddingSnapshotStore(str(tmp_path))
+        offset = store.start_delta(CandidateEmbedding, "v1")
+        # Written after the scan began; the scanned rows may predate it
+        store.record(CandidateEmbedding, "v1", [("c1", [0.0, 1.0, 0.0])])
+
+        await _write(store, delta_offset=offset)
+
+        snapshot = EmbeddingSnapshotStore(str(tmp_path)).get(CandidateEmbedding, "v1")
+        assert set(snapshot.delta) == {"c1"}
+        assert snapshot.top([0.0, 1.0, 0.0], ["c1", "c3"], 1) == ["c1"]
+
+    def test_no_snapshot_means_no_delta_log(self, tmp_path):
+        store = EmbeddingSnapshotStore(str(tmp_path))
+
+        store.record(CandidateEmbedding, "v1", [("c1", [1.0, 0.0, 0.0])])
+
+        assert store.get(CandidateEmbedding, "v1") is None
+        assert not list(tmp_path.glob("*.delta"))
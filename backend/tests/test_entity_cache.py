@@ -0,0 +1,89 @@
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from app.models.candidate import Candidate
+from app.models.vacancy import Vacancy
+from app.schemas.common import CandidateRead
+from app.services.entity_cache import NOTIFY_CHANNEL, EntityCache
+
+
+def _session(*entities):
+    session = AsyncMock()
+    session.get.side_effect = list(entities)
+    return session
+
+
+class TestEntityCache:
+    """Test the read-through candidate and vacancy snapshot cache."""
+
+    @pytest.mark.asyncio
+    async def test_snapshots_are_cached_and_read_only(self):
+        cache = EntityCache(max_size=10, ttl_seconds=60, notify=False)
+        candidate = Candidate(
+            id="c1",
+            name="Иван Иванов",
+            position="Backend developer",
+            status="pending",
+            skills='["Python"]',
+        )
+        session = _session(candidate)
+
+        snapshot = await cache.get(session, Candidate, "c1")
+        again = await cache.get(session, Candidate, "c1")
+
+        assert again is snapshot
+        session.get.assert_awaited_once_with(Candidate, "c1")
+        assert snapshot.name == "Иван Иванов"
+        with pytest.raises(AttributeError):
+            snapshot.name = "Пётр"
+        read = CandidateRead.model_validate(snapshot, from_attributes=True)
+        assert read.skills == ["Python"]
+
+    @pytest.mark.asyncio
+    async def test_missing_entities_are_not_cached(self):
+        cache = EntityCache(max_size=10, ttl_seconds=60, notify=False)
+        session = _session(None, Vacancy(id=1, title="Python developer"))
+
+        assert await cache.get(session, Vacancy, 1) is None
+        assert (await cache.get(session, Vacancy, 1)).title == "Python developer"
+
+    @pytest.mark.asyncio
+    async def test_load_racing_an_invalidation_is_not_stored(self):
+        cache = EntityCache(max_size=10, ttl_seconds=60, notify=False)
+
+        async def get_then_edited(model, entity_id):
+            # The row is edited while the old version is being read
+            await cache.invalidate(model, entity_id)
+            return Candidate(id=entity_id, name="Старое имя")
+
+        session = AsyncMock()
+        session.get.side_effect = get_then_edited
+        assert (await cache.get(session, Candidate, "c1")).name == "Старое имя"
+
+        session.get = AsyncMock(return_value=Candidate(id="c1", name="Новое имя"))
+        assert (await cache.get(session, Candidate, "c1")).name == "Новое имя"
+
+    @pytest.mark.asyncio
+    async def test_other_workers_invalidations_drop_entries(self):
+        cache = EntityCache(max_size=10, ttl_seconds=60, notify=True)
+        connection = Mock()
+        connection.get_server_pid.return_value = 1
+        cache._connection = connection
+        session = _session(Vacancy(id=7, title="Old"), Vacancy(id=7, title="New"))
+        await cache.get(session, Vacancy, 7)
+
+        cache._on_notification(connection, 1, NOTIFY_CHANNEL, "vacancy:7")
+        assert (await cache.get(session, Vacancy, 7)).title == "Old"
+
+        cache._on_notification(connection, 2, NOTIFY_CHANNEL, "vacancy:7")
+        assert (await cache.get(session, Vacancy, 7)).title == "New"
+
+    @pytest.mark.asyncio
+    async def test_nothing_is_cached_while_the_channel_is_down(self):
+        cache = EntityCache(max_size=10, ttl_seconds=60, notify=True)
+        session = _session(Vacancy(id=7, title="Old"), Vacancy(id=7, title="New"))
+
+        await cache.get(session, Vacancy, 7)
+
+        assert (await cache.get(session, Vacancy, 7)).title == "New"
@@ -0,0 +1,136 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.models.interview import Interview
+from app.models.interview_message import InterviewMessage, InterviewMessageType
+from app.services.interview_context import (
+    SUMMARY_PREFIX,
+    InterviewContextManager,
+    estimate_tokens,
+)
+
+
+def _history(turns: int, text: str = "x" * 30):
+    messages = [
+        InterviewMessage(
+            interview_id="i-1",
+            index=0,
+            text="System prompt",
+            type=InterviewMessageType.SYSTEM,
+        )
+    ]
+    for index in range(1, turns * 2 + 1):
+        message_type = (
+            InterviewMessageType.ASSISTANT if index % 2 else InterviewMessageType.USER
+        )
+        messages.append(
+            InterviewMessage(
+                interview_id="i-1", index=index, text=text, type=message_type
+            )
+        )
+    return messages
+
+
+def _interview(summary=None, summary_index=None):
+    interview = Interview()
+    interview.id = "i-1"
+    interview.context_summary = summary
+    interview.context_summary_index = summary_index
+    return interview
+
+
+class TestInterviewContextManager:
+    """Test token-budgeted prompt construction for interview turns."""
+
+    def test_short_conversation_is_sent_whole(self):
+        manager = InterviewContextManager(max_prompt_tokens=10_000)
+
+        messages = manager.build_messages(_interview(), _history(2), "Ответ")
+
+        assert [m["content"] for m in messages][0] == "System prompt"
+        assert len(messages) == 6
+        assert messages[-1]["content"] == "Ответ"
+
+    @pytest.mark.asyncio
+    async def test_window_stays_within_budget(self):
+        history = _history(50)
+        interview = _interview(summary="Сводка", summary_index=96)
+        per_message = estimate_tokens(history[1].text)
+        budget = (
+            estimate_tokens("System prompt")
+            + estimate_tokens(SUMMARY_PREFIX + "Сводка")
+            + estimate_tokens("Ответ")
+            + per_message * 4
+        )
+        manager = InterviewContextManager(
+            max_prompt_tokens=budget, summary_trigger_tokens=10**9
+        )
+
+        messages = manager.build_messages(interview, history, "Ответ")
+
+        assert len(messages) == 2 + 4 + 1
+        assert sum(estimate_tokens(m["content"]) for m in messages) <= budget
+
+    @pytest.mark.asyncio
+    async def test_turns_not_summarized_yet_are_never_dropped(self):
+        history = _history(50)
+        for message in history[1:]:
+            message.text = f"Реплика {message.index} " + "x" * 30
+        interview = _interview(summary="Сводка", summary_index=40)
+        manager = InterviewContextManager(
+            max_prompt_tokens=200, summary_trigger_tokens=10**9
+        )
+
+        messages = manager.build_messages(interview, history, "Ответ")
+
+        # Everything after the summary is sent, even over budget
+        dialog = [m for m in history if m.index > 40]
+        assert [m["content"] for m in messages[2:-1]] == [m.text for m in dialog]
+        assert len(messages) == 2 + len(dialog) + 1
+
+    @pytest.mark.asyncio
+    async def test_summary_replaces_older_turns(self):
+        manager = InterviewContextManager(
+            max_prompt_tokens=10_000, summary_trigger_tokens=10**9
+        )
+        interview = _interview(
+            summary="Кандидат 5 лет пишет на Python", summary_index=6
+        )
+
+        messages = manager.build_messages(interview, _history(5), "Ответ")
+
+        assert messages[1]["content"] == SUMMARY_PREFIX + interview.context_summary
+        # Messages 7..10 follow the summary, then the new user message
+        assert len(messages) == 2 + 4 + 1
+
+    @pytest.mark.asyncio
+    async def test_dropped_turns_trigger_background_summary(self, mock_session_factory):
+        client = MagicMock()
+        response = MagicMock()
+        response.choices = [MagicMock()]
+        response.choices[0].message.content = "Сводка"
+        client.achat = AsyncMock(return_value=response)
+        session = MagicMock()
+        session.execute = AsyncMock()
+        session.commit = AsyncMock()
+
+        history = _history(20)
+        manager = InterviewContextManager(
+            max_prompt_tokens=200,
+            summary_trigger_tokens=50,
+            client_factory=lambda: client,
+            session_factory=mock_session_factory(session),
+        )
+
+        manager.build_messages(_interview(), history, "Ответ")
+        # A second turn while the refresh is running does not start another one
+        manager.build_messages(_interview(), history, "Ответ")
+        task = manager._tasks["i-1"]
+        summary = await task
+
+        assert summary == "Сводка"
+        client.achat.assert_awaited_once()
+        session.execute.assert_awaited_once()
+        session.commit.assert_awaited_once()
+        assert "i-1" not in manager._refreshing
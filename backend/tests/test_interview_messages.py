@@ -1,5 +1,8 @@
+from unittest.mock import MagicMock, patch
+
 import pytest
 from httpx import AsyncClient
+from sqlalchemy import event
 
 
 @pytest.fixture
@@ -187,3 +190,53 @@ class TestPostInterviewMessages:
             f"/interviews/{sample_interview['id']}/messages", json={"text": "Hello"}
         )
         assert blocked.status_code == 409
+
+
+class TestConnectionUsage:
+    @pytest.mark.asyncio
+    async def test_no_connection_checked_out_during_llm_call(
+        self, client: AsyncClient, sample_interview: dict
+    ):
+        from app.db.session import engine
+        from app.services.interview_messages import interview_messages_service
+
+        r0 = await client.post(f"/interviews/{sample_interview['id']}/messages/first")
+        assert r0.status_code == 200
+
+        checked_out = 0
+
+        def on_checkout(*args):
+            nonlocal checked_out
+            checked_out += 1
+
+        def on_checkin(*args):
+            nonlocal checked_out
+            checked_out -= 1
+
+        checked_out_during_call = []
+
+        async def fake_call(client, chat_params):
+            checked_out_during_call.append(checked_out)
+            response = MagicMock()
+            response.choices[0].message.content = "Расскажите о себе."
+            response.choices[0].finish_reason = "stop"
+            return response
+
+        pool = engine.sync_engine.pool
+        event.listen(pool, "checkout", on_checkout)
+        event.listen(pool, "checkin", on_checkin)
+        try:
+            with patch.object(
+                interview_messages_service, "_call_gigachat_async", fake_call
+            ):
+                response = await client.post(
+                    f"/interviews/{sample_interview['id']}/messages",
+                    json={"text": "Hello"},
+                )
+        finally:
+            event.remove(pool, "checkout", on_checkout)
+            event.remove(pool, "checkin", on_checkin)
+
+        assert response.status_code == 200
+        assert response.json()[-1]["text"] == "Расскажите о себе."
+        assert checked_out_during_call == [0]
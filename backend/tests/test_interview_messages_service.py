@@ -1,14 +1,19 @@
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.services.interview_messages import InterviewMessagesService
+from app.services.interview_messages import (
+    ConversationState,
+    InterviewMessagesService,
+)
 from app.models.interview import Interview
 from app.models.candidate import Candidate
 from app.models.vacancy import Vacancy
 from app.models.interview_message import InterviewMessage, InterviewMessageType
 from app.schemas.common import InterviewMessageCreateRequest
 from app.services.exceptions import NotFoundError, ConflictError
+from app.services.interview_prompts import build_system_prompt
 
 
 @pytest.fixture
@@ -119,11 +124,6 @@ class TestInterviewMessagesService:
         sample_interview.state = "in_progress"
         mock_session.get.return_value = sample_interview
 
-        # Mock the execute result properly
-        mock_result = MagicMock()
-        mock_result.scalar_one.return_value = 2
-        mock_session.execute.return_value = mock_result
-
         # Mock GigaChat response (async achat)
         mock_client = MagicMock()
         mock_response = MagicMock()
@@ -134,6 +134,8 @@ class TestInterviewMessagesService:
 
         # Mock existing messages (empty conversation)
         mock_session.scalars.return_value = []
+        # message_seq after reserving the indexes of the turn
+        mock_session.scalar.return_value = 2
 
         # Act
         result = await interview_messages_service.create_message(
@@ -141,9 +143,287 @@ class TestInterviewMessagesService:
         )
 
         # Assert
-        assert len(result) == 0  # Will be empty since we mocked empty scalars
-        mock_session.add.assert_called()
-        mock_session.commit.assert_called()
+        assert [(m.index, m.type, m.text) for m in result] == [
+            (0, InterviewMessageType.USER, "Привет!"),
+            (1, InterviewMessageType.ASSISTANT, "Привет! Расскажите о себе."),
+        ]
+        mock_session.add_all.assert_called_once()
+        # Read phase and write phase
+        assert mock_session.commit.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_create_message_ends_transaction_before_llm_call(
+        self, interview_messages_service, mock_session, sample_interview
+    ):
+        """Test no transaction (and connection) is open while GigaChat answers."""
+        # Arrange
+        sample_interview.state = "in_progress"
+        mock_session.get.return_value = sample_interview
+        mock_session.scalars.return_value = []
+        mock_session.scalar.return_value = 2
+        commits_during_call = []
+
+        async def fake_achat(client, chat_params):
+            commits_during_call.append(mock_session.commit.await_count)
+            mock_session.add_all.assert_not_called()
+            response = MagicMock()
+            response.choices[0].message.content = "Ответ"
+            response.choices[0].finish_reason = "stop"
+            return response
+
+        interview_messages_service._call_gigachat_async = fake_achat
+        interview_messages_service.gigachat_client = MagicMock()
+
+        # Act
+        await interview_messages_service.create_message(
+            mock_session, "test-interview-id", InterviewMessageCreateRequest(text="Hi")
+        )
+
+        # Assert
+        assert commits_during_call == [1]
+        assert mock_session.commit.await_count == 2
+
+    @pytest.mark.asyncio
+    @patch("app.services.interview_messages.get_gigachat_client")
+    async def test_create_message_reuses_cached_conversation(
+        self,
+        mock_get_gigachat_client,
+        interview_messages_service,
+        mock_session,
+        sample_interview,
+    ):
+        """Test a second chat turn reads the history from the cache."""
+        # Arrange
+        interview_id = "test-interview-id"
+        sample_interview.state = "in_progress"
+        mock_session.get.return_value = sample_interview
+        mock_session.scalars.return_value = [
+            InterviewMessage(
+                interview_id=interview_id,
+                index=0,
+                text="System prompt",
+                type=InterviewMessageType.SYSTEM,
+            )
+        ]
+
+        mock_client = MagicMock()
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = "Ответ"
+        mock_client.achat = AsyncMock(return_value=mock_response)
+        mock_get_gigachat_client.return_value = mock_client
+        mock_session.scalar.side_effect = [3, 5]
+
+        # Act
+        await interview_messages_service.create_message(
+            mock_session, interview_id, InterviewMessageCreateRequest(text="Один")
+        )
+        result = await interview_messages_service.create_message(
+            mock_session, interview_id, InterviewMessageCreateRequest(text="Два")
+        )
+
+        # Assert
+        assert [m.index for m in result] == [0, 1, 2, 3, 4]
+        mock_session.scalars.assert_called_once()
+        mock_session.execute.assert_not_called()
+        assert mock_session.scalar.await_count == 2
+        sent = mock_client.achat.call_args.args[0]["messages"]
+        assert [m["content"] for m in sent] == [
+            "System prompt",
+            "Один",
+            "Ответ",
+            "Два",
+        ]
+
+    @pytest.mark.asyncio
+    @patch("app.services.interview_messages.get_gigachat_client")
+    async def test_create_message_conflict_invalidates_cache(
+        self,
+        mock_get_gigachat_client,
+        interview_messages_service,
+        mock_session,
+        sample_interview,
+    ):
+        """Test a concurrent insert drops the stale cached conversation."""
+        # Arrange
+        interview_id = "test-interview-id"
+        sample_interview.state = "in_progress"
+        mock_session.get.return_value = sample_interview
+        mock_session.scalars.return_value = []
+        mock_session.scalar.return_value = 2
+        mock_session.commit.side_effect = [
+            None,
+            IntegrityError("insert", {}, Exception()),
+        ]
+
+        mock_client = MagicMock()
+        mock_client.achat = AsyncMock(side_effect=RuntimeError("unavailable"))
+        mock_get_gigachat_client.return_value = mock_client
+
+        # Act & Assert
+        with pytest.raises(ConflictError):
+            await interview_messages_service.create_message(
+                mock_session, interview_id, InterviewMessageCreateRequest(text="Hi")
+            )
+        mock_session.rollback.assert_awaited_once()
+        assert interview_id not in interview_messages_service.conversations
+
+    @pytest.mark.asyncio
+    @patch("app.services.interview_messages.get_gigachat_client")
+    async def test_create_message_takes_indexes_from_sequence(
+        self,
+        mock_get_gigachat_client,
+        interview_messages_service,
+        mock_session,
+        sample_interview,
+    ):
+        """Test indexes come from message_seq and a gap reloads the history."""
+        # Arrange
+        interview_id = "test-interview-id"
+        sample_interview.state = "in_progress"
+        mock_session.get.return_value = sample_interview
+        history = [
+            InterviewMessage(
+                interview_id=interview_id,
+                index=index,
+                text=f"Message {index}",
+                type=InterviewMessageType.ASSISTANT,
+            )
+            for index in range(5)
+        ]
+        mock_session.scalars.side_effect = [history[:1], history]
+        # Another writer appended indexes 1 and 2 since the history was read
+        mock_session.scalar.return_value = 5
+
+        mock_client = MagicMock()
+        mock_client.achat = AsyncMock(side_effect=RuntimeError("unavailable"))
+        mock_get_gigachat_client.return_value = mock_client
+
+        # Act
+        result = await interview_messages_service.create_message(
+            mock_session, interview_id, InterviewMessageCreateRequest(text="Hi")
+        )
+
+        # Assert
+        user, assistant = mock_session.add_all.call_args.args[0]
+        assert (user.index, assistant.index) == (3, 4)
+        # The response includes the other writer's turn and this one
+        assert [m.index for m in result] == [0, 1, 2, 3, 4]
+        cached = interview_messages_service.conversations.get(interview_id)
+        assert cached.next_index == 5
+
+    @pytest.mark.asyncio
+    @patch("app.services.interview_messages.get_gigachat_client")
+    async def test_create_message_reloads_history_appended_elsewhere(
+        self,
+        mock_get_gigachat_client,
+        interview_messages_service,
+        mock_session,
+        sample_interview,
+    ):
+        """Test a cached conversation behind message_seq is reloaded first."""
+        # Arrange
+        interview_id = "test-interview-id"
+        sample_interview.state = "in_progress"
+        # Another worker stored indexes 1 and 2
+        sample_interview.message_seq = 3
+        mock_session.get.return_value = sample_interview
+        history = [
+            InterviewMessage(
+                interview_id=interview_id,
+                index=index,
+                text=text,
+                type=InterviewMessageType.USER,
+            )
+            for index, text in enumerate(["System prompt", "Вопрос", "Ответ"])
+        ]
+        mock_session.scalars.return_value = history
+        interview_messages_service.conversations.set(
+            interview_id, ConversationState(history[:1])
+        )
+
+        mock_client = MagicMock()
+        mock_response = MagicMock()
+        mock_response.choices = [MagicMock()]
+        mock_response.choices[0].message.content = "Ещё вопрос"
+        mock_client.achat = AsyncMock(return_value=mock_response)
+        mock_get_gigachat_client.return_value = mock_client
+        mock_session.scalar.return_value = 5
+
+        # Act
+        result = await interview_messages_service.create_message(
+            mock_session, interview_id, InterviewMessageCreateRequest(text="Далее")
+        )
+
+        # Assert
+        sent = mock_client.achat.call_args.args[0]["messages"]
+        assert [m["content"] for m in sent] == [
+            "System prompt",
+            "Вопрос",
+            "Ответ",
+            "Далее",
+        ]
+        assert [m.index for m in result] == [0, 1, 2, 3, 4]
+
+    @pytest.mark.asyncio
+    @patch("app.services.interview_messages.get_gigachat_client")
+    async def test_stream_message_yields_deltas_and_stores_reply(
+        self,
+        mock_get_gigachat_client,
+        interview_messages_service,
+        mock_session,
+        sample_interview,
+    ):
+        """Test streaming message creation stores the joined AI response."""
+        # Arrange
+        interview_id = "test-interview-id"
+        payload = InterviewMessageCreateRequest(text="Привет!")
+
+        sample_interview.state = "in_progress"
+        mock_session.get.return_value = sample_interview
+        mock_session.scalars.return_value = [
+            InterviewMessage(
+                interview_id=interview_id,
+                index=index,
+                text="...",
+                type=InterviewMessageType.ASSISTANT,
+            )
+            for index in range(3)
+        ]
+
+        def make_chunk(content):
+            chunk = MagicMock()
+            chunk.choices = [MagicMock()]
+            chunk.choices[0].delta.content = content
+            chunk.choices[0].delta.function_call = None
+            return chunk
+
+        async def fake_stream(chat_params):
+            assert chat_params["stream"] is True
+            for content in ["Привет! ", "Расскажите о себе."]:
+                yield make_chunk(content)
+
+        mock_client = MagicMock()
+        mock_client.astream = fake_stream
+        mock_get_gigachat_client.return_value = mock_client
+        mock_session.scalar.return_value = 5
+
+        # Act
+        deltas = [
+            delta
+            async for delta in interview_messages_service.stream_message(
+                mock_session, interview_id, payload
+            )
+        ]
+
+        # Assert
+        assert deltas == ["Привет! ", "Расскажите о себе."]
+        user, stored = mock_session.add_all.call_args.args[0]
+        assert user.index == 3
+        assert user.text == "Привет!"
+        assert stored.index == 4
+        assert stored.type == InterviewMessageType.ASSISTANT
+        assert stored.text == "Привет! Расскажите о себе."
 
     @pytest.mark.asyncio
     async def test_create_message_interview_not_found(
@@ -217,7 +497,8 @@ class TestInterviewMessagesService:
         # Interview must be in initialized state to allow first message
         sample_interview.state = "initialized"
         mock_session.get.side_effect = mock_get
-        mock_session.scalar.return_value = 0  # No existing messages
+        # No existing messages, no stored prompt for this candidate version
+        mock_session.scalar.side_effect = [0, None]
 
         # Mock GigaChat response (async achat)
         mock_client = MagicMock()
@@ -229,17 +510,18 @@ class TestInterviewMessagesService:
         mock_client.achat = AsyncMock(return_value=mock_response)
         mock_get_gigachat_client.return_value = mock_client
 
-        # Mock empty messages list
-        mock_session.scalars.return_value = []
-
         # Act
         result = await interview_messages_service.initialize_conversation(
             mock_session, interview_id
         )
 
         # Assert
-        assert len(result) == 0  # Will be empty since we mocked empty scalars
-        mock_session.add.assert_called()
+        assert [m.type for m in result] == [
+            InterviewMessageType.SYSTEM,
+            InterviewMessageType.ASSISTANT,
+        ]
+        assert result[1].text == "Здравствуйте! Готовы начать интервью?"
+        mock_session.add_all.assert_called_once()
         mock_session.commit.assert_called()
 
     @pytest.mark.asyncio
@@ -259,14 +541,101 @@ class TestInterviewMessagesService:
                 mock_session, interview_id
             )
 
-    def test_create_system_prompt(
-        self, interview_messages_service, sample_candidate, sample_vacancy
+    @pytest.mark.asyncio
+    @patch("app.services.interview_messages.get_gigachat_client")
+    async def test_initialize_conversation_uses_pending_greeting(
+        self,
+        mock_get_gigachat_client,
+        interview_messages_service,
+        mock_session,
+        sample_interview,
+        sample_candidate,
+        sample_vacancy,
+    ):
+        """Test that a pre-generated greeting is used without calling GigaChat."""
+        sample_interview.state = "initialized"
+        sample_interview.pending_greeting = "Добрый день! Начнем?"
+        models = {
+            Interview: sample_interview,
+            Candidate: sample_candidate,
+            Vacancy: sample_vacancy,
+        }
+        mock_session.get.side_effect = lambda model, id: models.get(model)
+        mock_session.scalar.side_effect = [0, None]
+
+        result = await interview_messages_service.initialize_conversation(
+            mock_session, "test-interview-id"
+        )
+
+        assert result[1].text == "Добрый день! Начнем?"
+        assert sample_interview.pending_greeting is None
+        assert sample_interview.state == "in_progress"
+        mock_get_gigachat_client.assert_not_called()
+
+    @pytest.mark.asyncio
+    @patch("app.services.interview_messages.interview_prompt_service")
+    @patch("app.services.interview_messages.AsyncSessionLocal")
+    async def test_prewarm_greeting_stores_pending_greeting(
+        self,
+        mock_session_local,
+        mock_prompt_service,
+        interview_messages_service,
+        mock_session,
+        sample_interview,
+        sample_candidate,
+        sample_vacancy,
+    ):
+        """Test that the greeting is generated and stored for a new interview."""
+        sample_interview.state = "initialized"
+        sample_interview.pending_greeting = None
+        models = {
+            Interview: sample_interview,
+            Candidate: sample_candidate,
+            Vacancy: sample_vacancy,
+        }
+        mock_session.get.side_effect = lambda model, id: models.get(model)
+        mock_session_local.return_value.__aenter__.return_value = mock_session
+        mock_prompt_service.get_system_prompt = AsyncMock(return_value="prompt")
+        interview_messages_service._get_initial_greeting = AsyncMock(
+            return_value="Здравствуйте!"
+        )
+
+        greeting = await interview_messages_service.prewarm_greeting(
+            "test-interview-id"
+        )
+
+        assert greeting == "Здравствуйте!"
+        interview_messages_service._get_initial_greeting.assert_awaited_once_with(
+            "prompt"
+        )
+        mock_session.execute.assert_awaited_once()
+        assert mock_session.commit.await_count == 2
+
+    @pytest.mark.asyncio
+    @patch("app.services.interview_messages.AsyncSessionLocal")
+    async def test_prewarm_greeting_skips_started_interview(
+        self,
+        mock_session_local,
+        interview_messages_service,
+        mock_session,
+        sample_interview,
     ):
+        """Test that no greeting is generated once the interview has started."""
+        sample_interview.state = "in_progress"
+        mock_session.get.return_value = sample_interview
+        mock_session_local.return_value.__aenter__.return_value = mock_session
+        interview_messages_service._get_initial_greeting = AsyncMock()
+
+        assert (
+            await interview_messages_service.prewarm_greeting("test-interview-id")
+            is None
+        )
+        interview_messages_service._get_initial_greeting.assert_not_called()
+
+    def test_build_system_prompt(self, sample_candidate, sample_vacancy):
         """Test system prompt creation."""
         # Act
-        prompt = interview_messages_service._create_system_prompt(
-            sample_candidate, sample_vacancy
-        )
+        prompt = build_system_prompt(sample_candidate, sample_vacancy)
 
         # Assert
         assert "ассистент HR" in prompt
@@ -275,14 +644,10 @@ class TestInterviewMessagesService:
         assert "Senior Python Developer" in prompt
         assert "Разработка веб-приложений" in prompt
 
-    def test_create_system_prompt_no_vacancy(
-        self, interview_messages_service, sample_candidate
-    ):
+    def test_build_system_prompt_no_vacancy(self, sample_candidate):
         """Test system prompt creation without vacancy."""
         # Act
-        prompt = interview_messages_service._create_system_prompt(
-            sample_candidate, None
-        )
+        prompt = build_system_prompt(sample_candidate, None)
 
         # Assert
         assert "ассистент HR" in prompt
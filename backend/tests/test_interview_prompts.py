@@ -0,0 +1,68 @@
+from datetime import datetime
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.candidate import Candidate
+from app.models.vacancy import Vacancy
+from app.services.interview_prompts import (
+    InterviewPromptService,
+    build_system_prompt,
+    prompt_cache_key,
+)
+
+
+@pytest.fixture
+def candidate():
+    return Candidate(
+        id="candidate-1", name="Иван Иванов", updated_at=datetime(2025, 1, 1)
+    )
+
+
+@pytest.fixture
+def vacancy():
+    return Vacancy(id=1, title="Python Developer", updated_at=datetime(2025, 1, 2))
+
+
+class TestInterviewPromptService:
+    """Test per-version caching of interview system prompts."""
+
+    @pytest.mark.asyncio
+    async def test_prompt_is_rendered_and_stored_once(self, candidate, vacancy):
+        service = InterviewPromptService()
+        session = AsyncMock(spec=AsyncSession)
+        session.scalar.return_value = None
+
+        first = await service.get_system_prompt(session, candidate, vacancy)
+        second = await service.get_system_prompt(session, candidate, vacancy)
+
+        assert first == second == build_system_prompt(candidate, vacancy)
+        session.scalar.assert_awaited_once()
+        # The insert, then the removal of the pair's superseded prompts
+        assert session.execute.await_count == 2
+        prune = session.execute.call_args_list[1].args[0]
+        assert prune.is_delete
+        assert prune.compile().params == {
+            "candidate_id_1": "candidate-1",
+            "vacancy_id_1": 1,
+            "cache_key_1": prompt_cache_key(candidate, vacancy),
+        }
+
+    @pytest.mark.asyncio
+    async def test_stored_prompt_is_reused(self, candidate, vacancy):
+        service = InterviewPromptService()
+        session = AsyncMock(spec=AsyncSession)
+        session.scalar.return_value = "stored prompt"
+
+        prompt = await service.get_system_prompt(session, candidate, vacancy)
+
+        assert prompt == "stored prompt"
+        session.execute.assert_not_awaited()
+
+    def test_key_changes_with_record_versions(self, candidate, vacancy):
+        key = prompt_cache_key(candidate, vacancy)
+
+        assert prompt_cache_key(candidate, None) != key
+        vacancy.updated_at = datetime(2025, 2, 1)
+        assert prompt_cache_key(candidate, vacancy) != key
@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from app.services.interview_sessions import (
+    InterviewSessionRegistry,
+    MemorySessionStore,
+)
+
+
+class TestInterviewSessionRegistry:
+    """Test resuming and expiring interview WebSocket session state."""
+
+    @pytest.mark.asyncio
+    async def test_reconnect_resumes_saved_state(self, tmp_path):
+        registry = InterviewSessionRegistry(MemorySessionStore(), tmp_path, 3600)
+
+        state = await registry.acquire("interview-1", prefix="p-")
+        state.audio_marker_timings.append(1500)
+        state.fragment_index += 1
+        await registry.save(state)
+
+        resumed = await registry.acquire("interview-1", prefix="p-")
+
+        assert resumed.session_key == "p-interview-1"
+        assert resumed.audio_marker_timings == [1500]
+        assert resumed.fragment_index == 1
+        assert resumed.started_at == state.started_at
+        assert resumed.spool_path == str(tmp_path / "p-interview-1.spool.webm")
+
+    @pytest.mark.asyncio
+    async def test_unsaved_changes_are_not_shared(self, tmp_path):
+        registry = InterviewSessionRegistry(MemorySessionStore(), tmp_path, 3600)
+
+        state = await registry.acquire("interview-1")
+        state.audio_marker_timings.append(1500)
+
+        resumed = await registry.acquire("interview-1")
+
+        assert resumed.audio_marker_timings == []
+
+    @pytest.mark.asyncio
+    async def test_expired_sessions_drop_spool_files(self, tmp_path):
+        registry = InterviewSessionRegistry(MemorySessionStore(), tmp_path, 3600)
+        state = await registry.acquire("interview-1")
+        spool = state.new_spool_segment()
+        spool.write_bytes(b"chunk")
+
+        registry.ttl_seconds = -1
+        purged = await registry.purge_expired()
+
+        assert purged == 1
+        assert not spool.exists()
+        assert await registry.store.load(state.session_key) is None
+
+    @pytest.mark.asyncio
+    async def test_each_connection_spools_to_a_new_segment(self, tmp_path):
+        registry = InterviewSessionRegistry(MemorySessionStore(), tmp_path, 3600)
+        state = await registry.acquire("interview-1")
+        first = state.new_spool_segment()
+        first.write_bytes(b"stream one")
+
+        resumed = await registry.acquire("interview-1")
+        second = resumed.new_spool_segment()
+        second.write_bytes(b"stream two")
+
+        assert first == tmp_path / "interview-1.spool.0.webm"
+        assert second == tmp_path / "interview-1.spool.1.webm"
+        assert resumed.spool_segments() == [first, second]
+
+    @pytest.mark.asyncio
+    async def test_spool_files_of_forgotten_sessions_are_purged(self, tmp_path):
+        registry = InterviewSessionRegistry(MemorySessionStore(), tmp_path, 3600)
+        live = (await registry.acquire("interview-1")).new_spool_segment()
+        live.write_bytes(b"chunk")
+        # Left by a run whose in-memory sessions are gone
+        abandoned = tmp_path / "interview-2.spool.0.webm"
+        abandoned.write_bytes(b"chunk")
+        legacy = tmp_path / "interview-3.spool.webm"
+        legacy.write_bytes(b"chunk")
+        recording = tmp_path / "interview-2.webm"
+        recording.write_bytes(b"video")
+
+        removed = await registry.purge_abandoned()
+
+        assert removed == 2
+        assert live.exists()
+        assert recording.exists()
+        assert not abandoned.exists()
+        assert not legacy.exists()
+
+    @pytest.mark.asyncio
+    async def test_connected_sessions_do_not_expire(self, tmp_path):
+        registry = InterviewSessionRegistry(MemorySessionStore(), tmp_path, 1)
+        state = await registry.acquire("interview-1")
+        spool = state.new_spool_segment()
+        spool.write_bytes(b"chunk")
+        keep_alive = asyncio.create_task(registry.keep_alive(state))
+
+        # Longer than the TTL without markers or reconnects
+        await asyncio.sleep(1.5)
+        purged = await registry.purge_expired()
+        keep_alive.cancel()
+
+        assert purged == 0
+        assert spool.exists()
@@ -0,0 +1,182 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.models.candidate import Candidate
+from app.models.candidate_vacancy_match import CandidateVacancyMatch
+from app.models.vacancy import Vacancy
+from app.services.match_matrix import MatchMatrixService, skills_fingerprint
+
+
+def _connect(mock_session_factory, locked):
+    connection = AsyncMock()
+    connection.scalar.return_value = locked
+    return mock_session_factory(connection), connection
+
+
+def _pair():
+    candidate = Candidate(id="candidate-1", skills='["Python"]', tech=["FastAPI"])
+    vacancy = Vacancy(id=7, status="open", skills='["Python", "SQL"]')
+    return candidate, vacancy
+
+
+class TestMatchMatrixService:
+    """Test incremental maintenance of the candidate×vacancy match table."""
+
+    @pytest.mark.asyncio
+    @patch("app.services.match_matrix.compatibility_service")
+    async def test_score_reuses_skills_while_skill_lists_are_unchanged(
+        self, mock_compatibility
+    ):
+        candidate, vacancy = _pair()
+        mock_compatibility.overall_score.return_value = 61.0
+        existing = CandidateVacancyMatch(
+            skills_pct=50, skills_fingerprint=skills_fingerprint(candidate, vacancy)
+        )
+        service = MatchMatrixService(session_factory=MagicMock())
+
+        row = await service._score(candidate, vacancy, 0.7, existing)
+
+        mock_compatibility.skills_match_percentage.assert_not_called()
+        assert row["skills_pct"] == 50
+        assert row["overall_score"] == 61.0
+
+    @pytest.mark.asyncio
+    @patch("app.services.match_matrix.compatibility_service")
+    async def test_score_calls_llm_when_skills_changed(self, mock_compatibility):
+        candidate, vacancy = _pair()
+        existing = CandidateVacancyMatch(
+            skills_pct=50, skills_fingerprint=skills_fingerprint(candidate, vacancy)
+        )
+        vacancy.skills = '["Python", "SQL", "Docker"]'
+        mock_compatibility.skills_match_percentage.return_value = 33
+        mock_compatibility.overall_score.return_value = 40.0
+        service = MatchMatrixService(session_factory=MagicMock())
+
+        row = await service._score(candidate, vacancy, 0.7, existing)
+
+        mock_compatibility.skills_match_percentage.assert_called_once_with(
+            candidate, vacancy
+        )
+        assert row["skills_pct"] == 33
+        assert row["skills_fingerprint"] == skills_fingerprint(candidate, vacancy)
+
+    @pytest.mark.asyncio
+    async def test_closed_vacancy_loses_its_matches(self, mock_session_factory):
+        _, vacancy = _pair()
+        vacancy.status = "closed"
+        session = AsyncMock()
+        session.get.return_value = vacancy
+        session.scalar.return_value = True
+        service = MatchMatrixService(session_factory=mock_session_factory(session))
+
+        stored = await service.refresh_vacancy(vacancy.id)
+
+        assert stored == 0
+        statement = session.execute.call_args_list[-1].args[0]
+        assert statement.is_delete
+        assert statement.table.name == "candidate_vacancy_match"
+        session.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    @patch("app.services.match_matrix.embedding_service")
+    @patch("app.services.match_matrix.compatibility_service")
+    async def test_refresh_stores_chunk_aware_similarity(
+        self, mock_compatibility, mock_embeddings, mock_session_factory
+    ):
+        candidate, vacancy = _pair()
+        session = AsyncMock()
+        session.get.return_value = candidate
+        session.scalar.return_value = True
+        vacancies = MagicMock()
+        vacancies.all.return_value = [vacancy]
+        session.scalars.side_effect = [vacancies, []]
+        mock_embeddings.similarities_by_ids = AsyncMock(
+            return_value={(candidate.id, vacancy.id): 0.83}
+        )
+        mock_compatibility.skills_match_percentage.return_value = 50
+        mock_compatibility.overall_score.return_value = 66.0
+        service = MatchMatrixService(session_factory=mock_session_factory(session))
+
+        stored = await service.refresh_candidate(candidate.id)
+
+        assert stored == 1
+        mock_embeddings.similarities_by_ids.assert_awaited_once_with(
+            session, [(candidate.id, vacancy.id)]
+        )
+        mock_compatibility.overall_score.assert_called_once_with(0.83, 50)
+
+    @pytest.mark.asyncio
+    @patch("app.services.match_matrix.settings")
+    async def test_rebuild_schedules_only_stale_matches(
+        self, mock_settings, mock_session_factory
+    ):
+        mock_settings.match_matrix_enabled = True
+        session = AsyncMock()
+        session.scalars.side_effect = [[7], ["candidate-1"]]
+        session.scalar.return_value = True
+        connect, connection = _connect(mock_session_factory, locked=True)
+        service = MatchMatrixService(
+            session_factory=mock_session_factory(session), connect=connect
+        )
+        service.refresh_vacancy = AsyncMock(return_value=0)
+        service.refresh_candidate = AsyncMock(return_value=0)
+
+        scheduled = await service.rebuild()
+        await service.stop()
+
+        assert scheduled == 2
+        lock, unlock = [call.args[0] for call in connection.scalar.call_args_list]
+        assert "pg_try_advisory_lock" in str(lock)
+        assert "pg_advisory_unlock" in str(unlock)
+        service.refresh_vacancy.assert_awaited_once_with(7)
+        service.refresh_candidate.assert_awaited_once_with("candidate-1")
+        stale_vacancies = session.scalars.call_args_list[0].args[0]
+        assert "min(candidate_vacancy_match.computed_at)" in str(stale_vacancies)
+
+    @pytest.mark.asyncio
+    async def test_rebuild_is_skipped_while_another_worker_holds_the_lock(
+        self, mock_session_factory
+    ):
+        session_factory = MagicMock()
+        connect, connection = _connect(mock_session_factory, locked=False)
+        service = MatchMatrixService(session_factory=session_factory, connect=connect)
+
+        assert await service.rebuild() == 0
+        session_factory.assert_not_called()
+        connection.scalar.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    @patch("app.services.match_matrix.settings")
+    async def test_repeated_changes_are_queued_once(self, mock_settings):
+        mock_settings.match_matrix_enabled = True
+        service = MatchMatrixService(session_factory=MagicMock())
+        service.refresh_candidate = AsyncMock(return_value=0)
+
+        service.enqueue_candidate("candidate-1")
+        service.enqueue_candidate("candidate-1")
+        await service.drain()
+        await service.stop()
+
+        service.refresh_candidate.assert_awaited_once_with("candidate-1")
+
+    @pytest.mark.asyncio
+    async def test_top_candidates_filtered_to_nothing_skip_the_fallback(self):
+        from app.api import compatibility as api
+
+        session = AsyncMock()
+        with patch.object(
+            api.entity_cache, "get", AsyncMock(return_value=Vacancy(status="open"))
+        ), patch.object(api, "match_matrix_service") as matrix, patch.object(
+            api, "embedding_service"
+        ) as embeddings:
+            matrix.top_candidates = AsyncMock(return_value=[])
+            matrix.has_vacancy_matches = AsyncMock(return_value=True)
+
+            result = await api.get_top_candidates_for_vacancy(
+                7, 10, "Москва", None, None, None, [], session
+            )
+
+        assert result == []
+        matrix.enqueue_vacancy.assert_not_called()
+        embeddings.find_similar_candidates.assert_not_called()
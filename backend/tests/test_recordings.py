@@ -0,0 +1,144 @@
+import os
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.services.recordings import (
+    RecordingKind,
+    RecordingLifecycleManager,
+    manifest_path,
+)
+
+
+def _write(path, size, mtime):
+    path.write_bytes(b"x" * size)
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def _session(interview):
+    session = MagicMock()
+    session.get = AsyncMock(return_value=interview)
+    session.commit = AsyncMock()
+    return session
+
+
+class TestRecordingLifecycleManager:
+    """Test background S3 archiving and disk quota of interview recordings."""
+
+    @pytest.mark.asyncio
+    async def test_full_recording_is_uploaded_and_url_stored(
+        self, tmp_path, mock_session_factory
+    ):
+        s3 = MagicMock()
+        interview = MagicMock()
+        session = _session(interview)
+        session_factory = mock_session_factory(session)
+        manager = RecordingLifecycleManager(tmp_path, 1024, lambda: s3, session_factory)
+        video = _write(tmp_path / "interview-1.webm", 10, 1000)
+
+        manager.enqueue(video, "interview-1", RecordingKind.FULL)
+        await manager.drain()
+        await manager.stop()
+
+        s3.upload_file.assert_called_once()
+        args = s3.upload_file.call_args.args
+        assert args[0] == str(video)
+        assert args[2] == "recordings/interview-1/interview-1.webm"
+        assert not video.exists()
+        assert interview.recording_url.endswith(
+            "/recordings/interview-1/interview-1.webm"
+        )
+        session.commit.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    @patch("app.services.recordings.UPLOAD_RETRY_DELAY_SECONDS", 0)
+    async def test_failed_upload_keeps_local_copy(self, tmp_path, mock_session_factory):
+        s3 = MagicMock()
+        s3.upload_file.side_effect = RuntimeError("S3 unavailable")
+        session_factory = mock_session_factory(_session(MagicMock()))
+        manager = RecordingLifecycleManager(tmp_path, 1024, lambda: s3, session_factory)
+        fragment = _write(tmp_path / "interview-1.0.webm", 10, 1000)
+
+        manager.enqueue(fragment, "interview-1", RecordingKind.FRAGMENT)
+        await manager.drain()
+        await manager.stop()
+
+        assert s3.upload_file.call_count == 3
+        assert fragment.exists()
+        session_factory.assert_not_called()
+        # Still waiting for archiving, so the quota must not evict it
+        manager.max_bytes = 0
+        manager.enforce_quota()
+        assert fragment.exists()
+
+    @pytest.mark.asyncio
+    async def test_recover_queues_recordings_left_by_a_restart(
+        self, tmp_path, mock_session_factory
+    ):
+        s3 = MagicMock()
+        interview = MagicMock()
+        session_factory = mock_session_factory(_session(interview))
+        stopped = RecordingLifecycleManager(tmp_path, 1024, MagicMock(), MagicMock())
+        with patch("app.services.recordings.settings.recordings_upload_enabled", False):
+            video = _write(tmp_path / "interview-1.webm", 10, 1000)
+            stopped.enqueue(video, "interview-1", RecordingKind.FULL)
+        assert video.exists()
+
+        manager = RecordingLifecycleManager(tmp_path, 1024, lambda: s3, session_factory)
+        assert manager.recover() == 1
+        await manager.drain()
+        await manager.stop()
+
+        assert s3.upload_file.call_args.args[2] == (
+            "recordings/interview-1/interview-1.webm"
+        )
+        assert not video.exists()
+        assert not manifest_path(video).exists()
+        assert interview.recording_url.endswith("/interview-1/interview-1.webm")
+
+    def test_quota_evicts_oldest_files_of_finished_sessions(self, tmp_path):
+        manager = RecordingLifecycleManager(tmp_path, 25, MagicMock(), MagicMock())
+        oldest = _write(tmp_path / "old.webm", 10, 1000)
+        live = _write(tmp_path / "live.0.webm", 10, 1500)
+        newer = _write(tmp_path / "new.webm", 10, 2000)
+        manager.protect_session("live")
+
+        freed = manager.enforce_quota()
+
+        assert freed == 10
+        assert not oldest.exists()
+        assert live.exists()
+        assert newer.exists()
+
+    def test_quota_keeps_recent_files_of_other_workers_sessions(self, tmp_path):
+        manager = RecordingLifecycleManager(
+            tmp_path, 0, MagicMock(), MagicMock(), live_seconds=3600
+        )
+        # Spooled just now by a session this worker knows nothing about
+        segment = _write(tmp_path / "other.spool.0.webm", 10, time.time())
+        stale = _write(tmp_path / "old.webm", 10, 1000)
+
+        manager.enforce_quota()
+
+        assert segment.exists()
+        assert not stale.exists()
+
+    @pytest.mark.asyncio
+    async def test_each_manifest_is_recovered_by_one_worker(self, tmp_path):
+        with patch("app.services.recordings.settings.recordings_upload_enabled", False):
+            video = _write(tmp_path / "interview-1.webm", 10, 1000)
+            RecordingLifecycleManager(tmp_path, 1024, MagicMock(), MagicMock()).enqueue(
+                video, "interview-1", RecordingKind.FULL
+            )
+        first = RecordingLifecycleManager(tmp_path, 1024, MagicMock(), MagicMock())
+        second = RecordingLifecycleManager(tmp_path, 1024, MagicMock(), MagicMock())
+        first._claim(video)
+
+        assert second.recover() == 0
+        assert second._pending == set()
+        await first.stop()
+        # A stopped (or crashed) worker's uploads can be taken over
+        assert second._claim(video)
+        await second.stop()
@@ -0,0 +1,64 @@
+from sqlalchemy.dialects import postgresql
+
+from app.models.candidate import Candidate
+from app.services.candidates import (
+    candidate_experience_years,
+    candidate_skill_tags,
+)
+from app.services.search_filters import CandidateFilters, VacancyFilters
+
+
+def _sql(condition) -> str:
+    return str(condition.compile(dialect=postgresql.dialect()))
+
+
+class TestCandidateFilters:
+    def test_empty_filters_add_no_conditions(self):
+        assert CandidateFilters().conditions() == []
+        assert VacancyFilters().conditions() == []
+
+    def test_skills_are_normalized_for_containment(self):
+        filters = CandidateFilters(skills=["  Python ", "Fast  API", " "])
+
+        (condition,) = filters.conditions()
+
+        assert "@>" in _sql(condition)
+        assert condition.right.value == ["python", "fast api"]
+
+    def test_location_is_case_insensitive(self):
+        (condition,) = VacancyFilters(location="Москва").conditions()
+
+        assert _sql(condition).startswith("lower(vacancy.location)")
+        assert condition.right.value == "москва"
+
+    def test_zero_experience_is_a_filter(self):
+        (condition,) = CandidateFilters(min_experience_years=0).conditions()
+
+        assert "candidate.experience_years >=" in _sql(condition)
+
+
+class TestCandidateSearchFields:
+    def test_skill_tags_merge_skills_and_tech(self):
+        candidate = Candidate(
+            skills='["Python", "SQL", "python"]', tech=["PostgreSQL", " Docker "]
+        )
+
+        assert candidate_skill_tags(candidate) == [
+            "docker",
+            "postgresql",
+            "python",
+            "sql",
+        ]
+
+    def test_experience_years_sums_items(self):
+        candidate = Candidate(
+            experience='[{"company": "A", "years": 2}, {"company": "B", "years": "3"}]'
+        )
+
+        assert candidate_experience_years(candidate) == 5
+
+    def test_unparseable_fields_are_empty(self):
+        candidate = Candidate(skills=None, tech=None, experience="not json")
+
+        assert candidate_skill_tags(candidate) == []
+        assert candidate_experience_years(candidate) == 0
@@ -0,0 +1,105 @@
+import io
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.services.speech_synthesis import (
+    SentenceSplitter,
+    SpeechSynthesisService,
+    TTSAudioCache,
+)
+
+
+class TestSentenceSplitter:
+    """Test incremental sentence splitting of streamed LLM text."""
+
+    def test_emits_sentence_once_boundary_arrives(self):
+        splitter = SentenceSplitter(min_chars=5)
+
+        assert splitter.feed("Здравствуйте, рад зна") == []
+        assert splitter.feed("комству! Расскажите") == ["Здравствуйте, рад знакомству!"]
+        assert splitter.feed(" о себе.") == []
+        assert splitter.flush() == "Расскажите о себе."
+        assert splitter.flush() is None
+
+    def test_short_sentences_are_merged(self):
+        splitter = SentenceSplitter(min_chars=20)
+
+        sentences = splitter.feed("Хорошо. Спасибо. Какой у вас опыт с Python? ")
+
+        assert sentences == ["Хорошо. Спасибо. Какой у вас опыт с Python?"]
+        assert splitter.flush() is None
+
+    def test_line_breaks_split_sentences(self):
+        splitter = SentenceSplitter(min_chars=1)
+
+        sentences = splitter.feed("Первый вопрос\nВторой вопрос\n")
+
+        assert sentences == ["Первый вопрос", "Второй вопрос"]
+
+
+class TestTTSAudioCache:
+    """Test the on-disk TTS audio cache."""
+
+    def test_put_and_get(self, tmp_path):
+        cache = TTSAudioCache(tmp_path, max_bytes=1024)
+        key = TTSAudioCache.make_key("Привет", "voice", "role", "mp3")
+
+        assert cache.get(key) is None
+        cache.put(key, b"audio")
+
+        assert cache.get(key) == b"audio"
+        # A fresh instance picks the entry up from disk
+        assert TTSAudioCache(tmp_path, max_bytes=1024).get(key) == b"audio"
+
+    def test_key_depends_on_voice_and_format(self):
+        base = TTSAudioCache.make_key("Привет", "voice", "role", "mp3")
+
+        assert base != TTSAudioCache.make_key("Привет", "other", "role", "mp3")
+        assert base != TTSAudioCache.make_key("Привет", "voice", "role", "wav")
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = TTSAudioCache(tmp_path, max_bytes=10)
+        cache.put("a", b"1234")
+        cache.put("b", b"1234")
+        cache.get("a")  # "b" is now the least recently used entry
+        cache.put("c", b"1234")
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+        assert not (tmp_path / "b.audio").exists()
+
+
+class TestSpeechSynthesisService:
+    """Test cached speech synthesis."""
+
+    @pytest.mark.asyncio
+    @patch("app.services.speech_synthesis.get_yandex_speech_synthesis_client")
+    async def test_synthesize_uses_cache(self, mock_get_client, tmp_path):
+        mock_model = MagicMock()
+        mock_model.synthesize.return_value.export.return_value = io.BytesIO(b"mp3")
+        mock_get_client.return_value = mock_model
+        service = SpeechSynthesisService(TTSAudioCache(tmp_path, max_bytes=1024))
+
+        first = await service.synthesize("Здравствуйте!")
+        second = await service.synthesize("Здравствуйте!")
+
+        assert first == second == b"mp3"
+        mock_model.synthesize.assert_called_once_with("Здравствуйте!")
+
+    @pytest.mark.asyncio
+    async def test_warm_up_renders_phrases_and_sentences(self, tmp_path):
+        service = SpeechSynthesisService(TTSAudioCache(tmp_path, max_bytes=1024))
+        service._synthesize_sync = MagicMock(return_value=b"mp3")
+        phrase = "Спасибо за беседу, это было полезно! Мы свяжемся с вами позже."
+
+        rendered = await service.warm_up([phrase])
+
+        rendered_texts = [c.args[0] for c in service._synthesize_sync.call_args_list]
+        assert rendered == 3
+        assert rendered_texts == [
+            phrase,
+            "Спасибо за беседу, это было полезно!",
+            "Мы свяжемся с вами позже.",
+        ]
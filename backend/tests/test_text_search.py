@@ -0,0 +1,48 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from sqlalchemy.dialects.postgresql.asyncpg import PGDialect_asyncpg
+
+from app.services.text_search import TextSearchService
+
+
+def _executed_sql(session) -> str:
+    statement = session.execute.call_args.args[0]
+    return str(statement.compile(dialect=PGDialect_asyncpg()))
+
+
+class TestTextSearchService:
+    """Test the SQL of ranked full-text searches."""
+
+    @pytest.mark.asyncio
+    async def test_candidates_match_keywords_or_fuzzy_name_and_email(self):
+        session = AsyncMock()
+        session.execute.return_value.all = lambda: []
+
+        await TextSearchService().search_candidates(session, "Иванов python", 10, 20)
+
+        sql = _executed_sql(session)
+        assert (
+            "candidate.search_vector @@ websearch_to_tsquery('russian'::regconfig"
+            in sql
+        )
+        assert "<% candidate.name" in sql
+        assert "<% candidate.email" in sql
+        assert "ORDER BY ts_rank_cd(candidate.search_vector" in sql
+        assert "LIMIT" in sql and "OFFSET" in sql
+
+    @pytest.mark.asyncio
+    async def test_messages_are_filtered_by_interview_with_snippets(self):
+        session = AsyncMock()
+        session.execute.return_value.all = lambda: [
+            ("message", "<b>Python</b> три года", 0.5)
+        ]
+
+        results = await TextSearchService().search_interview_messages(
+            session, "python", interview_id="interview-1"
+        )
+
+        sql = _executed_sql(session)
+        assert "ts_headline('russian'::regconfig, interview_message.text" in sql
+        assert "interview_message.interview_id = " in sql
+        assert results == [("message", "<b>Python</b> три года", 0.5)]
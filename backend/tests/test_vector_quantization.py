@@ -0,0 +1,80 @@
+import numpy as np
+from sqlalchemy.dialects import postgresql
+
+from app.models.embedding import CandidateEmbedding
+from app.services.vector_quantization import (
+    Quantization,
+    compact_distance,
+    create_index_statements,
+    drop_index_statements,
+    index_name,
+    int8_top_indices,
+    quantize_int8,
+    supports_compact_indexes,
+    supports_iterative_scan,
+)
+
+
+def _sql(expression) -> str:
+    return str(expression.compile(dialect=postgresql.dialect()))
+
+
+class TestVectorQuantization:
+    """Test compact vector distances, their indexes and int8 pre-filtering."""
+
+    def test_halfvec_distance_matches_index_expression(self):
+        sql = _sql(
+            compact_distance(
+                CandidateEmbedding.embedding, [0.1, 0.2, 0.3], 3, Quantization.HALFVEC
+            )
+        )
+
+        assert "CAST(candidate_embeddings.embedding AS HALFVEC(3))" in sql
+        assert "<=>" in sql
+
+    def test_bit_distance_uses_hamming_on_binary_quantize(self):
+        sql = _sql(
+            compact_distance(
+                CandidateEmbedding.embedding, [0.1, -0.2, 0.3], 3, Quantization.BIT
+            )
+        )
+
+        assert "binary_quantize(candidate_embeddings.embedding)" in sql
+        assert "<~>" in sql
+
+    def test_index_statements_are_partial_on_the_generation(self):
+        statements = create_index_statements("candidate_embeddings", "O'Model", 1024)
+
+        assert len(statements) == 2
+        assert all("WHERE generation = 'O''Model'" in s for s in statements)
+        assert "halfvec_cosine_ops" in statements[0]
+        assert "bit_hamming_ops" in statements[1]
+        assert index_name("candidate_embeddings", "bit", "O'Model") in statements[1]
+        assert drop_index_statements("candidate_embeddings", "O'Model") == [
+            "DROP INDEX IF EXISTS "
+            + index_name("candidate_embeddings", quantization, "O'Model")
+            for quantization in ("halfvec", "bit")
+        ]
+
+    def test_compact_indexes_need_pgvector_0_7(self):
+        assert supports_compact_indexes("0.8.0")
+        assert not supports_compact_indexes("0.6.2")
+        assert not supports_compact_indexes(None)
+
+    def test_iterative_scans_need_pgvector_0_8(self):
+        assert supports_iterative_scan("0.8.0")
+        assert not supports_iterative_scan("0.7.4")
+        assert not supports_iterative_scan("")
+
+    def test_int8_prefilter_keeps_exact_top_matches(self):
+        rng = np.random.default_rng(0)
+        vectors = rng.normal(size=(500, 64))
+        query = rng.normal(size=64)
+        exact = vectors @ query / np.linalg.norm(vectors, axis=1)
+        expected = set(np.argsort(-exact)[:10])
+
+        codes, scales = quantize_int8(vectors)
+        pool = int8_top_indices(query, codes, scales, 50)
+
+        assert codes.dtype == np.int8
+        assert expected <= set(pool)
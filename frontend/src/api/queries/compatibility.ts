@@ -67,21 +67,43 @@ export interface SimilarCandidate {
 	match_level: string;
 }
 
+export interface CompatibilityReportJob {
+	status: "pending" | "running" | "done" | "failed";
+	scoring_version: number;
+	overall_score: number | null;
+	computed_at: string | null;
+	error: string | null;
+}
+
+const REPORT_POLL_INTERVAL_MS = 2000;
+
 export const compatibilityReportQueryOptions = (
 	candidateId: string,
 	vacancyId: number,
 ) =>
 	queryOptions({
 		queryKey: ["compatibility", "report", candidateId, vacancyId],
-		queryFn: async (): Promise<CompatibilityReport> => {
+		// null while the report is being computed in the background
+		queryFn: async (): Promise<CompatibilityReport | null> => {
 			const response = await fetch(
 				`/api/compatibility/candidate/${candidateId}/vacancy/${vacancyId}/report`,
 			);
 			if (!response.ok) {
 				throw new Error("Failed to fetch compatibility report");
 			}
+			if (response.status === 202) {
+				const job: CompatibilityReportJob = await response.json();
+				if (job.status === "failed") {
+					throw new Error(
+						job.error ?? "Failed to compute compatibility report",
+					);
+				}
+				return null;
+			}
 			return response.json();
 		},
+		refetchInterval: (query) =>
+			query.state.data === null ? REPORT_POLL_INTERVAL_MS : false,
 		enabled: Boolean(candidateId && vacancyId),
 	});
 
@@ -26,7 +26,8 @@ export function CompatibilityReport({
 		error,
 	} = useQuery(compatibilityReportQueryOptions(candidateId, vacancyId));
 
-	if (isLoading) {
+	// The report is still being computed on the server
+	if (isLoading || report === null) {
 		return <CompatibilityReportSkeleton />;
 	}
 
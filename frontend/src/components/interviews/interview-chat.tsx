@@ -32,12 +32,10 @@ export function InterviewChat({ interviewId }: Props) {
 		refetchInterval: 1000,
 	});
 	const isFinished = interview.data.state === "done";
-	const { webcamRef, sendAudioReadyMarker, socketState } = useWebcamStreaming(
-		interviewId,
-		{
+	const { webcamRef, sendAudioReadyMarker, socketState, queuePosition } =
+		useWebcamStreaming(interviewId, {
 			disabled: isFinished,
-		},
-	);
+		});
 	const candidate = useSuspenseQuery(
 		candidateQueryOptions(interview.data.candidate_id),
 	);
@@ -62,6 +60,7 @@ export function InterviewChat({ interviewId }: Props) {
 		);
 	}
 
+	const isQueued = socketState === "queued";
 	const isAwaiting = socketState === "awaiting_user_answer";
 	const isSTT = socketState === "speech_recognition";
 	const isLLM = socketState === "generating_response";
@@ -185,6 +184,14 @@ export function InterviewChat({ interviewId }: Props) {
 											Отправить
 										</Button>
 									</div>
+								) : isQueued ? (
+									<div className="flex items-center gap-2 text-muted-foreground">
+										<Loader2Icon className="size-4 animate-spin" />
+										<span>
+											Все интервьюеры заняты. Ваша позиция в очереди:{" "}
+											{queuePosition}
+										</span>
+									</div>
 								) : isAwaiting ? (
 									<Tooltip>
 										<TooltipTrigger asChild>
@@ -5,11 +5,13 @@ import z from "zod";
 
 const socketStateMessageSchema = z.object({
 	state: z.enum([
+		"queued",
 		"awaiting_user_answer",
 		"speech_recognition",
 		"generating_response",
 		"speech_synthesis",
 	]),
+	position: z.number().int().optional(),
 });
 
 type SocketState = z.infer<typeof socketStateMessageSchema>["state"];
@@ -21,25 +23,32 @@ export function useWebcamStreaming(
 	const webcamRef = useRef<Webcam | null>(null);
 	const mediaRecorderRef = useRef<MediaRecorder | null>(null);
 	const audioRef = useRef<HTMLAudioElement | null>(null);
+	const audioQueueRef = useRef<Blob[]>([]);
+	const isPlayingRef = useRef(false);
 	const [isRecording, setIsRecording] = useState(false);
 	const isDisabled = options?.disabled === true;
 	const [socketState, setSocketState] = useState<SocketState | null>(
 		"awaiting_user_answer",
 	);
+	const [queuePosition, setQueuePosition] = useState<number | null>(null);
 	const { sendMessage, readyState, lastMessage } = useWebSocket(
 		isDisabled ? null : `/ws/${interviewId}/video`,
 		{
 			onError: (error) => {
 				console.error("WebSocket error connecting to webcam stream:", error);
 			},
+			onMessage: (event) => {
+				// Audio frames are handled here rather than via lastMessage,
+				// so frames arriving back to back are not dropped by batching.
+				if (event.data instanceof Blob) {
+					enqueueAudio(event.data);
+				}
+			},
 			onOpen: () => {
 				console.log(
 					"WebSocket connected to webcam stream for interview:",
 					interviewId,
 				);
-				if (!isDisabled) {
-					startRecording();
-				}
 			},
 		},
 	);
@@ -51,140 +60,96 @@ export function useWebcamStreaming(
 		sendMessage(data.data);
 	}
 
-	useEffect(() => {
-		if (lastMessage) {
-			if (lastMessage.data instanceof Blob) {
-				// Check if blob is empty or has invalid size
-				if (lastMessage.data.size === 0) {
-					console.warn("Received empty audio blob, skipping playback");
-					return;
-				}
+	/**
+	 * Ответ интервьюера приходит несколькими аудио-фреймами (по предложению),
+	 * поэтому складываем их в очередь и проигрываем по порядку.
+	 */
+	function enqueueAudio(blob: Blob) {
+		// Check if blob is empty or has invalid size
+		if (blob.size === 0) {
+			console.warn("Received empty audio blob, skipping playback");
+			return;
+		}
+		audioQueueRef.current.push(blob);
+		if (!isPlayingRef.current) {
+			playNextAudio();
+		}
+	}
 
-				// Log first few bytes to debug format
-				const reader = new FileReader();
-				reader.onload = () => {
-					const arrayBuffer = reader.result as ArrayBuffer;
-					const uint8Array = new Uint8Array(arrayBuffer);
-					const firstBytes = Array.from(uint8Array.slice(0, 12))
-						.map((b) => b.toString(16).padStart(2, "0"))
-						.join(" ");
-					console.log("Audio blob first bytes (hex):", firstBytes);
-
-					// Check for common audio format headers
-					if (firstBytes.startsWith("52 49 46 46")) {
-						console.log("Detected WAV format (RIFF header)");
-					} else if (
-						firstBytes.startsWith("ff fb") ||
-						firstBytes.startsWith("ff f3")
-					) {
-						console.log("Detected MP3 format");
-					} else if (firstBytes.startsWith("4f 67 67 53")) {
-						console.log("Detected OGG format");
-					} else {
-						console.warn("Unknown audio format, first bytes:", firstBytes);
-					}
-				};
-				reader.readAsArrayBuffer(lastMessage.data.slice(0, 12));
-
-				// Create audio element if it doesn't exist
-				if (!audioRef.current) {
-					console.log("Creating new Audio element");
-					audioRef.current = new Audio();
-				}
+	function playNextAudio() {
+		const blob = audioQueueRef.current.shift();
+		if (!blob) {
+			isPlayingRef.current = false;
+			return;
+		}
+		isPlayingRef.current = true;
 
-				// Create object URL from the blob and play it
-				const audioUrl = URL.createObjectURL(lastMessage.data);
+		// Create audio element if it doesn't exist
+		if (!audioRef.current) {
+			console.log("Creating new Audio element");
+			audioRef.current = new Audio();
+		}
+
+		const fallbackTypes = ["audio/mpeg", "audio/wav", "audio/ogg", "audio/mp4"];
+		let fallbackIndex = 0;
+
+		const tryPlay = () => {
+			if (fallbackIndex >= fallbackTypes.length) {
+				console.error("All fallback attempts failed");
+				playNextAudio();
+				return;
+			}
+			if (!audioRef.current) {
+				console.error("Audio element not found");
+				return;
+			}
 
-				// Set MIME type explicitly if not set
-				if (!lastMessage.data.type) {
-					// Create a new blob with explicit WAV MIME type
-					const wavBlob = new Blob([lastMessage.data], { type: "audio/wav" });
-					const wavUrl = URL.createObjectURL(wavBlob);
-					audioRef.current.src = wavUrl;
-					// Clean up the original URL
+			const audioUrl = URL.createObjectURL(
+				new Blob([blob], { type: blob.type || fallbackTypes[fallbackIndex] }),
+			);
+			audioRef.current.src = audioUrl;
+			audioRef.current.addEventListener(
+				"ended",
+				() => {
+					// Clean up the object URL after playing
 					URL.revokeObjectURL(audioUrl);
-				} else {
-					audioRef.current.src = audioUrl;
-				}
+					playNextAudio();
+				},
+				{ once: true },
+			);
+			audioRef.current.play().catch((error) => {
+				console.error(
+					`Error playing audio as ${fallbackTypes[fallbackIndex]}:`,
+					error,
+				);
+				URL.revokeObjectURL(audioUrl);
+				fallbackIndex++;
+				setTimeout(tryPlay, 100);
+			});
+		};
+
+		tryPlay();
+	}
 
-				// Add a small delay to ensure the audio element is ready
-				setTimeout(() => {
-					// Play the audio
-					audioRef.current
-						?.play()
-						.then(() => {
-							console.log("Audio playback started successfully");
-						})
-						.catch((error) => {
-							console.error("Error playing audio:", error);
-
-							const fallbackTypes = [
-								"audio/wav",
-								"audio/mpeg",
-								"audio/ogg",
-								"audio/mp4",
-							];
-							let fallbackIndex = 0;
-
-							const tryFallback = () => {
-								if (fallbackIndex >= fallbackTypes.length) {
-									console.error("All fallback attempts failed");
-									return;
-								}
-
-								const fallbackType = fallbackTypes[fallbackIndex];
-
-								const fallbackBlob = new Blob([lastMessage.data], {
-									type: fallbackType,
-								});
-								const fallbackUrl = URL.createObjectURL(fallbackBlob);
-
-								// Clean up previous URL
-								URL.revokeObjectURL(audioRef.current?.src || "");
-
-								if (!audioRef.current) {
-									console.error("Audio element not found");
-									return;
-								}
-
-								audioRef.current.src = fallbackUrl;
-
-								audioRef.current
-									?.play()
-									.then(() => {})
-									.catch((fallbackError) => {
-										console.error(
-											`Fallback ${fallbackType} failed:`,
-											fallbackError,
-										);
-										URL.revokeObjectURL(fallbackUrl);
-										fallbackIndex++;
-										setTimeout(tryFallback, 100);
-									});
-							};
-
-							setTimeout(tryFallback, 100);
-						});
-				}, 100);
-
-				// Clean up the object URL after playing
-				const currentUrl = audioRef.current.src;
-				audioRef.current.addEventListener(
-					"ended",
-					() => {
-						URL.revokeObjectURL(currentUrl);
-					},
-					{ once: true },
+	useEffect(() => {
+		if (lastMessage && !(lastMessage.data instanceof Blob)) {
+			try {
+				const parsedData = socketStateMessageSchema.parse(
+					JSON.parse(lastMessage.data),
 				);
-			} else {
-				try {
-					const parsedData = socketStateMessageSchema.parse(
-						JSON.parse(lastMessage.data),
-					);
-					setSocketState(parsedData.state);
-				} catch (error) {
-					console.error("Error parsing socket state message:", error);
+				setSocketState(parsedData.state);
+				setQueuePosition(parsedData.position ?? null);
+				// Пока собеседование в очереди, сервер читает из сокета не больше
+				// одного сообщения, поэтому запись начинаем только после допуска.
+				if (
+					parsedData.state !== "queued" &&
+					!mediaRecorderRef.current &&
+					!isDisabled
+				) {
+					startRecording();
 				}
+			} catch (error) {
+				console.error("Error parsing socket state message:", error);
 			}
 		}
 	}, [lastMessage]);
@@ -192,6 +157,7 @@ export function useWebcamStreaming(
 	// Cleanup audio element on unmount
 	useEffect(() => {
 		return () => {
+			audioQueueRef.current = [];
 			if (audioRef.current) {
 				audioRef.current.pause();
 				audioRef.current.src = "";
@@ -249,5 +215,6 @@ export function useWebcamStreaming(
 		handleStopRecording,
 		sendAudioReadyMarker,
 		socketState,
+		queuePosition,
 	};
 }